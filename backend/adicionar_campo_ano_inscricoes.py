@@ -4,6 +4,7 @@ e criar configuração específica para o ano ativo das inscrições.
 """
 from database import SessionLocal, engine
 from models.database_models import ConfiguracaoSistema
+from services.configuracoes import invalidar_configuracoes
 from sqlalchemy import text
 from datetime import datetime
 
@@ -53,6 +54,7 @@ def adicionar_campo_ano():
             )
             db.add(nova_config)
             db.commit()
+            invalidar_configuracoes()
             print(f"✅ Configuração 'ano_ativo_inscricoes' criada com ano {datetime.now().year}!")
         else:
             print(f"ℹ️  Configuração 'ano_ativo_inscricoes' já existe (ano: {config_ano_ativo.valor}).")
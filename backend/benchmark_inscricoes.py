@@ -0,0 +1,133 @@
+"""
+Benchmark de GET /api/inscricoes/ com o engine síncrono e com o assíncrono.
+
+- sync: rota `def` com Session (get_db), executada no threadpool do worker
+  (THREADS_POR_WORKER threads disputando o pool de conexões)
+- async: rota `async def` com AsyncSession (get_async_db), executada no
+  event loop; a espera pelo banco não ocupa thread
+
+Cada modo sobe, no mesmo processo, um app só com a listagem e recebe N
+clientes simultâneos (httpx com transporte ASGI, sem rede), cada um fazendo R
+requisições. Mostra requisições por segundo e latências p50/p95/p99.
+
+Requisições recusadas com 503 (pool saturado, services/pool_banco.py) são
+contadas à parte; para medir só a vazão, aumente DB_POOL_FILA_MAXIMA.
+
+Usa o banco de DATABASE_URL, só para leitura. O resultado representativo é o
+do PostgreSQL (asyncpg); com SQLite o aiosqlite usa uma thread por conexão e
+serve apenas para validar o caminho.
+
+Uso: python benchmark_inscricoes.py [--clientes 200] [--requisicoes 5] [--limite 50] [--modos sync async]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, NamedTuple, Optional
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from database import fechar_async_engine
+from routes import inscricoes
+from services.execucao import configurar_execucao
+from services.pool_banco import resposta_pool_esgotado
+
+URL = "/api/inscricoes/"
+MODOS = ("sync", "async")
+
+
+class Resultado(NamedTuple):
+    modo: str
+    requisicoes: int
+    recusadas: int  # 503: pool de conexões esgotado (services/pool_banco.py)
+    erros: int
+    duracao: float
+    latencias: List[float]
+
+    @property
+    def vazao(self) -> float:
+        return self.requisicoes / self.duracao
+
+    def percentil(self, p: float) -> float:
+        ordenadas = sorted(self.latencias)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+    def resumo(self) -> str:
+        return (
+            f"{self.modo:>5}: {self.vazao:8.1f} req/s | "
+            f"p50 {self.percentil(50) * 1000:7.1f}ms  p95 {self.percentil(95) * 1000:7.1f}ms  "
+            f"p99 {self.percentil(99) * 1000:7.1f}ms | {self.requisicoes} requisições, "
+            f"{self.recusadas} recusada(s) com 503, {self.erros} erro(s)"
+        )
+
+
+def montar_app(modo: str) -> FastAPI:
+    """App só com a listagem de inscrições no modo pedido."""
+    endpoint = inscricoes.listar_inscricoes_async if modo == "async" else inscricoes.listar_inscricoes
+    app = FastAPI()
+    app.add_api_route(URL, endpoint, methods=["GET"])
+    app.add_exception_handler(PoolTimeoutError, resposta_pool_esgotado)
+    return app
+
+
+async def medir(modo: str, clientes: int, requisicoes: int, params: Optional[dict] = None) -> Resultado:
+    """Dispara `clientes` clientes simultâneos, cada um com `requisicoes` requisições em sequência."""
+    await configurar_execucao()
+    latencias = []
+    recusadas = erros = 0
+
+    transporte = httpx.ASGITransport(app=montar_app(modo))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as client:
+        # Aquecimento: cria o engine e abre a primeira conexão fora da medição
+        response = await client.get(URL, params=params)
+        response.raise_for_status()
+
+        async def cliente():
+            nonlocal recusadas, erros
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                response = await client.get(URL, params=params)
+                latencias.append(time.perf_counter() - inicio)
+                if response.status_code == 503:
+                    recusadas += 1
+                elif response.status_code != 200:
+                    erros += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio
+
+    if modo == "async":
+        await fechar_async_engine()
+    return Resultado(modo, clientes * requisicoes, recusadas, erros, duracao, latencias)
+
+
+async def comparar(clientes: int, requisicoes: int, params: Optional[dict] = None, modos=MODOS) -> List[Resultado]:
+    resultados = []
+    for modo in modos:
+        try:
+            resultados.append(await medir(modo, clientes, requisicoes, params))
+        except RuntimeError as e:
+            # Driver assíncrono não instalado
+            print(f"⚠️  Modo {modo} ignorado: {e}")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de GET /api/inscricoes/ (sync x async)")
+    parser.add_argument("--clientes", type=int, default=200, help="Clientes simultâneos (padrão: 200)")
+    parser.add_argument("--requisicoes", type=int, default=5, help="Requisições por cliente (padrão: 5)")
+    parser.add_argument("--limite", type=int, default=50, help="Itens por página (padrão: 50)")
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    args = parser.parse_args()
+
+    print(f"📊 GET {URL}?limit={args.limite}: {args.clientes} clientes x {args.requisicoes} requisições")
+    resultados = asyncio.run(comparar(args.clientes, args.requisicoes, {"limit": args.limite}, args.modos))
+    for resultado in resultados:
+        print(resultado.resumo())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark de leituras no SQLite enquanto há escritas, com o perfil padrão
+do SQLite e com o perfil otimizado de database.py (WAL, synchronous=NORMAL,
+busy_timeout, mmap, cache e temp_store).
+
+Simula os workers do gunicorn: processos leitores listam inscrições (a
+consulta de GET /api/inscricoes/) enquanto um processo escritor grava
+transações como as de um upload. No modo padrão (journal DELETE) cada
+commit bloqueia todas as leituras; com WAL os leitores seguem lendo.
+
+Mostra, para cada perfil, leituras por segundo, latência das leituras
+(p50/p99), escritas por segundo e erros "database is locked".
+
+Usa bancos temporários, não altera o banco de desenvolvimento.
+
+Uso: python benchmark_sqlite.py [--leitores 4] [--escritores 1] [--segundos 5] [--inscricoes 2000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List, NamedTuple
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.exc import OperationalError
+
+from database import Base, aplicar_perfil_sqlite
+from models.database_models import Inscricao, StatusInscricao
+from services.projecoes import selecionar_pagina_inscricoes
+
+PERFIS = ("padrao", "otimizado")
+LINHAS_POR_ESCRITA = 20
+TAMANHO_TEXTO = 8 * 1024
+
+
+class Resultado(NamedTuple):
+    perfil: str
+    segundos: float
+    leituras: int
+    escritas: int
+    erros: int
+    latencias: List[float]
+
+    @property
+    def leituras_por_segundo(self) -> float:
+        return self.leituras / self.segundos
+
+    def percentil(self, p: float) -> float:
+        if not self.latencias:
+            return 0.0
+        ordenadas = sorted(self.latencias)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+    def resumo(self) -> str:
+        return (
+            f"{self.perfil:>9}: {self.leituras_por_segundo:8.1f} leituras/s | "
+            f"p50 {self.percentil(50) * 1000:7.1f}ms  p99 {self.percentil(99) * 1000:7.1f}ms | "
+            f"{self.escritas / self.segundos:6.1f} escritas/s | {self.erros} erro(s) de lock"
+        )
+
+
+def criar_engine(caminho: str, perfil: str):
+    engine = create_engine(f"sqlite:///{caminho}", connect_args={"check_same_thread": False})
+    # O modo do journal fica gravado no arquivo: o perfil padrão volta para DELETE
+    aplicar_perfil_sqlite(engine, None if perfil == "otimizado" else {"journal_mode": "DELETE"})
+    return engine
+
+
+def popular(caminho: str, perfil: str, inscricoes: int):
+    engine = criar_engine(caminho, perfil)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Inscricao), [
+            {
+                "usuario_id": n + 1, "nome": f"Aluno {n}", "email": f"a{n}@alunos.ibmec.edu.br",
+                "titulo_projeto": f"Projeto {n}", "area_conhecimento": "Computação",
+                "descricao": "x" * 500, "ano": 2024 + n % 3, "status": StatusInscricao.pendente_orientador,
+            }
+            for n in range(inscricoes)
+        ])
+    engine.dispose()
+
+
+def leitor(caminho: str, perfil: str, largada, segundos: float, fila):
+    engine = criar_engine(caminho, perfil)
+    latencias = []
+    erros = 0
+    largada.wait()
+    fim = time.time() + segundos
+    with engine.connect() as conn:
+        while time.time() < fim:
+            antes = time.perf_counter()
+            try:
+                conn.execute(selecionar_pagina_inscricoes(limite=50)).all()
+                conn.rollback()
+                latencias.append(time.perf_counter() - antes)
+            except OperationalError:
+                conn.rollback()
+                erros += 1
+    fila.put(("leitor", latencias, erros))
+
+
+def escritor(caminho: str, perfil: str, largada, segundos: float, fila, indice: int):
+    engine = criar_engine(caminho, perfil)
+    escritas = erros = 0
+    texto = "y" * TAMANHO_TEXTO
+    largada.wait()
+    fim = time.time() + segundos
+    while time.time() < fim:
+        primeiro = (escritas * LINHAS_POR_ESCRITA + indice * 7919) % 1000 + 1
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    update(Inscricao)
+                    .where(Inscricao.id.between(primeiro, primeiro + LINHAS_POR_ESCRITA - 1))
+                    .values(descricao=f"{escritas}{texto}")
+                )
+            escritas += 1
+        except OperationalError:
+            erros += 1
+    fila.put(("escritor", escritas, erros))
+
+
+def medir(perfil: str, leitores: int, escritores: int, segundos: float, inscricoes: int) -> Resultado:
+    """Roda leitores e escritores em processos separados por `segundos` no perfil pedido."""
+    diretorio = tempfile.mkdtemp()
+    caminho = os.path.join(diretorio, f"benchmark_{perfil}.db")
+    popular(caminho, perfil, inscricoes)
+
+    # Processos novos (spawn), como workers do gunicorn; todos começam juntos
+    contexto = multiprocessing.get_context("spawn")
+    largada = contexto.Barrier(leitores + escritores)
+    fila = contexto.Queue()
+    processos = [contexto.Process(target=leitor, args=(caminho, perfil, largada, segundos, fila))
+                 for _ in range(leitores)]
+    processos += [contexto.Process(target=escritor, args=(caminho, perfil, largada, segundos, fila, n))
+                  for n in range(escritores)]
+    for processo in processos:
+        processo.start()
+
+    latencias, escritas, erros = [], 0, 0
+    for _ in processos:
+        tipo, valor, erros_processo = fila.get()
+        erros += erros_processo
+        if tipo == "leitor":
+            latencias.extend(valor)
+        else:
+            escritas += valor
+    for processo in processos:
+        processo.join()
+    return Resultado(perfil, segundos, len(latencias), escritas, erros, latencias)
+
+
+def comparar(leitores: int, escritores: int, segundos: float, inscricoes: int) -> List[Resultado]:
+    return [medir(perfil, leitores, escritores, segundos, inscricoes) for perfil in PERFIS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leituras no SQLite durante escritas (perfil padrão x otimizado)")
+    parser.add_argument("--leitores", type=int, default=4, help="Processos leitores (padrão: 4)")
+    parser.add_argument("--escritores", type=int, default=1, help="Processos escritores (padrão: 1)")
+    parser.add_argument("--segundos", type=float, default=5, help="Duração de cada perfil (padrão: 5)")
+    parser.add_argument("--inscricoes", type=int, default=2000, help="Inscrições no banco (padrão: 2000)")
+    args = parser.parse_args()
+
+    print(f"📊 {args.leitores} leitor(es) e {args.escritores} escritor(es) por {args.segundos:.0f}s")
+    for resultado in comparar(args.leitores, args.escritores, args.segundos, args.inscricoes):
+        print(resultado.resumo())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Script para remover arquivos de upload que não são mais usados (blob store).
+
+Remove:
+- nomes lógicos em arquivos_armazenados que nenhum registro referencia mais
+  (ex.: inscrições apagadas por deletar_inscricao ou limpar_proposta.py)
+- blobs sem nenhum nome apontando (ref_count = 0)
+- objetos em blobs/ (diretório de upload ou bucket S3) sem registro no banco
+- temporários de uploads interrompidos
+
+Nada mais novo que a carência (padrão: 24h) é removido.
+
+Uso:
+    python coletar_arquivos_orfaos.py              # remove os órfãos
+    python coletar_arquivos_orfaos.py --simular    # apenas mostra o que seria removido
+    python coletar_arquivos_orfaos.py --carencia-horas 48
+"""
+import argparse
+from database import SessionLocal
+from services.blobs import blob_store, CARENCIA_PADRAO
+
+
+def coletar_arquivos_orfaos(simular: bool = False, carencia_horas: float = CARENCIA_PADRAO / 3600):
+    db = SessionLocal()
+    try:
+        print("\n" + "="*60)
+        print("   COLETA DE ARQUIVOS ÓRFÃOS" + (" (SIMULAÇÃO)" if simular else ""))
+        print("="*60 + "\n")
+
+        antes = blob_store.estatisticas(db)
+        resultado = blob_store.coletar_orfaos(db, carencia=carencia_horas * 3600, simular=simular)
+        depois = blob_store.estatisticas(db)
+
+        print(f"📋 Nomes lógicos sem referência: {resultado.nomes_removidos}")
+        print(f"🗑️  Blobs sem uso: {resultado.blobs_removidos}")
+        print(f"📁 Arquivos sem registro: {resultado.arquivos_sem_registro}")
+        print(f"🧹 Temporários antigos: {resultado.temporarios_removidos}")
+        print(f"💾 Espaço liberado: {resultado.bytes_liberados / (1024 * 1024):.2f} MB")
+        print(f"\n📊 Antes: {antes['arquivos']} arquivo(s) em {antes['blobs']} blob(s)")
+        print(f"📊 Depois: {depois['arquivos']} arquivo(s) em {depois['blobs']} blob(s)")
+        economia = depois["bytes_logicos"] - depois["bytes_em_disco"]
+        print(f"♻️  Economia por deduplicação: {economia / (1024 * 1024):.2f} MB")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro na coleta de órfãos: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove arquivos de upload órfãos")
+    parser.add_argument("--simular", action="store_true", help="Apenas mostrar o que seria removido")
+    parser.add_argument("--carencia-horas", type=float, default=CARENCIA_PADRAO / 3600,
+                        help="Idade mínima para considerar um arquivo órfão (padrão: 24)")
+    args = parser.parse_args()
+    coletar_arquivos_orfaos(simular=args.simular, carencia_horas=args.carencia_horas)
@@ -41,10 +41,17 @@ class Settings:
     BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
     
     # File Upload
-    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+    MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB (mesmo limite do frontend)
     ALLOWED_EXTENSIONS = [".pdf", ".doc", ".docx"]
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
     
+    # Armazenamento dos arquivos: "local" (UPLOAD_DIR) ou "s3" (bucket compartilhado entre instâncias)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME", "")
+    AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")  # Serviços compatíveis com S3 (MinIO, etc.)
+    S3_PREFIX = os.getenv("S3_PREFIX", "")
+    
     def __init__(self):
         """Log configurações ao inicializar"""
         logger.info(f"Settings initialized for environment: {self.ENVIRONMENT}")
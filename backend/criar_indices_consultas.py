@@ -0,0 +1,79 @@
+"""
+Migração: índices compostos para os filtros mais usados pelas rotas.
+
+Versão 2026.10 - cria (se não existirem) os índices declarados em
+`__table_args__` de Inscricao, Projeto, Entrega e MensagemRelatorio:
+
+- inscricoes (status, ano, id)          listagem filtrada por status, paginada por (ano, id)
+- inscricoes (orientador_id, status)    pendentes do orientador
+- inscricoes (usuario_id, data_submissao) inscrição mais recente do aluno
+- projetos (aluno_id)                   projeto / entregas / timeline do aluno
+- projetos (orientador_id, ano, id)     alunos do orientador, paginado
+- projetos (etapa_atual, ano, id)       alunos por etapa (coordenação), paginado
+- projetos (inscricao_id, id)           etapa do projeto na listagem de inscrições
+- entregas (projeto_id, tipo)           relatórios mensais / entregas por etapa
+- entregas (aluno_id, data_entrega)     entregas do aluno em ordem cronológica
+- mensagens_relatorios (entrega_id, data_criacao) conversa de cada relatório
+
+Bancos novos já recebem os índices via Base.metadata.create_all; este script
+é para bancos existentes e pode ser executado mais de uma vez.
+No PostgreSQL usa CREATE INDEX CONCURRENTLY para não bloquear escritas.
+
+Uso: python criar_indices_consultas.py
+"""
+from database import engine
+from models.database_models import Inscricao, Projeto, Entrega, MensagemRelatorio
+from sqlalchemy import Index, inspect, text
+
+VERSAO = "2026.10"
+MODELOS = (Inscricao, Projeto, Entrega, MensagemRelatorio)
+
+
+def indices_da_migracao():
+    """Índices declarados em __table_args__ dos modelos"""
+    for modelo in MODELOS:
+        for indice in modelo.__table_args__:
+            if isinstance(indice, Index):
+                yield indice
+
+
+def criar_indices_consultas():
+    print(f"🔧 Migração de índices {VERSAO} ({engine.dialect.name})")
+    inspector = inspect(engine)
+    tabelas = set(inspector.get_table_names())
+    criados = 0
+
+    for indice in indices_da_migracao():
+        tabela = indice.table.name
+        if tabela not in tabelas:
+            print(f"⚠️  Tabela '{tabela}' não existe, {indice.name} ignorado (rode init_db.py)")
+            continue
+        existentes = {i["name"] for i in inspector.get_indexes(tabela)}
+        if indice.name in existentes:
+            print(f"ℹ️  {indice.name} já existe")
+            continue
+
+        if engine.dialect.name == "postgresql":
+            colunas = ", ".join(coluna.name for coluna in indice.columns)
+            # CONCURRENTLY não pode rodar dentro de transação
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {indice.name} ON {tabela} ({colunas})"
+                ))
+        else:
+            indice.create(bind=engine, checkfirst=True)
+
+        criados += 1
+        print(f"✅ {indice.name} criado em {tabela}")
+
+    if engine.dialect.name == "postgresql":
+        # Atualizar estatísticas para o planejador considerar os novos índices
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for modelo in MODELOS:
+                conn.execute(text(f"ANALYZE {modelo.__tablename__}"))
+
+    print(f"\n✅ Migração {VERSAO} concluída: {criados} índice(s) criado(s)")
+
+
+if __name__ == "__main__":
+    criar_indices_consultas()
@@ -13,6 +13,7 @@ load_dotenv()
 # Importar do database e models existentes
 from database import Base, engine, SessionLocal
 from models.database_models import ConfiguracaoSistema
+from services.configuracoes import invalidar_configuracoes
 
 def criar_tabela_configuracoes():
     """
@@ -42,6 +43,7 @@ def criar_tabela_configuracoes():
                 )
                 db.add(config)
                 db.commit()
+                invalidar_configuracoes()
                 print("✅ Configuração padrão 'inscricoes_abertas' criada!")
             else:
                 print(f"ℹ️ Configuração 'inscricoes_abertas' já existe: {config_existente.valor}")
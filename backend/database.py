@@ -1,9 +1,11 @@
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, make_url, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
 import logging
+import threading
+from typing import Dict, Optional, Tuple
 
 load_dotenv()
 
@@ -20,6 +22,87 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
 db_type = SQLALCHEMY_DATABASE_URL.split("://")[0]
 logger.info(f"Database type: {db_type}")
 
+
+# Rotas migradas para AsyncSession usam o engine assíncrono (ver get_async_engine)
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+
+
+def dimensionar_pool(engines: int = 1) -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) de cada engine do worker.
+
+    DB_MAX_CONEXOES é o limite de conexões da instância inteira (todos os
+    workers do gunicorn) e é dividido por WEB_CONCURRENCY (número de workers,
+    padrão 4 como em startup.txt) e pelos engines de cada worker (2 com
+    DATABASE_ASYNC=true: o síncrono e o assíncrono têm pools separados).
+    Metade fica fixa no pool e metade como overflow. DB_POOL_SIZE e
+    DB_MAX_OVERFLOW, se definidos, prevalecem (valem para cada engine).
+    """
+    max_conexoes = int(os.getenv("DB_MAX_CONEXOES", "40"))
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "4")))
+    por_engine = max(2, max_conexoes // workers // max(1, engines))
+    pool_size = int(os.getenv("DB_POOL_SIZE", max(1, por_engine // 2)))
+    max_overflow = int(os.getenv("DB_MAX_OVERFLOW", por_engine - pool_size))
+    return pool_size, max_overflow
+
+
+# Perfil do SQLite (execução local e implantações sem PostgreSQL), aplicado
+# em cada conexão aberta:
+# - journal_mode=WAL: leitores não bloqueiam o escritor nem são bloqueados
+#   por ele (inclusive entre workers do gunicorn); só as escritas se serializam
+# - synchronous=NORMAL: com WAL, fsync só no checkpoint. Não corrompe o
+#   banco; uma queda de energia pode perder as últimas transações
+# - busy_timeout: espera o lock de escrita em vez de falhar na hora com
+#   "database is locked"
+# - mmap_size, cache_size e temp_store: leitura pelo mmap, cache de páginas
+#   maior e tabelas temporárias (ORDER BY, GROUP BY) em memória
+# WAL depende de memória compartilhada: com o arquivo em um compartilhamento
+# de rede (ex.: /home do Azure App Service), use SQLITE_PERFIL=padrao.
+#
+# Configuração (variáveis de ambiente):
+#     SQLITE_PERFIL            "otimizado" (padrão) ou "padrao" (padrões do SQLite)
+#     SQLITE_BUSY_TIMEOUT_MS   Espera pelo lock de escrita (padrão: 5000)
+#     SQLITE_MMAP_MB           Tamanho do mmap (padrão: 256)
+#     SQLITE_CACHE_MB          Cache de páginas por conexão (padrão: 64)
+SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", "otimizado").lower()
+
+
+def pragmas_sqlite() -> Dict[str, object]:
+    """PRAGMAs do perfil otimizado do SQLite."""
+    return {
+        # busy_timeout primeiro: os PRAGMAs seguintes também esperam o lock
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_MB", "256")) * 1024 * 1024,
+        "cache_size": -int(os.getenv("SQLITE_CACHE_MB", "64")) * 1024,  # negativo: em KiB
+        "temp_store": "MEMORY",
+    }
+
+
+def aplicar_perfil_sqlite(engine, pragmas: Optional[Dict[str, object]] = None):
+    """Executa os PRAGMAs em cada conexão nova do engine (síncrono ou sync_engine do assíncrono)."""
+    pragmas = pragmas_sqlite() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nome}={valor}")
+        finally:
+            cursor.close()
+
+
+def _usa_perfil_sqlite(url) -> bool:
+    url = make_url(url)
+    return (
+        url.get_backend_name() == "sqlite"
+        and SQLITE_PERFIL == "otimizado"
+        and url.database not in (None, "", ":memory:")
+    )
+
+
 # Configurar connect_args baseado no tipo de banco
 connect_args = {}
 pool_settings = {}
@@ -28,14 +111,19 @@ if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}  # Necessário apenas para SQLite
     logger.info("Using SQLite database")
 elif SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
-    # Configurações de pool para PostgreSQL no Azure
+    # Configurações de pool para PostgreSQL no Azure (ver dimensionar_pool).
+    # pool_timeout (DB_POOL_TIMEOUT) é o máximo que uma requisição espera por
+    # uma conexão; com o pool saturado e a fila cheia (DB_POOL_FILA_MAXIMA) a
+    # requisição é recusada na hora com 503, ver services/pool_banco.py
+    pool_size, max_overflow = dimensionar_pool(engines=2 if DATABASE_ASYNC else 1)
     pool_settings = {
-        "pool_size": 5,  # Número de conexões mantidas
-        "max_overflow": 10,  # Conexões extras quando necessário
-        "pool_timeout": 30,  # Timeout para obter conexão
+        "pool_size": pool_size,  # Número de conexões mantidas
+        "max_overflow": max_overflow,  # Conexões extras quando necessário
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),  # Timeout para obter conexão
         "pool_recycle": 3600,  # Reciclar conexões após 1 hora
         "pool_pre_ping": True,  # Verificar conexão antes de usar
     }
+    logger.info(f"Pool per engine: {pool_size} + {max_overflow} overflow")
     
     # SSL para Azure PostgreSQL
     if "azure" in SQLALCHEMY_DATABASE_URL.lower() or "sslmode" not in SQLALCHEMY_DATABASE_URL:
@@ -49,26 +137,84 @@ elif SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
     
     logger.info("Using PostgreSQL database with connection pooling")
 
-try:
-    # Criar engine com configurações apropriadas
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        connect_args=connect_args,
-        echo=False,  # Mude para True para debug SQL
-        **pool_settings
-    )
-    
-    # Testar conexão inicial
-    with engine.connect() as conn:
-        conn.execute(text("SELECT 1"))
-    logger.info("Database engine created and connection verified")
-    
-except Exception as e:
-    logger.error(f"Failed to create database engine: {e}")
-    raise
+# O engine é criado no primeiro uso (get_engine), não no import: importar o
+# app ou um módulo de modelos não carrega o driver nem abre conexões, e cada
+# worker só conecta no aquecimento (verificar_conexao, no lifespan do app) ou
+# na primeira requisição. `from database import engine` continua funcionando
+# (cria o engine nesse momento, ver __getattr__ abaixo).
+_engine = None
+_engine_lock = threading.Lock()
+_ao_criar_engine = []
+
+
+def _classe_pool(url, assincrono: bool = False) -> dict:
+    """
+    Pool com telemetria e descarte de carga (services/pool_banco.py). SQLite
+    em memória e aiosqlite mantêm o pool padrão do dialeto.
+    """
+    from services.pool_banco import PoolMonitorado, PoolMonitoradoAsync
+
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and (assincrono or url.database in (None, "", ":memory:")):
+        return {}
+    return {"poolclass": PoolMonitoradoAsync if assincrono else PoolMonitorado}
+
+
+def get_engine():
+    """Engine síncrono do banco, criado na primeira chamada."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                try:
+                    # Criar engine com configurações apropriadas
+                    novo = create_engine(
+                        SQLALCHEMY_DATABASE_URL,
+                        connect_args=connect_args,
+                        echo=False,  # Mude para True para debug SQL
+                        **pool_settings,
+                        **_classe_pool(SQLALCHEMY_DATABASE_URL)
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to create database engine: {e}")
+                    raise
+                if _usa_perfil_sqlite(SQLALCHEMY_DATABASE_URL):
+                    aplicar_perfil_sqlite(novo)
+                for funcao in _ao_criar_engine:
+                    funcao(novo)
+                _engine = novo
+                logger.info("Database engine created")
+    return _engine
+
+
+def ao_criar_engine(funcao):
+    """
+    Registra `funcao(engine)` para cada engine criado (o síncrono e o
+    sync_engine do assíncrono), ex.: instrumentação das métricas. Engines já
+    criados recebem a chamada na hora.
+    """
+    _ao_criar_engine.append(funcao)
+    for existente in (_engine, _async_engine and _async_engine.sync_engine):
+        if existente is not None:
+            funcao(existente)
+
+
+def __getattr__(nome):
+    # Compatibilidade com `from database import engine` (scripts e testes)
+    if nome == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+class SessaoBanco(Session):
+    """Session que usa o engine criado no primeiro uso."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        return self.bind or get_engine()
+
 
 # Session local
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=SessaoBanco, autocommit=False, autoflush=False)
 
 # Base para os modelos
 Base = declarative_base()
@@ -84,3 +230,100 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+def verificar_conexao():
+    """Abre a primeira conexão do pool e confirma que o banco responde."""
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+    logger.info("Database connection verified")
+
+
+def fechar_engine():
+    """Fecha as conexões do pool do engine síncrono (shutdown do worker)."""
+    if _engine is not None:
+        _engine.dispose()
+
+
+# Engine assíncrono (asyncpg / aiosqlite) para as rotas migradas para
+# AsyncSession. Convive com o engine síncrono: cada rota usa get_db ou
+# get_async_db, e a migração pode ser feita rota a rota. As conexões do
+# engine assíncrono não ocupam uma thread do threadpool enquanto esperam o banco.
+#
+# Configuração (variáveis de ambiente):
+#     DATABASE_ASYNC        "true" para as rotas migradas usarem o engine assíncrono
+#                           (o limite de conexões do worker é dividido entre os dois
+#                           engines, ver dimensionar_pool)
+#     ASYNC_DATABASE_URL    URL do engine assíncrono (padrão: DATABASE_URL com o driver trocado)
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def url_async(url: str):
+    """
+    Troca o driver da URL síncrona pelo equivalente assíncrono:
+    postgresql(+psycopg2) -> postgresql+asyncpg e sqlite -> sqlite+aiosqlite.
+    O asyncpg não aceita `sslmode`; o valor vai no parâmetro `ssl`.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if backend == "postgresql":
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", None)
+        if sslmode and sslmode != "disable":
+            query["ssl"] = sslmode
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    raise ValueError(f"Banco sem driver assíncrono suportado: {backend}")
+
+
+def get_async_engine():
+    """Engine assíncrono, criado no primeiro uso (pool do mesmo tamanho do síncrono)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = os.getenv("ASYNC_DATABASE_URL") or url_async(SQLALCHEMY_DATABASE_URL)
+        try:
+            _async_engine = create_async_engine(url, echo=False, **pool_settings, **_classe_pool(url, assincrono=True))
+        except ImportError as e:
+            raise RuntimeError(
+                f"Driver assíncrono não instalado ({e.name}): instale asyncpg (PostgreSQL) "
+                f"ou aiosqlite (SQLite), ver requirements.txt"
+            ) from e
+        if _usa_perfil_sqlite(url):
+            aplicar_perfil_sqlite(_async_engine.sync_engine)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        for funcao in _ao_criar_engine:
+            funcao(_async_engine.sync_engine)
+        logger.info(f"Async database engine created ({_async_engine.url.drivername})")
+    return _async_engine
+
+
+# Dependency para obter a sessão assíncrona do banco
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
+
+async def verificar_conexao_async():
+    """Equivalente de verificar_conexao para o engine assíncrono."""
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    logger.info("Async database connection verified")
+
+
+async def fechar_async_engine():
+    """Fecha as conexões do engine assíncrono (shutdown do worker)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _AsyncSessionLocal = None
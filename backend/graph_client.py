@@ -0,0 +1,231 @@
+"""
+Cliente HTTP assíncrono compartilhado para Microsoft Identity / Microsoft Graph.
+
+Substitui as chamadas bloqueantes de `requests` usadas pelo fluxo OAuth:
+- Um único httpx.AsyncClient por processo (keep-alive / pool de conexões)
+- Timeout em todas as chamadas
+- Limite de chamadas simultâneas por worker (semáforo)
+
+Configuração (variáveis de ambiente, todas opcionais):
+    GRAPH_HTTP_TIMEOUT         Timeout total por chamada em segundos (padrão: 10)
+    GRAPH_HTTP_CONNECT_TIMEOUT Timeout de conexão em segundos (padrão: 5)
+    GRAPH_MAX_CONCURRENCY      Máximo de chamadas simultâneas por worker (padrão: 20)
+    GRAPH_MAX_KEEPALIVE        Conexões mantidas abertas no pool (padrão: 10)
+"""
+
+import asyncio
+import os
+import time
+import logging
+from typing import Optional, Dict, Callable, Awaitable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class GraphHttpClient:
+    """
+    Wrapper sobre httpx.AsyncClient com pool de conexões, timeouts e
+    concorrência limitada.
+
+    O cliente é criado sob demanda no event loop em uso e recriado se o loop
+    mudar (ex.: scripts que chamam asyncio.run mais de uma vez).
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_keepalive: Optional[int] = None
+    ):
+        self.timeout = timeout if timeout is not None else float(os.getenv("GRAPH_HTTP_TIMEOUT", "10"))
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(os.getenv("GRAPH_HTTP_CONNECT_TIMEOUT", "5"))
+        self.max_concurrency = max_concurrency if max_concurrency is not None else int(os.getenv("GRAPH_MAX_CONCURRENCY", "20"))
+        self.max_keepalive = max_keepalive if max_keepalive is not None else int(os.getenv("GRAPH_MAX_KEEPALIVE", "10"))
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_keepalive
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+        return self._client
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        Executa uma requisição HTTP respeitando o limite de concorrência.
+
+        Args:
+            method: Método HTTP (GET, POST, ...)
+            url: URL completa
+            timeout: Timeout específico desta chamada (sobrescreve o padrão)
+            **kwargs: Argumentos repassados ao httpx (data, headers, params, ...)
+        """
+        client = self._get_client()
+
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout))
+
+        async with self._semaphore:
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, headers: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, headers=headers, **kwargs)
+
+    async def post_form(self, url: str, data: Dict, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, data=data, **kwargs)
+
+    async def aclose(self):
+        """Fecha o pool de conexões (chamado no shutdown da aplicação)."""
+        if self._client is not None and not self._client.is_closed:
+            try:
+                await self._client.aclose()
+            except RuntimeError as e:
+                # Loop original já foi encerrado (ex.: scripts com asyncio.run)
+                logger.debug(f"Graph client close skipped: {e}")
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+
+class AppTokenManager:
+    """
+    Cache do token de aplicação (Client Credentials) que respeita `expires_in`.
+
+    - Token válido: retornado direto da memória (hit)
+    - Token perto de expirar (dentro de refresh_margin): retornado e renovado
+      em segundo plano, sem fazer o chamador esperar
+    - Sem token ou expirado (miss): renovado antes de retornar
+
+    As renovações passam por um lock (single-flight): requisições simultâneas
+    esperam a mesma renovação em vez de chamarem o endpoint de token cada uma.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[], Awaitable[Dict]],
+        refresh_margin: Optional[float] = None,
+        default_ttl: float = 3600
+    ):
+        """
+        Args:
+            fetcher: Corrotina que obtém um novo token e retorna o JSON do endpoint
+                     de token (com access_token e expires_in)
+            refresh_margin: Segundos antes da expiração em que a renovação em
+                            segundo plano começa (padrão: GRAPH_TOKEN_REFRESH_MARGIN ou 300)
+            default_ttl: Validade assumida quando a resposta não traz expires_in
+        """
+        self.fetcher = fetcher
+        self.refresh_margin = refresh_margin if refresh_margin is not None else float(os.getenv("GRAPH_TOKEN_REFRESH_MARGIN", "300"))
+        self.default_ttl = default_ttl
+
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background_task: Optional[asyncio.Task] = None
+
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "refresh_failures": 0
+        }
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+            self._background_task = None
+        return self._lock
+
+    def _is_valid(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at
+
+    def _needs_refresh(self, now: float) -> bool:
+        return now >= self._refresh_at
+
+    async def _refresh(self, background: bool = False):
+        async with self._get_lock():
+            # Outra corrotina pode ter renovado enquanto esperávamos o lock
+            now = time.monotonic()
+            if self._is_valid(now) and (not background or not self._needs_refresh(now)):
+                return
+
+            try:
+                token_data = await self.fetcher()
+            except Exception as e:
+                self.counters["refresh_failures"] += 1
+                logger.warning(f"Falha ao renovar token de aplicação: {e}")
+                return
+
+            access_token = token_data.get("access_token") if token_data else None
+            if not access_token:
+                self.counters["refresh_failures"] += 1
+                return
+
+            expires_in = float(token_data.get("expires_in") or self.default_ttl)
+            now = time.monotonic()
+            self._token = access_token
+            self._expires_at = now + expires_in
+            # Tokens de vida curta renovam na metade da validade
+            self._refresh_at = self._expires_at - min(self.refresh_margin, expires_in / 2)
+            self.counters["refreshes"] += 1
+            if background:
+                self.counters["background_refreshes"] += 1
+
+    def _schedule_background_refresh(self):
+        if self._background_task is None or self._background_task.done():
+            self._background_task = asyncio.get_running_loop().create_task(self._refresh(background=True))
+
+    async def get_token(self) -> Optional[str]:
+        """
+        Retorna um token válido ou None se não foi possível obter um.
+        """
+        self._get_lock()
+        now = time.monotonic()
+
+        if self._is_valid(now):
+            self.counters["hits"] += 1
+            if self._needs_refresh(now):
+                self._schedule_background_refresh()
+            return self._token
+
+        self.counters["misses"] += 1
+        await self._refresh()
+        return self._token if self._is_valid(time.monotonic()) else None
+
+    def invalidate(self):
+        """Descarta o token atual (ex.: após resposta 401 do Graph)."""
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+
+    def stats(self) -> Dict:
+        """Contadores para monitoramento."""
+        return {
+            **self.counters,
+            "has_token": self._token is not None,
+            "expires_in": max(0, round(self._expires_at - time.monotonic())) if self._token else 0
+        }
+
+
+# Instância global (um pool por worker)
+graph_http_client = GraphHttpClient()
@@ -1,14 +1,30 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from routes import auth, inscricoes, usuarios
 from routes import orientadores
 from routes import coordenadores
 from routes import alunos
+from routes import arquivos
 from config import settings, unidades
-from database import get_db
-from models.database_models import Curso, Usuario, TipoUsuario, StatusUsuario, ConfiguracaoSistema
+from database import (
+    get_db, ao_criar_engine, verificar_conexao, verificar_conexao_async, fechar_engine, fechar_async_engine,
+    DATABASE_ASYNC
+)
+from graph_client import graph_http_client
+from microsoft_auth import microsoft_oauth
+from models.database_models import Curso, Usuario, ConfiguracaoSistema
+from services.versoes import rastrear_alteracoes, obter_versao
+from services.estatisticas import manter_estatisticas
+from services.execucao import configurar_execucao, aquecer
+from services.configuracoes import obter_configuracoes
+from services.metricas import MiddlewareMetricas, CAMINHO_METRICAS, instrumentar_engine, resposta_metricas
+from services.http_cache import gerar_etag, resposta_condicional
+from services.projecoes import listar_orientadores_ativos
+from services.pool_banco import estado_pools, resposta_pool_esgotado
 import os
 import logging
 
@@ -19,10 +35,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup e shutdown de cada worker.
+
+    O import do app não abre conexões; aqui o worker limita o threadpool e
+    aquece, em paralelo, a conexão com o banco, o cache de configurações e o
+    token do Microsoft Graph antes da primeira requisição.
+    """
+    await configurar_execucao()
+
+    tarefas = {"banco": verificar_conexao, "configuracoes": obter_configuracoes}
+    if DATABASE_ASYNC:
+        tarefas["banco_async"] = verificar_conexao_async
+    if microsoft_oauth.is_oauth_available():
+        tarefas["token_graph"] = microsoft_oauth.app_token.get_token
+    await aquecer(tarefas)
+
+    yield
+
+    # Fecha o pool de conexões HTTP com a Microsoft e os engines do banco
+    await graph_http_client.aclose()
+    await fechar_async_engine()
+    fechar_engine()
+
 app = FastAPI(
     title="API Iniciação Científica Ibmec",
     description="API para gerenciamento do programa de Iniciação Científica",
-    version="1.0.3"
+    version="1.0.3",
+    lifespan=lifespan
 )
 
 # Configuração CORS dinâmica baseada em ambiente
@@ -64,6 +106,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência, consultas SQL e bytes por rota (GET /metrics e cabeçalho Server-Timing);
+# os engines do banco são instrumentados quando criados
+ao_criar_engine(instrumentar_engine)
+app.add_middleware(MiddlewareMetricas)
+
+# Sem conexão livre no pool do banco: 503 com Retry-After (services/pool_banco.py)
+app.add_exception_handler(PoolTimeoutError, resposta_pool_esgotado)
+
 # Incluir routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticação"])
 app.include_router(inscricoes.router, prefix="/api/inscricoes", tags=["Inscrições"])
@@ -71,6 +121,7 @@ app.include_router(usuarios.router, prefix="/api", tags=["Usuários"])
 app.include_router(orientadores.router, prefix="/api", tags=["Orientadores"])
 app.include_router(coordenadores.router, prefix="/api", tags=["Coordenadores"])
 app.include_router(alunos.router, prefix="/api", tags=["Alunos"])
+app.include_router(arquivos.router, prefix="/api", tags=["Arquivos"])
 
 @app.get("/")
 async def root():
@@ -83,7 +134,7 @@ async def root():
     }
 
 @app.get("/api/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """
     Health check endpoint robusto para monitoramento Azure.
     Verifica conectividade do banco de dados e status da aplicação.
@@ -92,7 +143,10 @@ async def health_check(db: Session = Depends(get_db)):
         "status": "healthy",
         "environment": os.getenv("ENVIRONMENT", "development"),
         "database": "unknown",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "graph_token_cache": microsoft_oauth.app_token.stats(),
+        "email_validation_cache": microsoft_oauth.validation_cache.stats(),
+        "pool_banco": estado_pools()
     }
     
     try:
@@ -108,52 +162,63 @@ async def health_check(db: Session = Depends(get_db)):
     
     return health_status
 
+@app.get(CAMINHO_METRICAS, include_in_schema=False)
+async def metricas_prometheus(request: Request):
+    """
+    Métricas por rota no formato do Prometheus (latência, consultas SQL,
+    tempo no banco, bytes enviados). Protegida por METRICAS_TOKEN, se definido.
+    """
+    return resposta_metricas(request)
+
+# Listas de referência: versão por tabela para responder 304 sem reler os dados
+rastrear_alteracoes(Curso, Usuario)
+
+# Contadores de usuários, inscrições e projetos por ano (estatísticas e painéis)
+manter_estatisticas()
+
 @app.get("/api/cursos")
-async def listar_cursos(db: Session = Depends(get_db)):
+def listar_cursos(request: Request, db: Session = Depends(get_db)):
     """
     Retorna lista de cursos disponíveis no Ibmec.
+    Suporta GET condicional (ETag / If-None-Match).
     """
-    cursos = db.query(Curso).filter(Curso.ativo == 1).all()
-    cursos_list = [
-        {
-            "id": curso.id,
-            "nome": curso.nome,
-            "codigo": curso.codigo
-        }
-        for curso in cursos
-    ]
-    return {"cursos": cursos_list}
+    etag = gerar_etag("cursos", obter_versao(db, Curso))
+
+    def montar_cursos():
+        cursos = db.query(Curso).filter(Curso.ativo == 1).order_by(Curso.id).all()
+        cursos_list = [
+            {
+                "id": curso.id,
+                "nome": curso.nome,
+                "codigo": curso.codigo
+            }
+            for curso in cursos
+        ]
+        return {"cursos": cursos_list}
+
+    return resposta_condicional(request, etag, montar_cursos, max_age=300)
 
 @app.get("/api/unidades")
-async def listar_unidades():
+def listar_unidades(request: Request):
     """
     Retorna lista de unidades do Ibmec.
+    Suporta GET condicional (ETag / If-None-Match).
     """
-    return {"unidades": unidades}
+    etag = gerar_etag("unidades", unidades)
+    return resposta_condicional(request, etag, lambda: {"unidades": unidades}, max_age=3600)
 
 @app.get("/api/orientadores")
-async def listar_orientadores(db: Session = Depends(get_db)):
+def listar_orientadores(request: Request, db: Session = Depends(get_db)):
     """
     Retorna lista de orientadores ativos disponíveis para orientação.
+    Suporta GET condicional (ETag / If-None-Match).
     """
-    orientadores = db.query(Usuario).filter(
-        Usuario.tipo == TipoUsuario.orientador,
-        Usuario.status == StatusUsuario.ativo
-    ).all()
-    
-    orientadores_list = [
-        {
-            "id": orientador.id,
-            "nome": orientador.nome,
-            "email": orientador.email,
-            "departamento": orientador.departamento,
-            "area_pesquisa": orientador.area_pesquisa,
-            "titulacao": orientador.titulacao,
-            "vagas_disponiveis": orientador.vagas_disponiveis or 0
-        }
-        for orientador in orientadores
-    ]
-    return {"orientadores": orientadores_list}
+    etag = gerar_etag("orientadores", obter_versao(db, Usuario))
+
+    def montar_orientadores():
+        return {"orientadores": listar_orientadores_ativos(db)}
+
+    return resposta_condicional(request, etag, montar_orientadores, max_age=60)
 
 if __name__ == "__main__":
     import uvicorn
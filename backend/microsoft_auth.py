@@ -18,18 +18,26 @@ Para configurar:
 5. Adicione as credenciais no arquivo .env
 """
 
-import requests
+import httpx
 import urllib.parse
 import uuid
 from typing import Optional, Dict
 import os
 from dotenv import load_dotenv
 import logging
+from starlette.concurrency import run_in_threadpool
+from graph_client import graph_http_client, AppTokenManager
+from services.validacao_email import EmailValidationCache
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Erros de validação definitivos (podem ser memorizados no cache)
+ERRO_EMAIL_FORMATO = 'Formato de email inválido'
+ERRO_EMAIL_NAO_INSTITUCIONAL = 'Email não é institucional do Ibmec'
+ERRO_EMAIL_NAO_ENCONTRADO = 'Email institucional não encontrado no sistema'
+
 class MicrosoftOAuth:
     """
     Classe para autenticação Microsoft OAuth 2.0 e validação de emails.
@@ -83,7 +91,9 @@ class MicrosoftOAuth:
         # Scopes necessários para o fluxo OAuth
         self.scopes = ["User.Read", "openid", "profile", "email"]
         
-        self.token_cache = None
+        self.http = graph_http_client
+        self.app_token = AppTokenManager(self._fetch_app_token)
+        self.validation_cache = EmailValidationCache()
         self.is_configured = all([self.tenant_id, self.client_id, self.client_secret])
         
         # Validar configuração
@@ -148,7 +158,7 @@ class MicrosoftOAuth:
         }
         
         try:
-            response = requests.post(self.token_endpoint, data=token_data)
+            response = await self.http.post_form(self.token_endpoint, data=token_data)
             response.raise_for_status()
             
             token_response = response.json()
@@ -156,9 +166,9 @@ class MicrosoftOAuth:
             
             return token_response
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Erro ao trocar código por token: {e}")
-            if hasattr(e.response, 'text'):
+            if isinstance(e, httpx.HTTPStatusError):
                 print(f"Detalhes: {e.response.text}")
             raise
     
@@ -177,7 +187,7 @@ class MicrosoftOAuth:
         }
         
         try:
-            response = requests.get(f"{self.graph_endpoint}/me", headers=headers)
+            response = await self.http.get(f"{self.graph_endpoint}/me", headers=headers)
             response.raise_for_status()
             
             user_info = response.json()
@@ -185,25 +195,17 @@ class MicrosoftOAuth:
             
             return user_info
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Erro ao obter informações do usuário: {e}")
             raise
     
-    def _get_access_token_client_credentials(self) -> Optional[str]:
+    async def _fetch_app_token(self) -> Dict:
         """
-        Obtém token de acesso usando Client Credentials Flow (para validação de email).
-        Este é um fluxo diferente do OAuth interativo - a aplicação age sozinha.
+        Solicita um novo token de aplicação (Client Credentials Flow) ao endpoint de token.
         
         Returns:
-            Token de acesso ou None se falhar
+            JSON da resposta (access_token, expires_in, ...)
         """
-        if not all([self.tenant_id, self.client_id, self.client_secret]):
-            print("⚠️ Credenciais Microsoft não configuradas para validação de email.")
-            return None
-        
-        if self.token_cache:
-            return self.token_cache
-        
         token_url = f"{self.authority}/oauth2/v2.0/token"
         
         payload = {
@@ -214,30 +216,93 @@ class MicrosoftOAuth:
         }
         
         try:
-            response = requests.post(token_url, data=payload)
+            response = await self.http.post_form(token_url, data=payload)
             response.raise_for_status()
+            return response.json()
             
-            token_data = response.json()
-            self.token_cache = token_data.get('access_token')
-            
-            return self.token_cache
-            
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Erro ao obter token de aplicação: {e}")
+            raise
+    
+    async def _get_access_token_client_credentials(self) -> Optional[str]:
+        """
+        Obtém token de acesso usando Client Credentials Flow (para validação de email).
+        Este é um fluxo diferente do OAuth interativo - a aplicação age sozinha.
+        O token fica em cache até perto de expirar (ver AppTokenManager).
+        
+        Returns:
+            Token de acesso ou None se falhar
+        """
+        if not all([self.tenant_id, self.client_id, self.client_secret]):
+            print("⚠️ Credenciais Microsoft não configuradas para validação de email.")
             return None
+        
+        return await self.app_token.get_token()
     
-    def validate_institutional_email(self, email: str) -> Dict[str, any]:
+    async def validate_institutional_email(self, email: str) -> Dict[str, any]:
         """
         Valida se um email institucional existe no Azure AD (Client Credentials Flow).
         Este método NÃO requer login do usuário.
         Em modo desenvolvimento, aceita qualquer email @ibmec.edu.br sem validar no Azure.
         
+        Resultados definitivos (positivos e negativos) ficam em cache por email,
+        então logins repetidos não chamam o Microsoft Graph novamente.
+        
         Args:
             email: Email institucional a ser validado
             
         Returns:
             Dicionário com resultado da validação
         """
+        # O cache consulta o banco: fora do event loop
+        cached = await run_in_threadpool(self.validation_cache.get, email)
+        if cached is not None:
+            return cached
+        
+        result = await self._validate_institutional_email_uncached(email)
+        
+        if self._is_definitive_result(result):
+            await run_in_threadpool(self.validation_cache.set, email, result)
+        
+        return result
+    
+    @staticmethod
+    def _is_definitive_result(result: Dict) -> bool:
+        """
+        Indica se o resultado pode ir para o cache (não é erro transitório).
+        """
+        if result['valid'] and result['exists'] and not result['error']:
+            return True
+        return result['error'] in (ERRO_EMAIL_FORMATO, ERRO_EMAIL_NAO_INSTITUCIONAL, ERRO_EMAIL_NAO_ENCONTRADO)
+    
+    def remember_validated_user(self, user_info: Dict):
+        """
+        Registra no cache de validação um usuário autenticado via OAuth (/me),
+        evitando uma consulta ao Graph no próximo login por email/senha.
+        """
+        email = user_info.get("mail") or user_info.get("userPrincipalName")
+        if not email or 'ibmec.edu.br' not in email.split('@')[-1].lower():
+            return
+        
+        self.validation_cache.set(email, {
+            'valid': True,
+            'exists': True,
+            'user_data': {
+                'display_name': user_info.get('displayName'),
+                'given_name': user_info.get('givenName'),
+                'surname': user_info.get('surname'),
+                'mail': user_info.get('mail'),
+                'user_principal_name': user_info.get('userPrincipalName'),
+                'job_title': user_info.get('jobTitle'),
+                'department': user_info.get('department')
+            },
+            'error': None
+        })
+    
+    async def _validate_institutional_email_uncached(self, email: str) -> Dict[str, any]:
+        """
+        Consulta o Azure AD sem passar pelo cache (ver validate_institutional_email).
+        """
         result = {
             'valid': False,
             'exists': False,
@@ -246,12 +311,12 @@ class MicrosoftOAuth:
         }
         
         if not email or '@' not in email:
-            result['error'] = 'Formato de email inválido'
+            result['error'] = ERRO_EMAIL_FORMATO
             return result
         
         domain = email.split('@')[1].lower()
         if 'ibmec.edu.br' not in domain:
-            result['error'] = 'Email não é institucional do Ibmec'
+            result['error'] = ERRO_EMAIL_NAO_INSTITUCIONAL
             return result
         
         # Em modo desenvolvimento, aceitar APENAS usuários de teste
@@ -276,7 +341,7 @@ class MicrosoftOAuth:
             }
             return result
         
-        access_token = self._get_access_token_client_credentials()
+        access_token = await self._get_access_token_client_credentials()
         
         if not access_token:
             result['valid'] = True
@@ -292,7 +357,7 @@ class MicrosoftOAuth:
         user_url = f"{self.graph_endpoint}/users/{email}"
         
         try:
-            response = requests.get(user_url, headers=headers)
+            response = await self.http.get(user_url, headers=headers)
             
             if response.status_code == 200:
                 user_data = response.json()
@@ -310,14 +375,20 @@ class MicrosoftOAuth:
                 print(f"✅ Email validado via Microsoft: {email}")
                 
             elif response.status_code == 404:
-                result['error'] = 'Email institucional não encontrado no sistema'
+                result['error'] = ERRO_EMAIL_NAO_ENCONTRADO
                 print(f"❌ Email não existe no Azure AD: {email}")
                 
+            elif response.status_code == 401:
+                # Token revogado ou expirado antes do previsto: forçar renovação na próxima chamada
+                self.app_token.invalidate()
+                result['error'] = 'Erro ao validar email (código 401)'
+                print(f"⚠️ Token de aplicação rejeitado pelo Microsoft Graph")
+                
             else:
                 result['error'] = f'Erro ao validar email (código {response.status_code})'
                 print(f"⚠️ Erro Microsoft Graph: {response.status_code}")
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             result['error'] = f'Erro de conexão com Microsoft: {str(e)}'
             print(f"❌ Erro ao conectar com Microsoft Graph: {e}")
         
@@ -372,14 +443,14 @@ microsoft_oauth = MicrosoftOAuth()
 
 
 # Funções helper para compatibilidade com código existente
-def validate_email(email: str) -> Dict[str, any]:
+async def validate_email(email: str) -> Dict[str, any]:
     """Função helper para validar email institucional"""
-    return microsoft_oauth.validate_institutional_email(email)
+    return await microsoft_oauth.validate_institutional_email(email)
 
 
-def get_user_info(email: str) -> Optional[Dict]:
+async def get_user_info(email: str) -> Optional[Dict]:
     """Função helper para obter informações do usuário"""
-    validation = microsoft_oauth.validate_institutional_email(email)
+    validation = await microsoft_oauth.validate_institutional_email(email)
     
     if validation['valid'] and validation['exists']:
         return validation['user_data']
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -82,6 +82,12 @@ class Curso(Base):
 
 class Inscricao(Base):
     __tablename__ = "inscricoes"
+    __table_args__ = (
+        # Índices dos filtros usados pelas rotas (ver criar_indices_consultas.py)
+        Index("ix_inscricoes_status_ano_id", "status", "ano", "id"),
+        Index("ix_inscricoes_orientador_status", "orientador_id", "status"),
+        Index("ix_inscricoes_usuario_data", "usuario_id", "data_submissao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
@@ -127,6 +133,12 @@ class Inscricao(Base):
 
 class Projeto(Base):
     __tablename__ = "projetos"
+    __table_args__ = (
+        Index("ix_projetos_aluno_id", "aluno_id"),
+        Index("ix_projetos_orientador_ano_id", "orientador_id", "ano", "id"),
+        Index("ix_projetos_etapa_ano_id", "etapa_atual", "ano", "id"),
+        Index("ix_projetos_inscricao_id", "inscricao_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     aluno_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
@@ -188,6 +200,10 @@ class RelatorioMensal(Base):
 
 class Entrega(Base):
     __tablename__ = "entregas"
+    __table_args__ = (
+        Index("ix_entregas_projeto_tipo", "projeto_id", "tipo"),
+        Index("ix_entregas_aluno_data", "aluno_id", "data_entrega"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     projeto_id = Column(Integer, ForeignKey("projetos.id"), nullable=False)
@@ -233,6 +249,9 @@ class Notificacao(Base):
 
 class MensagemRelatorio(Base):
     __tablename__ = "mensagens_relatorios"
+    __table_args__ = (
+        Index("ix_mensagens_entrega_data", "entrega_id", "data_criacao"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     entrega_id = Column(Integer, ForeignKey("entregas.id"), nullable=False)
@@ -256,4 +275,55 @@ class ConfiguracaoSistema(Base):
     descricao = Column(Text, nullable=True)
     ano = Column(Integer, nullable=True)
     data_atualizacao = Column(DateTime, default=datetime.now, onupdate=datetime.now)
-    atualizado_por = Column(Integer, nullable=True)
\ No newline at end of file
+    atualizado_por = Column(Integer, nullable=True)
+
+class OAuthState(Base):
+    __tablename__ = "oauth_states"
+
+    state = Column(String(64), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class ValidacaoEmail(Base):
+    __tablename__ = "validacoes_email"
+
+    email = Column(String(255), primary_key=True)
+    valido = Column(Integer, nullable=False)
+    resultado = Column(Text, nullable=False)  # JSON do resultado da validação
+    data_validacao = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class VersaoTabela(Base):
+    __tablename__ = "versoes_tabelas"
+
+    tabela = Column(String(100), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    data_atualizacao = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ContadorEstatistica(Base):
+    __tablename__ = "contadores_estatisticas"
+
+    # ano = 0 guarda o total de todos os anos (usuários só existem nele)
+    ano = Column(Integer, primary_key=True)
+    metrica = Column(String(50), primary_key=True)
+    chave = Column(String(100), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+    data_atualizacao = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    tamanho = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    data_criacao = Column(DateTime, default=datetime.now)
+
+class ArquivoArmazenado(Base):
+    __tablename__ = "arquivos_armazenados"
+
+    # Nome lógico: o mesmo valor gravado em arquivo_projeto, entregas.arquivo, etc.
+    categoria = Column(String(50), primary_key=True)
+    nome = Column(String(500), primary_key=True)
+    sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=False, index=True)
+    tamanho = Column(Integer, nullable=False)
+    data_criacao = Column(DateTime, default=datetime.now, index=True)
@@ -0,0 +1,49 @@
+"""
+Script para reconciliar os contadores de estatísticas (contadores_estatisticas).
+
+Os contadores são atualizados a cada gravação via ORM. Alterações feitas fora
+dele (SQL direto, update/delete em massa, scripts de carga ou limpeza) deixam
+os contadores defasados; este script recalcula tudo com GROUP BY e corrige
+apenas o que diverge. Pode ser agendado (ex.: diariamente) e executado mais
+de uma vez. Em bancos sem a tabela, ela é criada e preenchida.
+
+Uso:
+    python reconciliar_estatisticas.py              # corrige os contadores
+    python reconciliar_estatisticas.py --simular    # apenas mostra as diferenças
+"""
+import argparse
+from database import engine, Base
+from models.database_models import ContadorEstatistica
+from services.estatisticas import reconciliar
+
+
+def reconciliar_estatisticas(simular: bool = False):
+    print("\n" + "="*60)
+    print("   RECONCILIAÇÃO DAS ESTATÍSTICAS" + (" (SIMULAÇÃO)" if simular else ""))
+    print("="*60 + "\n")
+
+    try:
+        Base.metadata.create_all(bind=engine, tables=[ContadorEstatistica.__table__])
+        with engine.begin() as connection:
+            diferencas = reconciliar(connection, simular=simular)
+    except Exception as e:
+        print(f"❌ Erro na reconciliação: {str(e)}")
+        raise
+
+    for diferenca in diferencas:
+        ano = "todos" if diferenca.ano == 0 else diferenca.ano
+        print(f"📋 [{ano}] {diferenca.metrica}/{diferenca.chave}: {diferenca.gravado} → {diferenca.correto}")
+
+    if not diferencas:
+        print("✅ Todos os contadores estão corretos")
+    elif simular:
+        print(f"\n⚠️  {len(diferencas)} contador(es) divergente(s) (nada foi alterado)")
+    else:
+        print(f"\n✅ {len(diferencas)} contador(es) corrigido(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcilia os contadores de estatísticas")
+    parser.add_argument("--simular", action="store_true", help="Apenas mostrar as diferenças")
+    args = parser.parse_args()
+    reconciliar_estatisticas(simular=args.simular)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from models.database_models import (
     Usuario, 
@@ -10,19 +11,17 @@ from models.database_models import (
 from typing import Optional
 from datetime import datetime
 import os
-from pathlib import Path
 from database import get_db
+from services.blobs import blob_store
+from services.http_cache import resposta_com_etag_do_conteudo
+from services.paineis import montar_painel_aluno, montar_timeline, verificar_entrega
+from routes.arquivos import bearer, exigir_proprio_usuario
 
 router = APIRouter()
 
-# Diretórios para salvar arquivos
-UPLOAD_DIR_RELATORIOS = Path("uploads/relatorios")
-UPLOAD_DIR_ENTREGAS = Path("uploads/entregas")
-UPLOAD_DIR_RELATORIOS.mkdir(parents=True, exist_ok=True)
-UPLOAD_DIR_ENTREGAS.mkdir(parents=True, exist_ok=True)
 
 @router.get("/alunos/{aluno_id}/projeto")
-async def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter projeto do aluno.
     """
@@ -61,7 +60,7 @@ async def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
     }
 
 @router.post("/alunos/{aluno_id}/entrega-etapa", status_code=status.HTTP_201_CREATED)
-async def enviar_entrega_etapa(
+def enviar_entrega_etapa(
     aluno_id: int,
     etapa: str = Form(...),
     descricao: Optional[str] = Form(None),
@@ -135,15 +134,14 @@ async def enviar_entrega_etapa(
     titulo = titulos.get(etapa, etapa)
     
     # Salvar arquivo
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     extensao = os.path.splitext(arquivo.filename)[1]
     arquivo_nome = f"{aluno_id}_{etapa}_{timestamp}{extensao}"
-    arquivo_path = UPLOAD_DIR_ENTREGAS / arquivo_nome
     
     try:
-        with open(arquivo_path, "wb") as buffer:
-            content = await arquivo.read()
-            buffer.write(content)
+        blob_store.guardar(db, arquivo, "entregas", arquivo_nome)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -189,7 +187,7 @@ async def enviar_entrega_etapa(
     }
 
 @router.get("/alunos/{aluno_id}/entregas")
-async def listar_entregas_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def listar_entregas_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Listar todas as entregas de um aluno.
     """
@@ -228,40 +226,19 @@ async def listar_entregas_aluno(aluno_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/alunos/{aluno_id}/verificar-entrega/{tipo}")
-async def verificar_entrega_enviada(aluno_id: int, tipo: str, db: Session = Depends(get_db)):
+def verificar_entrega_enviada(aluno_id: int, tipo: str, db: Session = Depends(get_db)):
     """
     Verificar se o aluno já enviou uma entrega específica.
     """
-    entrega = db.query(Entrega).filter(
+    entregas = db.query(Entrega).filter(
         Entrega.aluno_id == aluno_id,
         Entrega.tipo == tipo
-    ).first()
-    
-    if entrega:
-        return {
-            "ja_enviou": True,
-            "entrega": {
-                "id": entrega.id,
-                "titulo": entrega.titulo,
-                "descricao": entrega.descricao,
-                "arquivo": entrega.arquivo,
-                "data_entrega": entrega.data_entrega.isoformat() if entrega.data_entrega else None,
-                "status_aprovacao_orientador": entrega.status_aprovacao_orientador,
-                "status_aprovacao_coordenador": entrega.status_aprovacao_coordenador,
-                "feedback_orientador": entrega.feedback_orientador,
-                "feedback_coordenador": entrega.feedback_coordenador,
-                "data_avaliacao_orientador": entrega.data_avaliacao_orientador.isoformat() if entrega.data_avaliacao_orientador else None,
-                "data_avaliacao_coordenador": entrega.data_avaliacao_coordenador.isoformat() if entrega.data_avaliacao_coordenador else None
-            }
-        }
+    ).order_by(Entrega.data_entrega.desc()).limit(1).all()
     
-    return {
-        "ja_enviou": False,
-        "entrega": None
-    }
+    return verificar_entrega(entregas, tipo)
 
 @router.get("/alunos/{aluno_id}/timeline")
-async def obter_timeline_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def obter_timeline_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter linha do tempo do projeto do aluno com todas as etapas e entregas.
     """
@@ -271,74 +248,18 @@ async def obter_timeline_aluno(aluno_id: int, db: Session = Depends(get_db)):
     ).first()
     
     if not projeto:
-        return {
-            "tem_projeto": False,
-            "message": "Aluno não possui projeto aprovado"
-        }
+        return montar_timeline(None, [])
     
     # Buscar entregas
     entregas = db.query(Entrega).filter(
         Entrega.aluno_id == aluno_id
     ).order_by(Entrega.data_entrega.desc()).all()
     
-    # Verificar quais etapas já foram cumpridas
-    entregas_por_tipo = {}
-    for entrega in entregas:
-        if entrega.tipo not in entregas_por_tipo:
-            entregas_por_tipo[entrega.tipo] = entrega
-    
-    return {
-        "tem_projeto": True,
-        "projeto": {
-            "id": projeto.id,
-            "titulo": projeto.titulo,
-            "etapa_atual": projeto.etapa_atual.value,
-            "data_inicio": projeto.data_inicio.isoformat() if projeto.data_inicio else None
-        },
-        "etapas": {
-            "inscricao": {
-                "concluida": True,
-                "data": projeto.data_inicio.isoformat() if projeto.data_inicio else None
-            },
-            "desenvolvimento": {
-                "concluida": projeto.etapa_atual.value not in ['inscricao', 'desenvolvimento'],
-                "atual": projeto.etapa_atual.value == 'desenvolvimento'
-            },
-            "relatorio_parcial": {
-                "concluida": 'relatorio_parcial' in entregas_por_tipo,
-                "atual": projeto.etapa_atual.value == 'relatorio_parcial',
-                "entrega": {
-                    "id": entregas_por_tipo['relatorio_parcial'].id,
-                    "data": entregas_por_tipo['relatorio_parcial'].data_entrega.isoformat()
-                } if 'relatorio_parcial' in entregas_por_tipo else None
-            },
-            "apresentacao": {
-                "concluida": 'apresentacao' in entregas_por_tipo,
-                "atual": projeto.etapa_atual.value == 'apresentacao',
-                "entrega": {
-                    "id": entregas_por_tipo['apresentacao'].id,
-                    "data": entregas_por_tipo['apresentacao'].data_entrega.isoformat()
-                } if 'apresentacao' in entregas_por_tipo else None
-            },
-            "artigo_final": {
-                "concluida": 'artigo_final' in entregas_por_tipo,
-                "atual": projeto.etapa_atual.value == 'relatorio_final',
-                "entrega": {
-                    "id": entregas_por_tipo['artigo_final'].id,
-                    "data": entregas_por_tipo['artigo_final'].data_entrega.isoformat()
-                } if 'artigo_final' in entregas_por_tipo else None
-            },
-            "concluido": {
-                "concluida": projeto.etapa_atual.value == 'concluido',
-                "atual": False
-            }
-        },
-        "total_entregas": len(entregas)
-    }
+    return montar_timeline(projeto, entregas)
 
 
 @router.get("/alunos/{aluno_id}/certificado")
-async def obter_certificado_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def obter_certificado_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Verificar se o aluno tem certificado disponível.
     """
@@ -354,3 +275,29 @@ async def obter_certificado_aluno(aluno_id: int, db: Session = Depends(get_db)):
     }
 
 
+@router.get("/alunos/{aluno_id}/painel")
+def obter_painel_aluno(
+    aluno_id: int,
+    request: Request,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """
+    Tudo o que o painel do aluno precisa em uma requisição: dados do usuário,
+    inscrição, projeto, entregas, verificações de entrega, linha do tempo,
+    certificado e relatórios mensais. Uma ETag para o conjunto
+    (If-None-Match → 304). Requer token do próprio aluno ou de coordenador.
+    """
+    exigir_proprio_usuario(credenciais, aluno_id)
+    aluno = db.query(Usuario).filter(
+        Usuario.id == aluno_id,
+        Usuario.tipo == TipoUsuario.aluno
+    ).first()
+    
+    if not aluno:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aluno não encontrado"
+        )
+    
+    return resposta_com_etag_do_conteudo(request, montar_painel_aluno(db, aluno))
@@ -0,0 +1,173 @@
+"""
+Download dos arquivos enviados (propostas, entregas, relatórios, certificados, CR).
+
+Acesso:
+- Cabeçalho `Authorization: Bearer <token>` (o JWT emitido no login), ou
+- link temporário assinado obtido em GET /api/arquivos/{categoria}/{nome}/link,
+  que pode ser aberto direto pelo navegador
+
+Coordenadores acessam qualquer arquivo; alunos, os próprios; orientadores, os
+dos seus orientandos.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models.database_models import Entrega, Inscricao, Projeto, RelatorioMensal, Usuario, TipoUsuario
+from routes.auth import ALGORITHM, SECRET_KEY
+from services.blobs import CATEGORIAS, blob_store
+from services.downloads import TTL_LINK, assinatura_valida, gerar_link, responder_arquivo
+
+router = APIRouter()
+
+bearer = HTTPBearer(auto_error=False)
+
+# Relatórios mensais do orientador também ficam em entregas.arquivo: a tela
+# que lista entregas não sabe em qual das duas categorias o arquivo foi gravado
+CATEGORIAS_EQUIVALENTES = {
+    "entregas": ("relatorios",),
+    "relatorios": ("entregas",),
+}
+
+
+def usuario_do_token(credenciais: Optional[HTTPAuthorizationCredentials]) -> Optional[dict]:
+    """Dados do JWT (user_id, tipo) ou None se ausente/inválido."""
+    if credenciais is None:
+        return None
+    try:
+        dados = jwt.decode(credenciais.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if dados.get("user_id") is None or dados.get("tipo") is None:
+        return None
+    return dados
+
+
+def _mesmo_arquivo(coluna, nome: str):
+    # Algumas colunas guardam o caminho completo (ex.: "uploads/documentos_cr/<nome>");
+    # "_" e "%" são comuns nos nomes e não podem virar curingas do LIKE
+    escapado = nome.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(coluna == nome, coluna.like(f"%/{escapado}", escape="\\"))
+
+
+def pode_acessar(db: Session, usuario: dict, categoria: str, nome: str) -> bool:
+    """Verifica se o usuário do token pode baixar o arquivo."""
+    tipo, usuario_id = usuario["tipo"], usuario["user_id"]
+    if tipo == TipoUsuario.coordenador.value:
+        return True
+
+    # Projetos em que o usuário é o aluno ou o orientador
+    do_usuario = or_(Projeto.aluno_id == usuario_id, Projeto.orientador_id == usuario_id)
+
+    if categoria == "propostas":
+        condicao = exists().where(
+            _mesmo_arquivo(Inscricao.arquivo_projeto, nome),
+            or_(Inscricao.usuario_id == usuario_id, Inscricao.orientador_id == usuario_id)
+        )
+    elif categoria in ("entregas", "relatorios"):
+        condicao = exists().where(
+            _mesmo_arquivo(Entrega.arquivo, nome), Entrega.projeto_id == Projeto.id, do_usuario
+        )
+        if categoria == "relatorios":
+            condicao = or_(condicao, exists().where(
+                _mesmo_arquivo(RelatorioMensal.arquivo, nome), RelatorioMensal.projeto_id == Projeto.id, do_usuario
+            ))
+    elif categoria == "certificados":
+        condicao = exists().where(_mesmo_arquivo(Projeto.certificado_arquivo, nome), do_usuario)
+    elif categoria == "documentos_cr":
+        # O próprio aluno ou um orientador a quem ele enviou inscrição
+        condicao = exists().where(
+            _mesmo_arquivo(Usuario.documento_cr, nome),
+            or_(
+                Usuario.id == usuario_id,
+                exists().where(and_(Inscricao.usuario_id == Usuario.id, Inscricao.orientador_id == usuario_id))
+            )
+        )
+    else:
+        return False
+
+    return bool(db.execute(select(condicao)).scalar())
+
+
+def _localizar(db: Session, categoria: str, nome: str):
+    if categoria not in CATEGORIAS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria de arquivo desconhecida")
+    localizado = blob_store.localizar(db, categoria, nome)
+    for equivalente in CATEGORIAS_EQUIVALENTES.get(categoria, ()):
+        if localizado is not None:
+            break
+        localizado = blob_store.localizar(db, equivalente, nome)
+    if localizado is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arquivo não encontrado")
+    return localizado
+
+
+def exigir_usuario(credenciais: Optional[HTTPAuthorizationCredentials], tipo: Optional[TipoUsuario] = None) -> dict:
+    """Dados do JWT; 401 sem token válido, 403 se o usuário não for do `tipo` exigido."""
+    usuario = usuario_do_token(credenciais)
+    if usuario is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Autenticação necessária",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    if tipo is not None and usuario["tipo"] != tipo.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    return usuario
+
+
+def exigir_proprio_usuario(credenciais: Optional[HTTPAuthorizationCredentials], usuario_id: int) -> dict:
+    """Dados do JWT; 403 se o token não for do próprio usuário nem de um coordenador."""
+    usuario = exigir_usuario(credenciais)
+    if usuario["user_id"] != usuario_id and usuario["tipo"] != TipoUsuario.coordenador.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado")
+    return usuario
+
+
+def _autorizar(db: Session, credenciais: Optional[HTTPAuthorizationCredentials], categoria: str, nome: str):
+    usuario = exigir_usuario(credenciais)
+    if not pode_acessar(db, usuario, categoria, nome):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado a este arquivo")
+
+
+@router.get("/arquivos/{categoria}/{nome}", name="baixar_arquivo")
+def baixar_arquivo(
+    categoria: str,
+    nome: str,
+    request: Request,
+    expira: Optional[int] = None,
+    assinatura: Optional[str] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """
+    Envia o arquivo (suporta Range, If-None-Match e If-Modified-Since).
+    No armazenamento S3 redireciona para uma URL pré-assinada.
+    """
+    if not assinatura_valida(f"{categoria}/{nome}", expira, assinatura):
+        _autorizar(db, credenciais, categoria, nome)
+    localizado = _localizar(db, categoria, nome)
+    return responder_arquivo(request, localizado, nome)
+
+
+@router.get("/arquivos/{categoria}/{nome}/link")
+def link_arquivo(
+    categoria: str,
+    nome: str,
+    request: Request,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """Gera um link temporário para abrir o arquivo no navegador."""
+    _autorizar(db, credenciais, categoria, nome)
+    localizado = _localizar(db, categoria, nome)
+    return {
+        "url": gerar_link(request, localizado, categoria, nome),
+        "expira_em": TTL_LINK
+    }
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends, Query
 from fastapi.responses import RedirectResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from models.schemas import LoginRequest, LoginResponse, Usuario
 from models.database_models import Usuario as DBUsuario, TipoUsuario, StatusUsuario
@@ -7,9 +8,9 @@ from database import get_db
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 import os
-import shutil
-from pathlib import Path
 from microsoft_auth import microsoft_oauth, validate_email, get_user_info
+from services.oauth_state import criar_oauth_state_store
+from services.blobs import blob_store
 
 router = APIRouter()
 
@@ -18,8 +19,8 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "sua-chave-secreta-super-segura-aqui-12
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-# Cache temporário para estados OAuth (em produção, usar Redis ou banco)
-oauth_states = {}
+# Armazenamento dos states OAuth (compartilhado entre workers, com expiração)
+oauth_state_store = criar_oauth_state_store()
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """
@@ -65,7 +66,7 @@ def detectar_tipo_usuario(email: str) -> TipoUsuario:
         return TipoUsuario.aluno
 
 @router.get("/login")
-async def oauth_login():
+def oauth_login():
     """
     Endpoint que inicia o fluxo OAuth 2.0 com Microsoft.
     Redireciona o usuário para a página de login da Microsoft.
@@ -86,11 +87,8 @@ async def oauth_login():
         authorization_url = auth_data["authorization_url"]
         state = auth_data["state"]
         
-        # Armazenar state para validação posterior (em produção, usar Redis/DB)
-        oauth_states[state] = {
-            "created_at": datetime.utcnow(),
-            "used": False
-        }
+        # Armazenar state para validação posterior no callback
+        oauth_state_store.save(state)
         
         print(f"🔐 Redirecionando para login Microsoft (state: {state[:8]}...)")
         
@@ -106,6 +104,37 @@ async def oauth_login():
             detail=f"Erro ao iniciar autenticação Microsoft: {str(e)}"
         )
 
+def _buscar_ou_criar_usuario_oauth(db: Session, email: str, nome: str):
+    """
+    Busca o usuário pelo email ou cria um novo (login OAuth).
+    Bloqueante: a rota chama via run_in_threadpool.
+    """
+    user_data = db.query(DBUsuario).filter(DBUsuario.email == email).first()
+    is_new_user = False
+
+    if not user_data:
+        # Novo usuário - criar registro
+        is_new_user = True
+        tipo = detectar_tipo_usuario(email)
+
+        user_data = DBUsuario(
+            email=email,
+            senha="",  # Sem senha - apenas OAuth
+            nome=nome,
+            tipo=tipo,
+            status=StatusUsuario.ativo
+        )
+
+        db.add(user_data)
+        db.commit()
+        db.refresh(user_data)
+
+        print(f"✅ Novo usuário criado: {user_data.email} (tipo: {tipo.value})")
+    else:
+        print(f"✅ Usuário existente: {user_data.email}")
+
+    return user_data, is_new_user
+
 @router.get("/callback")
 async def oauth_callback(
     code: str = Query(...),
@@ -117,17 +146,14 @@ async def oauth_callback(
     Recebe o código de autorização da Microsoft e troca por token de acesso.
     """
     try:
-        # Validar state (proteção CSRF)
-        if state not in oauth_states or oauth_states[state]["used"]:
-            print(f"❌ State inválido ou já usado: {state}")
+        # Validar e consumir state (proteção CSRF) - cada state só pode ser usado uma vez
+        if not await run_in_threadpool(oauth_state_store.consume, state):
+            print(f"❌ State inválido, expirado ou já usado: {state}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="State de autenticação inválido"
             )
         
-        # Marcar state como usado
-        oauth_states[state]["used"] = True
-        
         print(f"✅ State validado: {state[:8]}...")
         
         # Trocar código por token de acesso
@@ -165,30 +191,14 @@ async def oauth_callback(
                 detail="Acesso permitido apenas para emails institucionais (@ibmec.edu.br)"
             )
         
-        # Buscar ou criar usuário no banco de dados
-        user_data = db.query(DBUsuario).filter(DBUsuario.email == email).first()
-        is_new_user = False
+        # Usuário autenticado existe no Azure AD: memorizar para logins futuros
+        await run_in_threadpool(microsoft_oauth.remember_validated_user, user_info)
         
-        if not user_data:
-            # Novo usuário - criar registro
-            is_new_user = True
-            tipo = detectar_tipo_usuario(email)
-            
-            user_data = DBUsuario(
-                email=email,
-                senha="",  # Sem senha - apenas OAuth
-                nome=display_name or f"{given_name} {surname}".strip() or email.split('@')[0],
-                tipo=tipo,
-                status=StatusUsuario.ativo
-            )
-            
-            db.add(user_data)
-            db.commit()
-            db.refresh(user_data)
-            
-            print(f"✅ Novo usuário criado: {user_data.email} (tipo: {tipo.value})")
-        else:
-            print(f"✅ Usuário existente: {user_data.email}")
+        # Buscar ou criar usuário no banco de dados (fora do event loop)
+        user_data, is_new_user = await run_in_threadpool(
+            _buscar_ou_criar_usuario_oauth, db, email,
+            display_name or f"{given_name} {surname}".strip() or email.split('@')[0]
+        )
         
         # Verificar se o usuário precisa completar o cadastro
         # Para usuários de teste em modo desenvolvimento, pular verificação
@@ -280,49 +290,20 @@ async def oauth_callback(
         error_url = f"{frontend_url}/login?error={str(e)}"
         return RedirectResponse(url=error_url)
 
-@router.post("/legacy-login")
-async def legacy_login(credentials: LoginRequest, db: Session = Depends(get_db)):
+def _buscar_ou_criar_usuario_legado(db: Session, credentials: LoginRequest, microsoft_user_data: dict,
+                                    is_test_user: bool, is_dev_mode: bool):
     """
-    Endpoint de login tradicional com email e senha.
-    Em modo desenvolvimento: aceita APENAS usuários de teste (aluno.teste, professor.teste, coordenador.teste).
-    Em produção: valida email via Microsoft e compara senha armazenada.
-    
-    Para outros usuários em desenvolvimento, use o fluxo OAuth normal.
+    Busca o usuário e confere a senha, ou cria um novo (login por email e senha).
+    Bloqueante: a rota chama via run_in_threadpool.
     """
-    print(f"🔑 Login tradicional para: {credentials.email}")
-    
-    # Verificar se é usuário de teste em desenvolvimento
-    is_test_user = microsoft_oauth.is_test_user(credentials.email)
-    is_dev_mode = microsoft_oauth.is_development
-    
-    # Em desenvolvimento, permitir APENAS usuários de teste
-    if is_dev_mode and not is_test_user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Login direto disponível apenas para usuários de teste em desenvolvimento. Use o fluxo OAuth para outros usuários."
-        )
-    
-    # Validar email institucional
-    validation_result = validate_email(credentials.email)
-    
-    if not validation_result['valid']:
-        error_message = validation_result.get('error', 'Email institucional inválido')
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=error_message
-        )
-    
-    microsoft_user_data = validation_result.get('user_data', {})
-    
-    # Buscar usuário no banco
     user_data = db.query(DBUsuario).filter(DBUsuario.email == credentials.email).first()
     is_new_user = False
-    
+
     if not user_data:
         # Criar novo usuário
         is_new_user = True
         tipo = detectar_tipo_usuario(credentials.email)
-        
+
         if microsoft_user_data and microsoft_user_data.get('display_name'):
             nome_usuario = microsoft_user_data['display_name']
         else:
@@ -330,12 +311,12 @@ async def legacy_login(credentials: LoginRequest, db: Session = Depends(get_db))
             username = credentials.email.split('@')[0]
             name_parts = username.replace('.', ' ').split()
             nome_usuario = ' '.join(word.capitalize() for word in name_parts)
-        
+
         # Pegar departamento do Microsoft se disponível
         departamento_usuario = None
         if microsoft_user_data and tipo != TipoUsuario.aluno:
             departamento_usuario = microsoft_user_data.get('department')
-        
+
         user_data = DBUsuario(
             email=credentials.email,
             senha=credentials.senha,
@@ -344,11 +325,11 @@ async def legacy_login(credentials: LoginRequest, db: Session = Depends(get_db))
             status=StatusUsuario.ativo,
             departamento=departamento_usuario
         )
-        
+
         db.add(user_data)
         db.commit()
         db.refresh(user_data)
-        
+
         print(f"✅ Novo usuário criado: {nome_usuario} ({tipo.value})")
     else:
         # Verificar senha - para usuários de teste, aceitar qualquer senha
@@ -360,6 +341,47 @@ async def legacy_login(credentials: LoginRequest, db: Session = Depends(get_db))
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Email ou senha inválidos"
                 )
+
+    return user_data, is_new_user
+
+@router.post("/legacy-login")
+async def legacy_login(credentials: LoginRequest, db: Session = Depends(get_db)):
+    """
+    Endpoint de login tradicional com email e senha.
+    Em modo desenvolvimento: aceita APENAS usuários de teste (aluno.teste, professor.teste, coordenador.teste).
+    Em produção: valida email via Microsoft e compara senha armazenada.
+    
+    Para outros usuários em desenvolvimento, use o fluxo OAuth normal.
+    """
+    print(f"🔑 Login tradicional para: {credentials.email}")
+    
+    # Verificar se é usuário de teste em desenvolvimento
+    is_test_user = microsoft_oauth.is_test_user(credentials.email)
+    is_dev_mode = microsoft_oauth.is_development
+    
+    # Em desenvolvimento, permitir APENAS usuários de teste
+    if is_dev_mode and not is_test_user:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Login direto disponível apenas para usuários de teste em desenvolvimento. Use o fluxo OAuth para outros usuários."
+        )
+    
+    # Validar email institucional
+    validation_result = await validate_email(credentials.email)
+    
+    if not validation_result['valid']:
+        error_message = validation_result.get('error', 'Email institucional inválido')
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=error_message
+        )
+    
+    microsoft_user_data = validation_result.get('user_data', {})
+    
+    # Buscar usuário no banco (fora do event loop)
+    user_data, is_new_user = await run_in_threadpool(
+        _buscar_ou_criar_usuario_legado, db, credentials, microsoft_user_data, is_test_user, is_dev_mode
+    )
     
     # Verificar se o usuário precisa completar o cadastro
     # Para usuários de teste em modo desenvolvimento, pular verificação
@@ -436,7 +458,7 @@ async def logout():
     return {"message": "Logout realizado com sucesso"}
 
 @router.get("/me")
-async def get_current_user():
+def get_current_user():
     """
     Retorna informações do usuário autenticado.
     Em produção, validar JWT token.
@@ -447,7 +469,7 @@ async def get_current_user():
     }
 
 @router.post("/completar-cadastro")
-async def completar_cadastro(dados: dict, db: Session = Depends(get_db)):
+def completar_cadastro(dados: dict, db: Session = Depends(get_db)):
     """
     Endpoint para completar dados do cadastro após primeiro login.
     Atualiza informações complementares do novo usuário.
@@ -514,9 +536,10 @@ async def completar_cadastro(dados: dict, db: Session = Depends(get_db)):
     }
 
 @router.post("/upload-documento-cr")
-async def upload_documento_cr(
+def upload_documento_cr(
     email: str = Form(...),
-    arquivo: UploadFile = File(...)
+    arquivo: UploadFile = File(...),
+    db: Session = Depends(get_db)
 ):
     """
     Endpoint para upload do documento de CR (histórico acadêmico).
@@ -532,19 +555,16 @@ async def upload_documento_cr(
             detail=f"Formato de arquivo não permitido. Use: {', '.join(extensoes_permitidas)}"
         )
     
-    # Criar diretório de uploads se não existir
-    upload_dir = Path("uploads/documentos_cr")
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
     # Gerar nome único para o arquivo
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     nome_arquivo = f"cr_{email.replace('@', '_').replace('.', '_')}_{timestamp}{extensao}"
-    caminho_arquivo = upload_dir / nome_arquivo
     
     # Salvar arquivo
     try:
-        with caminho_arquivo.open("wb") as buffer:
-            shutil.copyfileobj(arquivo.file, buffer)
+        blob_store.guardar(db, arquivo, "documentos_cr", nome_arquivo)
+        db.commit()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -557,5 +577,5 @@ async def upload_documento_cr(
     return {
         "message": "Documento enviado com sucesso",
         "filename": nome_arquivo,
-        "path": str(caminho_arquivo)
+        "path": f"documentos_cr/{nome_arquivo}"
     }
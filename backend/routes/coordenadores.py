@@ -1,14 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from models.database_models import (
-    Usuario, Projeto, Entrega, TipoUsuario, EtapaProjeto, MensagemRelatorio, ConfiguracaoSistema
+    Usuario, Projeto, Entrega, TipoUsuario, StatusUsuario, EtapaProjeto, MensagemRelatorio, ConfiguracaoSistema
 )
 from database import get_db
-from typing import List
+from services.projecoes import (
+    listar_relatorios_mensais_por_orientador, listar_projetos_com_alunos, aluno_do_projeto_para_dict,
+    certificado_para_dict, montar_dashboard_coordenador
+)
+from services.paginacao import converter_filtro, normalizar_limite
+from services.blobs import blob_store
+from services.configuracoes import obter_configuracoes, invalidar_configuracoes
+from services.downloads import TTL_LINK, assinatura_valida, link_assinado
+from services.exportacao_zip import gerar_zip
+from services.exportacao_tabelas import preparar_exportacao
+from services.estatisticas import obter_estatisticas
+from routes.arquivos import bearer, exigir_usuario
+from typing import List, Optional
 from datetime import datetime
-import re
-import os
-import shutil
+from urllib.parse import urlencode
 
 router = APIRouter()
 
@@ -28,34 +40,76 @@ ETAPAS_VALIDAS = [
     "concluido"
 ]
 
+def _configuracoes_para_dict(configuracoes) -> dict:
+    return {
+        "inscricoes_abertas": configuracoes.inscricoes_abertas,
+        "ano_ativo": configuracoes.ano_ativo,
+        "data_atualizacao": configuracoes.data_atualizacao.isoformat() if configuracoes.data_atualizacao else None,
+        "atualizado_por": configuracoes.atualizado_por
+    }
+
 @router.get("/coordenadores/alunos")
-async def listar_todos_alunos(db: Session = Depends(get_db)):
+def listar_todos_alunos(
+    ano: Optional[int] = None,
+    etapa: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Listar todos os alunos com seus projetos.
+    Listar alunos com seus projetos (mais recentes primeiro).
+    Filtros opcionais: ano do projeto, etapa atual e status do aluno.
+    Paginado por cursor: repita a chamada com `cursor=next_cursor` até next_cursor ser nulo.
     """
-    projetos = db.query(Projeto).all()
+    projetos, next_cursor = listar_projetos_com_alunos(
+        db,
+        ano=ano,
+        etapa=converter_filtro(EtapaProjeto, etapa, "Etapa"),
+        status_aluno=converter_filtro(StatusUsuario, status, "Status"),
+        cursor=cursor,
+        limite=normalizar_limite(limit)
+    )
     
-    alunos = []
-    for projeto in projetos:
-        aluno = projeto.aluno
-        orientador = projeto.orientador
-        
-        alunos.append({
-            "aluno_id": aluno.id,
-            "nome": aluno.nome,
-            "curso": aluno.curso,
-            "projeto_id": projeto.id,
-            "projeto_titulo": projeto.titulo,
-            "orientador_id": orientador.id if orientador else None,
-            "orientador_nome": orientador.nome if orientador else None,
-            "etapa": projeto.etapa_atual.value,
-            "data_inicio": projeto.data_inicio.isoformat() if projeto.data_inicio else None
-        })
+    alunos = [aluno_do_projeto_para_dict(projeto) for projeto in projetos]
     
-    return {"alunos": alunos}
+    return {"alunos": alunos, "next_cursor": next_cursor}
+
+@router.get("/coordenadores/dashboard")
+def dashboard_coordenador(
+    ano: Optional[int] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """
+    Tudo o que o painel do coordenador precisa em uma requisição: inscrições,
+    orientadores, alunos com a situação do certificado, configuração das
+    inscrições e totais. Sem `ano`, traz todos os anos.
+    Requer token de coordenador.
+    """
+    exigir_usuario(credenciais, TipoUsuario.coordenador)
+    dashboard = montar_dashboard_coordenador(db, ano)
+    configuracoes = obter_configuracoes(db)
+    dashboard["configuracoes"] = _configuracoes_para_dict(configuracoes)
+    return dashboard
+
+@router.get("/coordenadores/estatisticas")
+def estatisticas_coordenador(
+    ano: Optional[int] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """
+    Indicadores do programa: usuários por tipo, inscrições por status,
+    projetos por etapa e propostas aguardando cada orientador.
+    Lidos dos contadores pré-calculados; sem `ano`, totais de todos os anos.
+    Requer token de coordenador.
+    """
+    exigir_usuario(credenciais, TipoUsuario.coordenador)
+    return obter_estatisticas(db, ano)
 
 @router.get("/coordenadores/alunos/{aluno_id}/status-etapa")
-async def obter_status_etapa(aluno_id: int, db: Session = Depends(get_db)):
+def obter_status_etapa(aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter status/etapa de um aluno específico.
     """
@@ -72,7 +126,7 @@ async def obter_status_etapa(aluno_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/coordenadores/alunos/{aluno_id}/entregas")
-async def listar_entregas_do_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def listar_entregas_do_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Listar entregas de um aluno específico.
     """
@@ -108,7 +162,7 @@ async def listar_entregas_do_aluno(aluno_id: int, db: Session = Depends(get_db))
     }
 
 @router.patch("/coordenadores/entregas/{projeto_id}/{entrega_id}/status")
-async def validar_entrega(projeto_id: int, entrega_id: int, novo_status: str, db: Session = Depends(get_db)):
+def validar_entrega(projeto_id: int, entrega_id: int, novo_status: str, db: Session = Depends(get_db)):
     """
     Atualizar status de aprovação de uma entrega pelo coordenador.
     Filtra por projeto_id e entrega_id para maior segurança.
@@ -151,7 +205,7 @@ async def validar_entrega(projeto_id: int, entrega_id: int, novo_status: str, db
     }
 
 @router.post("/coordenadores/relatorio-parcial/{entrega_id}/avaliar")
-async def avaliar_relatorio_parcial(
+def avaliar_relatorio_parcial(
     entrega_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -200,7 +254,7 @@ async def avaliar_relatorio_parcial(
     }
 
 @router.post("/coordenadores/apresentacao-amostra/{entrega_id}/avaliar")
-async def avaliar_apresentacao_amostra(
+def avaliar_apresentacao_amostra(
     entrega_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -249,7 +303,7 @@ async def avaliar_apresentacao_amostra(
     }
 
 @router.post("/coordenadores/artigo-final/{entrega_id}/avaliar")
-async def avaliar_artigo_final(
+def avaliar_artigo_final(
     entrega_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -298,7 +352,7 @@ async def avaliar_artigo_final(
     }
 
 @router.patch("/coordenadores/alunos/{aluno_id}/status-etapa")
-async def atualizar_status_etapa(aluno_id: int, novo_status: str, db: Session = Depends(get_db)):
+def atualizar_status_etapa(aluno_id: int, novo_status: str, db: Session = Depends(get_db)):
     """
     Atualizar etapa/status de um projeto.
     Apenas coordenadores podem alterar a etapa.
@@ -334,7 +388,7 @@ async def atualizar_status_etapa(aluno_id: int, novo_status: str, db: Session =
     }
 
 @router.get("/coordenadores/orientadores/{orientador_id}/relatorios-mensais")
-async def listar_relatorios_mensais_orientador(orientador_id: int, db: Session = Depends(get_db)):
+def listar_relatorios_mensais_orientador(orientador_id: int, db: Session = Depends(get_db)):
     """
     Listar todos os relatórios mensais enviados por um orientador e seus alunos.
     Retorna os relatórios agrupados por aluno.
@@ -348,62 +402,8 @@ async def listar_relatorios_mensais_orientador(orientador_id: int, db: Session =
     if not orientador:
         raise HTTPException(status_code=404, detail="Orientador não encontrado")
     
-    # Buscar todos os projetos do orientador
-    projetos = db.query(Projeto).filter(Projeto.orientador_id == orientador_id).all()
-    
-    relatorios_list = []
-    
-    for projeto in projetos:
-        # Buscar relatórios mensais de cada projeto (armazenados como Entregas do tipo "relatorio_mensal")
-        relatorios = db.query(Entrega).filter(
-            Entrega.projeto_id == projeto.id,
-            Entrega.tipo == "relatorio_mensal"
-        ).all()
-        
-        for relatorio in relatorios:
-            # Extrair mês do título (formato: "Relatório Mensal - YYYY-MM")
-            # Melhorar a lógica para garantir que o mês seja extraído corretamente
-            mes = "N/A"
-            if relatorio.titulo:
-                # Tentar extrair o formato YYYY-MM do título
-                match = re.search(r'(\d{4}-\d{2})', relatorio.titulo)
-                if match:
-                    mes = match.group(1)
-                elif "Relatório Mensal - " in relatorio.titulo:
-                    mes = relatorio.titulo.replace("Relatório Mensal - ", "").strip()
-            
-            # Buscar mensagens relacionadas a este relatório
-            mensagens = db.query(MensagemRelatorio).filter(
-                MensagemRelatorio.entrega_id == relatorio.id
-            ).order_by(MensagemRelatorio.data_criacao.asc()).all()
-            
-            mensagens_list = [
-                {
-                    "id": msg.id,
-                    "mensagem": msg.mensagem,
-                    "tipo_usuario": msg.tipo_usuario,
-                    "usuario_id": msg.usuario_id,
-                    "data_criacao": msg.data_criacao.isoformat() if msg.data_criacao else None
-                }
-                for msg in mensagens
-            ]
-            
-            relatorios_list.append({
-                "id": relatorio.id,
-                "mes": mes,
-                "descricao": relatorio.descricao,
-                "arquivo_url": relatorio.arquivo,
-                "data_envio": relatorio.data_entrega.isoformat() if relatorio.data_entrega else None,
-                "feedback_coordenador": relatorio.feedback_coordenador,
-                "data_feedback_coordenador": relatorio.data_avaliacao_coordenador.isoformat() if relatorio.data_avaliacao_coordenador else None,
-                "resposta_orientador": relatorio.feedback_orientador,
-                "data_resposta_orientador": relatorio.data_avaliacao_orientador.isoformat() if relatorio.data_avaliacao_orientador else None,
-                "mensagens": mensagens_list,
-                "aluno_id": projeto.aluno_id,
-                "aluno_nome": projeto.aluno.nome if projeto.aluno else None,
-                "projeto_id": projeto.id,
-                "projeto_titulo": projeto.titulo
-            })
+    # Relatórios de todos os alunos do orientador em número constante de consultas
+    relatorios_list = listar_relatorios_mensais_por_orientador(db, orientador_id)
     
     return {
         "orientador_id": orientador_id,
@@ -413,7 +413,7 @@ async def listar_relatorios_mensais_orientador(orientador_id: int, db: Session =
     }
 
 @router.post("/coordenadores/relatorios-mensais/{relatorio_id}/responder")
-async def responder_relatorio_mensal(
+def responder_relatorio_mensal(
     relatorio_id: int, 
     feedback_data: dict,
     db: Session = Depends(get_db)
@@ -467,23 +467,13 @@ async def responder_relatorio_mensal(
     }
 
 @router.get("/coordenadores/configuracoes/inscricoes")
-async def obter_status_inscricoes(db: Session = Depends(get_db)):
+def obter_status_inscricoes(db: Session = Depends(get_db)):
     """
     Retorna o status atual das inscrições (abertas ou fechadas) e o ano ativo.
     """
-    # Buscar configuração do ano ativo
-    config_ano = db.query(ConfiguracaoSistema).filter(
-        ConfiguracaoSistema.chave == 'ano_ativo_inscricoes'
-    ).first()
-    
-    ano_ativo = int(config_ano.valor) if config_ano else datetime.now().year
-    
-    # Buscar configuração de inscrições abertas
-    config = db.query(ConfiguracaoSistema).filter(
-        ConfiguracaoSistema.chave == 'inscricoes_abertas'
-    ).first()
+    configuracoes = obter_configuracoes(db)
     
-    if not config:
+    if not configuracoes.configuracao_existe:
         # Se não existir, criar com valor padrão (abertas)
         config = ConfiguracaoSistema(
             chave='inscricoes_abertas',
@@ -494,19 +484,13 @@ async def obter_status_inscricoes(db: Session = Depends(get_db)):
         )
         db.add(config)
         db.commit()
-        db.refresh(config)
-    
-    inscricoes_abertas = config.valor.lower() == 'true'
+        invalidar_configuracoes()
+        configuracoes = obter_configuracoes(db)
     
-    return {
-        "inscricoes_abertas": inscricoes_abertas,
-        "ano_ativo": ano_ativo,
-        "data_atualizacao": config.data_atualizacao.isoformat() if config.data_atualizacao else None,
-        "atualizado_por": config.atualizado_por
-    }
+    return _configuracoes_para_dict(configuracoes)
 
 @router.post("/coordenadores/configuracoes/inscricoes/toggle")
-async def alternar_status_inscricoes(
+def alternar_status_inscricoes(
     dados: dict,
     db: Session = Depends(get_db)
 ):
@@ -577,6 +561,9 @@ async def alternar_status_inscricoes(
     db.commit()
     db.refresh(config)
     
+    # Propagar a alteração para o cache deste e dos demais workers
+    invalidar_configuracoes()
+    
     status_texto = "abertas" if novo_status else "fechadas"
     
     return {
@@ -589,7 +576,7 @@ async def alternar_status_inscricoes(
 
 
 @router.get("/coordenadores/apresentacoes/alunos")
-async def listar_alunos_para_apresentacao(
+def listar_alunos_para_apresentacao(
     db: Session = Depends(get_db)
 ):
     """
@@ -635,7 +622,7 @@ async def listar_alunos_para_apresentacao(
 
 
 @router.patch("/coordenadores/apresentacoes/agendar")
-async def agendar_apresentacoes(
+def agendar_apresentacoes(
     dados: dict,
     db: Session = Depends(get_db)
 ):
@@ -690,7 +677,7 @@ async def agendar_apresentacoes(
 
 
 @router.patch("/coordenadores/apresentacoes/{projeto_id}")
-async def atualizar_apresentacao_individual(
+def atualizar_apresentacao_individual(
     projeto_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -733,7 +720,7 @@ async def atualizar_apresentacao_individual(
 
 
 @router.patch("/coordenadores/apresentacoes/{projeto_id}/avaliar")
-async def avaliar_apresentacao(
+def avaliar_apresentacao(
     projeto_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -794,7 +781,7 @@ async def avaliar_apresentacao(
 
 
 @router.get("/coordenadores/apresentacoes-amostra/alunos")
-async def listar_alunos_apresentacao_amostra(
+def listar_alunos_apresentacao_amostra(
     db: Session = Depends(get_db)
 ):
     """
@@ -849,7 +836,7 @@ async def listar_alunos_apresentacao_amostra(
 
 
 @router.patch("/coordenadores/apresentacoes-amostra/{projeto_id}")
-async def agendar_apresentacao_amostra(
+def agendar_apresentacao_amostra(
     projeto_id: int,
     dados: dict,
     db: Session = Depends(get_db)
@@ -907,7 +894,7 @@ async def agendar_apresentacao_amostra(
 
 
 @router.post("/coordenadores/projetos/{projeto_id}/certificado")
-async def enviar_certificado(
+def enviar_certificado(
     projeto_id: int,
     certificado: UploadFile = File(...),
     db: Session = Depends(get_db)
@@ -935,20 +922,16 @@ async def enviar_certificado(
             detail="Apenas arquivos PDF são permitidos para certificados"
         )
     
-    # Criar diretório se não existir
-    upload_dir = "uploads/certificados"
-    os.makedirs(upload_dir, exist_ok=True)
-    
     # Gerar nome único para o arquivo
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     aluno_nome = projeto.aluno.nome.replace(" ", "_")
     filename = f"certificado_{aluno_nome}_{timestamp}.pdf"
-    file_path = os.path.join(upload_dir, filename)
     
     # Salvar arquivo
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(certificado.file, buffer)
+        blob_store.guardar(db, certificado, "certificados", filename)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -972,7 +955,7 @@ async def enviar_certificado(
 
 
 @router.get("/coordenadores/projetos/{projeto_id}/certificado")
-async def verificar_certificado(projeto_id: int, db: Session = Depends(get_db)):
+def verificar_certificado(projeto_id: int, db: Session = Depends(get_db)):
     """
     Verificar se um projeto tem certificado emitido.
     """
@@ -980,11 +963,105 @@ async def verificar_certificado(projeto_id: int, db: Session = Depends(get_db)):
     if not projeto:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
     
-    return {
-        "projeto_id": projeto.id,
-        "tem_certificado": projeto.certificado_arquivo is not None,
-        "certificado_arquivo": projeto.certificado_arquivo,
-        "data_emissao": projeto.certificado_data_emissao.isoformat() if projeto.certificado_data_emissao else None
-    }
+    return certificado_para_dict(projeto)
+
+
+@router.get("/coordenadores/exportar/{ano}", name="exportar_ano")
+def exportar_ano(
+    ano: int,
+    expira: Optional[int] = None,
+    assinatura: Optional[str] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+):
+    """
+    ZIP com os relatórios parciais, artigos finais e certificados dos projetos
+    do ano, mais um manifesto CSV. O ZIP é gerado e enviado em blocos.
+    Requer token de coordenador ou link obtido em /coordenadores/exportar/{ano}/link.
+    """
+    if not assinatura_valida(f"exportar/{ano}", expira, assinatura):
+        exigir_usuario(credenciais, TipoUsuario.coordenador)
+
+    return StreamingResponse(
+        gerar_zip(ano),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="iniciacao_cientifica_{ano}.zip"',
+            "Cache-Control": "no-store",
+        }
+    )
 
 
+@router.get("/coordenadores/exportar/{ano}/link")
+def link_exportar_ano(
+    ano: int,
+    request: Request,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+):
+    """Link temporário para baixar o ZIP do ano direto pelo navegador."""
+    exigir_usuario(credenciais, TipoUsuario.coordenador)
+    url = str(request.url_for("exportar_ano", ano=ano))
+    return {"url": link_assinado(url, f"exportar/{ano}"), "expira_em": TTL_LINK}
+
+
+def _recurso_exportacao(conjunto: str, parametros: dict) -> str:
+    # A assinatura do link cobre também formato, colunas e filtros
+    return f"exportacoes/{conjunto}?{urlencode(sorted(parametros.items()))}"
+
+
+def _parametros_exportacao(formato, colunas, ano, status, etapa) -> dict:
+    parametros = {"formato": formato, "colunas": colunas, "ano": ano, "status": status, "etapa": etapa}
+    return {chave: valor for chave, valor in parametros.items() if valor is not None}
+
+
+@router.get("/coordenadores/exportacoes/{conjunto}", name="exportar_tabela")
+def exportar_tabela(
+    conjunto: str,
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    ano: Optional[int] = None,
+    status: Optional[str] = None,
+    etapa: Optional[str] = None,
+    expira: Optional[int] = None,
+    assinatura: Optional[str] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+):
+    """
+    Exporta inscrições ou projetos (conjunto = inscricoes | projetos) em CSV,
+    XLSX ou Parquet, com seleção de colunas (?colunas=id,titulo_projeto) e
+    filtros por ano, status e etapa. As linhas são lidas em lotes e enviadas
+    à medida que são convertidas.
+    Requer token de coordenador ou link obtido em /coordenadores/exportacoes/{conjunto}/link.
+    """
+    parametros = _parametros_exportacao(formato, colunas, ano, status, etapa)
+    if not assinatura_valida(_recurso_exportacao(conjunto, parametros), expira, assinatura):
+        exigir_usuario(credenciais, TipoUsuario.coordenador)
+
+    # Valida antes de a resposta começar: erros ainda podem virar 400/404/501
+    exportacao = preparar_exportacao(conjunto, formato, colunas, status, ano, etapa)
+    return StreamingResponse(
+        exportacao.gerar(),
+        media_type=exportacao.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{conjunto}.{exportacao.formato}"',
+            "Cache-Control": "no-store",
+        }
+    )
+
+
+@router.get("/coordenadores/exportacoes/{conjunto}/link")
+def link_exportar_tabela(
+    conjunto: str,
+    request: Request,
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    ano: Optional[int] = None,
+    status: Optional[str] = None,
+    etapa: Optional[str] = None,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer)
+):
+    """Link temporário para baixar a exportação (com os mesmos parâmetros) direto pelo navegador."""
+    exigir_usuario(credenciais, TipoUsuario.coordenador)
+    preparar_exportacao(conjunto, formato, colunas, status, ano, etapa)
+    parametros = _parametros_exportacao(formato, colunas, ano, status, etapa)
+    url = f"{request.url_for('exportar_tabela', conjunto=conjunto)}?{urlencode(parametros)}"
+    return {"url": link_assinado(url, _recurso_exportacao(conjunto, parametros)), "expira_em": TTL_LINK}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from models.database_models import (
     Inscricao as InscricaoModel, 
@@ -6,22 +7,22 @@ from models.database_models import (
     StatusInscricao,
     Projeto,
     EtapaProjeto,
-    ConfiguracaoSistema,
     Entrega,
     RelatorioMensal
 )
 from typing import List, Optional
 from datetime import datetime
 import os
-from pathlib import Path
-from database import get_db
+from database import get_db, get_async_db, DATABASE_ASYNC
+from services.projecoes import listar_inscricoes_com_etapa, listar_inscricoes_com_etapa_async
+from services.paineis import inscricao_do_usuario_para_dict, proposta_pendente_para_dict
+from services.paginacao import converter_filtro, normalizar_limite
+from services.uploads import nome_seguro
+from services.blobs import blob_store
+from services.configuracoes import obter_configuracoes
 
 router = APIRouter()
 
-# Diretório para salvar arquivos (em produção, usar S3 ou similar)
-UPLOAD_DIR = Path("uploads/propostas")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 @router.get("/status")
 def verificar_status_inscricoes(db: Session = Depends(get_db)):
     """
@@ -29,26 +30,12 @@ def verificar_status_inscricoes(db: Session = Depends(get_db)):
     Usado pelo frontend para mostrar mensagens apropriadas aos alunos.
     """
     try:
-        # Buscar configuração de inscrições abertas
-        config = db.query(ConfiguracaoSistema).filter(
-            ConfiguracaoSistema.chave == 'inscricoes_abertas'
-        ).first()
-        
-        # Buscar ano ativo
-        config_ano = db.query(ConfiguracaoSistema).filter(
-            ConfiguracaoSistema.chave == 'ano_ativo_inscricoes'
-        ).first()
+        # Configurações em cache (sem consulta ao banco na maioria das chamadas)
+        configuracoes = obter_configuracoes(db)
         
-        inscricoes_abertas = True  # Padrão
-        data_atualizacao = None
-        ano_ativo = datetime.now().year  # Padrão
-        
-        if config:
-            inscricoes_abertas = config.valor.lower() == 'true'
-            data_atualizacao = config.data_atualizacao.isoformat() if config.data_atualizacao else None
-        
-        if config_ano:
-            ano_ativo = int(config_ano.valor)
+        inscricoes_abertas = configuracoes.inscricoes_abertas
+        ano_ativo = configuracoes.ano_ativo
+        data_atualizacao = configuracoes.data_atualizacao.isoformat() if configuracoes.data_atualizacao else None
         
         return {
             "inscricoes_abertas": inscricoes_abertas,
@@ -66,7 +53,7 @@ def verificar_status_inscricoes(db: Session = Depends(get_db)):
         }
 
 @router.post("/proposta", status_code=status.HTTP_201_CREATED)
-async def submeter_proposta(
+def submeter_proposta(
     usuario_id: int = Form(...),
     titulo_projeto: str = Form(...),
     area_conhecimento: str = Form(...),
@@ -83,26 +70,16 @@ async def submeter_proposta(
     Verifica se as inscrições estão abertas e usa o ano ativo definido pelo coordenador.
     """
     # Verificar se as inscrições estão abertas
-    config = db.query(ConfiguracaoSistema).filter(
-        ConfiguracaoSistema.chave == 'inscricoes_abertas'
-    ).first()
+    configuracoes = obter_configuracoes(db)
     
-    inscricoes_abertas = True  # Padrão se não houver configuração
-    if config:
-        inscricoes_abertas = config.valor.lower() == 'true'
-    
-    if not inscricoes_abertas:
+    if not configuracoes.inscricoes_abertas:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="As inscrições estão fechadas no momento. Entre em contato com a coordenação para mais informações."
         )
     
-    # Buscar ano ativo das inscrições
-    config_ano = db.query(ConfiguracaoSistema).filter(
-        ConfiguracaoSistema.chave == 'ano_ativo_inscricoes'
-    ).first()
-    
-    ano_ativo = int(config_ano.valor) if config_ano else datetime.now().year
+    # Ano ativo das inscrições
+    ano_ativo = configuracoes.ano_ativo
     
     # Buscar dados do usuário no banco de dados
     usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
@@ -120,14 +97,11 @@ async def submeter_proposta(
     arquivo_nome = None
     if projeto:
         # Gerar nome único para o arquivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        arquivo_nome = f"{usuario_id}_{timestamp}_{projeto.filename}"
-        arquivo_path = UPLOAD_DIR / arquivo_nome
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        arquivo_nome = f"{usuario_id}_{timestamp}_{nome_seguro(projeto.filename)}"
         
-        # Salvar arquivo
-        with open(arquivo_path, "wb") as buffer:
-            content = await projeto.read()
-            buffer.write(content)
+        # Salvar arquivo (deduplicado por conteúdo, gravado em blocos com limite de tamanho)
+        blob_store.guardar(db, projeto, "propostas", arquivo_nome)
     
     # Criar proposta no banco de dados
     nova_inscricao = InscricaoModel(
@@ -166,7 +140,7 @@ async def submeter_proposta(
     }
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def criar_inscricao(
+def criar_inscricao(
     nome: str = Form(...),
     email: str = Form(...),
     cpf: str = Form(...),
@@ -182,13 +156,10 @@ async def criar_inscricao(
     # Salvar arquivo se fornecido
     arquivo_nome = None
     if projeto:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        arquivo_nome = f"{cpf}_{timestamp}_{projeto.filename}"
-        arquivo_path = UPLOAD_DIR / arquivo_nome
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        arquivo_nome = f"{nome_seguro(cpf)}_{timestamp}_{nome_seguro(projeto.filename)}"
         
-        with open(arquivo_path, "wb") as buffer:
-            content = await projeto.read()
-            buffer.write(content)
+        blob_store.guardar(db, projeto, "propostas", arquivo_nome)
     
     # Criar inscrição no banco
     nova_inscricao = InscricaoModel(
@@ -217,7 +188,7 @@ async def criar_inscricao(
     }
 
 @router.get("/usuario/{usuario_id}")
-async def obter_inscricao_usuario(usuario_id: int, db: Session = Depends(get_db)):
+def obter_inscricao_usuario(usuario_id: int, db: Session = Depends(get_db)):
     """
     Obter inscrição/proposta de um usuário específico.
     Retorna a inscrição mais recente (última submetida).
@@ -226,115 +197,59 @@ async def obter_inscricao_usuario(usuario_id: int, db: Session = Depends(get_db)
         InscricaoModel.usuario_id == usuario_id
     ).order_by(InscricaoModel.data_submissao.desc()).first()  # Ordenar por data de submissão, mais recente primeiro
     
-    if not inscricao:
-        return {
-            "tem_proposta": False,
-            "message": "Usuário não possui proposta submetida"
-        }
-    
-    return {
-        "tem_proposta": True,
-        "inscricao": {
-            "id": inscricao.id,
-            "usuario_id": inscricao.usuario_id,
-            "nome": inscricao.nome,
-            "email": inscricao.email,
-            "cpf": inscricao.cpf,
-            "telefone": inscricao.telefone,
-            "curso": inscricao.curso,
-            "matricula": inscricao.matricula,
-            "unidade": inscricao.unidade,
-            "cr": inscricao.cr,
-            "titulo_projeto": inscricao.titulo_projeto,
-            "area_conhecimento": inscricao.area_conhecimento,
-            "descricao": inscricao.descricao,
-            "objetivos": inscricao.objetivos,
-            "metodologia": inscricao.metodologia,
-            "resultados_esperados": inscricao.resultados_esperados,
-            "arquivo_projeto": inscricao.arquivo_projeto,
-            "status": inscricao.status.value,
-            "feedback": inscricao.feedback,
-            "feedback_orientador": inscricao.feedback_orientador,
-            "feedback_coordenador": inscricao.feedback_coordenador,
-            "status_aprovacao_orientador": inscricao.status_aprovacao_orientador,
-            "status_aprovacao_coordenador": inscricao.status_aprovacao_coordenador,
-            "data_submissao": inscricao.data_submissao.isoformat() if inscricao.data_submissao else None,
-            "data_avaliacao_orientador": inscricao.data_avaliacao_orientador.isoformat() if inscricao.data_avaliacao_orientador else None,
-            "data_avaliacao_coordenador": inscricao.data_avaliacao_coordenador.isoformat() if inscricao.data_avaliacao_coordenador else None,
-            "data_avaliacao": inscricao.data_avaliacao.isoformat() if inscricao.data_avaliacao else None,
-            "orientador_nome": inscricao.orientador_nome,
-            "orientador_id": inscricao.orientador_id
-        }
-    }
+    return inscricao_do_usuario_para_dict(inscricao)
 
-@router.get("/", response_model=List[dict])
-async def listar_inscricoes(
+def listar_inscricoes(
     status: Optional[str] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Listar todas as inscrições com filtros opcionais.
+    Listar inscrições (mais recentes primeiro) com filtros opcionais.
+    Paginado por cursor: repita a chamada com `cursor=next_cursor` até next_cursor ser nulo.
     """
-    query = db.query(InscricaoModel)
-    
-    if status:
-        try:
-            status_enum = StatusInscricao(status)
-            query = query.filter(InscricaoModel.status == status_enum)
-        except ValueError:
-            pass
-    
-    inscricoes = query.all()
-    
-    resultado = []
-    for i in inscricoes:
-        # Buscar projeto associado para obter a etapa
-        projeto = db.query(Projeto).filter(Projeto.inscricao_id == i.id).first()
-        
-        # Se tem projeto, usar a etapa do projeto
-        # Se não tem projeto (ainda pendente), considerar como "envio_proposta"
-        if projeto:
-            etapa = projeto.etapa_atual.value
-        else:
-            # Inscrições pendentes ou em análise são consideradas na etapa de envio_proposta
-            etapa = "envio_proposta"
-        
-        resultado.append({
-            "id": i.id,
-            "usuario_id": i.usuario_id,
-            "nome": i.nome,
-            "email": i.email,
-            "cpf": i.cpf,
-            "telefone": i.telefone,
-            "curso": i.curso,
-            "matricula": i.matricula,
-            "unidade": i.unidade,
-            "cr": i.cr,
-            "titulo_projeto": i.titulo_projeto,
-            "area_conhecimento": i.area_conhecimento,
-            "descricao": i.descricao,
-            "objetivos": i.objetivos,
-            "metodologia": i.metodologia,
-            "resultados_esperados": i.resultados_esperados,
-            "arquivo_projeto": i.arquivo_projeto,
-            "status": i.status.value,
-            "data_submissao": i.data_submissao.isoformat() if i.data_submissao else None,
-            "orientador_nome": i.orientador_nome,
-            "orientador_id": i.orientador_id,
-            "feedback_orientador": i.feedback_orientador,
-            "status_aprovacao_orientador": i.status_aprovacao_orientador,
-            "data_avaliacao_orientador": i.data_avaliacao_orientador.isoformat() if i.data_avaliacao_orientador else None,
-            "feedback_coordenador": i.feedback_coordenador,
-            "status_aprovacao_coordenador": i.status_aprovacao_coordenador,
-            "data_avaliacao_coordenador": i.data_avaliacao_coordenador.isoformat() if i.data_avaliacao_coordenador else None,
-            "etapa": etapa,  # Adicionar etapa do projeto ou envio_proposta se pendente
-            "ano": i.ano  # Adicionar ano da inscrição
-        })
-    
-    return resultado
+    status_enum = converter_filtro(StatusInscricao, status, "Status")
+    etapa_enum = converter_filtro(EtapaProjeto, etapa, "Etapa")
+    limite = normalizar_limite(limit)
+
+    # Inscrições e etapa do projeto em uma única consulta (sem N+1)
+    inscricoes, next_cursor = listar_inscricoes_com_etapa(
+        db, status_enum, ano, etapa_enum, cursor, limite
+    )
+    return {"inscricoes": inscricoes, "next_cursor": next_cursor}
+
+async def listar_inscricoes_async(
+    status: Optional[str] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Listar inscrições (mais recentes primeiro) com filtros opcionais.
+    Paginado por cursor: repita a chamada com `cursor=next_cursor` até next_cursor ser nulo.
+    """
+    status_enum = converter_filtro(StatusInscricao, status, "Status")
+    etapa_enum = converter_filtro(EtapaProjeto, etapa, "Etapa")
+    limite = normalizar_limite(limit)
+
+    inscricoes, next_cursor = await listar_inscricoes_com_etapa_async(
+        db, status_enum, ano, etapa_enum, cursor, limite
+    )
+    return {"inscricoes": inscricoes, "next_cursor": next_cursor}
+
+# Rota já migrada para o engine assíncrono: com DATABASE_ASYNC=true a
+# listagem roda no event loop, sem ocupar uma thread por requisição
+router.add_api_route(
+    "/", listar_inscricoes_async if DATABASE_ASYNC else listar_inscricoes, methods=["GET"]
+)
 
 @router.get("/orientador/{orientador_id}/pendentes")
-async def listar_propostas_pendentes_orientador(
+def listar_propostas_pendentes_orientador(
     orientador_id: int,
     db: Session = Depends(get_db)
 ):
@@ -348,29 +263,11 @@ async def listar_propostas_pendentes_orientador(
     
     return {
         "total": len(inscricoes),
-        "propostas": [
-            {
-                "id": i.id,
-                "usuario_id": i.usuario_id,
-                "nome": i.nome,
-                "email": i.email,
-                "curso": i.curso,
-                "titulo_projeto": i.titulo_projeto,
-                "area_conhecimento": i.area_conhecimento,
-                "descricao": i.descricao,
-                "objetivos": i.objetivos,
-                "metodologia": i.metodologia,
-                "resultados_esperados": i.resultados_esperados,
-                "arquivo_projeto": i.arquivo_projeto,
-                "status": i.status.value,
-                "data_submissao": i.data_submissao.isoformat() if i.data_submissao else None
-            }
-            for i in inscricoes
-        ]
+        "propostas": [proposta_pendente_para_dict(i) for i in inscricoes]
     }
 
 @router.get("/coordenador/pendentes")
-async def listar_propostas_pendentes_coordenador(db: Session = Depends(get_db)):
+def listar_propostas_pendentes_coordenador(db: Session = Depends(get_db)):
     """
     Listar propostas que aguardam avaliação do coordenador.
     """
@@ -406,7 +303,7 @@ async def listar_propostas_pendentes_coordenador(db: Session = Depends(get_db)):
     }
 
 @router.get("/{inscricao_id}")
-async def obter_inscricao(inscricao_id: int, db: Session = Depends(get_db)):
+def obter_inscricao(inscricao_id: int, db: Session = Depends(get_db)):
     """
     Obter detalhes de uma inscrição específica.
     """
@@ -451,7 +348,7 @@ async def obter_inscricao(inscricao_id: int, db: Session = Depends(get_db)):
     }
 
 @router.patch("/{inscricao_id}/status")
-async def atualizar_status(
+def atualizar_status(
     inscricao_id: int,
     novo_status: str,
     feedback: Optional[str] = None,
@@ -519,7 +416,7 @@ async def atualizar_status(
     }
 
 @router.post("/{inscricao_id}/orientador/avaliar")
-async def orientador_avaliar(
+def orientador_avaliar(
     inscricao_id: int,
     aprovar: bool = Form(...),
     feedback: Optional[str] = Form(None),
@@ -576,7 +473,7 @@ async def orientador_avaliar(
     }
 
 @router.post("/{inscricao_id}/coordenador/avaliar")
-async def coordenador_avaliar(
+def coordenador_avaliar(
     inscricao_id: int,
     aprovar: bool = Form(...),
     feedback: Optional[str] = Form(None),
@@ -614,10 +511,7 @@ async def coordenador_avaliar(
         mensagem = "Proposta aprovada pelo coordenador. Aguardando apresentação e validação final!"
         
         # Obter o ano ativo das inscrições
-        config_ano = db.query(ConfiguracaoSistema).filter(
-            ConfiguracaoSistema.chave == 'ano_ativo_inscricoes'
-        ).first()
-        ano_projeto = int(config_ano.valor) if config_ano else datetime.now().year
+        ano_projeto = obter_configuracoes(db).ano_ativo
         
         # Criar o projeto
         projeto_existente = db.query(Projeto).filter(
@@ -660,7 +554,7 @@ async def coordenador_avaliar(
     }
 
 @router.delete("/{inscricao_id}")
-async def deletar_inscricao(inscricao_id: int, db: Session = Depends(get_db)):
+def deletar_inscricao(inscricao_id: int, db: Session = Depends(get_db)):
     """
     Deletar uma inscrição e o projeto associado.
     """
@@ -1,22 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from models.database_models import (
-    Usuario, Projeto, Entrega, TipoUsuario, EtapaProjeto, MensagemRelatorio
+    Usuario, Projeto, Entrega, TipoUsuario, StatusUsuario, EtapaProjeto, MensagemRelatorio
 )
 from database import get_db
+from services.projecoes import agrupar_mensagens_por_entrega, listar_projetos_com_alunos
+from services.paginacao import converter_filtro, normalizar_limite
+from services.uploads import nome_seguro
+from services.blobs import blob_store
+from services.http_cache import resposta_com_etag_do_conteudo
+from services.paineis import montar_painel_orientador, projeto_detalhado_para_dict, relatorio_mensal_para_dict
+from routes.arquivos import bearer, exigir_proprio_usuario
 from typing import List, Optional
 from datetime import datetime
-from pathlib import Path
 
 router = APIRouter()
 
-# Diretórios para uploads
-UPLOAD_DIR = Path("uploads/relatorios")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-ENTREGAS_DIR = Path("uploads/entregas")
-ENTREGAS_DIR.mkdir(parents=True, exist_ok=True)
-
 # Mapeamento das etapas válidas
 ETAPAS_VALIDAS = [
     "inscricao",
@@ -28,10 +28,24 @@ ETAPAS_VALIDAS = [
 ]
 
 @router.get("/orientadores/{orientador_id}/alunos")
-async def listar_alunos_orientador(orientador_id: int, db: Session = Depends(get_db)):
+def listar_alunos_orientador(
+    orientador_id: int,
+    ano: Optional[int] = None,
+    etapa: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Listar todos os alunos orientados por um orientador específico.
+    Listar os alunos orientados por um orientador específico (mais recentes primeiro).
+    Filtros opcionais: ano do projeto, etapa atual e status do aluno.
+    Paginado por cursor: repita a chamada com `cursor=next_cursor` até next_cursor ser nulo.
     """
+    etapa_enum = converter_filtro(EtapaProjeto, etapa, "Etapa")
+    status_enum = converter_filtro(StatusUsuario, status, "Status")
+    limite = normalizar_limite(limit)
+
     # Verificar se o orientador existe
     orientador = db.query(Usuario).filter(
         Usuario.id == orientador_id,
@@ -40,12 +54,20 @@ async def listar_alunos_orientador(orientador_id: int, db: Session = Depends(get
     
     if not orientador:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=404,
             detail="Orientador não encontrado"
         )
     
-    # Buscar projetos do orientador
-    projetos = db.query(Projeto).filter(Projeto.orientador_id == orientador_id).all()
+    # Buscar projetos do orientador (com alunos no mesmo SELECT)
+    projetos, next_cursor = listar_projetos_com_alunos(
+        db,
+        orientador_id=orientador_id,
+        ano=ano,
+        etapa=etapa_enum,
+        status_aluno=status_enum,
+        cursor=cursor,
+        limite=limite
+    )
     
     alunos = []
     for projeto in projetos:
@@ -62,10 +84,37 @@ async def listar_alunos_orientador(orientador_id: int, db: Session = Depends(get
             "ano_projeto": projeto.ano  # Adicionar ano do projeto
         })
     
-    return {"orientador_id": orientador_id, "alunos": alunos}
+    return {"orientador_id": orientador_id, "alunos": alunos, "next_cursor": next_cursor}
+
+@router.get("/orientadores/{orientador_id}/painel")
+def obter_painel_orientador(
+    orientador_id: int,
+    request: Request,
+    credenciais: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    db: Session = Depends(get_db)
+):
+    """
+    Tudo o que o painel do orientador precisa em uma requisição: dados do
+    usuário, orientandos (cada um com entregas, relatórios mensais e etapa) e
+    propostas pendentes. Uma ETag para o conjunto (If-None-Match → 304).
+    Requer token do próprio orientador ou de coordenador.
+    """
+    exigir_proprio_usuario(credenciais, orientador_id)
+    orientador = db.query(Usuario).filter(
+        Usuario.id == orientador_id,
+        Usuario.tipo == TipoUsuario.orientador
+    ).first()
+    
+    if not orientador:
+        raise HTTPException(
+            status_code=404,
+            detail="Orientador não encontrado"
+        )
+    
+    return resposta_com_etag_do_conteudo(request, montar_painel_orientador(db, orientador))
 
 @router.get("/orientadores/{orientador_id}/alunos/{aluno_id}/entregas")
-async def listar_entregas_aluno(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
+def listar_entregas_aluno(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
     """
     Listar entregas de um aluno específico.
     """
@@ -108,7 +157,7 @@ async def listar_entregas_aluno(orientador_id: int, aluno_id: int, db: Session =
     }
 
 @router.post("/orientadores/{orientador_id}/entregas/{entrega_id}/avaliar")
-async def orientador_avaliar_entrega(
+def orientador_avaliar_entrega(
     orientador_id: int,
     entrega_id: int,
     aprovar: bool = Form(...),
@@ -180,7 +229,7 @@ async def orientador_avaliar_entrega(
     }
 
 @router.post("/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais", status_code=status.HTTP_201_CREATED)
-async def enviar_relatorio_mensal(
+def enviar_relatorio_mensal(
     orientador_id: int,
     aluno_id: int,
     mes: str = Form(...),  # formato AAAA-MM
@@ -216,13 +265,10 @@ async def enviar_relatorio_mensal(
     # Salvar arquivo se foi enviado
     safe_name = None
     if arquivo:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_name = f"relatorio_mensal_orientador{orientador_id}_aluno{aluno_id}_{mes}_{timestamp}_{arquivo.filename}"
-        path = UPLOAD_DIR / safe_name
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        safe_name = f"relatorio_mensal_orientador{orientador_id}_aluno{aluno_id}_{mes}_{timestamp}_{nome_seguro(arquivo.filename)}"
         
-        with open(path, "wb") as f:
-            content = await arquivo.read()
-            f.write(content)
+        blob_store.guardar(db, arquivo, "relatorios", safe_name)
 
     # Criar entrega no banco
     entrega = Entrega(
@@ -246,7 +292,7 @@ async def enviar_relatorio_mensal(
     }
 
 @router.get("/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais")
-async def listar_relatorios_mensais(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
+def listar_relatorios_mensais(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
     """
     Listar relatórios mensais de um aluno.
     """
@@ -268,47 +314,12 @@ async def listar_relatorios_mensais(orientador_id: int, aluno_id: int, db: Sessi
         Entrega.tipo == "relatorio_mensal"
     ).all()
     
-    # Para cada relatório, buscar as mensagens
-    relatorios_com_mensagens = []
-    for r in relatorios:
-        mensagens = db.query(MensagemRelatorio).filter(
-            MensagemRelatorio.entrega_id == r.id
-        ).order_by(MensagemRelatorio.data_criacao.asc()).all()
-        
-        mensagens_list = [
-            {
-                "id": m.id,
-                "mensagem": m.mensagem,
-                "tipo_usuario": m.tipo_usuario,
-                "usuario_id": m.usuario_id,
-                "data_criacao": m.data_criacao.isoformat() if m.data_criacao else None
-            }
-            for m in mensagens
-        ]
-        
-        # Extrair mes_numero do título (formato: "Relatório Mensal - AAAA-MM")
-        mes_numero = None
-        if r.titulo and "-" in r.titulo:
-            try:
-                # Extrair AAAA-MM do título
-                mes_str = r.titulo.split(" - ")[-1]  # "2026-03"
-                mes_numero = int(mes_str.split("-")[-1])  # 3
-            except:
-                pass
-        
-        relatorios_com_mensagens.append({
-            "id": r.id,
-            "titulo": r.titulo,
-            "descricao": r.descricao,
-            "arquivo": r.arquivo,
-            "data_envio": r.data_entrega.isoformat() if r.data_entrega else None,
-            "mes_numero": mes_numero,
-            "feedback_coordenador": r.feedback_coordenador,
-            "data_feedback_coordenador": r.data_avaliacao_coordenador.isoformat() if r.data_avaliacao_coordenador else None,
-            "resposta_orientador": r.feedback_orientador,
-            "data_resposta_orientador": r.data_avaliacao_orientador.isoformat() if r.data_avaliacao_orientador else None,
-            "mensagens": mensagens_list
-        })
+    # Buscar as mensagens de todos os relatórios em uma única consulta
+    mensagens_por_relatorio = agrupar_mensagens_por_entrega(db, [r.id for r in relatorios])
+    
+    relatorios_com_mensagens = [
+        relatorio_mensal_para_dict(r, mensagens_por_relatorio[r.id]) for r in relatorios
+    ]
     
     return {
         "orientador_id": orientador_id,
@@ -317,7 +328,7 @@ async def listar_relatorios_mensais(orientador_id: int, aluno_id: int, db: Sessi
     }
 
 @router.post("/orientadores/relatorios-mensais/{relatorio_id}/responder")
-async def orientador_responder_coordenador(
+def orientador_responder_coordenador(
     relatorio_id: int,
     feedback_data: dict,
     db: Session = Depends(get_db)
@@ -368,7 +379,7 @@ async def orientador_responder_coordenador(
     }
 
 @router.post("/orientadores/{orientador_id}/alunos/{aluno_id}/entrega-etapa", status_code=status.HTTP_201_CREATED)
-async def enviar_entrega_etapa(
+def enviar_entrega_etapa(
     orientador_id: int,
     aluno_id: int,
     tipo_entrega: str = Form(...),
@@ -393,13 +404,10 @@ async def enviar_entrega_etapa(
         )
 
     # Salvar arquivo
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_name = f"entrega_{tipo_entrega}_orientador{orientador_id}_aluno{aluno_id}_{timestamp}_{arquivo.filename}"
-    path = ENTREGAS_DIR / safe_name
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    safe_name = f"entrega_{nome_seguro(tipo_entrega)}_orientador{orientador_id}_aluno{aluno_id}_{timestamp}_{nome_seguro(arquivo.filename)}"
     
-    with open(path, "wb") as f:
-        content = await arquivo.read()
-        f.write(content)
+    blob_store.guardar(db, arquivo, "entregas", safe_name)
 
     # Criar entrega no banco
     entrega = Entrega(
@@ -423,7 +431,7 @@ async def enviar_entrega_etapa(
     }
 
 @router.get("/orientadores/{orientador_id}/alunos/{aluno_id}/status-etapa")
-async def obter_status_etapa(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
+def obter_status_etapa(orientador_id: int, aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter status/etapa atual do projeto do aluno.
     """
@@ -445,7 +453,7 @@ async def obter_status_etapa(orientador_id: int, aluno_id: int, db: Session = De
     }
 
 @router.get("/projetos/alunos/{aluno_id}/status-etapa")
-async def obter_status_etapa_por_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def obter_status_etapa_por_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter status/etapa do projeto de um aluno (busca em qualquer orientador).
     """
@@ -465,7 +473,7 @@ async def obter_status_etapa_por_aluno(aluno_id: int, db: Session = Depends(get_
     }
 
 @router.get("/projetos/aluno/{aluno_id}")
-async def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Obter dados completos do projeto de um aluno incluindo informações de apresentação.
     """
@@ -477,30 +485,10 @@ async def obter_projeto_aluno(aluno_id: int, db: Session = Depends(get_db)):
             detail="Projeto não encontrado para este aluno"
         )
     
-    return {
-        "id": projeto.id,
-        "aluno_id": projeto.aluno_id,
-        "orientador_id": projeto.orientador_id,
-        "titulo": projeto.titulo,
-        "area_conhecimento": projeto.area_conhecimento,
-        "descricao": projeto.descricao,
-        "etapa_atual": projeto.etapa_atual.value,
-        "apresentacao_data": projeto.apresentacao_data,
-        "apresentacao_hora": projeto.apresentacao_hora,
-        "apresentacao_campus": projeto.apresentacao_campus,
-        "apresentacao_sala": projeto.apresentacao_sala,
-        "status_apresentacao": projeto.status_apresentacao,
-        "feedback_apresentacao": projeto.feedback_apresentacao,
-        "data_avaliacao_apresentacao": projeto.data_avaliacao_apresentacao,
-        "amostra_data": projeto.amostra_data,
-        "amostra_hora": projeto.amostra_hora,
-        "amostra_campus": projeto.amostra_campus,
-        "amostra_sala": projeto.amostra_sala,
-        "status_amostra": projeto.status_amostra,
-    }
+    return projeto_detalhado_para_dict(projeto)
 
 @router.get("/alunos/{aluno_id}/projetos")
-async def listar_projetos_aluno(aluno_id: int, db: Session = Depends(get_db)):
+def listar_projetos_aluno(aluno_id: int, db: Session = Depends(get_db)):
     """
     Listar todos os projetos de um aluno.
     """
@@ -1,74 +1,94 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 from models.schemas import Usuario, UsuarioCreate, MessageResponse
-from models.database_models import Usuario as DBUsuario, TipoUsuario, Inscricao as InscricaoModel
+from models.database_models import Usuario as DBUsuario, TipoUsuario, StatusUsuario, Inscricao as InscricaoModel
 from database import get_db
+from services.paginacao import converter_filtro, normalizar_limite, aplicar_keyset, montar_pagina
+from services.paineis import usuario_para_dict
+from services.estatisticas import obter_estatisticas as obter_contadores
 from typing import List, Optional
+from datetime import datetime
 
 router = APIRouter()
 
-@router.get("/usuarios", response_model=List[dict])
-async def listar_usuarios(tipo: Optional[str] = None, db: Session = Depends(get_db)):
+@router.get("/usuarios")
+def listar_usuarios(
+    tipo: Optional[str] = None,
+    status: Optional[str] = None,
+    ano: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Listar todos os usuários.
-    Filtrar por tipo se especificado.
+    Listar usuários (mais recentes primeiro).
+    Filtrar por tipo, status e ano de cadastro se especificados.
+    Paginado por cursor: repita a chamada com `cursor=next_cursor` até next_cursor ser nulo.
     """
+    tipo_enum = converter_filtro(TipoUsuario, tipo, "Tipo")
+    status_enum = converter_filtro(StatusUsuario, status, "Status")
+    limite = normalizar_limite(limit)
+
     query = db.query(DBUsuario)
-    
-    if tipo:
-        try:
-            tipo_enum = TipoUsuario(tipo)
-            query = query.filter(DBUsuario.tipo == tipo_enum)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tipo inválido. Use: aluno, orientador, coordenador"
-            )
-    
-    usuarios = query.all()
-    
-    return [
-        {
-            "id": u.id,
-            "email": u.email,
-            "nome": u.nome,
-            "cpf": u.cpf,
-            "telefone": u.telefone,
-            "tipo": u.tipo.value,
-            "status": u.status.value,
-            "curso": u.curso,
-            "unidade": u.unidade,
-            "matricula": u.matricula,
-            "departamento": u.departamento,
-            "area_pesquisa": u.area_pesquisa,
-            "titulacao": u.titulacao,
-            "vagas_disponiveis": u.vagas_disponiveis
-        }
-        for u in usuarios
-    ]
+
+    if tipo_enum:
+        query = query.filter(DBUsuario.tipo == tipo_enum)
+    if status_enum:
+        query = query.filter(DBUsuario.status == status_enum)
+    if ano:
+        # Intervalo em vez de extract(year): a comparação direta pode usar índice
+        query = query.filter(
+            DBUsuario.data_cadastro >= datetime(ano, 1, 1),
+            DBUsuario.data_cadastro < datetime(ano + 1, 1, 1)
+        )
+
+    # Usuários não têm coluna ano: a chave do cursor é só o id
+    query = aplicar_keyset(query, (DBUsuario.id,), cursor, limite)
+    usuarios, next_cursor = montar_pagina(query.all(), limite, lambda u: (u.id,))
+
+    return {
+        "usuarios": [
+            {
+                "id": u.id,
+                "email": u.email,
+                "nome": u.nome,
+                "cpf": u.cpf,
+                "telefone": u.telefone,
+                "tipo": u.tipo.value,
+                "status": u.status.value,
+                "curso": u.curso,
+                "unidade": u.unidade,
+                "matricula": u.matricula,
+                "departamento": u.departamento,
+                "area_pesquisa": u.area_pesquisa,
+                "titulacao": u.titulacao,
+                "vagas_disponiveis": u.vagas_disponiveis
+            }
+            for u in usuarios
+        ],
+        "next_cursor": next_cursor
+    }
 
 @router.get("/estatisticas")
-async def obter_estatisticas(db: Session = Depends(get_db)):
+def obter_estatisticas(db: Session = Depends(get_db)):
     """
     Obter estatísticas gerais do sistema.
     Apenas para coordenadores (implementar verificação em produção).
+    Lê os contadores pré-calculados (services/estatisticas.py), sem COUNT nas tabelas.
     """
-    total_usuarios = db.query(DBUsuario).count()
-    total_alunos = db.query(DBUsuario).filter(DBUsuario.tipo == TipoUsuario.aluno).count()
-    total_orientadores = db.query(DBUsuario).filter(DBUsuario.tipo == TipoUsuario.orientador).count()
-    total_coordenadores = db.query(DBUsuario).filter(DBUsuario.tipo == TipoUsuario.coordenador).count()
-    total_inscricoes = db.query(InscricaoModel).count()
+    estatisticas = obter_contadores(db)
+    usuarios_por_tipo = estatisticas["usuarios_por_tipo"]
     
     return {
-        "total_usuarios": total_usuarios,
-        "total_alunos": total_alunos,
-        "total_orientadores": total_orientadores,
-        "total_coordenadores": total_coordenadores,
-        "total_inscricoes": total_inscricoes
+        "total_usuarios": sum(usuarios_por_tipo.values()),
+        "total_alunos": usuarios_por_tipo.get(TipoUsuario.aluno.value, 0),
+        "total_orientadores": usuarios_por_tipo.get(TipoUsuario.orientador.value, 0),
+        "total_coordenadores": usuarios_por_tipo.get(TipoUsuario.coordenador.value, 0),
+        "total_inscricoes": sum(estatisticas["inscricoes_por_status"].values())
     }
 
 @router.get("/usuarios/{usuario_id}")
-async def obter_usuario(usuario_id: int, db: Session = Depends(get_db)):
+def obter_usuario(usuario_id: int, db: Session = Depends(get_db)):
     """
     Obter informações de um usuário específico.
     """
@@ -80,28 +100,10 @@ async def obter_usuario(usuario_id: int, db: Session = Depends(get_db)):
             detail="Usuário não encontrado"
         )
     
-    return {
-        "id": usuario.id,
-        "email": usuario.email,
-        "nome": usuario.nome,
-        "cpf": usuario.cpf,
-        "telefone": usuario.telefone,
-        "tipo": usuario.tipo.value,
-        "status": usuario.status.value,
-        "curso": usuario.curso,
-        "unidade": usuario.unidade,
-        "matricula": usuario.matricula,
-        "cr": usuario.cr,
-        "documento_cr": usuario.documento_cr,
-        "departamento": usuario.departamento,
-        "area_pesquisa": usuario.area_pesquisa,
-        "titulacao": usuario.titulacao,
-        "vagas_disponiveis": usuario.vagas_disponiveis,
-        "data_cadastro": usuario.data_cadastro.isoformat() if usuario.data_cadastro else None
-    }
+    return usuario_para_dict(usuario)
 
 @router.put("/usuarios/{usuario_id}")
-async def atualizar_usuario(usuario_id: int, usuario_data: dict, db: Session = Depends(get_db)):
+def atualizar_usuario(usuario_id: int, usuario_data: dict, db: Session = Depends(get_db)):
     """
     Atualizar informações de um usuário.
     """
@@ -132,7 +134,7 @@ async def atualizar_usuario(usuario_id: int, usuario_data: dict, db: Session = D
     }
 
 @router.get("/usuarios/{usuario_id}/inscricoes")
-async def listar_inscricoes_usuario(usuario_id: int, db: Session = Depends(get_db)):
+def listar_inscricoes_usuario(usuario_id: int, db: Session = Depends(get_db)):
     """
     Listar todas as inscrições de um usuário.
     """
@@ -0,0 +1,371 @@
+"""
+Armazenamento de uploads endereçado por conteúdo (SHA-256), com deduplicação.
+
+Cada conteúdo distinto é gravado uma única vez na chave
+`blobs/<aa>/<bb>/<sha256>` do backend de armazenamento (services/storage.py:
+diretório UPLOAD_DIR ou bucket S3). As rotas continuam gravando no banco
+o mesmo nome lógico de antes (arquivo_projeto, entregas.arquivo, ...); a
+tabela arquivos_armazenados liga (categoria, nome) ao blob e a tabela blobs
+guarda quantos nomes apontam para cada conteúdo (ref_count).
+
+Reenvios idênticos (ex.: a mesma proposta após uma rejeição) criam apenas um
+novo nome lógico, sem copiar os bytes de novo.
+
+Arquivos deixados para trás quando registros são apagados (deletar_inscricao,
+limpar_proposta.py, substituição de certificado) são removidos pela coleta de
+órfãos: `python coletar_arquivos_orfaos.py`.
+
+Arquivos gravados antes do blob store (<categoria>/<nome>) continuam sendo
+encontrados por `chave()`.
+"""
+
+import time
+import uuid
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict
+
+from fastapi import UploadFile
+from sqlalchemy import update, delete, select, exists, or_, func, literal, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.database_models import (
+    Blob, ArquivoArmazenado, Inscricao, Entrega, RelatorioMensal, Projeto, Usuario
+)
+from services.uploads import gravar_upload
+from services.storage import StorageBackend, obter_storage
+
+logger = logging.getLogger(__name__)
+
+# Categorias de upload e as colunas que guardam o nome lógico de cada uma
+CATEGORIAS = {
+    "propostas": (Inscricao.arquivo_projeto,),
+    "relatorios": (Entrega.arquivo, RelatorioMensal.arquivo),
+    "entregas": (Entrega.arquivo,),
+    "certificados": (Projeto.certificado_arquivo,),
+    "documentos_cr": (Usuario.documento_cr,),
+}
+
+# Arquivos mais novos que isso nunca são coletados (upload ainda em andamento
+# ou documento enviado antes do cadastro ser concluído)
+CARENCIA_PADRAO = 24 * 3600
+
+
+@dataclass(frozen=True)
+class ArquivoGuardado:
+    """Resultado de `BlobStore.guardar`."""
+    categoria: str
+    nome: str
+    sha256: str
+    tamanho: int
+    deduplicado: bool  # True se o conteúdo já existia
+
+
+@dataclass(frozen=True)
+class ArquivoLocalizado:
+    """Resultado de `BlobStore.localizar`."""
+    chave: str
+    tamanho: int
+    modificado_em: float
+    sha256: Optional[str]  # None para arquivos anteriores ao blob store
+
+
+@dataclass
+class ResultadoColeta:
+    nomes_removidos: int = 0
+    blobs_removidos: int = 0
+    arquivos_sem_registro: int = 0
+    temporarios_removidos: int = 0
+    bytes_liberados: int = 0
+
+
+class BlobStore:
+    """
+    Blobs no backend de armazenamento + metadados no banco (tabelas blobs e
+    arquivos_armazenados).
+    """
+
+    PREFIXO_BLOBS = "blobs"
+
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        self._storage = storage
+        self._tabelas_verificadas = False
+
+    @property
+    def storage(self) -> StorageBackend:
+        return self._storage or obter_storage()
+
+    @property
+    def dir_temporario(self) -> Path:
+        return self.storage.diretorio_temporario()
+
+    def _garantir_tabelas(self, db: Session):
+        """
+        Cria as tabelas em bancos antigos (o PostgreSQL não passa por
+        create_all) em uma transação própria, já confirmada: downloads e a
+        exportação em ZIP usam sessões que nunca fazem commit. Chamado no
+        início de cada operação, antes de a sessão gravar.
+        """
+        if self._tabelas_verificadas:
+            return
+        with db.get_bind().begin() as connection:
+            existentes = inspect(connection)
+            for tabela in (Blob.__table__, ArquivoArmazenado.__table__):
+                if not existentes.has_table(tabela.name):
+                    tabela.create(bind=connection)
+                    logger.info(f"Tabela {tabela.name} criada")
+        self._tabelas_verificadas = True
+
+    def chave_blob(self, sha256: str) -> str:
+        return f"{self.PREFIXO_BLOBS}/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def _incrementar(self, db: Session, sha256: str, tamanho: int):
+        atualizado = db.execute(
+            update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + 1)
+        ).rowcount
+        if atualizado:
+            return True
+
+        try:
+            with db.begin_nested():
+                db.add(Blob(sha256=sha256, tamanho=tamanho, ref_count=1))
+            return False
+        except IntegrityError:
+            # Outro upload do mesmo conteúdo criou o blob ao mesmo tempo
+            db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count + 1))
+            return True
+
+    def _publicar(self, temporario: Path, sha256: str):
+        # Sempre substitui: se a coleta de órfãos removeu o blob no meio do
+        # caminho, o conteúdo volta; a data de modificação nova protege o
+        # blob da coleta
+        self.storage.put_arquivo(temporario, self.chave_blob(sha256))
+
+    def guardar(
+        self,
+        db: Session,
+        arquivo: UploadFile,
+        categoria: str,
+        nome: str,
+        max_size: Optional[int] = None
+    ) -> ArquivoGuardado:
+        """
+        Grava o upload (em blocos, com limite de tamanho) e registra o nome
+        lógico na sessão. O commit fica a cargo da rota, junto com o registro
+        que guarda o nome (inscrição, entrega, ...). Bloqueante: as rotas de
+        upload são síncronas e rodam no threadpool.
+        """
+        if categoria not in CATEGORIAS:
+            raise ValueError(f"Categoria de upload desconhecida: {categoria}")
+
+        self._garantir_tabelas(db)
+        temporario = self.dir_temporario / uuid.uuid4().hex
+        salvo = gravar_upload(arquivo, temporario, max_size=max_size)
+
+        try:
+            registro = db.get(ArquivoArmazenado, (categoria, nome))
+            if registro is not None and registro.sha256 == salvo.sha256:
+                deduplicado = True
+            else:
+                deduplicado = self._incrementar(db, salvo.sha256, salvo.tamanho)
+                if registro is None:
+                    db.add(ArquivoArmazenado(
+                        categoria=categoria, nome=nome, sha256=salvo.sha256, tamanho=salvo.tamanho
+                    ))
+                else:
+                    # Mesmo nome lógico com outro conteúdo: solta o blob anterior
+                    db.execute(update(Blob).where(Blob.sha256 == registro.sha256).values(ref_count=Blob.ref_count - 1))
+                    registro.sha256 = salvo.sha256
+                    registro.tamanho = salvo.tamanho
+            db.flush()
+            self._publicar(temporario, salvo.sha256)
+        except BaseException:
+            temporario.unlink(missing_ok=True)
+            raise
+
+        if deduplicado:
+            logger.info(f"Upload deduplicado: {categoria}/{nome} -> {salvo.sha256[:12]}")
+        return ArquivoGuardado(categoria, nome, salvo.sha256, salvo.tamanho, deduplicado)
+
+    def localizar(self, db: Session, categoria: str, nome: str) -> Optional[ArquivoLocalizado]:
+        """
+        Chave, tamanho e data de modificação do arquivo lógico, ou None se não existir.
+        Arquivos anteriores ao blob store são procurados em <categoria>/<nome>.
+        """
+        self._garantir_tabelas(db)
+        registro = db.get(ArquivoArmazenado, (categoria, nome))
+        if registro is not None:
+            chave, sha256 = self.chave_blob(registro.sha256), registro.sha256
+        else:
+            chave, sha256 = f"{categoria}/{Path(nome).name}", None
+        info = self.storage.info(chave)
+        if info is None:
+            return None
+        return ArquivoLocalizado(chave, info.tamanho, info.modificado_em, sha256)
+
+    def localizar_varios(self, db: Session, categoria: str, nomes) -> Dict[str, ArquivoLocalizado]:
+        """
+        Chaves de vários nomes lógicos da mesma categoria em uma consulta, sem
+        consultar o backend de armazenamento (tamanho e data vêm do banco;
+        arquivos anteriores ao blob store voltam com tamanho 0 e sem SHA-256).
+        """
+        self._garantir_tabelas(db)
+        nomes = list(dict.fromkeys(nomes))
+        resultado = {}
+        for inicio in range(0, len(nomes), 500):
+            lote = nomes[inicio:inicio + 500]
+            registros = db.execute(
+                select(ArquivoArmazenado).where(
+                    ArquivoArmazenado.categoria == categoria, ArquivoArmazenado.nome.in_(lote)
+                )
+            ).scalars()
+            for registro in registros:
+                resultado[registro.nome] = ArquivoLocalizado(
+                    self.chave_blob(registro.sha256), registro.tamanho,
+                    registro.data_criacao.timestamp() if registro.data_criacao else 0, registro.sha256
+                )
+        for nome in nomes:
+            resultado.setdefault(nome, ArquivoLocalizado(f"{categoria}/{Path(nome).name}", 0, 0, None))
+        return resultado
+
+    def chave(self, db: Session, categoria: str, nome: str) -> Optional[str]:
+        """Chave no backend de armazenamento do arquivo lógico, ou None se não existir."""
+        localizado = self.localizar(db, categoria, nome)
+        return localizado.chave if localizado else None
+
+    def caminho(self, db: Session, categoria: str, nome: str) -> Optional[Path]:
+        """Caminho em disco do arquivo lógico (apenas backend local)."""
+        chave = self.chave(db, categoria, nome)
+        return self.storage.caminho_local(chave) if chave else None
+
+    def ler(self, db: Session, categoria: str, nome: str) -> Optional[bytes]:
+        """Conteúdo completo do arquivo lógico, ou None se não existir."""
+        chave = self.chave(db, categoria, nome)
+        return self.storage.get(chave) if chave else None
+
+    # ----- Coleta de órfãos -----
+
+    def _remover_nomes_sem_referencia(self, db: Session, limite, simular: bool, resultado: ResultadoColeta) -> Counter:
+        """Retorna quantas referências cada blob perdeu."""
+        liberadas = Counter()
+        for categoria, colunas in CATEGORIAS.items():
+            # Aceita também o caminho completo gravado na coluna (ex.: "uploads/documentos_cr/<nome>")
+            referenciado = or_(*[
+                exists().where(or_(
+                    coluna == ArquivoArmazenado.nome,
+                    coluna.like(literal("%/") + ArquivoArmazenado.nome)
+                ))
+                for coluna in colunas
+            ])
+            orfaos = db.execute(
+                select(ArquivoArmazenado.nome, ArquivoArmazenado.sha256).where(
+                    ArquivoArmazenado.categoria == categoria,
+                    ArquivoArmazenado.data_criacao < limite,
+                    ~referenciado
+                )
+            ).all()
+
+            for nome, sha256 in orfaos:
+                resultado.nomes_removidos += 1
+                liberadas[sha256] += 1
+                if simular:
+                    continue
+                db.execute(delete(ArquivoArmazenado).where(
+                    ArquivoArmazenado.categoria == categoria, ArquivoArmazenado.nome == nome
+                ))
+                db.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+        return liberadas
+
+    def _remover_blobs_sem_uso(self, db: Session, limite_mtime: float, simular: bool, resultado: ResultadoColeta, liberadas: Counter):
+        candidatos = db.execute(
+            select(Blob.sha256, Blob.tamanho, Blob.ref_count).where(
+                or_(Blob.ref_count <= 0, Blob.sha256.in_(list(liberadas)))
+            )
+        ).all()
+        # Na simulação os ref_count não foram decrementados
+        sem_uso = [
+            (sha256, tamanho) for sha256, tamanho, ref_count in candidatos
+            if ref_count - (liberadas[sha256] if simular else 0) <= 0
+        ]
+        for sha256, tamanho in sem_uso:
+            chave = self.chave_blob(sha256)
+            info = self.storage.info(chave)
+            if info is not None and info.modificado_em > limite_mtime:
+                continue  # Publicado agora há pouco por um novo upload
+
+            resultado.blobs_removidos += 1
+            resultado.bytes_liberados += tamanho
+            if simular:
+                continue
+            apagado = db.execute(delete(Blob).where(Blob.sha256 == sha256, Blob.ref_count <= 0)).rowcount
+            db.commit()
+            if apagado:
+                self.storage.delete(chave)
+
+    def _remover_arquivos_sem_registro(self, db: Session, limite_mtime: float, simular: bool, resultado: ResultadoColeta):
+        conhecidos = set(db.execute(select(Blob.sha256)).scalars())
+        for info in self.storage.listar(self.PREFIXO_BLOBS):
+            sha256 = info.chave.rsplit("/", 1)[-1]
+            if sha256 in conhecidos or info.modificado_em > limite_mtime:
+                continue
+            resultado.arquivos_sem_registro += 1
+            resultado.bytes_liberados += info.tamanho
+            if not simular:
+                self.storage.delete(info.chave)
+
+        # Temporários são sempre locais (upload recebido antes do put no backend)
+        dir_temporario = self.dir_temporario
+        if dir_temporario.exists():
+            for caminho in dir_temporario.iterdir():
+                if caminho.stat().st_mtime > limite_mtime:
+                    continue
+                resultado.temporarios_removidos += 1
+                if not simular:
+                    caminho.unlink(missing_ok=True)
+
+    def coletar_orfaos(self, db: Session, carencia: float = CARENCIA_PADRAO, simular: bool = False) -> ResultadoColeta:
+        """
+        Remove nomes lógicos que nenhum registro usa mais, blobs sem nenhum
+        nome apontando, objetos em blobs/ sem registro no banco e temporários
+        de uploads interrompidos.
+
+        Args:
+            db: Sessão do banco
+            carencia: Idade mínima (segundos) para algo ser considerado órfão
+            simular: Apenas contar, sem apagar nada
+        """
+        self._garantir_tabelas(db)
+        resultado = ResultadoColeta()
+        limite = datetime.now() - timedelta(seconds=carencia)
+        limite_mtime = time.time() - carencia
+
+        liberadas = self._remover_nomes_sem_referencia(db, limite, simular, resultado)
+        if not simular:
+            db.commit()
+        self._remover_blobs_sem_uso(db, limite_mtime, simular, resultado, liberadas)
+        self._remover_arquivos_sem_registro(db, limite_mtime, simular, resultado)
+        return resultado
+
+    def estatisticas(self, db: Session) -> Dict:
+        """Quantidade de nomes, blobs e bytes economizados pela deduplicação."""
+        self._garantir_tabelas(db)
+        arquivos, bytes_logicos = db.execute(
+            select(func.count(), func.coalesce(func.sum(ArquivoArmazenado.tamanho), 0))
+        ).one()
+        blobs, bytes_em_disco = db.execute(
+            select(func.count(), func.coalesce(func.sum(Blob.tamanho), 0))
+        ).one()
+        return {
+            "arquivos": arquivos,
+            "blobs": blobs,
+            "bytes_logicos": bytes_logicos,
+            "bytes_em_disco": bytes_em_disco,
+        }
+
+
+# Instância global
+blob_store = BlobStore()
@@ -0,0 +1,73 @@
+"""
+Cache em memória com expiração (TTL) e limite de tamanho (LRU).
+
+Usado para memoizar resultados caros (chamadas externas, leituras repetidas)
+dentro de um worker. Thread-safe: pode ser usado tanto em rotas async quanto
+em rotas sync executadas no threadpool.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Hashable
+
+_AUSENTE = object()
+
+
+class TTLCache:
+    """
+    Dicionário LRU em que cada entrada expira após seu TTL.
+
+    Args:
+        max_size: Máximo de entradas; ao exceder, as menos usadas saem primeiro
+        ttl: TTL padrão em segundos para entradas sem TTL explícito
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        agora = time.monotonic()
+        with self._lock:
+            item = self._dados.get(chave, _AUSENTE)
+            if item is _AUSENTE:
+                self.counters["misses"] += 1
+                return default
+
+            valor, expira_em = item
+            if expira_em <= agora:
+                del self._dados[chave]
+                self.counters["expirations"] += 1
+                self.counters["misses"] += 1
+                return default
+
+            self._dados.move_to_end(chave)
+            self.counters["hits"] += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any, ttl: Optional[float] = None):
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_size:
+                self._dados.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def delete(self, chave: Hashable):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self):
+        return len(self._dados)
+
+    def stats(self) -> dict:
+        return {**self.counters, "size": len(self._dados), "max_size": self.max_size}
@@ -0,0 +1,168 @@
+"""
+Acesso tipado e em cache às configurações do sistema (tabela configuracoes_sistema).
+
+`inscricoes_abertas` e `ano_ativo_inscricoes` são lidas em quase toda
+requisição de inscrição (o frontend consulta /api/inscricoes/status a cada
+página). Este módulo mantém um snapshot em memória por worker:
+
+- Leitura: sem SQL enquanto o snapshot estiver válido
+- Escrita: quem altera a tabela chama `invalidar_configuracoes()`, que descarta
+  o snapshot local e atualiza um arquivo de versão (version stamp)
+- Outros workers do mesmo servidor comparam o mtime desse arquivo (um os.stat,
+  sem SQL) e recarregam quando ele muda
+- Outras instâncias (scale-out) recarregam no máximo após CONFIG_CACHE_MAX_AGE
+
+Configuração (variáveis de ambiente):
+    CONFIG_CACHE_MAX_AGE     Idade máxima do snapshot em segundos (padrão: 60)
+    CONFIG_VERSION_FILE      Arquivo de versão compartilhado entre workers
+                             (padrão: <tmp>/pict_configuracoes.version)
+"""
+
+import os
+import tempfile
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models.database_models import ConfiguracaoSistema
+
+logger = logging.getLogger(__name__)
+
+CHAVE_INSCRICOES_ABERTAS = 'inscricoes_abertas'
+CHAVE_ANO_ATIVO = 'ano_ativo_inscricoes'
+
+
+@dataclass(frozen=True)
+class ConfiguracoesInscricoes:
+    """Snapshot das configurações de inscrição."""
+    inscricoes_abertas: bool
+    ano_ativo: int
+    data_atualizacao: Optional[datetime]
+    atualizado_por: Optional[int]
+    configuracao_existe: bool  # False se 'inscricoes_abertas' ainda não foi criada
+
+
+class ConfiguracoesCache:
+    """
+    Snapshot versionado das configurações, compartilhado por todas as rotas do worker.
+    """
+
+    def __init__(self, max_age: Optional[float] = None, version_file: Optional[str] = None, session_factory=None):
+        self.max_age = max_age if max_age is not None else float(os.getenv("CONFIG_CACHE_MAX_AGE", "60"))
+        self.version_file = version_file or os.getenv(
+            "CONFIG_VERSION_FILE",
+            os.path.join(tempfile.gettempdir(), "pict_configuracoes.version")
+        )
+        self.session_factory = session_factory
+
+        self._snapshot: Optional[ConfiguracoesInscricoes] = None
+        self._carregado_em = 0.0
+        self._versao = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "reloads": 0, "invalidations": 0}
+
+    def _versao_atual(self):
+        try:
+            # os.replace cria um novo inode, então (inode, mtime) muda a cada invalidação
+            info = os.stat(self.version_file)
+            return (info.st_ino, info.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _valido(self) -> bool:
+        if self._snapshot is None:
+            return False
+        if time.monotonic() - self._carregado_em > self.max_age:
+            return False
+        return self._versao_atual() == self._versao
+
+    def _carregar(self, db: Session) -> ConfiguracoesInscricoes:
+        configs = {
+            c.chave: c
+            for c in db.query(ConfiguracaoSistema).filter(
+                ConfiguracaoSistema.chave.in_([CHAVE_INSCRICOES_ABERTAS, CHAVE_ANO_ATIVO])
+            ).all()
+        }
+        config = configs.get(CHAVE_INSCRICOES_ABERTAS)
+        config_ano = configs.get(CHAVE_ANO_ATIVO)
+
+        return ConfiguracoesInscricoes(
+            inscricoes_abertas=config.valor.lower() == 'true' if config else True,  # Padrão: abertas
+            ano_ativo=int(config_ano.valor) if config_ano else datetime.now().year,
+            data_atualizacao=config.data_atualizacao if config else None,
+            atualizado_por=config.atualizado_por if config else None,
+            configuracao_existe=config is not None
+        )
+
+    def obter(self, db: Optional[Session] = None) -> ConfiguracoesInscricoes:
+        """
+        Retorna o snapshot atual, recarregando do banco apenas se necessário.
+
+        Args:
+            db: Sessão da requisição (usada só se for preciso recarregar)
+        """
+        if self._valido():
+            self.counters["hits"] += 1
+            return self._snapshot
+
+        with self._lock:
+            if self._valido():
+                self.counters["hits"] += 1
+                return self._snapshot
+
+            # Ler a versão antes de consultar: uma escrita concorrente força novo reload
+            versao = self._versao_atual()
+            sessao_propria = db is None
+            if sessao_propria:
+                if self.session_factory is None:
+                    from database import SessionLocal
+                    self.session_factory = SessionLocal
+                db = self.session_factory()
+            try:
+                self._snapshot = self._carregar(db)
+            finally:
+                if sessao_propria:
+                    db.close()
+
+            self._versao = versao
+            self._carregado_em = time.monotonic()
+            self.counters["reloads"] += 1
+            return self._snapshot
+
+    def invalidar(self):
+        """
+        Descarta o snapshot local e avisa os demais workers (atualiza o arquivo de versão).
+        Deve ser chamado após o commit de qualquer alteração em configuracoes_sistema.
+        """
+        with self._lock:
+            self._snapshot = None
+            self.counters["invalidations"] += 1
+            try:
+                temporario = f"{self.version_file}.{os.getpid()}.tmp"
+                with open(temporario, "w") as f:
+                    f.write(str(time.time_ns()))
+                os.replace(temporario, self.version_file)
+            except OSError as e:
+                logger.warning(f"Não foi possível atualizar versão das configurações: {e}")
+
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+
+# Instância global (uma por worker)
+configuracoes_cache = ConfiguracoesCache()
+
+
+def obter_configuracoes(db: Optional[Session] = None) -> ConfiguracoesInscricoes:
+    """Função helper para ler as configurações de inscrição em cache"""
+    return configuracoes_cache.obter(db)
+
+
+def invalidar_configuracoes():
+    """Função helper para invalidar o cache após alterar configuracoes_sistema"""
+    configuracoes_cache.invalidar()
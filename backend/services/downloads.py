@@ -0,0 +1,215 @@
+"""
+Download de arquivos armazenados (propostas, entregas, relatórios, certificados, CR).
+
+- Backend local: o arquivo é enviado direto do disco em blocos (FileResponse),
+  sem carregar o PDF na memória do worker. Suporta Range (um intervalo,
+  206 / 416), If-Range, If-None-Match e If-Modified-Since (304)
+- Backend S3: responde 307 para uma URL pré-assinada de curta duração; os
+  bytes (e o Range) ficam a cargo do bucket
+
+A ETag de arquivos do blob store é o próprio SHA-256 do conteúdo.
+
+Links temporários: `gerar_link` devolve uma URL que pode ser aberta direto
+pelo navegador (<a href>, nova aba) sem o cabeçalho Authorization. No
+backend local é a própria rota de download com `expira` e `assinatura`
+(HMAC com settings.SECRET_KEY); no S3 é a URL pré-assinada do bucket.
+
+Configuração (variáveis de ambiente):
+    DOWNLOAD_LINK_TTL   Validade dos links temporários em segundos (padrão: 300)
+"""
+
+import hashlib
+import hmac
+import mimetypes
+import os
+import re
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from config import settings
+from services.blobs import ArquivoLocalizado, blob_store
+from services.http_cache import etag_corresponde, gerar_etag
+
+TTL_LINK = int(os.getenv("DOWNLOAD_LINK_TTL", "300"))
+TAMANHO_BLOCO = 256 * 1024
+
+
+class IntervaloInvalido(Exception):
+    """Range fora do tamanho do arquivo (416)."""
+
+
+class ArquivoResponse(FileResponse):
+    """FileResponse com blocos maiores que o padrão do Starlette (64KB)."""
+    chunk_size = TAMANHO_BLOCO
+
+
+class ArquivoParcialResponse(ArquivoResponse):
+    """ArquivoResponse que envia apenas os bytes [inicio, fim] do arquivo (206)."""
+
+    def __init__(self, path, inicio: int, fim: int, tamanho_total: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.inicio = inicio
+        self.fim = fim
+        self.headers["content-range"] = f"bytes {inicio}-{fim}/{tamanho_total}"
+        self.headers["content-length"] = str(fim - inicio + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as arquivo:
+            await arquivo.seek(self.inicio)
+            restante = self.fim - self.inicio + 1
+            while restante > 0:
+                bloco = await arquivo.read(min(self.chunk_size, restante))
+                if not bloco:
+                    break
+                restante -= len(bloco)
+                await send({"type": "http.response.body", "body": bloco, "more_body": restante > 0})
+            if restante > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def assinar(recurso: str, expira: int) -> str:
+    """Assinatura HMAC de um recurso (ex.: "propostas/<nome>") válida até `expira`."""
+    mensagem = f"{recurso}:{expira}".encode("utf-8")
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), mensagem, hashlib.sha256).hexdigest()
+
+
+def assinatura_valida(recurso: str, expira: Optional[int], assinatura: Optional[str]) -> bool:
+    if not expira or not assinatura or expira < time.time():
+        return False
+    return hmac.compare_digest(assinar(recurso, expira), assinatura)
+
+
+def link_assinado(url: str, recurso: str, ttl: int = TTL_LINK) -> str:
+    """Acrescenta `expira` e `assinatura` à URL de uma rota que aceita links temporários."""
+    expira = int(time.time()) + ttl
+    separador = "&" if "?" in url else "?"
+    return f"{url}{separador}expira={expira}&assinatura={assinar(recurso, expira)}"
+
+
+def gerar_link(request: Request, localizado: ArquivoLocalizado, categoria: str, nome: str, ttl: int = TTL_LINK) -> str:
+    """URL temporária para baixar o arquivo sem o cabeçalho Authorization."""
+    url = blob_store.storage.presign(localizado.chave, expira_em=ttl, nome_download=nome)
+    if url:
+        return url
+
+    caminho = request.url_for("baixar_arquivo", categoria=categoria, nome=nome)
+    return link_assinado(str(caminho), f"{categoria}/{nome}", ttl)
+
+
+def etag_arquivo(localizado: ArquivoLocalizado) -> str:
+    if localizado.sha256:
+        return f'"{localizado.sha256}"'
+    return gerar_etag(localizado.chave, localizado.tamanho, localizado.modificado_em)
+
+
+def interpretar_range(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """
+    Converte "bytes=inicio-fim" em (inicio, fim) inclusivo.
+    Retorna None para cabeçalho ausente, malformado ou com vários intervalos
+    (a resposta é o arquivo inteiro, como permite o RFC 9110).
+    """
+    if not cabecalho:
+        return None
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", cabecalho)
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    inicio, fim = match.groups()
+    if inicio == "":
+        # Sufixo: últimos N bytes
+        sufixo = int(fim)
+        if sufixo == 0:
+            raise IntervaloInvalido()
+        return max(tamanho - sufixo, 0), tamanho - 1
+
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or fim < inicio:
+        raise IntervaloInvalido()
+    return inicio, fim
+
+
+def _nao_modificado(request: Request, etag: str, modificado_em: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_corresponde(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(modificado_em) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _if_range_corresponde(request: Request, etag: str, ultima_modificacao: str) -> bool:
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    # If-Range exige comparação forte
+    return if_range.strip() in (etag, ultima_modificacao)
+
+
+def responder_arquivo(request: Request, localizado: ArquivoLocalizado, nome_download: str) -> Response:
+    """Resposta de download do arquivo localizado, respeitando os cabeçalhos condicionais."""
+    url = blob_store.storage.presign(localizado.chave, expira_em=TTL_LINK, nome_download=nome_download)
+    if url:
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "private, no-store"})
+
+    etag = etag_arquivo(localizado)
+    ultima_modificacao = formatdate(localizado.modificado_em, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": ultima_modificacao,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(nome_download)}",
+    }
+
+    if _nao_modificado(request, etag, localizado.modificado_em):
+        return Response(status_code=304, headers=headers)
+
+    intervalo = None
+    if _if_range_corresponde(request, etag, ultima_modificacao):
+        try:
+            intervalo = interpretar_range(request.headers.get("range"), localizado.tamanho)
+        except IntervaloInvalido:
+            headers["Content-Range"] = f"bytes */{localizado.tamanho}"
+            return Response(status_code=416, headers=headers)
+
+    # Blobs não têm extensão: o tipo vem do nome lógico
+    media_type = mimetypes.guess_type(nome_download)[0] or "application/octet-stream"
+    caminho = blob_store.storage.caminho_local(localizado.chave)
+    if caminho is None:
+        # Backend sem arquivo em disco e sem URL pré-assinada: envia em blocos
+        inicio, fim = intervalo or (0, localizado.tamanho - 1)
+        if intervalo:
+            headers["Content-Range"] = f"bytes {inicio}-{fim}/{localizado.tamanho}"
+        headers["Content-Length"] = str(max(fim - inicio + 1, 0))
+        return StreamingResponse(
+            blob_store.storage.stream(localizado.chave, TAMANHO_BLOCO, inicio, fim),
+            status_code=206 if intervalo else 200,
+            media_type=media_type,
+            headers=headers
+        )
+
+    if intervalo:
+        inicio, fim = intervalo
+        return ArquivoParcialResponse(
+            caminho, inicio, fim, localizado.tamanho,
+            headers=headers, media_type=media_type
+        )
+    return ArquivoResponse(caminho, headers=headers, media_type=media_type)
@@ -0,0 +1,287 @@
+"""
+Estatísticas pré-calculadas (tabela contadores_estatisticas).
+
+Contadores por ano, atualizados na mesma transação de cada gravação via ORM:
+
+- usuarios_tipo          usuários por tipo (só no total, ano 0)
+- inscricoes_status      inscrições por status
+- projetos_etapa         projetos por etapa_atual
+- pendentes_orientador   inscrições aguardando cada orientador (chave = id)
+
+Cada registro conta no seu ano e no total (ano 0). Ler as estatísticas de um
+ano é uma consulta pela chave primária da tabela de contadores, sem COUNT
+sobre usuarios, inscricoes e projetos.
+
+Gravações fora do ORM (update/delete em massa, SQL direto, scripts de carga)
+não passam pelos eventos: reconciliar() recalcula os contadores com GROUP BY
+e corrige as diferenças (script reconciliar_estatisticas.py).
+"""
+
+import enum
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event, func, insert, inspect, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import get_engine
+from models.database_models import ContadorEstatistica, Inscricao, Projeto, Usuario, StatusInscricao
+
+logger = logging.getLogger(__name__)
+
+ANO_TODOS = 0
+
+# Atributos de cada modelo que decidem em quais contadores o registro entra
+_ATRIBUTOS = {
+    Usuario: ("tipo",),
+    Inscricao: ("ano", "status", "orientador_id"),
+    Projeto: ("ano", "etapa_atual"),
+}
+
+_SECOES = {
+    "usuarios_tipo": "usuarios_por_tipo",
+    "inscricoes_status": "inscricoes_por_status",
+    "projetos_etapa": "projetos_por_etapa",
+    "pendentes_orientador": "pendentes_por_orientador",
+}
+
+_DELTAS_SESSAO = "deltas_estatisticas"
+_tabela_verificada = False
+
+
+class Diferenca(NamedTuple):
+    ano: int
+    metrica: str
+    chave: str
+    gravado: int
+    correto: int
+
+
+def _texto(valor) -> str:
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    return "" if valor is None else str(valor)
+
+
+def _anos(ano: Optional[int]) -> List[int]:
+    return [ANO_TODOS] if ano is None or ano == ANO_TODOS else [ano, ANO_TODOS]
+
+
+def _chaves(modelo, valores: dict) -> List[tuple]:
+    """Contadores (ano, metrica, chave) em que um registro com esses valores entra"""
+    if modelo is Usuario:
+        return [(ANO_TODOS, "usuarios_tipo", _texto(valores["tipo"]))]
+
+    if modelo is Inscricao:
+        status = _texto(valores["status"])
+        chaves = [("inscricoes_status", status)]
+        if status == StatusInscricao.pendente_orientador.value and valores["orientador_id"] is not None:
+            chaves.append(("pendentes_orientador", str(valores["orientador_id"])))
+    else:
+        chaves = [("projetos_etapa", _texto(valores["etapa_atual"]))]
+
+    return [(ano, metrica, chave) for ano in _anos(valores["ano"]) for metrica, chave in chaves]
+
+
+def _valores_atuais(obj) -> dict:
+    return {nome: getattr(obj, nome) for nome in _ATRIBUTOS[type(obj)]}
+
+
+def _valores_gravados(obj) -> dict:
+    """Valores como estão no banco (antes das alterações ainda não enviadas)"""
+    estado = inspect(obj)
+    valores = {}
+    for nome in _ATRIBUTOS[type(obj)]:
+        historico = estado.attrs[nome].history
+        valores[nome] = historico.deleted[0] if historico.deleted else getattr(obj, nome)
+    return valores
+
+
+def _antes_do_flush(session, flush_context, instances):
+    # Valores antigos de registros alterados ou removidos: depois do flush não existem mais
+    deltas = Counter()
+    for obj in session.dirty:
+        if type(obj) not in _ATRIBUTOS or not session.is_modified(obj):
+            continue
+        for chave in _chaves(type(obj), _valores_gravados(obj)):
+            deltas[chave] -= 1
+        for chave in _chaves(type(obj), _valores_atuais(obj)):
+            deltas[chave] += 1
+    for obj in session.deleted:
+        if type(obj) in _ATRIBUTOS:
+            for chave in _chaves(type(obj), _valores_gravados(obj)):
+                deltas[chave] -= 1
+    session.info[_DELTAS_SESSAO] = deltas
+
+
+def _apos_flush(session, flush_context):
+    # Registros novos só têm ano e status (defaults das colunas) depois do INSERT
+    deltas = session.info.pop(_DELTAS_SESSAO, Counter())
+    for obj in session.new:
+        if type(obj) in _ATRIBUTOS:
+            for chave in _chaves(type(obj), _valores_atuais(obj)):
+                deltas[chave] += 1
+
+    deltas = {chave: delta for chave, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    connection = session.connection()
+    if _garantir_tabela(connection):
+        return  # tabela criada agora: a reconciliação já contou este flush
+
+    # Ordem fixa para transações concorrentes travarem as linhas na mesma sequência
+    for (ano, metrica, chave), delta in sorted(deltas.items()):
+        _somar(connection, ano, metrica, chave, delta)
+
+
+def _somar(connection, ano: int, metrica: str, chave: str, delta: int):
+    tabela = ContadorEstatistica.__table__
+    somar = (
+        update(tabela)
+        .where(tabela.c.ano == ano, tabela.c.metrica == metrica, tabela.c.chave == chave)
+        .values(valor=tabela.c.valor + delta, data_atualizacao=datetime.utcnow())
+    )
+    if connection.execute(somar).rowcount:
+        return
+
+    try:
+        with connection.begin_nested():
+            connection.execute(
+                insert(tabela).values(ano=ano, metrica=metrica, chave=chave, valor=delta,
+                                      data_atualizacao=datetime.utcnow())
+            )
+    except IntegrityError:
+        # Outra transação criou o contador ao mesmo tempo (ex.: primeiras
+        # inscrições de um ano novo): o savepoint desfaz só o INSERT e a
+        # gravação do usuário segue
+        connection.execute(somar)
+
+
+def _garantir_tabela(connection) -> bool:
+    """
+    Cria a tabela em bancos antigos e a preenche com reconciliar().
+    Retorna True se a tabela foi criada agora.
+    """
+    global _tabela_verificada
+    if _tabela_verificada:
+        return False
+    if inspect(connection).has_table(ContadorEstatistica.__tablename__):
+        _tabela_verificada = True
+        return False
+
+    ContadorEstatistica.__table__.create(bind=connection)
+    reconciliar(connection)
+    logger.info("Tabela contadores_estatisticas criada e preenchida")
+    return True
+
+
+def manter_estatisticas():
+    """Passa a atualizar os contadores a cada gravação via ORM."""
+    if not event.contains(Session, "before_flush", _antes_do_flush):
+        event.listen(Session, "before_flush", _antes_do_flush)
+        event.listen(Session, "after_flush", _apos_flush)
+        # Atribuir um valor a um atributo expirado carrega o valor antigo,
+        # para o histórico saber de qual contador o registro sai
+        for modelo, atributos in _ATRIBUTOS.items():
+            for nome in atributos:
+                event.listen(getattr(modelo, nome), "set", _ao_atribuir, active_history=True)
+
+
+def _ao_atribuir(alvo, valor, anterior, iniciador):
+    return valor
+
+
+def _contagens_reais(connection) -> Counter:
+    reais = Counter()
+    for tipo, total in connection.execute(select(Usuario.tipo, func.count()).group_by(Usuario.tipo)):
+        reais[(ANO_TODOS, "usuarios_tipo", _texto(tipo))] += total
+
+    consultas = (
+        ("inscricoes_status",
+         select(Inscricao.ano, Inscricao.status, func.count()).group_by(Inscricao.ano, Inscricao.status)),
+        ("pendentes_orientador",
+         select(Inscricao.ano, Inscricao.orientador_id, func.count())
+         .where(Inscricao.status == StatusInscricao.pendente_orientador, Inscricao.orientador_id.isnot(None))
+         .group_by(Inscricao.ano, Inscricao.orientador_id)),
+        ("projetos_etapa",
+         select(Projeto.ano, Projeto.etapa_atual, func.count()).group_by(Projeto.ano, Projeto.etapa_atual)),
+    )
+    for metrica, consulta in consultas:
+        for ano, chave, total in connection.execute(consulta):
+            for ano_contador in _anos(ano):
+                reais[(ano_contador, metrica, _texto(chave))] += total
+    return reais
+
+
+def reconciliar(connection, simular: bool = False) -> List[Diferenca]:
+    """
+    Recalcula todos os contadores a partir das tabelas e corrige os que
+    divergem. Retorna as diferenças encontradas.
+
+    No PostgreSQL a tabela de contadores fica travada (EXCLUSIVE) até o fim
+    da transação: incrementos concorrentes esperam e são aplicados sobre os
+    valores corrigidos.
+    """
+    tabela = ContadorEstatistica.__table__
+    if connection.dialect.name == "postgresql" and not simular:
+        connection.execute(text(f"LOCK TABLE {tabela.name} IN EXCLUSIVE MODE"))
+
+    reais = _contagens_reais(connection)
+    gravados = {
+        (ano, metrica, chave): valor
+        for ano, metrica, chave, valor in connection.execute(
+            select(tabela.c.ano, tabela.c.metrica, tabela.c.chave, tabela.c.valor)
+        )
+    }
+    diferencas = [
+        Diferenca(*chave, gravados.get(chave, 0), reais.get(chave, 0))
+        for chave in sorted(set(reais) | set(gravados))
+        if gravados.get(chave, 0) != reais.get(chave, 0)
+    ]
+    if simular:
+        return diferencas
+
+    for diferenca in diferencas:
+        chave = (diferenca.ano, diferenca.metrica, diferenca.chave)
+        if chave in gravados:
+            connection.execute(
+                update(tabela)
+                .where(tabela.c.ano == diferenca.ano, tabela.c.metrica == diferenca.metrica,
+                       tabela.c.chave == diferenca.chave)
+                .values(valor=diferenca.correto, data_atualizacao=datetime.utcnow())
+            )
+        else:
+            connection.execute(
+                insert(tabela).values(ano=diferenca.ano, metrica=diferenca.metrica, chave=diferenca.chave,
+                                      valor=diferenca.correto, data_atualizacao=datetime.utcnow())
+            )
+    if diferencas:
+        logger.warning(f"Estatísticas reconciliadas: {len(diferencas)} contador(es) corrigido(s)")
+    return diferencas
+
+
+def obter_estatisticas(db: Session, ano: Optional[int] = None) -> Dict[str, object]:
+    """
+    Contadores de um ano (sem `ano`: todos os anos) em uma consulta pela
+    chave primária. usuarios_por_tipo só é preenchido no total.
+    """
+    if not _tabela_verificada:
+        with get_engine().begin() as connection:
+            _garantir_tabela(connection)
+
+    tabela = ContadorEstatistica.__table__
+    linhas = db.execute(
+        select(tabela.c.metrica, tabela.c.chave, tabela.c.valor)
+        .where(tabela.c.ano == (ANO_TODOS if ano is None else ano), tabela.c.valor != 0)
+        .order_by(tabela.c.metrica, tabela.c.chave)
+    ).all()
+
+    estatisticas = {"ano": ano, **{secao: {} for secao in _SECOES.values()}}
+    for metrica, chave, valor in linhas:
+        if metrica in _SECOES:
+            estatisticas[_SECOES[metrica]][chave] = valor
+    return estatisticas
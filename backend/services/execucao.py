@@ -0,0 +1,87 @@
+"""
+Modelo de execução das rotas (um event loop por worker do uvicorn).
+
+- Rotas que usam a Session do SQLAlchemy (síncrona), o armazenamento de
+  arquivos ou qualquer outra chamada bloqueante são `def`: o FastAPI as
+  executa no threadpool do AnyIO e o event loop continua atendendo as demais
+  requisições enquanto uma consulta lenta espera o banco
+- `async def` fica para rotas que aguardam I/O assíncrono (Microsoft Graph);
+  nelas, o trabalho com o banco vai por `run_in_threadpool`
+- O threadpool é limitado por worker (THREADS_POR_WORKER): acima do limite as
+  requisições esperam uma thread livre, em vez de disputar conexões do pool
+- No startup do worker (lifespan do app), as tarefas de aquecimento (primeira
+  conexão com o banco, caches, token do Graph) rodam ao mesmo tempo por
+  aquecer(); o import do app não faz I/O
+- Com LOOP_LENTO_MS definido (testes, diagnóstico), o asyncio registra um
+  aviso (logger "asyncio") para cada callback que segurar o event loop por
+  mais tempo que isso, indicando a rota que bloqueou
+
+Configuração (variáveis de ambiente):
+    THREADS_POR_WORKER  Threads para rotas síncronas em cada worker (padrão: 40)
+    LOOP_LENTO_MS       Limite para o aviso de loop bloqueado, em ms (padrão: desligado)
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+import anyio.to_thread
+
+logger = logging.getLogger(__name__)
+
+THREADS_POR_WORKER = int(os.getenv("THREADS_POR_WORKER", "40"))
+LOOP_LENTO_MS = float(os.getenv("LOOP_LENTO_MS", "0"))
+
+
+async def configurar_execucao(threads: Optional[int] = None, loop_lento_ms: Optional[float] = None):
+    """
+    Aplica o limite do threadpool e o detector de loop bloqueado ao event loop
+    atual. Chamada no startup de cada worker.
+    """
+    threads = threads or THREADS_POR_WORKER
+    loop_lento_ms = LOOP_LENTO_MS if loop_lento_ms is None else loop_lento_ms
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+
+    if loop_lento_ms > 0:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = loop_lento_ms / 1000
+        logger.info(f"Detector de loop bloqueado ativo: avisos acima de {loop_lento_ms:.0f}ms")
+
+    logger.info(f"Threadpool das rotas síncronas: {threads} thread(s) por worker")
+
+
+async def aquecer(tarefas: Dict[str, Callable]) -> Dict[str, Optional[Exception]]:
+    """
+    Executa as tarefas de aquecimento do worker ao mesmo tempo: funções
+    `async` no event loop, as demais no threadpool. O tempo de cada uma vai
+    para o log.
+
+    Uma tarefa que falha é registrada e não impede o worker de subir (ex.:
+    banco fora do ar no deploy: /api/health responde "unhealthy" e as
+    requisições tentam de novo).
+
+    Returns:
+        {nome: exceção ou None}
+    """
+    async def executar(nome: str, tarefa: Callable) -> Optional[Exception]:
+        inicio = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(tarefa):
+                await tarefa()
+            else:
+                await anyio.to_thread.run_sync(tarefa)
+        except Exception as e:
+            logger.error(f"Aquecimento '{nome}' falhou após {(time.perf_counter() - inicio) * 1000:.0f}ms: {e}")
+            return e
+        logger.info(f"Aquecimento '{nome}': {(time.perf_counter() - inicio) * 1000:.0f}ms")
+        return None
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(executar(nome, tarefa) for nome, tarefa in tarefas.items()))
+    logger.info(f"Worker aquecido em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+    return dict(zip(tarefas, resultados))
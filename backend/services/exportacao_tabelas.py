@@ -0,0 +1,301 @@
+"""
+Exportação de inscrições e projetos em CSV, XLSX ou Parquet, enviada em blocos.
+
+- As linhas são lidas em lotes por chave (id > último id), cada lote em uma
+  conexão própria com cursor no servidor (stream_results / yield_per). A
+  conexão volta ao pool assim que o lote é lido, antes de os bytes serem
+  enviados ao cliente: um download lento não prende conexão do pool
+- A memória usada é a de um lote, independente do total de linhas
+- CSV: cada lote é convertido e enviado em seguida
+- Parquet (pyarrow, opcional): um row group por lote, enviado em seguida
+- XLSX (openpyxl, opcional): o formato exige o arquivo completo antes do
+  envio; as linhas vão para um arquivo temporário (modo write_only) e o
+  resultado é enviado em blocos
+
+Configuração (variáveis de ambiente):
+    EXPORTACAO_LOTE   Linhas por lote (padrão: 2000)
+"""
+
+import csv
+import enum
+import io
+import os
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, status as status_http
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.orm import aliased
+
+from database import get_engine
+from models.database_models import Inscricao, Projeto, Usuario, StatusInscricao, StatusUsuario, EtapaProjeto
+from services.paginacao import converter_filtro
+from services.projecoes import etapa_do_projeto, filtros_inscricoes
+
+logger = logging.getLogger(__name__)
+
+LOTE = int(os.getenv("EXPORTACAO_LOTE", "2000"))
+YIELD_PER = 500
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", None),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "parquet": ("application/vnd.apache.parquet", "pyarrow"),
+}
+
+
+@dataclass(frozen=True)
+class Conjunto:
+    """Tabela exportável: colunas disponíveis, chave dos lotes e filtros."""
+    colunas: Dict[str, object]
+    chave: object
+    filtros: Callable[..., list]
+
+
+def _colunas_inscricoes() -> Dict[str, object]:
+    colunas = {coluna.key: coluna for coluna in Inscricao.__table__.columns}
+    colunas["etapa"] = etapa_do_projeto().label("etapa")
+    return colunas
+
+
+def _filtros_inscricoes(colunas, status: Optional[str], ano: Optional[int], etapa: Optional[str]) -> list:
+    return filtros_inscricoes(
+        colunas["etapa"],
+        converter_filtro(StatusInscricao, status, "Status"),
+        ano,
+        converter_filtro(EtapaProjeto, etapa, "Etapa")
+    )
+
+
+_aluno = aliased(Usuario, name="aluno")
+_orientador = aliased(Usuario, name="orientador")
+
+
+def _colunas_projetos() -> Dict[str, object]:
+    colunas = {coluna.key: coluna for coluna in Projeto.__table__.columns}
+    colunas.update({
+        "aluno_nome": select(_aluno.nome).where(_aluno.id == Projeto.aluno_id).scalar_subquery().label("aluno_nome"),
+        "aluno_email": select(_aluno.email).where(_aluno.id == Projeto.aluno_id).scalar_subquery().label("aluno_email"),
+        "aluno_matricula": select(_aluno.matricula).where(_aluno.id == Projeto.aluno_id).scalar_subquery().label("aluno_matricula"),
+        "aluno_status": select(_aluno.status).where(_aluno.id == Projeto.aluno_id).scalar_subquery().label("aluno_status"),
+        "orientador_nome": select(_orientador.nome).where(_orientador.id == Projeto.orientador_id).scalar_subquery().label("orientador_nome"),
+    })
+    return colunas
+
+
+def _filtros_projetos(colunas, status: Optional[str], ano: Optional[int], etapa: Optional[str]) -> list:
+    filtros = []
+    status_aluno = converter_filtro(StatusUsuario, status, "Status")
+    etapa_enum = converter_filtro(EtapaProjeto, etapa, "Etapa")
+    if status_aluno is not None:
+        filtros.append(colunas["aluno_status"] == status_aluno)
+    if ano is not None:
+        filtros.append(Projeto.ano == ano)
+    if etapa_enum is not None:
+        filtros.append(Projeto.etapa_atual == etapa_enum)
+    return filtros
+
+
+CONJUNTOS = {
+    "inscricoes": lambda: Conjunto(_colunas_inscricoes(), Inscricao.id, _filtros_inscricoes),
+    "projetos": lambda: Conjunto(_colunas_projetos(), Projeto.id, _filtros_projetos),
+}
+
+
+def _erro(mensagem: str, codigo: int = status_http.HTTP_400_BAD_REQUEST) -> HTTPException:
+    return HTTPException(status_code=codigo, detail=mensagem)
+
+
+def validar_formato(formato: str) -> str:
+    """Valida o formato; 400 se desconhecido, 501 se a biblioteca opcional não estiver instalada."""
+    formato = (formato or "csv").lower()
+    if formato not in FORMATOS:
+        raise _erro(f"Formato inválido. Valores aceitos: {', '.join(FORMATOS)}")
+    pacote = FORMATOS[formato][1]
+    if pacote:
+        try:
+            __import__(pacote)
+        except ImportError:
+            raise _erro(f"Exportação em {formato} requer o pacote {pacote}", status_http.HTTP_501_NOT_IMPLEMENTED)
+    return formato
+
+
+def selecionar_colunas(disponiveis: Dict[str, object], pedido: Optional[str]) -> List[str]:
+    """Colunas pedidas ("id,nome,email") na ordem pedida; todas se não houver pedido."""
+    if not pedido:
+        return list(disponiveis)
+    nomes = [nome.strip() for nome in pedido.split(",") if nome.strip()]
+    invalidas = [nome for nome in nomes if nome not in disponiveis]
+    if invalidas or not nomes:
+        raise _erro(
+            f"Coluna(s) inválida(s): {', '.join(invalidas) or '(nenhuma)'}. "
+            f"Colunas disponíveis: {', '.join(disponiveis)}"
+        )
+    return list(dict.fromkeys(nomes))
+
+
+@dataclass
+class Exportacao:
+    """Exportação validada, pronta para gerar os bytes."""
+    conjunto: Conjunto
+    colunas: List[str]
+    filtros: list
+    formato: str
+
+    @property
+    def media_type(self) -> str:
+        return FORMATOS[self.formato][0]
+
+    def lotes(self) -> Iterator[List[tuple]]:
+        """Linhas em lotes de até LOTE, cada lote lido em uma conexão devolvida logo em seguida."""
+        expressoes = [self.conjunto.colunas[nome] for nome in self.colunas]
+        chave = self.conjunto.chave.label("chave_lote")
+        ultimo = None
+        while True:
+            consulta = select(chave, *expressoes).where(*self.filtros).order_by(self.conjunto.chave).limit(LOTE)
+            if ultimo is not None:
+                consulta = consulta.where(self.conjunto.chave > ultimo)
+
+            with get_engine().connect() as conn:
+                resultado = conn.execution_options(stream_results=True, yield_per=YIELD_PER).execute(consulta)
+                lote = [tuple(linha) for particao in resultado.partitions() for linha in particao]
+
+            if not lote:
+                return
+            ultimo = lote[-1][0]
+            yield [linha[1:] for linha in lote]
+            if len(lote) < LOTE:
+                return
+
+    def gerar(self) -> Iterator[bytes]:
+        geradores = {"csv": _gerar_csv, "xlsx": _gerar_xlsx, "parquet": _gerar_parquet}
+        total = 0
+        for bloco in geradores[self.formato](self):
+            total += len(bloco)
+            yield bloco
+        logger.info(f"Exportação {self.formato} ({', '.join(self.colunas[:3])}...): {total} bytes")
+
+
+def preparar_exportacao(
+    conjunto: str,
+    formato: str = "csv",
+    colunas: Optional[str] = None,
+    status: Optional[str] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[str] = None
+) -> Exportacao:
+    """Valida conjunto, formato, colunas e filtros antes de a resposta começar (erros viram 4xx/501)."""
+    if conjunto not in CONJUNTOS:
+        raise _erro(f"Conjunto inválido. Valores aceitos: {', '.join(CONJUNTOS)}", status_http.HTTP_404_NOT_FOUND)
+    definicao = CONJUNTOS[conjunto]()
+    return Exportacao(
+        conjunto=definicao,
+        colunas=selecionar_colunas(definicao.colunas, colunas),
+        filtros=definicao.filtros(definicao.colunas, status, ano, etapa),
+        formato=validar_formato(formato),
+    )
+
+
+def _valor_texto(valor):
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _gerar_csv(exportacao: Exportacao) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    buffer.write("\ufeff")  # BOM para o Excel reconhecer UTF-8
+    escritor.writerow(exportacao.colunas)
+    for lote in exportacao.lotes():
+        for linha in lote:
+            escritor.writerow([_valor_texto(valor) for valor in linha])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gerar_xlsx(exportacao: Exportacao) -> Iterator[bytes]:
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet("dados")
+    planilha.append(exportacao.colunas)
+    for lote in exportacao.lotes():
+        for linha in lote:
+            planilha.append([valor.value if isinstance(valor, enum.Enum) else valor for valor in linha])
+
+    with tempfile.TemporaryFile() as arquivo:
+        livro.save(arquivo)
+        arquivo.seek(0)
+        while True:
+            bloco = arquivo.read(256 * 1024)
+            if not bloco:
+                break
+            yield bloco
+
+
+class _SaidaParquet(io.RawIOBase):
+    """Destino sequencial do ParquetWriter: acumula os bytes até serem retirados."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._posicao = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._buffer += dados
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def retirar(self) -> bytes:
+        dados = bytes(self._buffer)
+        self._buffer.clear()
+        return dados
+
+
+def _tipo_arrow(pa, expressao):
+    tipo = getattr(expressao, "type", None)
+    if isinstance(tipo, Boolean):
+        return pa.bool_()
+    if isinstance(tipo, Integer):
+        return pa.int64()
+    if isinstance(tipo, Float):
+        return pa.float64()
+    if isinstance(tipo, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _gerar_parquet(exportacao: Exportacao) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([
+        (nome, _tipo_arrow(pa, exportacao.conjunto.colunas[nome])) for nome in exportacao.colunas
+    ])
+    saida = _SaidaParquet()
+    with pq.ParquetWriter(saida, esquema) as escritor:
+        for lote in exportacao.lotes():
+            colunas = list(zip(*lote))
+            escritor.write_table(pa.table(
+                [
+                    [valor.value if isinstance(valor, enum.Enum) else valor for valor in coluna]
+                    for coluna in colunas
+                ],
+                schema=esquema
+            ))
+            yield saida.retirar()
+    yield saida.retirar()
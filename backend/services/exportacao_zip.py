@@ -0,0 +1,200 @@
+"""
+Exportação em ZIP das entregas e certificados de um ano (GET /api/coordenadores/exportar/{ano}).
+
+O ZIP é montado enquanto é enviado:
+- os metadados (entregas, projetos, alunos) são lidos em uma consulta e a
+  conexão volta ao pool antes do primeiro arquivo
+- cada arquivo é lido do armazenamento em blocos e escrito no ZIP sem
+  compressão (PDFs já são comprimidos); cada bloco é repassado ao cliente
+  assim que é escrito, sem arquivo temporário e sem montar o ZIP na memória
+- o manifesto CSV (uma linha por arquivo, inclusive os não encontrados) é
+  o último item do ZIP
+
+A memória usada é a de um bloco mais as linhas do manifesto, independente do
+tamanho total do ano.
+"""
+
+import csv
+import io
+import logging
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from database import SessionLocal
+from models.database_models import Entrega, Projeto, Usuario
+from services.blobs import blob_store
+from services.storage import ArquivoNaoEncontrado
+
+logger = logging.getLogger(__name__)
+
+TIPOS_PADRAO = ("relatorio_parcial", "artigo_final", "certificado")
+TAMANHO_BLOCO = 256 * 1024
+
+COLUNAS_MANIFESTO = [
+    "projeto_id", "aluno", "email_aluno", "orientador", "titulo_projeto",
+    "tipo", "entrega_id", "data_entrega", "status_orientador", "status_coordenador",
+    "arquivo_original", "caminho_zip", "tamanho", "sha256", "situacao",
+]
+
+
+@dataclass
+class ItemExportacao:
+    projeto_id: int
+    aluno_id: int
+    aluno: str
+    email_aluno: str
+    orientador: Optional[str]
+    titulo_projeto: str
+    categoria: str
+    tipo: str
+    entrega_id: Optional[int]
+    data: Optional[datetime]
+    status_orientador: Optional[str]
+    status_coordenador: Optional[str]
+    arquivo: str
+
+
+class _SaidaZip(io.RawIOBase):
+    """Destino não-posicionável do ZipFile: acumula o que foi escrito até ser retirado."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._buffer += dados
+        return len(dados)
+
+    def retirar(self) -> bytes:
+        dados = bytes(self._buffer)
+        self._buffer.clear()
+        return dados
+
+
+def _nome_seguro(texto: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", texto or "").strip("_") or "sem_nome"
+
+
+def consultar_itens(db: Session, ano: int, tipos: Sequence[str] = TIPOS_PADRAO) -> List[ItemExportacao]:
+    """Entregas com arquivo dos tipos pedidos e certificados dos projetos do ano."""
+    aluno = aliased(Usuario)
+    orientador = aliased(Usuario)
+    base = (
+        select(Projeto.id, Projeto.titulo, Projeto.certificado_arquivo, Projeto.certificado_data_emissao,
+               aluno.id, aluno.nome, aluno.email, orientador.nome)
+        .join(aluno, aluno.id == Projeto.aluno_id)
+        .outerjoin(orientador, orientador.id == Projeto.orientador_id)
+        .where(Projeto.ano == ano)
+    )
+
+    itens = []
+    entregas = db.execute(
+        base.add_columns(
+            Entrega.id, Entrega.tipo, Entrega.arquivo, Entrega.data_entrega,
+            Entrega.status_aprovacao_orientador, Entrega.status_aprovacao_coordenador
+        )
+        .join(Entrega, Entrega.projeto_id == Projeto.id)
+        .where(Entrega.tipo.in_(tipos), Entrega.arquivo.isnot(None))
+        .order_by(aluno.nome, Projeto.id, Entrega.tipo, Entrega.id)
+    ).all()
+    for (projeto_id, titulo, _, _, aluno_id, aluno_nome, aluno_email, orientador_nome,
+         entrega_id, tipo, arquivo, data, status_orientador, status_coordenador) in entregas:
+        itens.append(ItemExportacao(
+            projeto_id, aluno_id, aluno_nome, aluno_email, orientador_nome, titulo,
+            "entregas", tipo, entrega_id, data, status_orientador, status_coordenador, arquivo
+        ))
+
+    if "certificado" in tipos:
+        certificados = db.execute(
+            base.where(Projeto.certificado_arquivo.isnot(None)).order_by(aluno.nome, Projeto.id)
+        ).all()
+        for (projeto_id, titulo, arquivo, data, aluno_id, aluno_nome, aluno_email, orientador_nome) in certificados:
+            itens.append(ItemExportacao(
+                projeto_id, aluno_id, aluno_nome, aluno_email, orientador_nome, titulo,
+                "certificados", "certificado", None, data, None, None, arquivo
+            ))
+    return itens
+
+
+def gerar_zip(ano: int, tipos: Sequence[str] = TIPOS_PADRAO) -> Iterator[bytes]:
+    """Gera os bytes do ZIP do ano, bloco a bloco (usar em StreamingResponse)."""
+    db = SessionLocal()
+    try:
+        itens = consultar_itens(db, ano, tipos)
+        localizados = {}
+        for categoria in {item.categoria for item in itens}:
+            nomes = [item.arquivo for item in itens if item.categoria == categoria]
+            for nome, localizado in blob_store.localizar_varios(db, categoria, nomes).items():
+                localizados[(categoria, nome)] = localizado
+    finally:
+        db.close()
+
+    storage = blob_store.storage
+    saida = _SaidaZip()
+    manifesto = io.StringIO()
+    escritor = csv.DictWriter(manifesto, fieldnames=COLUNAS_MANIFESTO)
+    escritor.writeheader()
+    incluidos = 0
+
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as zip_saida:
+        for item in itens:
+            localizado = localizados[(item.categoria, item.arquivo)]
+            pasta = f"{ano}/{_nome_seguro(item.aluno)}_{item.aluno_id}"
+            identificador = item.entrega_id if item.entrega_id is not None else item.projeto_id
+            caminho_zip = f"{pasta}/{item.tipo}_{identificador}_{_nome_seguro(item.arquivo.rsplit('/', 1)[-1])}"
+            linha = {
+                "projeto_id": item.projeto_id,
+                "aluno": item.aluno,
+                "email_aluno": item.email_aluno,
+                "orientador": item.orientador or "",
+                "titulo_projeto": item.titulo_projeto,
+                "tipo": item.tipo,
+                "entrega_id": item.entrega_id or "",
+                "data_entrega": item.data.isoformat() if item.data else "",
+                "status_orientador": item.status_orientador or "",
+                "status_coordenador": item.status_coordenador or "",
+                "arquivo_original": item.arquivo,
+                "caminho_zip": "",
+                "tamanho": "",
+                "sha256": localizado.sha256 or "",
+                "situacao": "arquivo_nao_encontrado",
+            }
+
+            try:
+                blocos = storage.stream(localizado.chave, TAMANHO_BLOCO)
+            except ArquivoNaoEncontrado:
+                logger.warning(f"Exportação {ano}: arquivo não encontrado {item.categoria}/{item.arquivo}")
+                escritor.writerow(linha)
+                continue
+
+            data = item.data if item.data and item.data.year >= 1980 else datetime.now()
+            info = zipfile.ZipInfo(caminho_zip, date_time=data.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            info.file_size = localizado.tamanho  # Tamanho conhecido: decide se usa ZIP64
+            tamanho = 0
+            with zip_saida.open(info, "w") as destino:
+                for bloco in blocos:
+                    destino.write(bloco)
+                    tamanho += len(bloco)
+                    yield saida.retirar()
+            yield saida.retirar()
+
+            incluidos += 1
+            linha.update(caminho_zip=caminho_zip, tamanho=tamanho, situacao="incluido")
+            escritor.writerow(linha)
+
+        zip_saida.writestr(
+            zipfile.ZipInfo(f"{ano}/manifesto.csv", date_time=datetime.now().timetuple()[:6]),
+            "\ufeff" + manifesto.getvalue(),  # BOM para o Excel reconhecer UTF-8
+            compress_type=zipfile.ZIP_DEFLATED
+        )
+    yield saida.retirar()
+    logger.info(f"Exportação {ano}: {incluidos} de {len(itens)} arquivo(s) incluídos")
@@ -0,0 +1,89 @@
+"""
+Respostas condicionais (ETag / If-None-Match).
+
+- Listas de referência: a ETag é derivada de uma versão barata de calcular
+  (ver services/versoes.py), não do corpo da resposta: quando o cliente já
+  tem a versão atual, a rota responde 304 sem consultar a tabela nem
+  serializar JSON
+- Snapshots por usuário (painéis): a ETag é o hash do corpo; o snapshot é
+  montado mesmo assim, mas o 304 evita reenviar e reprocessar o JSON
+"""
+
+import hashlib
+import json
+from typing import Callable, Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+def gerar_etag(*partes) -> str:
+    """Gera uma ETag forte a partir das partes que identificam a versão do recurso."""
+    chave = "|".join(str(parte) for parte in partes)
+    return '"' + hashlib.sha256(chave.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_corresponde(if_none_match: str, etag: str) -> bool:
+    """
+    Compara o cabeçalho If-None-Match com a ETag atual (comparação fraca,
+    como exige o RFC 9110 para If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    atual = etag[2:] if etag.startswith("W/") else etag
+    for candidata in if_none_match.split(","):
+        candidata = candidata.strip()
+        if candidata.startswith("W/"):
+            candidata = candidata[2:]
+        if candidata == atual:
+            return True
+    return False
+
+
+def resposta_condicional(
+    request: Request,
+    etag: str,
+    gerar_conteudo: Callable[[], Any],
+    max_age: int = 60
+) -> Response:
+    """
+    Retorna 304 se o cliente já tem a versão `etag`; caso contrário chama
+    `gerar_conteudo()` e retorna o JSON com ETag e Cache-Control.
+
+    Args:
+        request: Requisição atual (para ler If-None-Match)
+        etag: ETag da versão atual do recurso (ver gerar_etag)
+        gerar_conteudo: Função que monta o corpo; só é chamada em caso de 200
+        max_age: Segundos em que o navegador pode reutilizar a resposta sem revalidar
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate",
+    }
+
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=gerar_conteudo(), headers=headers)
+
+
+def resposta_com_etag_do_conteudo(request: Request, conteudo: Any) -> Response:
+    """
+    Serializa `conteudo` uma vez e usa o hash do corpo como ETag; 304 se o
+    cliente já tem esse corpo. Para dados por usuário: o navegador guarda a
+    resposta, mas revalida sempre (private, no-cache).
+    """
+    corpo = json.dumps(
+        jsonable_encoder(conteudo), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=corpo, media_type="application/json", headers=headers)
@@ -0,0 +1,288 @@
+"""
+Métricas por rota: latência, consultas SQL, tempo no banco e bytes enviados.
+
+- MiddlewareMetricas mede cada requisição HTTP e agrupa pelo caminho da rota
+  (ex.: /api/alunos/{aluno_id}/painel), não pela URL, para o número de
+  séries não crescer com os ids
+- As consultas são contadas pelos eventos before/after_cursor_execute do
+  engine e atribuídas à requisição em andamento (contextvar, que acompanha a
+  requisição também em threads do threadpool)
+- Cada resposta recebe o cabeçalho Server-Timing (app, db e quantidade de
+  consultas), visível na aba Network do navegador
+- GET /metrics devolve tudo no formato texto do Prometheus; um N+1 aparece
+  como o histograma de consultas por requisição subindo para aquela rota.
+  Inclui também o estado dos pools de conexões (services/pool_banco.py)
+
+As métricas ficam na memória de cada processo: com vários workers do
+gunicorn, cada coleta vê um worker.
+
+Configuração (variáveis de ambiente):
+    METRICAS_TOKEN   Se definido, GET /metrics exige "Authorization: Bearer <token>"
+"""
+
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_METRICAS = "/metrics"
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+LIMITES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+SEM_ROTA = "(sem rota)"
+
+
+class Medicao:
+    """Acumulado de uma requisição em andamento."""
+    __slots__ = ("consultas", "tempo_sql", "bytes")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_sql = 0.0
+        self.bytes = 0
+
+    def server_timing(self, duracao: float) -> str:
+        return (
+            f'app;dur={duracao * 1000:.1f}, '
+            f'db;dur={self.tempo_sql * 1000:.1f};desc="{self.consultas} consulta(s)"'
+        )
+
+
+_medicao_atual: ContextVar[Optional[Medicao]] = ContextVar("medicao_atual", default=None)
+
+
+class Histograma:
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        for indice, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[indice] += 1
+                break
+        self.soma += valor
+        self.total += 1
+
+    def acumulados(self):
+        """(limite, contagem acumulada) como no formato do Prometheus, terminando em +Inf"""
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            yield _numero(limite), acumulado
+        yield "+Inf", self.total
+
+
+class SerieRota:
+    """Métricas de um par (método, rota)."""
+
+    def __init__(self):
+        self.por_status = Counter()
+        self.duracao = Histograma(LIMITES_DURACAO)
+        self.consultas = Histograma(LIMITES_CONSULTAS)
+        self.tempo_sql = 0.0
+        self.bytes = 0
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], SerieRota] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, rota: str, status: int, duracao: float, medicao: Medicao):
+        with self._lock:
+            serie = self._series.get((metodo, rota))
+            if serie is None:
+                serie = self._series[(metodo, rota)] = SerieRota()
+            serie.por_status[status] += 1
+            serie.duracao.observar(duracao)
+            serie.consultas.observar(medicao.consultas)
+            serie.tempo_sql += medicao.tempo_sql
+            serie.bytes += medicao.bytes
+
+    def limpar(self):
+        with self._lock:
+            self._series.clear()
+
+    def serie(self, metodo: str, rota: str) -> Optional[SerieRota]:
+        return self._series.get((metodo, rota))
+
+    def exportar(self) -> str:
+        """Todas as séries no formato texto de exposição do Prometheus."""
+        with self._lock:
+            series = sorted(self._series.items())
+            linhas = []
+
+            _cabecalho(linhas, "http_requests_total", "counter", "Requisições HTTP por rota e status")
+            for (metodo, rota), serie in series:
+                for status, total in sorted(serie.por_status.items()):
+                    linhas.append(f"http_requests_total{_rotulos(metodo, rota, status=status)} {total}")
+
+            _cabecalho(linhas, "http_request_duration_seconds", "histogram", "Duração das requisições")
+            for (metodo, rota), serie in series:
+                _histograma(linhas, "http_request_duration_seconds", metodo, rota, serie.duracao)
+
+            _cabecalho(linhas, "http_request_sql_queries", "histogram", "Consultas SQL por requisição")
+            for (metodo, rota), serie in series:
+                _histograma(linhas, "http_request_sql_queries", metodo, rota, serie.consultas)
+
+            _cabecalho(linhas, "http_request_sql_seconds_total", "counter", "Tempo total em consultas SQL")
+            for (metodo, rota), serie in series:
+                linhas.append(f"http_request_sql_seconds_total{_rotulos(metodo, rota)} {_numero(serie.tempo_sql)}")
+
+            _cabecalho(linhas, "http_response_size_bytes_total", "counter", "Bytes enviados no corpo das respostas")
+            for (metodo, rota), serie in series:
+                linhas.append(f"http_response_size_bytes_total{_rotulos(metodo, rota)} {serie.bytes}")
+
+        return "\n".join(linhas) + "\n"
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(metodo: str, rota: str, **extras) -> str:
+    pares = {"method": metodo, "route": rota, **extras}
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares.items()) + "}"
+
+
+def _cabecalho(linhas: list, nome: str, tipo: str, descricao: str):
+    linhas.append(f"# HELP {nome} {descricao}")
+    linhas.append(f"# TYPE {nome} {tipo}")
+
+
+def _histograma(linhas: list, nome: str, metodo: str, rota: str, histograma: Histograma):
+    for limite, acumulado in histograma.acumulados():
+        linhas.append(f"{nome}_bucket{_rotulos(metodo, rota, le=limite)} {acumulado}")
+    linhas.append(f"{nome}_sum{_rotulos(metodo, rota)} {_numero(histograma.soma)}")
+    linhas.append(f"{nome}_count{_rotulos(metodo, rota)} {histograma.total}")
+
+
+metricas = RegistroMetricas()
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+def _apos_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consultas")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.consultas += 1
+        medicao.tempo_sql += duracao
+
+
+def _erro_na_consulta(contexto):
+    # Consulta com erro não passa por after_cursor_execute
+    conexao = contexto.connection
+    if conexao is not None and conexao.info.get("inicio_consultas"):
+        _apos_consulta(conexao, None, None, None, None, False)
+
+
+def instrumentar_engine(engine):
+    """Passa a contar consultas e tempo de SQL do engine na requisição em andamento."""
+    if not event.contains(engine, "before_cursor_execute", _antes_da_consulta):
+        event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+        event.listen(engine, "after_cursor_execute", _apos_consulta)
+        event.listen(engine, "handle_error", _erro_na_consulta)
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI: mede cada requisição e acrescenta o cabeçalho Server-Timing."""
+
+    def __init__(self, app, registro: RegistroMetricas = metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == CAMINHO_METRICAS:
+            await self.app(scope, receive, send)
+            return
+
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                MutableHeaders(scope=mensagem).append(
+                    "Server-Timing", medicao.server_timing(time.perf_counter() - inicio)
+                )
+            elif mensagem["type"] == "http.response.body":
+                medicao.bytes += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _medicao_atual.reset(token)
+            rota = getattr(scope.get("route"), "path", None) or SEM_ROTA
+            self.registro.registrar(scope["method"], rota, status, time.perf_counter() - inicio, medicao)
+
+
+def exportar_pools() -> str:
+    """Séries dos pools de conexões do banco (services/pool_banco.py)."""
+    from services.pool_banco import estado_pools, telemetrias
+
+    estados = estado_pools()
+    linhas = []
+    series = (
+        ("db_pool_size", "gauge", "tamanho", "Conexões fixas do pool"),
+        ("db_pool_max_overflow", "gauge", "max_overflow", "Conexões extras permitidas além do pool"),
+        ("db_pool_connections_in_use", "gauge", "em_uso", "Conexões retiradas do pool"),
+        ("db_pool_connections_idle", "gauge", "livres", "Conexões abertas e livres no pool"),
+        ("db_pool_checkouts_waiting", "gauge", "aguardando", "Checkouts aguardando uma conexão"),
+        ("db_pool_overflow_checkouts_total", "counter", "checkouts_overflow", "Checkouts atendidos além do pool fixo"),
+        ("db_pool_checkout_timeouts_total", "counter", "timeouts", "Checkouts que esgotaram o pool_timeout"),
+        ("db_pool_checkouts_rejected_total", "counter", "recusados", "Checkouts recusados com o pool saturado (503)"),
+    )
+    for nome, tipo, chave, descricao in series:
+        _cabecalho(linhas, nome, tipo, descricao)
+        for rotulo, estado in estados.items():
+            linhas.append(f'{nome}{{pool="{rotulo}"}} {estado[chave]}')
+
+    nome = "db_pool_checkout_wait_seconds"
+    _cabecalho(linhas, nome, "histogram", "Espera para obter uma conexão do pool")
+    for rotulo in estados:
+        histograma = telemetrias[rotulo].espera
+        for limite, acumulado in histograma.acumulados():
+            linhas.append(f'{nome}_bucket{{pool="{rotulo}",le="{limite}"}} {acumulado}')
+        linhas.append(f'{nome}_sum{{pool="{rotulo}"}} {_numero(histograma.soma)}')
+        linhas.append(f'{nome}_count{{pool="{rotulo}"}} {histograma.total}')
+
+    return "\n".join(linhas) + "\n"
+
+
+def resposta_metricas(request: Request) -> Response:
+    """Texto do Prometheus; 401 se METRICAS_TOKEN estiver definido e não vier no cabeçalho."""
+    if METRICAS_TOKEN:
+        recebido = request.headers.get("authorization", "")
+        if not hmac.compare_digest(recebido.encode(), f"Bearer {METRICAS_TOKEN}".encode()):
+            return PlainTextResponse("Não autorizado\n", status_code=401)
+    return PlainTextResponse(metricas.exportar() + exportar_pools(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,161 @@
+"""
+Armazenamento dos states do fluxo OAuth 2.0 (proteção CSRF do /login -> /callback).
+
+O state precisa ser visto por qualquer worker/instância que receba o callback,
+expirar sozinho e ser usado uma única vez. Dois backends:
+
+- memory:   LRU em memória do processo (apenas para 1 worker / desenvolvimento)
+- database: tabela `oauth_states` no banco configurado (SQLite ou PostgreSQL),
+            compartilhada entre workers do gunicorn e instâncias do App Service
+
+Configuração (variáveis de ambiente):
+    OAUTH_STATE_BACKEND      memory | database (padrão: database)
+    OAUTH_STATE_TTL_SECONDS  Validade de um state em segundos (padrão: 600)
+    OAUTH_STATE_MAX_SIZE     Máximo de states pendentes guardados (padrão: 10000)
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from database import SessionLocal
+from models.database_models import OAuthState
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryOAuthStateStore:
+    """
+    States em um OrderedDict (ordem de inserção = ordem de expiração).
+    Expira por TTL e descarta os mais antigos ao passar de max_size.
+    """
+
+    def __init__(self, ttl_seconds: int = 600, max_size: int = 10000):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_size = max_size
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, agora: datetime):
+        # Como o TTL é fixo, os expirados estão sempre no início
+        while self._states:
+            state, expires_at = next(iter(self._states.items()))
+            if expires_at > agora and len(self._states) <= self.max_size:
+                break
+            self._states.popitem(last=False)
+
+    def save(self, state: str):
+        agora = datetime.utcnow()
+        with self._lock:
+            self._states[state] = agora + self.ttl
+            self._states.move_to_end(state)
+            self._evict(agora)
+
+    def consume(self, state: str) -> bool:
+        """Remove o state e retorna True se ele existia e não estava expirado."""
+        with self._lock:
+            expires_at = self._states.pop(state, None)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            antes = len(self._states)
+            self._evict(datetime.utcnow())
+            return antes - len(self._states)
+
+    def __len__(self):
+        return len(self._states)
+
+
+class DatabaseOAuthStateStore:
+    """
+    States na tabela `oauth_states`. O consumo é um DELETE condicional, então
+    é atômico entre workers: apenas um callback consegue usar cada state.
+    """
+
+    def __init__(self, ttl_seconds: int = 600, max_size: int = 10000, session_factory=SessionLocal):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_size = max_size
+        self.session_factory = session_factory
+        self._tabela_verificada = False
+
+    def _garantir_tabela(self, db):
+        if not self._tabela_verificada:
+            OAuthState.__table__.create(bind=db.get_bind(), checkfirst=True)
+            self._tabela_verificada = True
+
+    def save(self, state: str):
+        agora = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            self._garantir_tabela(db)
+            db.query(OAuthState).filter(OAuthState.expires_at <= agora).delete(synchronize_session=False)
+            db.add(OAuthState(state=state, created_at=agora, expires_at=agora + self.ttl))
+            db.flush()
+
+            # Limitar o tamanho removendo os states mais antigos
+            excedente = db.query(OAuthState).count() - self.max_size
+            if excedente > 0:
+                mais_antigos = db.query(OAuthState.state).order_by(
+                    OAuthState.expires_at.asc()
+                ).limit(excedente).subquery()
+                db.query(OAuthState).filter(
+                    OAuthState.state.in_(db.query(mais_antigos.c.state))
+                ).delete(synchronize_session=False)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def consume(self, state: str) -> bool:
+        """Remove o state e retorna True se ele existia e não estava expirado."""
+        db = self.session_factory()
+        try:
+            self._garantir_tabela(db)
+            removidos = db.query(OAuthState).filter(
+                OAuthState.state == state,
+                OAuthState.expires_at > datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return removidos == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        db = self.session_factory()
+        try:
+            self._garantir_tabela(db)
+            removidos = db.query(OAuthState).filter(
+                OAuthState.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return removidos
+        finally:
+            db.close()
+
+
+def criar_oauth_state_store():
+    """
+    Cria o armazenamento de states conforme OAUTH_STATE_BACKEND.
+    """
+    backend = os.getenv("OAUTH_STATE_BACKEND", "database").lower()
+    ttl = int(os.getenv("OAUTH_STATE_TTL_SECONDS", "600"))
+    max_size = int(os.getenv("OAUTH_STATE_MAX_SIZE", "10000"))
+
+    if backend == "memory":
+        logger.info("OAuth state store: memory (single worker only)")
+        return MemoryOAuthStateStore(ttl_seconds=ttl, max_size=max_size)
+
+    if backend != "database":
+        logger.warning(f"OAUTH_STATE_BACKEND inválido: {backend}. Usando 'database'.")
+
+    logger.info("OAuth state store: database")
+    return DatabaseOAuthStateStore(ttl_seconds=ttl, max_size=max_size)
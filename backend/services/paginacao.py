@@ -0,0 +1,124 @@
+"""
+Paginação por cursor (keyset) e filtros comuns das listagens.
+
+Em vez de OFFSET, cada página continua a partir da chave da última linha
+retornada: `WHERE (ano, id) < (:ano, :id) ORDER BY ano DESC, id DESC LIMIT n`.
+O custo de cada página é o mesmo independente de quantos anos de histórico
+existem, e o ciclo atual (ano mais recente) vem sempre na primeira página.
+
+O cursor é opaco para o cliente (JSON em base64 url-safe) e vai no campo
+`next_cursor` da resposta; `next_cursor` nulo indica a última página.
+
+Configuração (variáveis de ambiente):
+    PAGINACAO_LIMITE_PADRAO   Itens por página quando `limit` não é informado (padrão: 100)
+    PAGINACAO_LIMITE_MAXIMO   Maior `limit` aceito (padrão: 500)
+"""
+
+import base64
+import binascii
+import json
+import os
+from enum import Enum
+from typing import Callable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+LIMITE_PADRAO = int(os.getenv("PAGINACAO_LIMITE_PADRAO", "100"))
+LIMITE_MAXIMO = int(os.getenv("PAGINACAO_LIMITE_MAXIMO", "500"))
+
+
+def codificar_cursor(chave: Sequence) -> str:
+    """Codifica a chave da última linha da página em um cursor opaco."""
+    bruto = json.dumps(list(chave), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(bruto).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str], tamanho: int) -> Optional[Tuple]:
+    """
+    Decodifica um cursor recebido do cliente.
+
+    Raises:
+        HTTPException 400 se o cursor for inválido ou de outra listagem
+    """
+    if not cursor:
+        return None
+
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        chave = json.loads(bruto)
+    except (binascii.Error, ValueError):
+        chave = None
+
+    if not isinstance(chave, list) or len(chave) != tamanho or not all(isinstance(v, int) for v in chave):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+    return tuple(chave)
+
+
+def normalizar_limite(limit: Optional[int]) -> int:
+    """Aplica o limite padrão e o teto de itens por página."""
+    if limit is None:
+        return LIMITE_PADRAO
+    if limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O parâmetro limit deve ser maior que zero"
+        )
+    return min(limit, LIMITE_MAXIMO)
+
+
+def converter_filtro(enum_cls: Type[Enum], valor: Optional[str], nome: str):
+    """
+    Converte o valor de um filtro de query string para o Enum correspondente.
+
+    Raises:
+        HTTPException 400 com os valores aceitos se o valor for inválido
+    """
+    if not valor:
+        return None
+    try:
+        return enum_cls(valor)
+    except ValueError:
+        aceitos = ", ".join(e.value for e in enum_cls)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{nome} inválido. Use: {aceitos}"
+        )
+
+
+def aplicar_keyset(query, colunas: Sequence, cursor: Optional[str], limite: int):
+    """
+    Ordena a consulta pela chave (decrescente), continua a partir do cursor e
+    busca uma linha a mais que o limite para saber se existe próxima página.
+
+    Args:
+        query: Consulta já filtrada
+        colunas: Colunas que formam a chave única, ex.: (Projeto.ano, Projeto.id)
+        cursor: Cursor recebido do cliente (ou None para a primeira página)
+        limite: Itens por página (já normalizado)
+    """
+    chave = decodificar_cursor(cursor, len(colunas))
+    if chave is not None:
+        if len(colunas) == 1:
+            query = query.filter(colunas[0] < chave[0])
+        else:
+            query = query.filter(tuple_(*colunas) < tuple_(*chave))
+
+    return query.order_by(*[coluna.desc() for coluna in colunas]).limit(limite + 1)
+
+
+def montar_pagina(linhas: List, limite: int, extrair_chave: Callable) -> Tuple[List, Optional[str]]:
+    """
+    Separa a página das linhas retornadas por `aplicar_keyset`.
+
+    Returns:
+        (linhas da página, next_cursor ou None se for a última página)
+    """
+    if len(linhas) <= limite:
+        return linhas, None
+
+    pagina = linhas[:limite]
+    return pagina, codificar_cursor(extrair_chave(pagina[-1]))
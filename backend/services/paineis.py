@@ -0,0 +1,363 @@
+"""
+Snapshots dos painéis do aluno e do orientador (uma requisição por página).
+
+O projeto, as entregas e as mensagens são carregados uma vez; linha do
+tempo, verificações de entrega, certificado e relatórios mensais são
+calculados em memória a partir deles. Os formatos são os mesmos das rotas
+individuais (que também usam as funções deste módulo), para que o frontend
+possa trocar várias chamadas por uma sem mudar o tratamento dos dados.
+
+Consultas por snapshot, independente do número de entregas e alunos:
+- aluno: usuário, inscrição, projeto (com orientador), entregas, mensagens
+- orientador: usuário, projetos (com alunos), entregas, mensagens, propostas pendentes
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from models.database_models import Usuario, Inscricao, Projeto, Entrega, StatusInscricao
+from services.configuracoes import obter_configuracoes
+from services.projecoes import agrupar_mensagens_por_entrega, certificado_para_dict
+
+# Entregas cujo envio o painel do aluno verifica (GET /alunos/{id}/verificar-entrega/{tipo})
+TIPOS_VERIFICADOS = ("relatorio_parcial", "apresentacao_amostra", "artigo_final")
+
+
+def _isoformat(valor):
+    return valor.isoformat() if valor else None
+
+
+def usuario_para_dict(usuario: Usuario) -> dict:
+    """Formato de GET /api/usuarios/{id}."""
+    return {
+        "id": usuario.id,
+        "email": usuario.email,
+        "nome": usuario.nome,
+        "cpf": usuario.cpf,
+        "telefone": usuario.telefone,
+        "tipo": usuario.tipo.value,
+        "status": usuario.status.value,
+        "curso": usuario.curso,
+        "unidade": usuario.unidade,
+        "matricula": usuario.matricula,
+        "cr": usuario.cr,
+        "documento_cr": usuario.documento_cr,
+        "departamento": usuario.departamento,
+        "area_pesquisa": usuario.area_pesquisa,
+        "titulacao": usuario.titulacao,
+        "vagas_disponiveis": usuario.vagas_disponiveis,
+        "data_cadastro": _isoformat(usuario.data_cadastro)
+    }
+
+
+def inscricao_do_usuario_para_dict(inscricao: Optional[Inscricao]) -> dict:
+    """Formato de GET /api/inscricoes/usuario/{id}."""
+    if not inscricao:
+        return {
+            "tem_proposta": False,
+            "message": "Usuário não possui proposta submetida"
+        }
+
+    return {
+        "tem_proposta": True,
+        "inscricao": {
+            "id": inscricao.id,
+            "usuario_id": inscricao.usuario_id,
+            "nome": inscricao.nome,
+            "email": inscricao.email,
+            "cpf": inscricao.cpf,
+            "telefone": inscricao.telefone,
+            "curso": inscricao.curso,
+            "matricula": inscricao.matricula,
+            "unidade": inscricao.unidade,
+            "cr": inscricao.cr,
+            "titulo_projeto": inscricao.titulo_projeto,
+            "area_conhecimento": inscricao.area_conhecimento,
+            "descricao": inscricao.descricao,
+            "objetivos": inscricao.objetivos,
+            "metodologia": inscricao.metodologia,
+            "resultados_esperados": inscricao.resultados_esperados,
+            "arquivo_projeto": inscricao.arquivo_projeto,
+            "status": inscricao.status.value,
+            "feedback": inscricao.feedback,
+            "feedback_orientador": inscricao.feedback_orientador,
+            "feedback_coordenador": inscricao.feedback_coordenador,
+            "status_aprovacao_orientador": inscricao.status_aprovacao_orientador,
+            "status_aprovacao_coordenador": inscricao.status_aprovacao_coordenador,
+            "data_submissao": _isoformat(inscricao.data_submissao),
+            "data_avaliacao_orientador": _isoformat(inscricao.data_avaliacao_orientador),
+            "data_avaliacao_coordenador": _isoformat(inscricao.data_avaliacao_coordenador),
+            "data_avaliacao": _isoformat(inscricao.data_avaliacao),
+            "orientador_nome": inscricao.orientador_nome,
+            "orientador_id": inscricao.orientador_id
+        }
+    }
+
+
+def proposta_pendente_para_dict(inscricao: Inscricao) -> dict:
+    """Formato de GET /api/inscricoes/orientador/{id}/pendentes."""
+    return {
+        "id": inscricao.id,
+        "usuario_id": inscricao.usuario_id,
+        "nome": inscricao.nome,
+        "email": inscricao.email,
+        "curso": inscricao.curso,
+        "titulo_projeto": inscricao.titulo_projeto,
+        "area_conhecimento": inscricao.area_conhecimento,
+        "descricao": inscricao.descricao,
+        "objetivos": inscricao.objetivos,
+        "metodologia": inscricao.metodologia,
+        "resultados_esperados": inscricao.resultados_esperados,
+        "arquivo_projeto": inscricao.arquivo_projeto,
+        "status": inscricao.status.value,
+        "data_submissao": _isoformat(inscricao.data_submissao)
+    }
+
+
+def projeto_detalhado_para_dict(projeto: Projeto) -> dict:
+    """Formato de GET /api/projetos/aluno/{id} (inclui apresentação e amostra)."""
+    return {
+        "id": projeto.id,
+        "aluno_id": projeto.aluno_id,
+        "orientador_id": projeto.orientador_id,
+        "titulo": projeto.titulo,
+        "area_conhecimento": projeto.area_conhecimento,
+        "descricao": projeto.descricao,
+        "etapa_atual": projeto.etapa_atual.value,
+        "apresentacao_data": projeto.apresentacao_data,
+        "apresentacao_hora": projeto.apresentacao_hora,
+        "apresentacao_campus": projeto.apresentacao_campus,
+        "apresentacao_sala": projeto.apresentacao_sala,
+        "status_apresentacao": projeto.status_apresentacao,
+        "feedback_apresentacao": projeto.feedback_apresentacao,
+        "data_avaliacao_apresentacao": _isoformat(projeto.data_avaliacao_apresentacao),
+        "amostra_data": projeto.amostra_data,
+        "amostra_hora": projeto.amostra_hora,
+        "amostra_campus": projeto.amostra_campus,
+        "amostra_sala": projeto.amostra_sala,
+        "status_amostra": projeto.status_amostra,
+    }
+
+
+def entrega_para_dict(entrega: Entrega) -> dict:
+    """Entrega com a situação das avaliações (formato das listagens de entregas)."""
+    return {
+        "id": entrega.id,
+        "tipo": entrega.tipo,
+        "titulo": entrega.titulo,
+        "descricao": entrega.descricao,
+        "arquivo": entrega.arquivo,
+        "data_entrega": _isoformat(entrega.data_entrega),
+        "prazo": _isoformat(entrega.prazo),
+        "projeto_id": entrega.projeto_id,
+        "status_aprovacao_orientador": entrega.status_aprovacao_orientador,
+        "status_aprovacao_coordenador": entrega.status_aprovacao_coordenador,
+        "feedback_orientador": entrega.feedback_orientador,
+        "feedback_coordenador": entrega.feedback_coordenador,
+        "data_avaliacao_orientador": _isoformat(entrega.data_avaliacao_orientador),
+        "data_avaliacao_coordenador": _isoformat(entrega.data_avaliacao_coordenador)
+    }
+
+
+def verificar_entrega(entregas: List[Entrega], tipo: str) -> dict:
+    """Formato de GET /api/alunos/{id}/verificar-entrega/{tipo}, a partir das entregas já carregadas."""
+    entrega = next((e for e in entregas if e.tipo == tipo), None)
+    if entrega is None:
+        return {"ja_enviou": False, "entrega": None}
+
+    dados = entrega_para_dict(entrega)
+    return {
+        "ja_enviou": True,
+        "entrega": {chave: dados[chave] for chave in (
+            "id", "titulo", "descricao", "arquivo", "data_entrega",
+            "status_aprovacao_orientador", "status_aprovacao_coordenador",
+            "feedback_orientador", "feedback_coordenador",
+            "data_avaliacao_orientador", "data_avaliacao_coordenador"
+        )}
+    }
+
+
+def _etapa_da_timeline(etapa_atual: str, entregas_por_tipo: Dict[str, Entrega], tipo: str, etapa: str) -> dict:
+    entrega = entregas_por_tipo.get(tipo)
+    return {
+        "concluida": tipo in entregas_por_tipo,
+        "atual": etapa_atual == etapa,
+        "entrega": {
+            "id": entrega.id,
+            "data": entrega.data_entrega.isoformat()
+        } if entrega else None
+    }
+
+
+def montar_timeline(projeto: Optional[Projeto], entregas: List[Entrega]) -> dict:
+    """
+    Formato de GET /api/alunos/{id}/timeline.
+
+    Args:
+        entregas: Entregas do aluno da mais recente para a mais antiga
+    """
+    if not projeto:
+        return {
+            "tem_projeto": False,
+            "message": "Aluno não possui projeto aprovado"
+        }
+
+    # Verificar quais etapas já foram cumpridas (a entrega mais recente de cada tipo)
+    entregas_por_tipo = {}
+    for entrega in entregas:
+        if entrega.tipo not in entregas_por_tipo:
+            entregas_por_tipo[entrega.tipo] = entrega
+
+    etapa_atual = projeto.etapa_atual.value
+    return {
+        "tem_projeto": True,
+        "projeto": {
+            "id": projeto.id,
+            "titulo": projeto.titulo,
+            "etapa_atual": etapa_atual,
+            "data_inicio": _isoformat(projeto.data_inicio)
+        },
+        "etapas": {
+            "inscricao": {
+                "concluida": True,
+                "data": _isoformat(projeto.data_inicio)
+            },
+            "desenvolvimento": {
+                "concluida": etapa_atual not in ['inscricao', 'desenvolvimento'],
+                "atual": etapa_atual == 'desenvolvimento'
+            },
+            "relatorio_parcial": _etapa_da_timeline(etapa_atual, entregas_por_tipo, 'relatorio_parcial', 'relatorio_parcial'),
+            "apresentacao": _etapa_da_timeline(etapa_atual, entregas_por_tipo, 'apresentacao', 'apresentacao'),
+            "artigo_final": _etapa_da_timeline(etapa_atual, entregas_por_tipo, 'artigo_final', 'relatorio_final'),
+            "concluido": {
+                "concluida": etapa_atual == 'concluido',
+                "atual": False
+            }
+        },
+        "total_entregas": len(entregas)
+    }
+
+
+def _mes_numero(titulo: Optional[str]) -> Optional[int]:
+    # Título no formato "Relatório Mensal - AAAA-MM"
+    if not titulo or "-" not in titulo:
+        return None
+    try:
+        return int(titulo.split(" - ")[-1].split("-")[-1])
+    except ValueError:
+        return None
+
+
+def relatorio_mensal_para_dict(relatorio: Entrega, mensagens: List[dict]) -> dict:
+    """Formato de GET /api/orientadores/{id}/alunos/{id}/relatorios-mensais."""
+    return {
+        "id": relatorio.id,
+        "titulo": relatorio.titulo,
+        "descricao": relatorio.descricao,
+        "arquivo": relatorio.arquivo,
+        "data_envio": _isoformat(relatorio.data_entrega),
+        "mes_numero": _mes_numero(relatorio.titulo),
+        "feedback_coordenador": relatorio.feedback_coordenador,
+        "data_feedback_coordenador": _isoformat(relatorio.data_avaliacao_coordenador),
+        "resposta_orientador": relatorio.feedback_orientador,
+        "data_resposta_orientador": _isoformat(relatorio.data_avaliacao_orientador),
+        "mensagens": mensagens
+    }
+
+
+def _relatorios_mensais(db: Session, entregas: List[Entrega]) -> Dict[int, List[dict]]:
+    """Relatórios mensais (com mensagens) agrupados por projeto, em uma consulta."""
+    relatorios = sorted((e for e in entregas if e.tipo == "relatorio_mensal"), key=lambda e: e.id)
+    mensagens = agrupar_mensagens_por_entrega(db, [r.id for r in relatorios])
+    por_projeto = {}
+    for relatorio in relatorios:
+        por_projeto.setdefault(relatorio.projeto_id, []).append(
+            relatorio_mensal_para_dict(relatorio, mensagens[relatorio.id])
+        )
+    return por_projeto
+
+
+def _mais_recentes_primeiro(entregas: List[Entrega]) -> List[Entrega]:
+    return sorted(entregas, key=lambda e: (e.data_entrega is not None, e.data_entrega, e.id), reverse=True)
+
+
+def montar_painel_aluno(db: Session, aluno: Usuario) -> dict:
+    """Tudo o que o painel do aluno precisa, com o projeto e as entregas lidos uma vez."""
+    inscricao = db.query(Inscricao).filter(
+        Inscricao.usuario_id == aluno.id
+    ).order_by(Inscricao.data_submissao.desc()).first()
+
+    projeto = db.query(Projeto).options(joinedload(Projeto.orientador)).filter(
+        Projeto.aluno_id == aluno.id
+    ).order_by(Projeto.id).first()
+
+    entregas = _mais_recentes_primeiro(db.query(Entrega).filter(Entrega.aluno_id == aluno.id).all())
+    do_projeto = [e for e in entregas if projeto and e.projeto_id == projeto.id]
+    orientador = projeto.orientador if projeto else None
+
+    return {
+        "usuario": usuario_para_dict(aluno),
+        "inscricoes_abertas": obter_configuracoes(db).inscricoes_abertas,
+        "inscricao": inscricao_do_usuario_para_dict(inscricao),
+        "projeto": {
+            **projeto_detalhado_para_dict(projeto),
+            "objetivos": projeto.objetivos,
+            "metodologia": projeto.metodologia,
+            "data_inicio": _isoformat(projeto.data_inicio),
+            "orientador": {
+                "id": orientador.id,
+                "nome": orientador.nome,
+                "email": orientador.email,
+                "departamento": orientador.departamento
+            } if orientador else None
+        } if projeto else None,
+        "entregas": [entrega_para_dict(e) for e in entregas],
+        "verificacoes": {tipo: verificar_entrega(entregas, tipo) for tipo in TIPOS_VERIFICADOS},
+        "timeline": montar_timeline(projeto, entregas),
+        "certificado": certificado_para_dict(projeto) if projeto else None,
+        "relatorios_mensais": _relatorios_mensais(db, do_projeto).get(projeto.id, []) if projeto else []
+    }
+
+
+def montar_painel_orientador(db: Session, orientador: Usuario) -> dict:
+    """Tudo o que o painel do orientador precisa: orientandos com entregas e relatórios, e propostas pendentes."""
+    projetos = db.query(Projeto).options(joinedload(Projeto.aluno)).filter(
+        Projeto.orientador_id == orientador.id
+    ).order_by(Projeto.ano.desc(), Projeto.id.desc()).all()
+
+    entregas_por_projeto = {projeto.id: [] for projeto in projetos}
+    if entregas_por_projeto:
+        for entrega in db.query(Entrega).filter(Entrega.projeto_id.in_(list(entregas_por_projeto))).all():
+            entregas_por_projeto[entrega.projeto_id].append(entrega)
+    todas = [entrega for entregas in entregas_por_projeto.values() for entrega in entregas]
+    relatorios = _relatorios_mensais(db, todas)
+
+    alunos = []
+    for projeto in projetos:
+        aluno = projeto.aluno
+        entregas = _mais_recentes_primeiro(entregas_por_projeto[projeto.id])
+        alunos.append({
+            "aluno_id": aluno.id,
+            "nome": aluno.nome,
+            "curso": aluno.curso,
+            "projeto_id": projeto.id,
+            "projeto_titulo": projeto.titulo,
+            "status": "ativo",
+            "etapa": projeto.etapa_atual.value,
+            "data_inicio": _isoformat(projeto.data_inicio),
+            "ano_projeto": projeto.ano,
+            "entregas": [entrega_para_dict(e) for e in entregas if e.tipo != "relatorio_mensal"],
+            "relatorios_mensais": relatorios.get(projeto.id, [])
+        })
+
+    pendentes = db.query(Inscricao).filter(
+        Inscricao.orientador_id == orientador.id,
+        Inscricao.status == StatusInscricao.pendente_orientador
+    ).order_by(Inscricao.id).all()
+
+    return {
+        "usuario": usuario_para_dict(orientador),
+        "alunos": alunos,
+        "propostas_pendentes": [proposta_pendente_para_dict(inscricao) for inscricao in pendentes]
+    }
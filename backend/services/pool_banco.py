@@ -0,0 +1,145 @@
+"""
+Pool de conexões do banco: telemetria e descarte de carga.
+
+- PoolMonitorado (QueuePool) mede cada checkout: tempo de espera por uma
+  conexão, conexões em uso, checkouts além do pool fixo (overflow) e
+  timeouts. As séries entram em GET /metrics (services/metricas.py)
+- Descarte de carga: com todas as conexões do worker em uso e a fila de
+  espera cheia, o checkout falha na hora com PoolSaturado em vez de esperar
+  o pool_timeout; a API responde 503 com Retry-After (main.py). Em um pico de
+  inscrições parte das requisições é recusada rápido e o cliente tenta de
+  novo, em vez de todas esperarem até o timeout
+
+O SQLAlchemy não tem evento antes do checkout, por isso a espera é medida
+em volta de Pool.connect().
+
+Configuração (variáveis de ambiente):
+    DB_POOL_FILA_MAXIMA   Checkouts esperando por worker antes de recusar
+                          (padrão: 0 = o número de conexões do worker)
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from services.metricas import Histograma
+
+logger = logging.getLogger(__name__)
+
+FILA_MAXIMA = int(os.getenv("DB_POOL_FILA_MAXIMA", "0"))
+
+LIMITES_ESPERA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolSaturado(PoolTimeoutError):
+    """Checkout recusado sem esperar: todas as conexões em uso e fila cheia."""
+
+
+class TelemetriaPool:
+    """Contadores de um pool (sobrevivem à recriação do pool no dispose)."""
+
+    def __init__(self):
+        self.espera = Histograma(LIMITES_ESPERA)
+        self.checkouts_overflow = 0
+        self.timeouts = 0
+        self.recusados = 0
+        self.aguardando = 0
+        self.pool = None  # weakref do pool atual
+        self._lock = threading.Lock()
+
+    def estado(self) -> dict:
+        pool = self.pool() if self.pool else None
+        if pool is None:
+            return {}
+        return {
+            "tamanho": pool.size(),
+            "max_overflow": pool.max_overflow,
+            "em_uso": pool.checkedout(),
+            "livres": pool.checkedin(),
+            "aguardando": self.aguardando,
+            "checkouts_overflow": self.checkouts_overflow,
+            "timeouts": self.timeouts,
+            "recusados": self.recusados,
+        }
+
+
+telemetrias: Dict[str, TelemetriaPool] = {"sync": TelemetriaPool(), "async": TelemetriaPool()}
+
+
+class _Monitoramento:
+    """Comportamento comum aos pools síncrono e assíncrono."""
+
+    rotulo = "sync"
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+        self.telemetria = telemetrias[self.rotulo]
+        self.telemetria.pool = weakref.ref(self)
+
+    def limite_conexoes(self) -> int:
+        return self.size() + max(self.max_overflow, 0)
+
+    def connect(self):
+        telemetria = self.telemetria
+        fila_maxima = FILA_MAXIMA or self.limite_conexoes()
+        with telemetria._lock:
+            if self.max_overflow >= 0 and self.checkedout() >= self.limite_conexoes() \
+                    and telemetria.aguardando >= fila_maxima:
+                telemetria.recusados += 1
+                raise PoolSaturado(
+                    f"Pool de conexões saturado: {self.checkedout()} em uso e "
+                    f"{telemetria.aguardando} aguardando"
+                )
+            telemetria.aguardando += 1
+
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except PoolTimeoutError:
+            with telemetria._lock:
+                telemetria.timeouts += 1
+            raise
+        finally:
+            with telemetria._lock:
+                telemetria.aguardando -= 1
+                telemetria.espera.observar(time.perf_counter() - inicio)
+
+        if self.checkedout() > self.size():
+            with telemetria._lock:
+                telemetria.checkouts_overflow += 1
+        return conexao
+
+
+class PoolMonitorado(_Monitoramento, QueuePool):
+    rotulo = "sync"
+
+
+class PoolMonitoradoAsync(_Monitoramento, AsyncAdaptedQueuePool):
+    rotulo = "async"
+
+
+def estado_pools() -> Dict[str, dict]:
+    """Estado atual dos pools em uso (para /api/health)."""
+    return {rotulo: estado for rotulo, telemetria in telemetrias.items() if (estado := telemetria.estado())}
+
+
+async def resposta_pool_esgotado(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """
+    Handler de exceção do app: sem conexão livre no pool (recusada na hora ou
+    após o pool_timeout), responde 503 com Retry-After em vez de erro 500.
+    """
+    logger.warning(f"Requisição recusada, pool de conexões esgotado: {request.method} {request.url.path} ({exc})")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado no momento. Tente novamente em alguns segundos."},
+        headers={"Retry-After": "2"}
+    )
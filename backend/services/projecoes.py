@@ -0,0 +1,435 @@
+"""
+Camada de leitura (projeções) para as listagens do sistema.
+
+As consultas deste módulo buscam apenas as colunas necessárias para montar
+as respostas da API, evitando carregar objetos ORM completos e, principalmente,
+evitando uma consulta extra por linha (problema N+1).
+"""
+
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from models.database_models import (
+    TipoUsuario,
+    Usuario,
+    Inscricao,
+    Projeto,
+    Entrega,
+    MensagemRelatorio,
+    StatusInscricao,
+    StatusUsuario,
+    EtapaProjeto
+)
+from services.paginacao import LIMITE_PADRAO, aplicar_keyset, montar_pagina
+from services.estatisticas import obter_estatisticas
+
+# Colunas de Inscricao expostas pela listagem geral (GET /api/inscricoes/)
+COLUNAS_INSCRICAO = (
+    Inscricao.id,
+    Inscricao.usuario_id,
+    Inscricao.nome,
+    Inscricao.email,
+    Inscricao.cpf,
+    Inscricao.telefone,
+    Inscricao.curso,
+    Inscricao.matricula,
+    Inscricao.unidade,
+    Inscricao.cr,
+    Inscricao.titulo_projeto,
+    Inscricao.area_conhecimento,
+    Inscricao.descricao,
+    Inscricao.objetivos,
+    Inscricao.metodologia,
+    Inscricao.resultados_esperados,
+    Inscricao.arquivo_projeto,
+    Inscricao.status,
+    Inscricao.data_submissao,
+    Inscricao.orientador_nome,
+    Inscricao.orientador_id,
+    Inscricao.feedback_orientador,
+    Inscricao.status_aprovacao_orientador,
+    Inscricao.data_avaliacao_orientador,
+    Inscricao.feedback_coordenador,
+    Inscricao.status_aprovacao_coordenador,
+    Inscricao.data_avaliacao_coordenador,
+    Inscricao.ano,
+)
+
+
+def _isoformat(valor):
+    return valor.isoformat() if valor else None
+
+
+def etapa_do_projeto():
+    """
+    Subconsulta correlacionada com a etapa do primeiro projeto da inscrição.
+
+    Usar uma subconsulta (em vez de JOIN) garante uma linha por inscrição, o
+    que mantém a paginação por cursor exata.
+    """
+    return (
+        select(Projeto.etapa_atual)
+        .where(Projeto.inscricao_id == Inscricao.id)
+        .order_by(Projeto.id)
+        .limit(1)
+        .correlate(Inscricao)
+        .scalar_subquery()
+    )
+
+
+def consultar_inscricoes_com_etapa(
+    db: Session,
+    status: Optional[StatusInscricao] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None
+):
+    """
+    Monta a consulta de inscrições já com a etapa do projeto associado.
+
+    Usa um único SELECT, retornando apenas colunas (sem instanciar objetos ORM).
+    """
+    etapa_projeto = etapa_do_projeto()
+    query = db.query(*COLUNAS_INSCRICAO, etapa_projeto.label("etapa_projeto"))
+    return query.filter(*filtros_inscricoes(etapa_projeto, status, ano, etapa))
+
+
+def filtros_inscricoes(
+    etapa_projeto,
+    status: Optional[StatusInscricao] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None
+) -> list:
+    """
+    Condições WHERE dos filtros de inscrições (status, ano e etapa do projeto).
+
+    Args:
+        etapa_projeto: Expressão com a etapa do projeto (ver etapa_do_projeto)
+    """
+    filtros = []
+    if status is not None:
+        filtros.append(Inscricao.status == status)
+    if ano is not None:
+        filtros.append(Inscricao.ano == ano)
+    if etapa is not None:
+        if etapa == EtapaProjeto.envio_proposta:
+            # Inscrições sem projeto também estão na etapa envio_proposta
+            filtros.append(or_(etapa_projeto == etapa, etapa_projeto.is_(None)))
+        else:
+            filtros.append(etapa_projeto == etapa)
+    return filtros
+
+
+def inscricao_para_dict(linha) -> dict:
+    """
+    Converte uma linha da projeção de inscrições no formato de resposta da API.
+    """
+    # Inscrições sem projeto (pendentes ou em análise) são consideradas na etapa envio_proposta
+    etapa = linha.etapa_projeto.value if linha.etapa_projeto else EtapaProjeto.envio_proposta.value
+
+    return {
+        "id": linha.id,
+        "usuario_id": linha.usuario_id,
+        "nome": linha.nome,
+        "email": linha.email,
+        "cpf": linha.cpf,
+        "telefone": linha.telefone,
+        "curso": linha.curso,
+        "matricula": linha.matricula,
+        "unidade": linha.unidade,
+        "cr": linha.cr,
+        "titulo_projeto": linha.titulo_projeto,
+        "area_conhecimento": linha.area_conhecimento,
+        "descricao": linha.descricao,
+        "objetivos": linha.objetivos,
+        "metodologia": linha.metodologia,
+        "resultados_esperados": linha.resultados_esperados,
+        "arquivo_projeto": linha.arquivo_projeto,
+        "status": linha.status.value,
+        "data_submissao": _isoformat(linha.data_submissao),
+        "orientador_nome": linha.orientador_nome,
+        "orientador_id": linha.orientador_id,
+        "feedback_orientador": linha.feedback_orientador,
+        "status_aprovacao_orientador": linha.status_aprovacao_orientador,
+        "data_avaliacao_orientador": _isoformat(linha.data_avaliacao_orientador),
+        "feedback_coordenador": linha.feedback_coordenador,
+        "status_aprovacao_coordenador": linha.status_aprovacao_coordenador,
+        "data_avaliacao_coordenador": _isoformat(linha.data_avaliacao_coordenador),
+        "etapa": etapa,
+        "ano": linha.ano
+    }
+
+
+def selecionar_pagina_inscricoes(
+    status: Optional[StatusInscricao] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None,
+    cursor: Optional[str] = None,
+    limite: int = LIMITE_PADRAO
+):
+    """
+    SELECT de uma página de inscrições com a etapa do projeto (mesma consulta
+    de consultar_inscricoes_com_etapa), executável por Session e AsyncSession.
+    """
+    etapa_projeto = etapa_do_projeto()
+    consulta = select(*COLUNAS_INSCRICAO, etapa_projeto.label("etapa_projeto")).where(
+        *filtros_inscricoes(etapa_projeto, status, ano, etapa)
+    )
+    return aplicar_keyset(consulta, (Inscricao.ano, Inscricao.id), cursor, limite)
+
+
+def _pagina_de_inscricoes(linhas, limite: int) -> Tuple[List[dict], Optional[str]]:
+    linhas, next_cursor = montar_pagina(linhas, limite, lambda linha: (linha.ano, linha.id))
+    return [inscricao_para_dict(linha) for linha in linhas], next_cursor
+
+
+def listar_inscricoes_com_etapa(
+    db: Session,
+    status: Optional[StatusInscricao] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None,
+    cursor: Optional[str] = None,
+    limite: int = LIMITE_PADRAO
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Lista uma página de inscrições (mais recentes primeiro) com a etapa do
+    projeto em uma única ida ao banco.
+
+    Returns:
+        (inscrições da página, next_cursor)
+    """
+    consulta = selecionar_pagina_inscricoes(status, ano, etapa, cursor, limite)
+    return _pagina_de_inscricoes(db.execute(consulta).all(), limite)
+
+
+async def listar_inscricoes_com_etapa_async(
+    db: AsyncSession,
+    status: Optional[StatusInscricao] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None,
+    cursor: Optional[str] = None,
+    limite: int = LIMITE_PADRAO
+) -> Tuple[List[dict], Optional[str]]:
+    """Versão de listar_inscricoes_com_etapa para AsyncSession (get_async_db)."""
+    consulta = selecionar_pagina_inscricoes(status, ano, etapa, cursor, limite)
+    resultado = await db.execute(consulta)
+    return _pagina_de_inscricoes(resultado.all(), limite)
+
+
+def agrupar_mensagens_por_entrega(db: Session, entrega_ids) -> dict:
+    """
+    Busca as mensagens de várias entregas em uma única consulta e agrupa por entrega_id.
+
+    Returns:
+        Dict {entrega_id: [mensagens em ordem cronológica]}
+    """
+    mensagens_por_entrega = {entrega_id: [] for entrega_id in entrega_ids}
+    if not mensagens_por_entrega:
+        return mensagens_por_entrega
+
+    mensagens = db.query(MensagemRelatorio).filter(
+        MensagemRelatorio.entrega_id.in_(list(mensagens_por_entrega))
+    ).order_by(MensagemRelatorio.data_criacao.asc(), MensagemRelatorio.id.asc()).all()
+
+    for msg in mensagens:
+        mensagens_por_entrega[msg.entrega_id].append({
+            "id": msg.id,
+            "mensagem": msg.mensagem,
+            "tipo_usuario": msg.tipo_usuario,
+            "usuario_id": msg.usuario_id,
+            "data_criacao": _isoformat(msg.data_criacao)
+        })
+
+    return mensagens_por_entrega
+
+
+def listar_projetos_com_alunos(
+    db: Session,
+    orientador_id: Optional[int] = None,
+    ano: Optional[int] = None,
+    etapa: Optional[EtapaProjeto] = None,
+    status_aluno: Optional[StatusUsuario] = None,
+    cursor: Optional[str] = None,
+    limite: int = LIMITE_PADRAO
+) -> Tuple[List[Projeto], Optional[str]]:
+    """
+    Busca uma página de projetos (mais recentes primeiro) já com aluno e
+    orientador carregados no mesmo SELECT.
+
+    Returns:
+        (projetos da página, next_cursor)
+    """
+    query = db.query(Projeto).options(
+        joinedload(Projeto.aluno),
+        joinedload(Projeto.orientador)
+    )
+
+    if orientador_id is not None:
+        query = query.filter(Projeto.orientador_id == orientador_id)
+    if ano is not None:
+        query = query.filter(Projeto.ano == ano)
+    if etapa is not None:
+        query = query.filter(Projeto.etapa_atual == etapa)
+    if status_aluno is not None:
+        query = query.filter(Projeto.aluno.has(Usuario.status == status_aluno))
+
+    query = aplicar_keyset(query, (Projeto.ano, Projeto.id), cursor, limite)
+    return montar_pagina(query.all(), limite, lambda projeto: (projeto.ano, projeto.id))
+
+
+def extrair_mes_relatorio(titulo: Optional[str]) -> str:
+    """
+    Extrai o mês (AAAA-MM) do título de um relatório mensal ("Relatório Mensal - AAAA-MM").
+    """
+    if not titulo:
+        return "N/A"
+
+    match = re.search(r'(\d{4}-\d{2})', titulo)
+    if match:
+        return match.group(1)
+    if "Relatório Mensal - " in titulo:
+        return titulo.replace("Relatório Mensal - ", "").strip()
+    return "N/A"
+
+
+def listar_relatorios_mensais_por_orientador(db: Session, orientador_id: int) -> List[dict]:
+    """
+    Lista os relatórios mensais (entregas do tipo relatorio_mensal) de todos os
+    alunos de um orientador, com as mensagens de cada relatório.
+
+    Executa um número constante de consultas: projetos com alunos, relatórios
+    e mensagens, independente da quantidade de alunos e relatórios.
+    """
+    projetos = db.query(Projeto).options(
+        joinedload(Projeto.aluno)
+    ).filter(Projeto.orientador_id == orientador_id).order_by(Projeto.id).all()
+
+    if not projetos:
+        return []
+
+    projetos_por_id = {projeto.id: projeto for projeto in projetos}
+
+    relatorios = db.query(Entrega).filter(
+        Entrega.projeto_id.in_(list(projetos_por_id)),
+        Entrega.tipo == "relatorio_mensal"
+    ).order_by(Entrega.projeto_id, Entrega.id).all()
+
+    mensagens_por_relatorio = agrupar_mensagens_por_entrega(db, [r.id for r in relatorios])
+
+    relatorios_list = []
+    for relatorio in relatorios:
+        projeto = projetos_por_id[relatorio.projeto_id]
+        relatorios_list.append({
+            "id": relatorio.id,
+            "mes": extrair_mes_relatorio(relatorio.titulo),
+            "descricao": relatorio.descricao,
+            "arquivo_url": relatorio.arquivo,
+            "data_envio": _isoformat(relatorio.data_entrega),
+            "feedback_coordenador": relatorio.feedback_coordenador,
+            "data_feedback_coordenador": _isoformat(relatorio.data_avaliacao_coordenador),
+            "resposta_orientador": relatorio.feedback_orientador,
+            "data_resposta_orientador": _isoformat(relatorio.data_avaliacao_orientador),
+            "mensagens": mensagens_por_relatorio[relatorio.id],
+            "aluno_id": projeto.aluno_id,
+            "aluno_nome": projeto.aluno.nome if projeto.aluno else None,
+            "projeto_id": projeto.id,
+            "projeto_titulo": projeto.titulo
+        })
+
+    return relatorios_list
+
+
+def orientador_para_dict(orientador: Usuario) -> dict:
+    """Formato de orientador da lista de orientadores ativos (GET /api/orientadores)."""
+    return {
+        "id": orientador.id,
+        "nome": orientador.nome,
+        "email": orientador.email,
+        "departamento": orientador.departamento,
+        "area_pesquisa": orientador.area_pesquisa,
+        "titulacao": orientador.titulacao,
+        "vagas_disponiveis": orientador.vagas_disponiveis or 0
+    }
+
+
+def listar_orientadores_ativos(db: Session) -> List[dict]:
+    orientadores = db.query(Usuario).filter(
+        Usuario.tipo == TipoUsuario.orientador,
+        Usuario.status == StatusUsuario.ativo
+    ).order_by(Usuario.id).all()
+    return [orientador_para_dict(orientador) for orientador in orientadores]
+
+
+def aluno_do_projeto_para_dict(projeto: Projeto) -> dict:
+    """
+    Formato de aluno da visão do coordenador (GET /api/coordenadores/alunos).
+    Requer aluno e orientador já carregados (ver listar_projetos_com_alunos).
+    """
+    aluno = projeto.aluno
+    orientador = projeto.orientador
+    return {
+        "aluno_id": aluno.id,
+        "nome": aluno.nome,
+        "curso": aluno.curso,
+        "projeto_id": projeto.id,
+        "projeto_titulo": projeto.titulo,
+        "orientador_id": orientador.id if orientador else None,
+        "orientador_nome": orientador.nome if orientador else None,
+        "etapa": projeto.etapa_atual.value,
+        "data_inicio": _isoformat(projeto.data_inicio),
+        "ano_projeto": projeto.ano
+    }
+
+
+def certificado_para_dict(projeto: Projeto) -> dict:
+    """Situação do certificado (GET /api/coordenadores/projetos/{id}/certificado)."""
+    return {
+        "projeto_id": projeto.id,
+        "tem_certificado": projeto.certificado_arquivo is not None,
+        "certificado_arquivo": projeto.certificado_arquivo,
+        "data_emissao": _isoformat(projeto.certificado_data_emissao)
+    }
+
+
+def montar_dashboard_coordenador(db: Session, ano: Optional[int] = None) -> dict:
+    """
+    Dados do painel do coordenador em uma resposta: inscrições (com etapa),
+    orientadores ativos, alunos com a situação do certificado e totais.
+
+    Quatro consultas (inscrições, orientadores, projetos com aluno e
+    orientador, contadores pré-calculados), independente da quantidade de alunos.
+    """
+    linhas = consultar_inscricoes_com_etapa(db, ano=ano).order_by(
+        Inscricao.ano.desc(), Inscricao.id.desc()
+    ).all()
+    inscricoes = [inscricao_para_dict(linha) for linha in linhas]
+
+    query = db.query(Projeto).options(joinedload(Projeto.aluno), joinedload(Projeto.orientador))
+    if ano is not None:
+        query = query.filter(Projeto.ano == ano)
+    projetos = query.order_by(Projeto.ano.desc(), Projeto.id.desc()).all()
+    alunos = [
+        {**aluno_do_projeto_para_dict(projeto), **certificado_para_dict(projeto)}
+        for projeto in projetos if projeto.aluno is not None
+    ]
+
+    estatisticas = obter_estatisticas(db, ano)
+    concluidos = [aluno for aluno in alunos if aluno["etapa"] == EtapaProjeto.concluido.value]
+
+    return {
+        "ano": ano,
+        "inscricoes": inscricoes,
+        "orientadores": listar_orientadores_ativos(db),
+        "alunos": alunos,
+        "resumo": {
+            "total_inscricoes": sum(estatisticas["inscricoes_por_status"].values()),
+            "inscricoes_por_status": estatisticas["inscricoes_por_status"],
+            "total_alunos": sum(estatisticas["projetos_por_etapa"].values()),
+            "alunos_por_etapa": estatisticas["projetos_por_etapa"],
+            "pendentes_por_orientador": estatisticas["pendentes_por_orientador"],
+            "alunos_concluidos": len(concluidos),
+            "certificados_emitidos": sum(1 for aluno in concluidos if aluno["tem_certificado"]),
+            "certificados_pendentes": sum(1 for aluno in concluidos if not aluno["tem_certificado"]),
+        }
+    }
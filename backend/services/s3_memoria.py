@@ -0,0 +1,185 @@
+"""
+Cliente S3 em memória, com a mesma interface (subconjunto) do cliente boto3.
+
+Usado nos testes para exercitar S3Storage sem rede nem credenciais:
+    S3Storage(bucket="teste", client=ClienteS3Memoria())
+
+Reproduz as regras do S3 que importam para o backend: chaves inexistentes
+geram erro com código "NoSuchKey"/"404", listagem paginada (MaxKeys /
+ContinuationToken), Range em get_object e, no multipart upload, partes
+(exceto a última) de no mínimo 5MB.
+"""
+
+import hashlib
+import io
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict
+
+
+class ErroS3(Exception):
+    """Equivalente ao botocore.exceptions.ClientError (atributo `response`)."""
+
+    def __init__(self, codigo: str, mensagem: str = ""):
+        super().__init__(f"{codigo}: {mensagem}")
+        self.response = {"Error": {"Code": codigo, "Message": mensagem}}
+
+
+class CorpoS3(io.BytesIO):
+    """Equivalente ao StreamingBody do botocore."""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while True:
+            bloco = self.read(chunk_size)
+            if not bloco:
+                break
+            yield bloco
+
+
+class ClienteS3Memoria:
+    PARTE_MINIMA = 5 * 1024 * 1024
+
+    def __init__(self, max_keys: int = 1000):
+        self.objetos: Dict[tuple, dict] = {}
+        self.uploads: Dict[str, dict] = {}
+        self.max_keys = max_keys
+        self.chamadas = []  # Nome de cada operação executada, para asserts nos testes
+        self._lock = threading.Lock()
+
+    def _registrar(self, operacao: str):
+        self.chamadas.append(operacao)
+
+    def _objeto(self, bucket: str, key: str) -> dict:
+        objeto = self.objetos.get((bucket, key))
+        if objeto is None:
+            raise ErroS3("NoSuchKey", key)
+        return objeto
+
+    def _gravar(self, bucket: str, key: str, conteudo: bytes, content_type=None):
+        with self._lock:
+            self.objetos[(bucket, key)] = {
+                "conteudo": conteudo,
+                "etag": f'"{hashlib.md5(conteudo).hexdigest()}"',
+                "modificado": datetime.now(timezone.utc),
+                "content_type": content_type or "binary/octet-stream",
+            }
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, **kwargs):
+        self._registrar("put_object")
+        conteudo = Body if isinstance(Body, bytes) else Body.read()
+        self._gravar(Bucket, Key, conteudo, ContentType)
+        return {"ETag": self.objetos[(Bucket, Key)]["etag"]}
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self._registrar("get_object")
+        objeto = self._objeto(Bucket, Key)
+        conteudo = objeto["conteudo"]
+        if Range:
+            inicio, _, fim = Range.removeprefix("bytes=").partition("-")
+            fim = int(fim) if fim else len(conteudo) - 1
+            conteudo = conteudo[int(inicio):fim + 1]
+        return {
+            "Body": CorpoS3(conteudo),
+            "ContentLength": len(conteudo),
+            "ETag": objeto["etag"],
+            "LastModified": objeto["modificado"],
+            "ContentType": objeto["content_type"],
+        }
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._registrar("head_object")
+        objeto = self.objetos.get((Bucket, Key))
+        if objeto is None:
+            raise ErroS3("404", "Not Found")
+        return {
+            "ContentLength": len(objeto["conteudo"]),
+            "ETag": objeto["etag"],
+            "LastModified": objeto["modificado"],
+            "ContentType": objeto["content_type"],
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._registrar("delete_object")
+        with self._lock:
+            self.objetos.pop((Bucket, Key), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None, MaxKeys=None, **kwargs):
+        self._registrar("list_objects_v2")
+        max_keys = MaxKeys or self.max_keys
+        chaves = sorted(k for b, k in self.objetos if b == Bucket and k.startswith(Prefix))
+        if ContinuationToken:
+            chaves = [k for k in chaves if k > ContinuationToken]
+
+        pagina = chaves[:max_keys]
+        resposta = {
+            "Contents": [
+                {
+                    "Key": k,
+                    "Size": len(self.objetos[(Bucket, k)]["conteudo"]),
+                    "LastModified": self.objetos[(Bucket, k)]["modificado"],
+                    "ETag": self.objetos[(Bucket, k)]["etag"],
+                }
+                for k in pagina
+            ],
+            "KeyCount": len(pagina),
+            "IsTruncated": len(chaves) > max_keys,
+        }
+        if resposta["IsTruncated"]:
+            resposta["NextContinuationToken"] = pagina[-1]
+        return resposta
+
+    # ----- Multipart upload -----
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, **kwargs):
+        self._registrar("create_multipart_upload")
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {"bucket": Bucket, "key": Key, "partes": {}, "content_type": ContentType}
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def _upload(self, UploadId) -> dict:
+        upload = self.uploads.get(UploadId)
+        if upload is None:
+            raise ErroS3("NoSuchUpload", UploadId)
+        return upload
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._registrar("upload_part")
+        conteudo = Body if isinstance(Body, bytes) else Body.read()
+        etag = f'"{hashlib.md5(conteudo).hexdigest()}"'
+        self._upload(UploadId)["partes"][PartNumber] = (etag, conteudo)
+        return {"ETag": etag}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._registrar("complete_multipart_upload")
+        upload = self._upload(UploadId)
+        partes = MultipartUpload["Parts"]
+        numeros = [p["PartNumber"] for p in partes]
+        if numeros != sorted(numeros):
+            raise ErroS3("InvalidPartOrder")
+
+        conteudo = []
+        for indice, parte in enumerate(partes):
+            etag, dados = upload["partes"].get(parte["PartNumber"], (None, None))
+            if etag is None or etag != parte["ETag"]:
+                raise ErroS3("InvalidPart", str(parte["PartNumber"]))
+            if indice < len(partes) - 1 and len(dados) < self.PARTE_MINIMA:
+                raise ErroS3("EntityTooSmall", str(parte["PartNumber"]))
+            conteudo.append(dados)
+
+        del self.uploads[UploadId]
+        self._gravar(Bucket, Key, b"".join(conteudo), upload["content_type"])
+        return {"Bucket": Bucket, "Key": Key, "ETag": self.objetos[(Bucket, Key)]["etag"]}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._registrar("abort_multipart_upload")
+        self.uploads.pop(UploadId, None)
+        return {}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn=3600, **kwargs):
+        self._registrar("generate_presigned_url")
+        url = f"https://{Params['Bucket']}.s3.memoria/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+        if "ResponseContentDisposition" in Params:
+            url += "&response-content-disposition=" + Params["ResponseContentDisposition"]
+        return url
@@ -0,0 +1,341 @@
+"""
+Abstração de armazenamento de arquivos (put / get / stream / delete / presign).
+
+Backends:
+- LocalStorage: diretório local (settings.UPLOAD_DIR). Padrão; serve para
+  desenvolvimento e para uma única instância
+- S3Storage: bucket S3 ou compatível (MinIO, etc.), compartilhado entre todas as
+  instâncias do App Service. Arquivos grandes são enviados em multipart upload
+  e downloads podem ser feitos direto do bucket via URL pré-assinada
+
+As chaves são caminhos relativos com "/" (ex.: "blobs/ab/cd/<sha256>").
+Todos os métodos são síncronos; chamar de rotas síncronas (def), que rodam no
+threadpool, ou via run_in_threadpool em código assíncrono.
+
+Configuração (variáveis de ambiente):
+    STORAGE_BACKEND                local (padrão) ou s3
+    UPLOAD_DIR                     Diretório do backend local (padrão: uploads)
+    AWS_BUCKET_NAME, AWS_REGION    Bucket do backend s3 (credenciais AWS_* padrão do boto3)
+    S3_ENDPOINT_URL                Endpoint de serviço compatível com S3 (opcional)
+    S3_PREFIX                      Prefixo das chaves dentro do bucket (opcional)
+    STORAGE_MULTIPART_THRESHOLD    Tamanho a partir do qual usa multipart (padrão: 8MB)
+"""
+
+import os
+import tempfile
+import threading
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO = 1024 * 1024  # 1MB
+PARTE_MINIMA_S3 = 5 * 1024 * 1024  # Limite do S3 para partes de multipart (exceto a última)
+
+
+@dataclass(frozen=True)
+class InfoArquivo:
+    chave: str
+    tamanho: int
+    modificado_em: float  # timestamp (segundos)
+
+
+class ArquivoNaoEncontrado(Exception):
+    """A chave não existe no armazenamento."""
+
+
+class StorageBackend(ABC):
+    """Interface comum dos backends de armazenamento."""
+
+    @abstractmethod
+    def diretorio_temporario(self) -> Path:
+        """Onde gravar uploads antes de `put_arquivo` (mesmo disco no backend local)."""
+
+    @abstractmethod
+    def put_arquivo(self, origem: Path, chave: str, content_type: Optional[str] = None):
+        """Armazena o arquivo local `origem` em `chave`, consumindo (removendo) a origem."""
+
+    @abstractmethod
+    def put(self, chave: str, conteudo: bytes, content_type: Optional[str] = None):
+        """Armazena `conteudo` em `chave`, substituindo o que houver."""
+
+    def get(self, chave: str) -> bytes:
+        return b"".join(self.stream(chave))
+
+    @abstractmethod
+    def stream(self, chave: str, tamanho_bloco: int = TAMANHO_BLOCO, inicio: int = 0, fim: Optional[int] = None) -> Iterator[bytes]:
+        """Lê o conteúdo em blocos; `inicio`/`fim` (inclusivo) limitam a um intervalo de bytes."""
+
+    @abstractmethod
+    def info(self, chave: str) -> Optional[InfoArquivo]:
+        """Tamanho e data de modificação, ou None se a chave não existir."""
+
+    @abstractmethod
+    def delete(self, chave: str):
+        """Remove a chave; não falha se ela não existir."""
+
+    @abstractmethod
+    def listar(self, prefixo: str = "") -> Iterator[InfoArquivo]:
+        """Arquivos cujas chaves começam com `prefixo`."""
+
+    def presign(self, chave: str, expira_em: int = 300, nome_download: Optional[str] = None) -> Optional[str]:
+        """URL temporária para download direto, ou None se o backend não oferece."""
+        return None
+
+    def caminho_local(self, chave: str) -> Optional[Path]:
+        """Caminho em disco, se o arquivo estiver em um diretório local."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Arquivos em um diretório local."""
+
+    def __init__(self, raiz: Optional[str] = None):
+        self.raiz = Path(raiz or settings.UPLOAD_DIR)
+
+    def _caminho(self, chave: str) -> Path:
+        partes = [p for p in chave.split("/") if p not in ("", ".", "..")]
+        return self.raiz.joinpath(*partes)
+
+    def diretorio_temporario(self) -> Path:
+        return self.raiz / "tmp"
+
+    def put_arquivo(self, origem: Path, chave: str, content_type: Optional[str] = None):
+        destino = self._caminho(chave)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(origem, destino)
+
+    def put(self, chave: str, conteudo: bytes, content_type: Optional[str] = None):
+        destino = self._caminho(chave)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_name(f".{destino.name}.{os.getpid()}.{threading.get_ident()}.part")
+        temporario.write_bytes(conteudo)
+        os.replace(temporario, destino)
+
+    def stream(self, chave: str, tamanho_bloco: int = TAMANHO_BLOCO, inicio: int = 0, fim: Optional[int] = None) -> Iterator[bytes]:
+        caminho = self._caminho(chave)
+        try:
+            arquivo = open(caminho, "rb")
+        except FileNotFoundError:
+            raise ArquivoNaoEncontrado(chave)
+
+        def gerar():
+            with arquivo:
+                arquivo.seek(inicio)
+                restante = None if fim is None else fim - inicio + 1
+                while restante is None or restante > 0:
+                    bloco = arquivo.read(tamanho_bloco if restante is None else min(tamanho_bloco, restante))
+                    if not bloco:
+                        break
+                    if restante is not None:
+                        restante -= len(bloco)
+                    yield bloco
+
+        return gerar()
+
+    def info(self, chave: str) -> Optional[InfoArquivo]:
+        try:
+            stat = self._caminho(chave).stat()
+        except FileNotFoundError:
+            return None
+        return InfoArquivo(chave, stat.st_size, stat.st_mtime)
+
+    def delete(self, chave: str):
+        self._caminho(chave).unlink(missing_ok=True)
+
+    def listar(self, prefixo: str = "") -> Iterator[InfoArquivo]:
+        base = self._caminho(prefixo)
+        if not base.exists():
+            return
+        for caminho in base.rglob("*"):
+            if caminho.is_file():
+                stat = caminho.stat()
+                yield InfoArquivo(caminho.relative_to(self.raiz).as_posix(), stat.st_size, stat.st_mtime)
+
+    def caminho_local(self, chave: str) -> Optional[Path]:
+        caminho = self._caminho(chave)
+        return caminho if caminho.is_file() else None
+
+
+class S3Storage(StorageBackend):
+    """
+    Arquivos em um bucket S3 (ou compatível).
+
+    `client` permite injetar um cliente com a mesma interface do boto3
+    (ex.: o fake em memória de services/s3_memoria.py nos testes).
+    """
+
+    def __init__(
+        self,
+        bucket: Optional[str] = None,
+        client=None,
+        prefixo: Optional[str] = None,
+        limite_multipart: Optional[int] = None,
+        tamanho_parte: Optional[int] = None
+    ):
+        self.bucket = bucket or settings.AWS_BUCKET_NAME
+        self.prefixo = (prefixo if prefixo is not None else settings.S3_PREFIX).strip("/")
+        self.limite_multipart = limite_multipart or int(os.getenv("STORAGE_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+        self.tamanho_parte = max(tamanho_parte or self.limite_multipart, PARTE_MINIMA_S3)
+        self._client = client
+        self._lock = threading.Lock()
+
+        if not self.bucket:
+            raise ValueError("AWS_BUCKET_NAME é obrigatório com STORAGE_BACKEND=s3")
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    try:
+                        import boto3
+                    except ImportError:
+                        raise RuntimeError("STORAGE_BACKEND=s3 requer o pacote boto3 (pip install boto3)")
+                    self._client = boto3.client(
+                        "s3",
+                        region_name=settings.AWS_REGION,
+                        endpoint_url=settings.S3_ENDPOINT_URL or None
+                    )
+        return self._client
+
+    def _chave(self, chave: str) -> str:
+        chave = chave.strip("/")
+        return f"{self.prefixo}/{chave}" if self.prefixo else chave
+
+    def _chave_relativa(self, chave_s3: str) -> str:
+        return chave_s3[len(self.prefixo) + 1:] if self.prefixo else chave_s3
+
+    @staticmethod
+    def _nao_encontrado(erro) -> bool:
+        codigo = getattr(erro, "response", {}).get("Error", {}).get("Code")
+        return codigo in ("404", "NoSuchKey", "NotFound")
+
+    def diretorio_temporario(self) -> Path:
+        return Path(tempfile.gettempdir()) / "pict_uploads"
+
+    def put(self, chave: str, conteudo: bytes, content_type: Optional[str] = None):
+        extras = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self._chave(chave), Body=conteudo, **extras)
+
+    def put_arquivo(self, origem: Path, chave: str, content_type: Optional[str] = None):
+        try:
+            if origem.stat().st_size <= self.limite_multipart:
+                self.put(chave, origem.read_bytes(), content_type)
+            else:
+                self._put_multipart(origem, chave, content_type)
+        finally:
+            origem.unlink(missing_ok=True)
+
+    def _put_multipart(self, origem: Path, chave: str, content_type: Optional[str]):
+        chave_s3 = self._chave(chave)
+        extras = {"ContentType": content_type} if content_type else {}
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=chave_s3, **extras)["UploadId"]
+
+        try:
+            partes = []
+            with open(origem, "rb") as arquivo:
+                numero = 1
+                while True:
+                    bloco = arquivo.read(self.tamanho_parte)
+                    if not bloco:
+                        break
+                    resposta = self.client.upload_part(
+                        Bucket=self.bucket, Key=chave_s3, UploadId=upload_id,
+                        PartNumber=numero, Body=bloco
+                    )
+                    partes.append({"PartNumber": numero, "ETag": resposta["ETag"]})
+                    numero += 1
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=chave_s3, UploadId=upload_id,
+                MultipartUpload={"Parts": partes}
+            )
+            logger.info(f"Multipart upload concluído: {chave} ({len(partes)} partes)")
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=chave_s3, UploadId=upload_id)
+            raise
+
+    def stream(self, chave: str, tamanho_bloco: int = TAMANHO_BLOCO, inicio: int = 0, fim: Optional[int] = None) -> Iterator[bytes]:
+        parametros = {"Bucket": self.bucket, "Key": self._chave(chave)}
+        if inicio or fim is not None:
+            parametros["Range"] = f"bytes={inicio}-{'' if fim is None else fim}"
+        try:
+            corpo = self.client.get_object(**parametros)["Body"]
+        except Exception as e:
+            if self._nao_encontrado(e):
+                raise ArquivoNaoEncontrado(chave)
+            raise
+
+        def gerar():
+            try:
+                for bloco in corpo.iter_chunks(tamanho_bloco):
+                    yield bloco
+            finally:
+                corpo.close()
+
+        return gerar()
+
+    def info(self, chave: str) -> Optional[InfoArquivo]:
+        try:
+            resposta = self.client.head_object(Bucket=self.bucket, Key=self._chave(chave))
+        except Exception as e:
+            if self._nao_encontrado(e):
+                return None
+            raise
+        modificado = resposta["LastModified"]
+        if modificado.tzinfo is None:
+            modificado = modificado.replace(tzinfo=timezone.utc)
+        return InfoArquivo(chave, resposta["ContentLength"], modificado.timestamp())
+
+    def delete(self, chave: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._chave(chave))
+
+    def listar(self, prefixo: str = "") -> Iterator[InfoArquivo]:
+        parametros = {"Bucket": self.bucket, "Prefix": self._chave(prefixo) if prefixo else (f"{self.prefixo}/" if self.prefixo else "")}
+        while True:
+            resposta = self.client.list_objects_v2(**parametros)
+            for objeto in resposta.get("Contents", []):
+                modificado = objeto["LastModified"]
+                if modificado.tzinfo is None:
+                    modificado = modificado.replace(tzinfo=timezone.utc)
+                yield InfoArquivo(self._chave_relativa(objeto["Key"]), objeto["Size"], modificado.timestamp())
+            if not resposta.get("IsTruncated"):
+                return
+            parametros["ContinuationToken"] = resposta["NextContinuationToken"]
+
+    def presign(self, chave: str, expira_em: int = 300, nome_download: Optional[str] = None) -> Optional[str]:
+        parametros = {"Bucket": self.bucket, "Key": self._chave(chave)}
+        if nome_download:
+            parametros["ResponseContentDisposition"] = f'attachment; filename="{nome_download}"'
+        return self.client.generate_presigned_url("get_object", Params=parametros, ExpiresIn=expira_em)
+
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def criar_storage() -> StorageBackend:
+    """Cria o backend configurado em STORAGE_BACKEND."""
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "s3":
+        return S3Storage()
+    if backend != "local":
+        logger.warning(f"STORAGE_BACKEND desconhecido '{backend}', usando local")
+    return LocalStorage()
+
+
+def obter_storage() -> StorageBackend:
+    """Backend de armazenamento do processo (criado no primeiro uso)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = criar_storage()
+    return _storage
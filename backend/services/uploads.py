@@ -0,0 +1,142 @@
+"""
+Gravação de arquivos enviados (UploadFile) em disco, em blocos.
+
+Todas as rotas de upload passam por `gravar_upload` (rotas síncronas, já em
+uma thread do threadpool) ou `salvar_upload` (código assíncrono):
+- Lê o arquivo em blocos de tamanho fixo (memória constante por upload)
+- Grava e calcula o SHA-256 de cada bloco fora do event loop
+- Interrompe assim que o tamanho passa de settings.MAX_FILE_SIZE (413)
+- Grava em um arquivo temporário no mesmo diretório e só renomeia para o
+  nome final (os.replace, atômico) quando o arquivo está completo; em caso
+  de erro o temporário é removido e nenhum arquivo parcial fica no destino
+"""
+
+import hashlib
+import os
+import uuid
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_BLOCO = 1024 * 1024  # 1MB
+
+
+@dataclass(frozen=True)
+class ArquivoSalvo:
+    """Resultado de um upload gravado com sucesso."""
+    caminho: Path
+    nome: str
+    tamanho: int
+    sha256: str
+
+
+def nome_seguro(nome: Optional[str]) -> str:
+    """
+    Remove diretórios do nome enviado pelo cliente (ex.: "../../main.py").
+    """
+    nome = Path((nome or "").replace("\\", "/")).name.strip()
+    return nome or "arquivo"
+
+
+def _erro_tamanho(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Arquivo excede o tamanho máximo de {max_size // (1024 * 1024)}MB"
+    )
+
+
+def _abrir_temporario(destino: Path):
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(f".{destino.name}.{uuid.uuid4().hex}.part")
+    return temporario, open(temporario, "wb")
+
+
+def _gravar_bloco(arquivo, hasher, bloco: bytes):
+    hasher.update(bloco)
+    arquivo.write(bloco)
+
+
+def _concluir(arquivo, temporario: Path, destino: Path):
+    arquivo.flush()
+    os.fsync(arquivo.fileno())
+    arquivo.close()
+    os.replace(temporario, destino)
+
+
+def _descartar(arquivo, temporario: Path):
+    try:
+        arquivo.close()
+    finally:
+        try:
+            os.unlink(temporario)
+        except FileNotFoundError:
+            pass
+
+
+def gravar_upload(
+    arquivo: UploadFile,
+    destino: Path,
+    max_size: Optional[int] = None,
+    tamanho_bloco: int = TAMANHO_BLOCO
+) -> ArquivoSalvo:
+    """
+    Grava o upload em `destino` em blocos. Bloqueante: chamar de uma rota
+    síncrona (def) ou via `salvar_upload`.
+
+    Args:
+        arquivo: Arquivo recebido pela rota
+        destino: Caminho final do arquivo (o diretório é criado se necessário)
+        max_size: Tamanho máximo em bytes (padrão: settings.MAX_FILE_SIZE)
+        tamanho_bloco: Tamanho de cada leitura/gravação
+
+    Raises:
+        HTTPException 413 se o arquivo passar de max_size
+    """
+    max_size = max_size if max_size is not None else settings.MAX_FILE_SIZE
+
+    # Tamanho já conhecido (multipart armazenado pelo Starlette): rejeitar antes de gravar
+    if arquivo.size is not None and arquivo.size > max_size:
+        raise _erro_tamanho(max_size)
+
+    temporario, saida = _abrir_temporario(destino)
+    hasher = hashlib.sha256()
+    total = 0
+
+    try:
+        while True:
+            bloco = arquivo.file.read(tamanho_bloco)
+            if not bloco:
+                break
+            total += len(bloco)
+            if total > max_size:
+                raise _erro_tamanho(max_size)
+            _gravar_bloco(saida, hasher, bloco)
+
+        _concluir(saida, temporario, destino)
+    except BaseException:
+        _descartar(saida, temporario)
+        raise
+
+    logger.info(f"Upload salvo: {destino} ({total} bytes)")
+    return ArquivoSalvo(caminho=destino, nome=destino.name, tamanho=total, sha256=hasher.hexdigest())
+
+
+async def salvar_upload(
+    arquivo: UploadFile,
+    destino: Path,
+    max_size: Optional[int] = None,
+    tamanho_bloco: int = TAMANHO_BLOCO
+) -> ArquivoSalvo:
+    """
+    Mesmo que `gravar_upload`, para código assíncrono: a leitura e a gravação
+    rodam em uma thread do threadpool, sem bloquear o event loop.
+    """
+    return await run_in_threadpool(gravar_upload, arquivo, destino, max_size, tamanho_bloco)
@@ -0,0 +1,153 @@
+"""
+Cache dos resultados de validação de email institucional (Microsoft Graph).
+
+Cada login pelo /legacy-login valida o email no Graph (/users/{email}). Como o
+resultado raramente muda, ele é memorizado por email normalizado:
+- resultados positivos (usuário existe) por EMAIL_VALIDATION_TTL segundos
+- resultados negativos definitivos (formato inválido, domínio não institucional,
+  usuário inexistente) por EMAIL_VALIDATION_NEGATIVE_TTL segundos
+- erros transitórios (falha de rede, 5xx, 401) nunca são memorizados
+
+Opcionalmente os resultados também são gravados na tabela `validacoes_email`,
+para sobreviver a reinícios de worker e serem compartilhados entre workers.
+
+Configuração (variáveis de ambiente):
+    EMAIL_VALIDATION_TTL           TTL de resultados positivos (padrão: 86400)
+    EMAIL_VALIDATION_NEGATIVE_TTL  TTL de resultados negativos (padrão: 900)
+    EMAIL_VALIDATION_CACHE_SIZE    Máximo de emails em memória (padrão: 5000)
+    EMAIL_VALIDATION_PERSIST       true para gravar no banco (padrão: false)
+"""
+
+import copy
+import json
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+class EmailValidationCache:
+    """
+    Cache LRU+TTL de resultados de validação, com persistência opcional no banco.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+        persist: Optional[bool] = None,
+        session_factory=None
+    ):
+        self.ttl = ttl if ttl is not None else float(os.getenv("EMAIL_VALIDATION_TTL", "86400"))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(os.getenv("EMAIL_VALIDATION_NEGATIVE_TTL", "900"))
+        if persist is None:
+            persist = os.getenv("EMAIL_VALIDATION_PERSIST", "false").lower() == "true"
+        self.persist = persist
+        self.session_factory = session_factory
+        self._memoria = TTLCache(
+            max_size=max_size if max_size is not None else int(os.getenv("EMAIL_VALIDATION_CACHE_SIZE", "5000")),
+            ttl=self.ttl
+        )
+        self._tabela_verificada = False
+
+    def _sessao(self):
+        if self.session_factory is None:
+            from database import SessionLocal
+            self.session_factory = SessionLocal
+        db = self.session_factory()
+        if not self._tabela_verificada:
+            from models.database_models import ValidacaoEmail
+            ValidacaoEmail.__table__.create(bind=db.get_bind(), checkfirst=True)
+            self._tabela_verificada = True
+        return db
+
+    def get(self, email: str) -> Optional[Dict]:
+        """Retorna uma cópia do resultado memorizado ou None."""
+        chave = normalizar_email(email)
+        resultado = self._memoria.get(chave)
+
+        if resultado is None and self.persist:
+            resultado = self._carregar_do_banco(chave)
+
+        return copy.deepcopy(resultado) if resultado is not None else None
+
+    def set(self, email: str, resultado: Dict):
+        """Memoriza um resultado definitivo (positivo ou negativo)."""
+        chave = normalizar_email(email)
+        positivo = bool(resultado.get("valid") and resultado.get("exists"))
+        ttl = self.ttl if positivo else self.negative_ttl
+
+        self._memoria.set(chave, copy.deepcopy(resultado), ttl=ttl)
+
+        if self.persist:
+            self._gravar_no_banco(chave, resultado, positivo, ttl)
+
+    def invalidate(self, email: str):
+        chave = normalizar_email(email)
+        self._memoria.delete(chave)
+        if self.persist:
+            from models.database_models import ValidacaoEmail
+            db = self._sessao()
+            try:
+                db.query(ValidacaoEmail).filter(ValidacaoEmail.email == chave).delete(synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+
+    def _carregar_do_banco(self, chave: str) -> Optional[Dict]:
+        from models.database_models import ValidacaoEmail
+        try:
+            db = self._sessao()
+            try:
+                registro = db.query(ValidacaoEmail).filter(
+                    ValidacaoEmail.email == chave,
+                    ValidacaoEmail.expires_at > datetime.utcnow()
+                ).first()
+                if not registro:
+                    return None
+
+                resultado = json.loads(registro.resultado)
+                restante = (registro.expires_at - datetime.utcnow()).total_seconds()
+                self._memoria.set(chave, resultado, ttl=restante)
+                return resultado
+            finally:
+                db.close()
+        except Exception as e:
+            # O cache nunca deve impedir o login
+            logger.warning(f"Falha ao ler cache de validação do banco: {e}")
+            return None
+
+    def _gravar_no_banco(self, chave: str, resultado: Dict, positivo: bool, ttl: float):
+        from models.database_models import ValidacaoEmail
+        agora = datetime.utcnow()
+        try:
+            db = self._sessao()
+            try:
+                registro = db.query(ValidacaoEmail).filter(ValidacaoEmail.email == chave).first()
+                if not registro:
+                    registro = ValidacaoEmail(email=chave)
+                    db.add(registro)
+                registro.valido = 1 if positivo else 0
+                registro.resultado = json.dumps(resultado)
+                registro.data_validacao = agora
+                registro.expires_at = agora + timedelta(seconds=ttl)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Falha ao gravar cache de validação no banco: {e}")
+
+    def stats(self) -> Dict:
+        return {**self._memoria.stats(), "persist": self.persist}
@@ -0,0 +1,110 @@
+"""
+Contadores de alteração por tabela (tabela versoes_tabelas).
+
+Toda vez que uma sessão grava (insert/update/delete via ORM) um modelo
+rastreado, o contador da tabela é incrementado na mesma transação. A versão
+de uma tabela é lida com uma única consulta por chave primária, o que permite
+gerar ETags para listas quase estáticas sem reler a tabela inteira.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select, func, update, insert
+from sqlalchemy.orm import Session
+
+from models.database_models import VersaoTabela
+
+logger = logging.getLogger(__name__)
+
+_tabelas_rastreadas = set()
+_tabela_verificada = False
+
+
+def _garantir_tabela(db: Session, na_transacao: bool = False):
+    """
+    Cria a tabela em bancos antigos (o PostgreSQL não passa por create_all).
+
+    Fora de uma gravação, a tabela é criada em uma transação própria, já
+    confirmada: a sessão de uma leitura (GET) nunca faz commit. Dentro do
+    after_flush a sessão já gravou e segura o lock de escrita (SQLite), então
+    a tabela é criada na mesma transação e só conta como existente depois do
+    commit, na próxima verificação.
+    """
+    global _tabela_verificada
+    if _tabela_verificada:
+        return
+
+    if na_transacao:
+        connection = db.connection()
+        if inspect(connection).has_table(VersaoTabela.__tablename__):
+            _tabela_verificada = True
+        else:
+            VersaoTabela.__table__.create(bind=connection)
+        return
+
+    with db.get_bind().begin() as connection:
+        if not inspect(connection).has_table(VersaoTabela.__tablename__):
+            VersaoTabela.__table__.create(bind=connection)
+            logger.info("Tabela versoes_tabelas criada")
+    _tabela_verificada = True
+
+
+def _incrementar(connection, tabela: str):
+    resultado = connection.execute(
+        update(VersaoTabela.__table__)
+        .where(VersaoTabela.__table__.c.tabela == tabela)
+        .values(versao=VersaoTabela.__table__.c.versao + 1, data_atualizacao=datetime.utcnow())
+    )
+    if resultado.rowcount == 0:
+        connection.execute(
+            insert(VersaoTabela.__table__).values(tabela=tabela, versao=1, data_atualizacao=datetime.utcnow())
+        )
+
+
+def _apos_flush(session, flush_context):
+    alteradas = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tabela = getattr(getattr(obj, "__table__", None), "name", None)
+        if tabela not in _tabelas_rastreadas:
+            continue
+        # Objetos em session.dirty podem não ter mudanças reais de coluna
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        alteradas.add(tabela)
+
+    if not alteradas:
+        return
+
+    _garantir_tabela(session, na_transacao=True)
+    connection = session.connection()
+    for tabela in sorted(alteradas):
+        _incrementar(connection, tabela)
+
+
+def rastrear_alteracoes(*modelos):
+    """
+    Passa a incrementar a versão das tabelas dos modelos a cada gravação via ORM.
+    """
+    for modelo in modelos:
+        _tabelas_rastreadas.add(modelo.__table__.name)
+
+    if not event.contains(Session, "after_flush", _apos_flush):
+        event.listen(Session, "after_flush", _apos_flush)
+
+
+def obter_versao(db: Session, modelo) -> str:
+    """
+    Retorna a versão atual da tabela do modelo: "<contador>-<maior id>".
+
+    O maior id (lido pelo índice da chave primária) cobre inserções feitas
+    fora do ORM, como scripts de carga inicial.
+    """
+    tabela = modelo.__table__.name
+    _garantir_tabela(db)
+
+    contador = select(VersaoTabela.versao).where(VersaoTabela.tabela == tabela).scalar_subquery()
+    maior_id = select(func.max(modelo.id)).scalar_subquery()
+    versao, ultimo_id = db.execute(select(contador, maior_id)).one()
+
+    return f"{versao or 0}-{ultimo_id or 0}"
@@ -5,6 +5,7 @@ Use este script para testar se a integração com Microsoft está funcionando co
 """
 
 from microsoft_auth import validate_email, get_user_info
+import asyncio
 import json
 import sys
 
@@ -14,7 +15,7 @@ def test_validation(email: str):
     print(f"🔍 Testando validação para: {email}")
     print("=" * 80)
     
-    result = validate_email(email)
+    result = asyncio.run(validate_email(email))
     
     print("\n📊 Resultado da Validação:")
     print("-" * 80)
@@ -0,0 +1,162 @@
+"""
+Teste do engine assíncrono (database.get_async_db) e da listagem de
+inscrições migrada para AsyncSession.
+
+Verifica que:
+- a URL síncrona é convertida para o driver assíncrono (asyncpg/aiosqlite)
+- com DATABASE_ASYNC=true, GET /api/inscricoes/ é servida pela rota async
+- as duas versões da listagem devolvem as mesmas páginas (filtros e cursor)
+- 200 clientes simultâneos são atendidos sem erro nos dois modos
+  (benchmark_inscricoes.py), com a vazão de cada um no relatório
+- sem o driver instalado, o erro indica o pacote que falta
+Usa um banco SQLite temporário.
+
+Uso: python testar_banco_async.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_banco_async.db"
+os.environ["DATABASE_ASYNC"] = "true"
+os.environ["DB_POOL_FILA_MAXIMA"] = "1000"  # sem descarte de carga: todas as requisições esperam
+
+import asyncio
+import inspect
+
+import httpx
+from fastapi.routing import APIRoute
+import database
+from database import engine, SessionLocal, Base, url_async, get_async_engine, fechar_async_engine
+from models.database_models import (
+    Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from benchmark_inscricoes import URL, comparar, montar_app
+from main import app
+
+CLIENTES = 200
+
+
+def popular():
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="Orientador",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        db.add(orientador)
+        db.flush()
+        status = list(StatusInscricao)
+        for n in range(120):
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno {n}",
+                            tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+            db.add(aluno)
+            db.flush()
+            inscricao = Inscricao(
+                usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, ano=2024 + n % 3,
+                orientador_id=orientador.id, titulo_projeto=f"Projeto {n}", area_conhecimento="C",
+                descricao="D", status=status[n % len(status)]
+            )
+            db.add(inscricao)
+            db.flush()
+            if n % 4 == 0:
+                db.add(Projeto(aluno_id=aluno.id, orientador_id=orientador.id, inscricao_id=inscricao.id,
+                               ano=inscricao.ano, titulo=inscricao.titulo_projeto, area_conhecimento="C",
+                               descricao="D", etapa_atual=list(EtapaProjeto)[n % 3]))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_url_async():
+    assert str(url_async("sqlite:///./banco.db")) == "sqlite+aiosqlite:///./banco.db"
+    url = url_async("postgresql://u:s@servidor.postgres.database.azure.com/ic?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg" and dict(url.query) == {"ssl": "require"}
+    url = url_async("postgresql+psycopg2://u:s@localhost/ic?sslmode=disable")
+    assert url.drivername == "postgresql+asyncpg" and not url.query
+
+
+def test_rota_registrada():
+    rotas = [r for r in app.routes if isinstance(r, APIRoute) and r.path == URL and "GET" in r.methods]
+    assert len(rotas) == 1 and inspect.iscoroutinefunction(rotas[0].endpoint), rotas
+
+
+async def paginas(client, params):
+    """Todas as páginas de uma listagem, seguindo next_cursor"""
+    resultado = []
+    cursor = None
+    while True:
+        response = await client.get(URL, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        dados = response.json()
+        resultado.append(dados)
+        cursor = dados["next_cursor"]
+        if not cursor:
+            return resultado
+
+
+async def test_mesmas_respostas():
+    filtros = [
+        {"limit": 7},
+        {"limit": 5, "ano": 2025},
+        {"limit": 4, "status": "aprovada"},
+        {"limit": 3, "etapa": "envio_proposta"},
+        {"limit": 3, "etapa": "relatorio_parcial", "ano": 2024},
+    ]
+    clientes = {
+        modo: httpx.AsyncClient(transport=httpx.ASGITransport(app=montar_app(modo)), base_url="http://teste")
+        for modo in ("sync", "async")
+    }
+    try:
+        for params in filtros:
+            sincronas = await paginas(clientes["sync"], params)
+            assincronas = await paginas(clientes["async"], params)
+            assert sincronas == assincronas, params
+        assert sum(len(p["inscricoes"]) for p in await paginas(clientes["async"], {"limit": 7})) == 120
+
+        # Erros de validação iguais nos dois modos
+        for modo, client in clientes.items():
+            assert (await client.get(URL, params={"status": "x"})).status_code == 400, modo
+            assert (await client.get(URL, params={"cursor": "invalido"})).status_code == 400, modo
+
+        # Pelo app principal (rota async registrada com DATABASE_ASYNC=true)
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as client:
+            assert await paginas(client, {"limit": 7}) == await paginas(clientes["sync"], {"limit": 7})
+    finally:
+        for client in clientes.values():
+            await client.aclose()
+        await fechar_async_engine()
+
+
+async def test_benchmark():
+    resultados = await comparar(CLIENTES, 2, {"limit": 20})
+    assert [r.modo for r in resultados] == ["sync", "async"]
+    print(f"📊 GET {URL}?limit=20 com {CLIENTES} clientes simultâneos:")
+    for resultado in resultados:
+        print(f"   {resultado.resumo()}")
+        assert resultado.erros == resultado.recusadas == 0 and len(resultado.latencias) == CLIENTES * 2
+
+
+def test_driver_ausente():
+    os.environ["ASYNC_DATABASE_URL"] = "postgresql+asyncpg://u:s@localhost/ic"
+    try:
+        get_async_engine()
+    except RuntimeError as e:
+        assert "asyncpg" in str(e), e
+    else:
+        # asyncpg instalado: o engine é criado sem conectar
+        assert database._async_engine is not None
+        asyncio.run(fechar_async_engine())
+    finally:
+        del os.environ["ASYNC_DATABASE_URL"]
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    popular()
+    test_url_async()
+    test_rota_registrada()
+    asyncio.run(test_mesmas_respostas())
+    asyncio.run(test_benchmark())
+    test_driver_ausente()
+    print("✅ Engine assíncrono e listagem de inscrições com AsyncSession validados")
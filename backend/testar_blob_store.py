@@ -0,0 +1,156 @@
+"""
+Teste do blob store endereçado por conteúdo (services/blobs.py).
+
+Verifica que:
+- duas propostas com o mesmo PDF gravam os bytes uma única vez (ref_count 2)
+- cada nome lógico continua resolvendo para o conteúdo certo
+- após deletar_inscricao, a coleta de órfãos remove o nome; o blob só é
+  removido quando nenhuma inscrição usa mais aquele conteúdo
+- arquivos soltos em uploads/blobs sem registro também são coletados
+- em um banco sem as tabelas do blob store, um download (sessão sem commit)
+  as cria em uma transação própria, que o rollback não desfaz
+Usa um diretório e banco SQLite temporários.
+
+Uso: python testar_blob_store.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)  # uploads/ relativo ao diretório de trabalho
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_blobs.db"
+
+from pathlib import Path
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+from database import SessionLocal, Base, engine
+from models.database_models import Usuario, Inscricao, Blob, TipoUsuario, StatusUsuario
+from services.blobs import BlobStore, blob_store
+from services.storage import LocalStorage
+from main import app
+
+PDF = b"%PDF-1.4 " + os.urandom(200_000)
+OUTRO_PDF = b"%PDF-1.4 " + os.urandom(50_000)
+
+
+def criar_usuarios():
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="O",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        aluno = Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="A",
+                        tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+        db.add_all([orientador, aluno])
+        db.commit()
+        return orientador.id, aluno.id
+    finally:
+        db.close()
+
+
+def submeter(client, aluno_id, orientador_id, conteudo):
+    response = client.post("/api/inscricoes/proposta", data={
+        "usuario_id": aluno_id,
+        "titulo_projeto": "Projeto",
+        "area_conhecimento": "Computação",
+        "orientador_id": orientador_id,
+        "descricao": "Descrição",
+    }, files={"projeto": ("proposta.pdf", conteudo, "application/pdf")})
+    assert response.status_code in (200, 201), response.text
+    return response.json()["proposta_id"]
+
+
+def test_blob_store():
+    Base.metadata.create_all(bind=engine)
+    orientador_id, aluno_id = criar_usuarios()
+    client = TestClient(app)
+
+    primeira = submeter(client, aluno_id, orientador_id, PDF)
+    segunda = submeter(client, aluno_id, orientador_id, PDF)  # reenvio idêntico
+    terceira = submeter(client, aluno_id, orientador_id, OUTRO_PDF)
+
+    db = SessionLocal()
+    try:
+        nomes = {i.id: i.arquivo_projeto for i in db.query(Inscricao).all()}
+        assert len(set(nomes.values())) == 3, "nomes lógicos devem ser distintos"
+        for inscricao_id, conteudo in ((primeira, PDF), (segunda, PDF), (terceira, OUTRO_PDF)):
+            assert blob_store.caminho(db, "propostas", nomes[inscricao_id]).read_bytes() == conteudo
+
+        blobs = {b.sha256: b.ref_count for b in db.query(Blob).all()}
+        assert sorted(blobs.values()) == [1, 2], blobs
+        stats = blob_store.estatisticas(db)
+        print(f"📊 {stats['arquivos']} arquivos em {stats['blobs']} blobs "
+              f"({stats['bytes_logicos']} bytes lógicos, {stats['bytes_em_disco']} em disco)")
+        assert stats["bytes_em_disco"] == len(PDF) + len(OUTRO_PDF)
+    finally:
+        db.close()
+
+    # Arquivo solto sem registro
+    solto = blob_store.chave_blob("f" * 64)
+    blob_store.storage.put(solto, b"lixo")
+
+    # Apagar uma das inscrições com o PDF repetido: o blob continua em uso
+    assert client.delete(f"/api/inscricoes/{primeira}").status_code == 200
+    db = SessionLocal()
+    try:
+        resultado = blob_store.coletar_orfaos(db, carencia=0)
+        assert resultado.nomes_removidos == 1 and resultado.blobs_removidos == 0, resultado
+        assert resultado.arquivos_sem_registro == 1 and blob_store.storage.info(solto) is None
+        assert blob_store.caminho(db, "propostas", nomes[segunda]).read_bytes() == PDF
+        assert blob_store.caminho(db, "propostas", nomes[primeira]) is None
+    finally:
+        db.close()
+
+    # Apagar a última inscrição com esse PDF: o blob é removido
+    assert client.delete(f"/api/inscricoes/{segunda}").status_code == 200
+    db = SessionLocal()
+    try:
+        simulado = blob_store.coletar_orfaos(db, carencia=0, simular=True)
+        assert simulado.blobs_removidos == 1
+        assert db.query(Blob).count() == 2, "simulação não deve apagar nada"
+
+        resultado = blob_store.coletar_orfaos(db, carencia=0)
+        assert resultado.nomes_removidos == 1 and resultado.blobs_removidos == 1, resultado
+        assert resultado.bytes_liberados == len(PDF)
+        assert db.query(Blob).count() == 1
+        assert blob_store.caminho(db, "propostas", nomes[terceira]).read_bytes() == OUTRO_PDF
+
+        # Com carência padrão nada recente é coletado
+        assert blob_store.coletar_orfaos(db).nomes_removidos == 0
+    finally:
+        db.close()
+
+    restantes = [p for p in Path(_tmpdir, "uploads", "blobs").rglob("*") if p.is_file()]
+    assert len(restantes) == 1, restantes
+
+
+def test_tabelas_criadas_em_banco_existente():
+    # SQLite com DDL dentro da transação, como no PostgreSQL
+    antigo = create_engine(f"sqlite:///{_tmpdir}/banco_antigo.db")
+
+    @event.listens_for(antigo, "connect")
+    def _sem_autocommit(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(antigo, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    store = BlobStore(LocalStorage(os.path.join(_tmpdir, "uploads_antigo")))
+    db = Session(bind=antigo)
+    try:
+        assert store.localizar(db, "propostas", "inexistente.pdf") is None
+        assert store.localizar_varios(db, "propostas", ["inexistente.pdf"])["inexistente.pdf"].sha256 is None
+    finally:
+        db.rollback()
+        db.close()
+    tabelas = inspect(antigo).get_table_names()
+    assert {"blobs", "arquivos_armazenados"} <= set(tabelas), tabelas
+    antigo.dispose()
+
+
+if __name__ == "__main__":
+    test_blob_store()
+    test_tabelas_criadas_em_banco_existente()
+    print("✅ Blob store com deduplicação e coleta de órfãos validado")
@@ -0,0 +1,90 @@
+"""
+Teste do cache de configurações do sistema (inscrições abertas / ano ativo).
+
+Verifica que:
+- GET /api/inscricoes/status não consulta o banco quando o cache está válido
+- alternar o status pelo coordenador invalida o cache (write-through)
+- a invalidação chega a outro worker via arquivo de versão, sem SQL
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_cache_configuracoes.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_configuracoes.db"
+os.environ["CONFIG_VERSION_FILE"] = os.path.join(_tmpdir, "configuracoes.version")
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import Usuario, TipoUsuario, StatusUsuario
+from services.configuracoes import ConfiguracoesCache
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def criar_coordenador() -> int:
+    db = SessionLocal()
+    try:
+        coordenador = Usuario(
+            email="coord@coordenador.ibmec.edu.br",
+            senha="123456",
+            nome="Coordenação",
+            tipo=TipoUsuario.coordenador,
+            status=StatusUsuario.ativo
+        )
+        db.add(coordenador)
+        db.commit()
+        return coordenador.id
+    finally:
+        db.close()
+
+
+def test_cache_configuracoes():
+    Base.metadata.create_all(bind=engine)
+    coordenador_id = criar_coordenador()
+    client = TestClient(app)
+
+    # Outro worker no mesmo servidor (compartilha apenas o arquivo de versão)
+    outro_worker = ConfiguracoesCache()
+    assert outro_worker.obter().inscricoes_abertas is True
+
+    assert client.get("/api/inscricoes/status").json()["inscricoes_abertas"] is True
+
+    consultas.clear()
+    for _ in range(20):
+        assert client.get("/api/inscricoes/status").status_code == 200
+    print(f"📊 20 leituras de /status com cache válido: {len(consultas)} consulta(s)")
+    assert len(consultas) == 0, "leitura em cache executou SQL"
+
+    response = client.post("/api/coordenadores/configuracoes/inscricoes/toggle", json={
+        "coordenador_id": coordenador_id, "abrir": False, "ano": 2027
+    })
+    assert response.status_code == 200, response.text
+
+    dados = client.get("/api/inscricoes/status").json()
+    assert dados["inscricoes_abertas"] is False, "escrita não invalidou o cache local"
+
+    consultas.clear()
+    assert outro_worker.obter().inscricoes_abertas is False, "invalidação não chegou ao outro worker"
+    assert outro_worker.counters["reloads"] == 2
+
+    response = client.post("/api/coordenadores/configuracoes/inscricoes/toggle", json={
+        "coordenador_id": coordenador_id, "abrir": True, "ano": 2027
+    })
+    dados = client.get("/api/inscricoes/status").json()
+    assert dados["inscricoes_abertas"] is True and dados["ano_ativo"] == 2027
+
+
+if __name__ == "__main__":
+    test_cache_configuracoes()
+    print("✅ Cache de configurações validado")
@@ -0,0 +1,103 @@
+"""
+Teste do cache de validação de email institucional.
+
+Verifica que logins repetidos não geram chamadas ao Microsoft Graph, que
+emails inexistentes também ficam em cache (negativo), que erros transitórios
+não são memorizados e que o cache persistido sobrevive a um "reinício" do worker.
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_cache_validacao_email.py
+"""
+
+import asyncio
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_validacao_email.db"
+
+import httpx
+
+from microsoft_auth import MicrosoftOAuth
+from services.validacao_email import EmailValidationCache
+
+
+class FakeGraph:
+    """Substitui o GraphHttpClient contando as chamadas feitas"""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.status_usuario = {}
+
+    async def post_form(self, url, data, **kwargs):
+        self.chamadas += 1
+        return httpx.Response(200, json={"access_token": "token", "expires_in": 3600}, request=httpx.Request("POST", url))
+
+    async def get(self, url, headers=None, **kwargs):
+        self.chamadas += 1
+        email = url.rsplit("/", 1)[-1]
+        status_code = self.status_usuario.get(email, 200)
+        corpo = {"displayName": "Fulano", "mail": email, "userPrincipalName": email} if status_code == 200 else {}
+        return httpx.Response(status_code, json=corpo, request=httpx.Request("GET", url))
+
+
+def criar_oauth(persist: bool) -> MicrosoftOAuth:
+    oauth = MicrosoftOAuth()
+    oauth.is_development = False
+    oauth.tenant_id = oauth.client_id = oauth.client_secret = "fake"
+    oauth.http = FakeGraph()
+    oauth.validation_cache = EmailValidationCache(ttl=60, negative_ttl=60, max_size=100, persist=persist)
+    return oauth
+
+
+async def _cenario():
+    oauth = criar_oauth(persist=True)
+    graph = oauth.http
+
+    # Primeiro login: token + /users/{email}
+    r = await oauth.validate_institutional_email("Fulano@Alunos.Ibmec.edu.br")
+    assert r["valid"] and r["user_data"]["display_name"] == "Fulano"
+    chamadas_primeiro_login = graph.chamadas
+
+    # Logins repetidos (inclusive com outra capitalização): zero chamadas
+    for _ in range(10):
+        r = await oauth.validate_institutional_email("fulano@alunos.ibmec.edu.br ")
+        assert r["valid"]
+    assert graph.chamadas == chamadas_primeiro_login, "login repetido chamou o Graph"
+
+    # Cache negativo para email inexistente
+    graph.status_usuario["naoexiste@alunos.ibmec.edu.br"] = 404
+    await oauth.validate_institutional_email("naoexiste@alunos.ibmec.edu.br")
+    antes = graph.chamadas
+    r = await oauth.validate_institutional_email("naoexiste@alunos.ibmec.edu.br")
+    assert not r["valid"] and graph.chamadas == antes, "resultado negativo não foi memorizado"
+
+    # Erros transitórios não são memorizados
+    graph.status_usuario["instavel@alunos.ibmec.edu.br"] = 503
+    await oauth.validate_institutional_email("instavel@alunos.ibmec.edu.br")
+    antes = graph.chamadas
+    await oauth.validate_institutional_email("instavel@alunos.ibmec.edu.br")
+    assert graph.chamadas == antes + 1, "erro transitório foi memorizado"
+
+    # Novo worker (memória vazia) reaproveita o resultado persistido no banco
+    reiniciado = criar_oauth(persist=True)
+    r = await reiniciado.validate_institutional_email("fulano@alunos.ibmec.edu.br")
+    assert r["valid"] and reiniciado.http.chamadas == 0, "cache persistido não foi usado"
+
+    # Usuário autenticado via OAuth entra no cache sem consulta ao Graph
+    oauth.remember_validated_user({"mail": "novo@alunos.ibmec.edu.br", "displayName": "Novo"})
+    antes = graph.chamadas
+    r = await oauth.validate_institutional_email("novo@alunos.ibmec.edu.br")
+    assert r["valid"] and graph.chamadas == antes
+
+    return oauth.validation_cache.stats()
+
+
+def test_cache_validacao_email():
+    stats = asyncio.run(_cenario())
+    print(f"📊 {stats}")
+
+
+if __name__ == "__main__":
+    test_cache_validacao_email()
+    print("✅ Cache de validação de email validado")
@@ -0,0 +1,104 @@
+"""
+Teste de regressão do número de consultas em GET /api/inscricoes/
+
+Garante que a listagem de inscrições faz um número constante de idas ao banco,
+independente da quantidade de inscrições (sem N+1).
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_consultas_inscricoes.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_consultas.db"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def popular(quantidade: int):
+    """Cria `quantidade` inscrições, metade delas com projeto"""
+    db = SessionLocal()
+    try:
+        inicio = db.query(Usuario).count()
+        for n in range(inicio, inicio + quantidade):
+            aluno = Usuario(
+                email=f"aluno{n}@alunos.ibmec.edu.br",
+                senha="123456",
+                nome=f"Aluno {n}",
+                tipo=TipoUsuario.aluno,
+                status=StatusUsuario.ativo
+            )
+            db.add(aluno)
+            db.flush()
+
+            inscricao = Inscricao(
+                usuario_id=aluno.id,
+                nome=aluno.nome,
+                email=aluno.email,
+                titulo_projeto=f"Projeto {n}",
+                area_conhecimento="Computação",
+                descricao="Descrição",
+                status=StatusInscricao.pendente_apresentacao
+            )
+            db.add(inscricao)
+            db.flush()
+
+            if n % 2 == 0:
+                db.add(Projeto(
+                    aluno_id=aluno.id,
+                    inscricao_id=inscricao.id,
+                    titulo=inscricao.titulo_projeto,
+                    area_conhecimento=inscricao.area_conhecimento,
+                    descricao=inscricao.descricao,
+                    etapa_atual=EtapaProjeto.relatorio_parcial
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def medir(client: TestClient):
+    consultas.clear()
+    response = client.get("/api/inscricoes/", params={"limit": 500})
+    assert response.status_code == 200, response.text
+    return len(consultas), response.json()["inscricoes"]
+
+
+def test_listagem_inscricoes_consultas_constantes():
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+
+    popular(5)
+    consultas_poucas, dados = medir(client)
+    assert len(dados) == 5
+
+    popular(45)
+    consultas_muitas, dados = medir(client)
+    assert len(dados) == 50
+
+    etapas = {d["etapa"] for d in dados}
+    assert etapas == {"relatorio_parcial", "envio_proposta"}, etapas
+
+    print(f"📊 5 inscrições: {consultas_poucas} consulta(s)")
+    print(f"📊 50 inscrições: {consultas_muitas} consulta(s)")
+    assert consultas_poucas == consultas_muitas, "Número de consultas cresce com o número de inscrições (N+1)"
+
+
+if __name__ == "__main__":
+    test_listagem_inscricoes_consultas_constantes()
+    print("✅ Listagem de inscrições com número constante de consultas")
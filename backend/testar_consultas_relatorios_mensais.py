@@ -0,0 +1,133 @@
+"""
+Benchmark do número de consultas em
+GET /api/coordenadores/orientadores/{orientador_id}/relatorios-mensais
+
+Cria um orientador com poucos e depois com muitos alunos/relatórios/mensagens e
+verifica que o número de consultas ao banco permanece o mesmo.
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_consultas_relatorios_mensais.py
+"""
+
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_relatorios.db"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Projeto, Entrega, MensagemRelatorio, TipoUsuario, StatusUsuario, EtapaProjeto
+)
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def criar_cenario(email_orientador: str, alunos: int, meses: int) -> int:
+    """
+    Cria um orientador com `alunos` alunos e `meses` relatórios mensais por aluno,
+    cada relatório com uma mensagem do coordenador e uma resposta do orientador.
+    """
+    db = SessionLocal()
+    try:
+        orientador = Usuario(
+            email=email_orientador,
+            senha="123456",
+            nome=f"Orientador {email_orientador}",
+            tipo=TipoUsuario.orientador,
+            status=StatusUsuario.ativo
+        )
+        db.add(orientador)
+        db.flush()
+
+        for a in range(alunos):
+            aluno = Usuario(
+                email=f"{a}.{email_orientador.replace('@', '.')}@alunos.ibmec.edu.br",
+                senha="123456",
+                nome=f"Aluno {a}",
+                tipo=TipoUsuario.aluno,
+                status=StatusUsuario.ativo
+            )
+            db.add(aluno)
+            db.flush()
+
+            projeto = Projeto(
+                aluno_id=aluno.id,
+                orientador_id=orientador.id,
+                titulo=f"Projeto {a}",
+                area_conhecimento="Computação",
+                descricao="Descrição",
+                etapa_atual=EtapaProjeto.relatorio_mensal_1
+            )
+            db.add(projeto)
+            db.flush()
+
+            for m in range(meses):
+                relatorio = Entrega(
+                    projeto_id=projeto.id,
+                    aluno_id=aluno.id,
+                    tipo="relatorio_mensal",
+                    titulo=f"Relatório Mensal - 2026-{m + 1:02d}",
+                    descricao="Progresso do mês"
+                )
+                db.add(relatorio)
+                db.flush()
+
+                db.add(MensagemRelatorio(
+                    entrega_id=relatorio.id, usuario_id=orientador.id,
+                    mensagem="Pergunta do coordenador", tipo_usuario="coordenador"
+                ))
+                db.add(MensagemRelatorio(
+                    entrega_id=relatorio.id, usuario_id=orientador.id,
+                    mensagem="Resposta do orientador", tipo_usuario="orientador"
+                ))
+
+        db.commit()
+        return orientador.id
+    finally:
+        db.close()
+
+
+def medir(client: TestClient, orientador_id: int):
+    consultas.clear()
+    inicio = time.perf_counter()
+    response = client.get(f"/api/coordenadores/orientadores/{orientador_id}/relatorios-mensais")
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    assert response.status_code == 200, response.text
+    return len(consultas), duracao_ms, response.json()
+
+
+def test_relatorios_mensais_consultas_constantes():
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+
+    pequeno = criar_cenario("pequeno@orientador.ibmec.edu.br", alunos=1, meses=1)
+    grande = criar_cenario("grande@orientador.ibmec.edu.br", alunos=10, meses=5)
+
+    consultas_pequeno, ms_pequeno, dados = medir(client, pequeno)
+    assert dados["total_relatorios"] == 1
+
+    consultas_grande, ms_grande, dados = medir(client, grande)
+    assert dados["total_relatorios"] == 50
+    relatorio = dados["relatorios"][0]
+    assert relatorio["mes"] == "2026-01"
+    assert relatorio["aluno_nome"] == "Aluno 0"
+    assert [m["tipo_usuario"] for m in relatorio["mensagens"]] == ["coordenador", "orientador"]
+
+    print(f"📊 1 aluno x 1 mês:   {consultas_pequeno} consulta(s), {ms_pequeno:.1f} ms")
+    print(f"📊 10 alunos x 5 meses: {consultas_grande} consulta(s), {ms_grande:.1f} ms")
+    assert consultas_pequeno == consultas_grande, "Número de consultas cresce com alunos/relatórios (N+1)"
+
+
+if __name__ == "__main__":
+    test_relatorios_mensais_consultas_constantes()
+    print("✅ Relatórios mensais do orientador com número constante de consultas")
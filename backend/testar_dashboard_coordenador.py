@@ -0,0 +1,140 @@
+"""
+Teste de GET /api/coordenadores/dashboard (painel do coordenador em uma requisição).
+
+Verifica que:
+- a rota exige token de coordenador (401 / 403)
+- a resposta traz inscrições, orientadores, alunos com a situação do
+  certificado, configuração das inscrições e totais, com filtro por ano
+- o número de consultas não cresce com o número de alunos (sem N+1)
+Usa um banco SQLite temporário.
+
+Uso: python testar_dashboard_coordenador.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_dashboard.db"
+
+from datetime import datetime
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from routes.auth import create_access_token
+from main import app
+
+URL = "/api/coordenadores/dashboard"
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def token(usuario_id, tipo):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': usuario_id, 'tipo': tipo})}"}
+
+
+def criar_equipe():
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="Orientador",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        coordenador = Usuario(email="c@ibmec.edu.br", senha="x", nome="Coordenação",
+                              tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo)
+        db.add_all([orientador, coordenador])
+        db.commit()
+        return orientador.id, coordenador.id
+    finally:
+        db.close()
+
+
+def popular(quantidade: int, orientador_id: int):
+    """Inscrições de 2025 (metade com projeto; um quarto concluído, metade deles com certificado) e uma de 2024"""
+    db = SessionLocal()
+    try:
+        inicio = db.query(Usuario).count()
+        for n in range(inicio, inicio + quantidade):
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno {n}",
+                            tipo=TipoUsuario.aluno, status=StatusUsuario.ativo, curso="Computação")
+            db.add(aluno)
+            db.flush()
+            inscricao = Inscricao(
+                usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, ano=2025,
+                orientador_id=orientador_id, titulo_projeto=f"Projeto {n}", area_conhecimento="C",
+                descricao="D", status=StatusInscricao.aprovada if n % 2 == 0 else StatusInscricao.pendente_orientador
+            )
+            db.add(inscricao)
+            db.flush()
+            if n % 2 == 0:
+                concluido = n % 4 == 0
+                db.add(Projeto(
+                    aluno_id=aluno.id, orientador_id=orientador_id, inscricao_id=inscricao.id, ano=2025,
+                    titulo=inscricao.titulo_projeto, area_conhecimento="C", descricao="D",
+                    etapa_atual=EtapaProjeto.concluido if concluido else EtapaProjeto.relatorio_parcial,
+                    certificado_arquivo=f"certificado_{n}.pdf" if concluido and n % 8 == 0 else None,
+                    certificado_data_emissao=datetime(2025, 12, 1) if concluido and n % 8 == 0 else None
+                ))
+        db.add(Inscricao(usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, ano=2024,
+                         titulo_projeto="Antigo", area_conhecimento="C", descricao="D"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def medir(client, auth, **params):
+    client.get(URL, headers=auth, params=params)  # configurações em cache, como em produção
+    consultas.clear()
+    response = client.get(URL, headers=auth, params=params)
+    assert response.status_code == 200, response.text
+    return len(consultas), response.json()
+
+
+def test_dashboard():
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    orientador_id, coordenador_id = criar_equipe()
+    auth = token(coordenador_id, "coordenador")
+
+    assert client.get(URL).status_code == 401
+    assert client.get(URL, headers=token(orientador_id, "orientador")).status_code == 403
+
+    popular(8, orientador_id)
+    consultas_poucas, dados = medir(client, auth, ano=2025)
+    assert len(dados["inscricoes"]) == 8
+    assert len(dados["alunos"]) == 4
+    assert [o["id"] for o in dados["orientadores"]] == [orientador_id]
+    assert set(dados["configuracoes"]) >= {"inscricoes_abertas", "ano_ativo"}
+
+    resumo = dados["resumo"]
+    assert resumo["inscricoes_por_status"] == {"aprovada": 4, "pendente_orientador": 4}, resumo
+    assert resumo["alunos_concluidos"] == 2
+    assert resumo["certificados_emitidos"] == 1 and resumo["certificados_pendentes"] == 1
+
+    # Situação do certificado igual à da rota por projeto
+    for aluno in dados["alunos"]:
+        certificado = client.get(f"/api/coordenadores/projetos/{aluno['projeto_id']}/certificado").json()
+        assert {chave: aluno[chave] for chave in certificado} == certificado
+
+    # Sem ano: todos os anos
+    _, todos = medir(client, auth)
+    assert len(todos["inscricoes"]) == 9
+
+    popular(72, orientador_id)
+    consultas_muitas, dados = medir(client, auth, ano=2025)
+    assert len(dados["inscricoes"]) == 80
+
+    print(f"📊 8 inscrições: {consultas_poucas} consulta(s)")
+    print(f"📊 80 inscrições: {consultas_muitas} consulta(s)")
+    assert consultas_poucas == consultas_muitas, "Número de consultas cresce com o número de alunos (N+1)"
+    assert consultas_muitas <= 4, consultas_muitas
+
+
+if __name__ == "__main__":
+    test_dashboard()
+    print("✅ Painel do coordenador em uma requisição com número constante de consultas")
@@ -0,0 +1,189 @@
+"""
+Teste da rota de download de arquivos (routes/arquivos.py, services/downloads.py).
+
+Verifica que:
+- sem token a rota retorna 401; outro aluno recebe 403; aluno, orientador e
+  coordenador baixam o arquivo
+- a ETag é o SHA-256 do conteúdo; If-None-Match e If-Modified-Since geram 304
+- Range devolve 206 com Content-Range (intervalo, sufixo, aberto), 416 fora
+  do arquivo e o arquivo inteiro quando If-Range não corresponde
+- o link temporário funciona sem token; assinatura alterada ou expirada não
+- com armazenamento S3 a rota redireciona para a URL pré-assinada
+Usa um diretório e banco SQLite temporários.
+
+Uso: python testar_downloads.py
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)  # uploads/ relativo ao diretório de trabalho
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_downloads.db"
+
+from email.utils import formatdate
+from urllib.parse import urlsplit
+from fastapi.testclient import TestClient
+from database import SessionLocal, Base, engine
+from models.database_models import Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario
+from routes.auth import create_access_token
+from services import storage as storage_module
+from services.storage import S3Storage
+from services.s3_memoria import ClienteS3Memoria
+from services.blobs import blob_store
+from services.downloads import assinar
+from main import app
+
+PDF = b"%PDF-1.4 " + os.urandom(700_000)
+
+
+def criar_usuarios():
+    db = SessionLocal()
+    try:
+        usuarios = [
+            Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="O",
+                    tipo=TipoUsuario.orientador, status=StatusUsuario.ativo),
+            Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="A",
+                    tipo=TipoUsuario.aluno, status=StatusUsuario.ativo),
+            Usuario(email="b@alunos.ibmec.edu.br", senha="x", nome="B",
+                    tipo=TipoUsuario.aluno, status=StatusUsuario.ativo),
+            Usuario(email="c@ibmec.edu.br", senha="x", nome="C",
+                    tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo),
+        ]
+        db.add_all(usuarios)
+        db.commit()
+        return {u.nome: (u.id, u.tipo.value) for u in usuarios}
+    finally:
+        db.close()
+
+
+def cabecalho(usuario):
+    user_id, tipo = usuario
+    token = create_access_token({"sub": "x", "user_id": user_id, "tipo": tipo})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_downloads():
+    Base.metadata.create_all(bind=engine)
+    usuarios = criar_usuarios()
+    client = TestClient(app)
+
+    response = client.post("/api/inscricoes/proposta", data={
+        "usuario_id": usuarios["A"][0],
+        "titulo_projeto": "Projeto",
+        "area_conhecimento": "Computação",
+        "orientador_id": usuarios["O"][0],
+        "descricao": "Descrição",
+    }, files={"projeto": ("proposta.pdf", PDF, "application/pdf")})
+    assert response.status_code in (200, 201), response.text
+    db = SessionLocal()
+    try:
+        nome = db.query(Inscricao).one().arquivo_projeto
+    finally:
+        db.close()
+    url = f"/api/arquivos/propostas/{nome}"
+
+    # Autenticação e permissão
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer invalido"}).status_code == 401
+    assert client.get(url, headers=cabecalho(usuarios["B"])).status_code == 403
+    for quem in ("A", "O", "C"):
+        response = client.get(url, headers=cabecalho(usuarios[quem]))
+        assert response.status_code == 200, (quem, response.status_code)
+        assert response.content == PDF
+    assert client.get("/api/arquivos/propostas/nao_existe.pdf", headers=cabecalho(usuarios["C"])).status_code == 404
+    assert client.get(f"/api/arquivos/desconhecida/{nome}", headers=cabecalho(usuarios["C"])).status_code == 404
+
+    # Relatório mensal do orientador aberto pela lista de entregas
+    db = SessionLocal()
+    try:
+        db.add(Projeto(aluno_id=usuarios["A"][0], orientador_id=usuarios["O"][0], titulo="P",
+                       area_conhecimento="C", descricao="D"))
+        db.commit()
+    finally:
+        db.close()
+    response = client.post(
+        f"/api/orientadores/{usuarios['O'][0]}/alunos/{usuarios['A'][0]}/relatorios-mensais",
+        data={"mes": "2026-05"},
+        files={"arquivo": ("relatorio.pdf", b"%PDF-1.4 mensal", "application/pdf")}
+    )
+    relatorio = response.json()["arquivo"]
+    for categoria in ("relatorios", "entregas"):
+        response = client.get(f"/api/arquivos/{categoria}/{relatorio}", headers=cabecalho(usuarios["A"]))
+        assert response.status_code == 200 and response.content == b"%PDF-1.4 mensal", categoria
+    assert client.get(f"/api/arquivos/entregas/{relatorio}", headers=cabecalho(usuarios["B"])).status_code == 403
+
+    auth = cabecalho(usuarios["A"])
+    response = client.get(url, headers=auth)
+    etag = response.headers["etag"]
+    ultima_modificacao = response.headers["last-modified"]
+    assert etag == f'"{hashlib.sha256(PDF).hexdigest()}"'
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert int(response.headers["content-length"]) == len(PDF)
+
+    # Requisições condicionais
+    assert client.get(url, headers={**auth, "If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={**auth, "If-None-Match": '"outra"'}).status_code == 200
+    assert client.get(url, headers={**auth, "If-Modified-Since": ultima_modificacao}).status_code == 304
+    antes = formatdate(time.time() - 86400, usegmt=True)
+    assert client.get(url, headers={**auth, "If-Modified-Since": antes}).status_code == 200
+
+    # Range
+    response = client.get(url, headers={**auth, "Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == PDF[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(PDF)}"
+    assert response.headers["content-length"] == "100"
+
+    response = client.get(url, headers={**auth, "Range": "bytes=-500"})
+    assert response.status_code == 206 and response.content == PDF[-500:]
+
+    response = client.get(url, headers={**auth, "Range": "bytes=600000-"})
+    assert response.status_code == 206 and response.content == PDF[600000:]
+
+    response = client.get(url, headers={**auth, "Range": f"bytes={len(PDF)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PDF)}"
+
+    # Retomada com If-Range: só parcial se a versão for a mesma
+    response = client.get(url, headers={**auth, "Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206 and response.content == PDF[:10]
+    response = client.get(url, headers={**auth, "Range": "bytes=0-9", "If-Range": '"antiga"'})
+    assert response.status_code == 200 and response.content == PDF
+
+    # Vários intervalos: arquivo inteiro
+    response = client.get(url, headers={**auth, "Range": "bytes=0-9,20-29"})
+    assert response.status_code == 200 and len(response.content) == len(PDF)
+
+    # Link temporário
+    response = client.get(f"{url}/link", headers=auth)
+    assert response.status_code == 200, response.text
+    link = urlsplit(response.json()["url"])
+    assinado = f"{link.path}?{link.query}"
+    response = client.get(assinado)
+    assert response.status_code == 200 and response.content == PDF
+    assert client.get(assinado.replace("assinatura=", "assinatura=0")).status_code == 401
+    expira = int(time.time()) - 1
+    expirado = f"{url}?expira={expira}&assinatura={assinar(f'propostas/{nome}', expira)}"
+    assert client.get(expirado).status_code == 401
+    assert client.get(f"{url}/link").status_code == 401
+    assert client.get(f"{url}/link", headers=cabecalho(usuarios["B"])).status_code == 403
+
+    # Armazenamento S3: redireciona para a URL pré-assinada
+    cliente_s3 = ClienteS3Memoria()
+    storage_module._storage = S3Storage(bucket="uploads", client=cliente_s3, prefixo="")
+    chave = blob_store.chave_blob(hashlib.sha256(PDF).hexdigest())
+    blob_store.storage.put(chave, PDF)
+    response = client.get(url, headers=auth, follow_redirects=False)
+    assert response.status_code == 307, response.status_code
+    assert response.headers["location"].startswith("https://uploads.s3.memoria/" + chave)
+    response = client.get(f"{url}/link", headers=auth)
+    assert response.json()["url"].startswith("https://uploads.s3.memoria/")
+
+
+if __name__ == "__main__":
+    test_downloads()
+    print("✅ Download com autenticação, Range, requisições condicionais e links temporários validado")
@@ -0,0 +1,258 @@
+"""
+Teste dos contadores pré-calculados (services/estatisticas.py).
+
+Verifica que:
+- inserções, alterações (status, ano, orientador, etapa, inclusive em objetos
+  expirados após commit) e remoções via ORM mantêm os contadores iguais a
+  um GROUP BY nas tabelas; rollback desfaz os incrementos
+- GET /api/estatisticas responde com uma consulta, sem COUNT nas tabelas
+- GET /api/coordenadores/estatisticas exige token de coordenador e filtra por ano
+- alterações fora do ORM são corrigidas por reconciliar(); com simular=True
+  nada é gravado
+- em um banco sem a tabela, ela é criada e preenchida na primeira leitura
+- duas sessões criando o mesmo contador novo ao mesmo tempo: a segunda não
+  falha com chave duplicada, soma no contador criado pela primeira
+Usa um banco SQLite temporário.
+
+Uso: python testar_estatisticas.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_estatisticas.db"
+
+from sqlalchemy import event, text
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, ContadorEstatistica,
+    TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from routes.auth import create_access_token
+from services import estatisticas
+from services.estatisticas import obter_estatisticas, reconciliar
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def token(usuario_id, tipo):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': usuario_id, 'tipo': tipo})}"}
+
+
+def conferir():
+    """Os contadores gravados batem com a contagem real"""
+    with engine.connect() as connection:
+        diferencas = reconciliar(connection, simular=True)
+    assert diferencas == [], diferencas
+
+
+def popular():
+    db = SessionLocal()
+    try:
+        orientadores = [
+            Usuario(email=f"o{n}@professores.ibmec.edu.br", senha="x", nome=f"Orientador {n}",
+                    tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+            for n in range(2)
+        ]
+        coordenador = Usuario(email="c@ibmec.edu.br", senha="x", nome="Coordenação",
+                              tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo)
+        db.add_all(orientadores + [coordenador])
+        db.flush()
+
+        for n in range(12):
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno {n}",
+                            tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+            db.add(aluno)
+            db.flush()
+            inscricao = Inscricao(
+                usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, ano=2024 + n % 2,
+                orientador_id=orientadores[n % 2].id, titulo_projeto=f"Projeto {n}",
+                area_conhecimento="C", descricao="D",
+                # sem status: default da coluna (pendente_orientador), aplicado no INSERT
+                **({"status": StatusInscricao.aprovada} if n % 3 == 0 else {})
+            )
+            db.add(inscricao)
+            db.flush()
+            if n % 3 == 0:
+                db.add(Projeto(aluno_id=aluno.id, orientador_id=inscricao.orientador_id,
+                               inscricao_id=inscricao.id, ano=inscricao.ano, titulo=inscricao.titulo_projeto,
+                               area_conhecimento="C", descricao="D"))
+        db.commit()
+        return [o.id for o in orientadores], coordenador.id
+    finally:
+        db.close()
+
+
+def test_eventos(orientadores):
+    total = obter_estatisticas(SessionLocal())
+    assert total["usuarios_por_tipo"] == {"aluno": 12, "coordenador": 1, "orientador": 2}
+    assert total["inscricoes_por_status"] == {"aprovada": 4, "pendente_orientador": 8}
+    assert total["projetos_por_etapa"] == {"envio_proposta": 4}
+    assert total["pendentes_por_orientador"] == {str(orientadores[0]): 4, str(orientadores[1]): 4}
+    conferir()
+
+    db = SessionLocal()
+    try:
+        # Alterações em objetos expirados pelo commit: o valor antigo é carregado
+        inscricao = db.query(Inscricao).filter(Inscricao.status == StatusInscricao.pendente_orientador).first()
+        db.commit()
+        inscricao.status = StatusInscricao.pendente_coordenador
+        db.commit()
+        conferir()
+
+        outra = db.query(Inscricao).filter(Inscricao.status == StatusInscricao.pendente_orientador).first()
+        outra.orientador_id = orientadores[1] if outra.orientador_id == orientadores[0] else orientadores[0]
+        outra.ano = 2030
+        db.flush()
+        outra.status = StatusInscricao.rejeitada_orientador  # segundo flush na mesma transação
+        db.commit()
+        conferir()
+        assert obter_estatisticas(db, 2030)["inscricoes_por_status"] == {"rejeitada_orientador": 1}
+
+        projeto = db.query(Projeto).first()
+        projeto.etapa_atual = EtapaProjeto.relatorio_parcial
+        db.commit()
+        conferir()
+
+        # Rollback desfaz os incrementos junto com a gravação
+        db.add(Usuario(email="x@alunos.ibmec.edu.br", senha="x", tipo=TipoUsuario.aluno))
+        db.flush()
+        db.rollback()
+        conferir()
+
+        # Remoção (rota que apaga inscrição e projeto)
+        inscricao_id = projeto.inscricao_id
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    assert client.delete(f"/api/inscricoes/{inscricao_id}").status_code == 200
+    conferir()
+    assert obter_estatisticas(SessionLocal())["inscricoes_por_status"]["aprovada"] == 3
+
+
+def test_rotas(orientadores, coordenador_id):
+    client = TestClient(app)
+    client.get("/api/estatisticas")
+    consultas.clear()
+    response = client.get("/api/estatisticas")
+    assert response.status_code == 200
+    print(f"📊 /api/estatisticas: {len(consultas)} consulta(s)")
+    assert len(consultas) == 1 and "count" not in consultas[0].lower(), consultas
+    dados = response.json()
+    assert dados["total_usuarios"] == 15 and dados["total_alunos"] == 12
+    assert dados["total_orientadores"] == 2 and dados["total_coordenadores"] == 1
+    assert dados["total_inscricoes"] == 11
+
+    url = "/api/coordenadores/estatisticas"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=token(orientadores[0], "orientador")).status_code == 403
+    response = client.get(url, headers=token(coordenador_id, "coordenador"), params={"ano": 2024})
+    assert response.status_code == 200
+    ano_2024 = response.json()
+    assert ano_2024["ano"] == 2024 and ano_2024["usuarios_por_tipo"] == {}
+    db = SessionLocal()
+    try:
+        assert sum(ano_2024["inscricoes_por_status"].values()) == db.query(Inscricao).filter(Inscricao.ano == 2024).count()
+    finally:
+        db.close()
+
+
+def test_reconciliacao():
+    # Alteração fora do ORM: contadores ficam defasados até a reconciliação
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE inscricoes SET status = 'aprovada'"))
+    with engine.connect() as connection:
+        diferencas = reconciliar(connection, simular=True)
+    assert diferencas and all(d.metrica in ("inscricoes_status", "pendentes_orientador") for d in diferencas)
+    with engine.connect() as connection:
+        assert reconciliar(connection, simular=True) == diferencas  # simular não grava
+    with engine.begin() as connection:
+        reconciliar(connection)
+    conferir()
+    assert obter_estatisticas(SessionLocal())["pendentes_por_orientador"] == {}
+
+    # Banco antigo, sem a tabela: criada e preenchida na primeira leitura
+    ContadorEstatistica.__table__.drop(bind=engine)
+    estatisticas._tabela_verificada = False
+    assert obter_estatisticas(SessionLocal())["usuarios_por_tipo"]["aluno"] == 12
+    conferir()
+
+
+def nova_inscricao(db, orientador_id, n):
+    aluno = Usuario(email=f"novo{n}@alunos.ibmec.edu.br", senha="x", nome=f"Novo {n}",
+                    tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+    db.add(aluno)
+    db.flush()
+    db.add(Inscricao(usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, ano=2031,
+                     orientador_id=orientador_id, titulo_projeto=f"Novo {n}",
+                     area_conhecimento="C", descricao="D"))
+
+
+def test_contador_novo_concorrente(orientador_id):
+    """
+    Primeiras inscrições de um ano novo em duas sessões. No SQLite as escritas
+    se serializam, então a corrida do PostgreSQL é reproduzida à mão: o
+    contador da primeira sessão é gravado entre o UPDATE (0 linhas) e o
+    INSERT da segunda.
+    """
+    primeira = SessionLocal()
+    try:
+        nova_inscricao(primeira, orientador_id, 1)
+        primeira.commit()
+    finally:
+        primeira.close()
+    with engine.begin() as connection:
+        contadores = connection.execute(
+            text("SELECT ano, metrica, chave, valor FROM contadores_estatisticas WHERE ano = 2031")
+        ).all()
+        connection.execute(text("DELETE FROM contadores_estatisticas WHERE ano = 2031"))
+    assert len(contadores) == 2, contadores
+
+    corridas = []
+
+    def _primeira_grava_antes(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("UPDATE contadores_estatisticas") or cursor.rowcount:
+            return
+        valores = context.compiled_parameters[0]
+        chave = (valores["ano_1"], valores["metrica_1"], valores["chave_1"])
+        for ano, metrica, chave_contador, valor in contadores:
+            if (ano, metrica, chave_contador) == chave and chave not in corridas:
+                corridas.append(chave)
+                cursor.connection.execute(
+                    "INSERT INTO contadores_estatisticas (ano, metrica, chave, valor) VALUES (?, ?, ?, ?)",
+                    (ano, metrica, chave_contador, valor),
+                )
+
+    event.listen(engine, "after_cursor_execute", _primeira_grava_antes)
+    segunda = SessionLocal()
+    try:
+        nova_inscricao(segunda, orientador_id, 2)
+        segunda.commit()
+    finally:
+        segunda.close()
+        event.remove(engine, "after_cursor_execute", _primeira_grava_antes)
+
+    assert len(corridas) == 2, corridas
+    ano_novo = obter_estatisticas(SessionLocal(), 2031)
+    assert ano_novo["inscricoes_por_status"] == {"pendente_orientador": 2}, ano_novo
+    assert ano_novo["pendentes_por_orientador"] == {str(orientador_id): 2}, ano_novo
+    conferir()
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    orientadores, coordenador_id = popular()
+    test_eventos(orientadores)
+    test_rotas(orientadores, coordenador_id)
+    test_reconciliacao()
+    test_contador_novo_concorrente(orientadores[0])
+    print("✅ Estatísticas pré-calculadas mantidas pelos eventos e reconciliadas")
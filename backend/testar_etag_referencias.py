@@ -0,0 +1,177 @@
+"""
+Teste do GET condicional (ETag / If-None-Match) das listas de referência.
+
+Verifica que:
+- /api/cursos, /api/unidades e /api/orientadores retornam ETag e Cache-Control
+- If-None-Match com a ETag atual retorna 304 sem reler a tabela (1 consulta de versão)
+- a ETag muda depois de inserir ou alterar um curso / orientador
+- em um banco sem a tabela versoes_tabelas, a primeira leitura a cria em uma
+  transação própria: o rollback da sessão do GET não a desfaz
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_etag_referencias.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_etag.db"
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import Curso, Usuario, TipoUsuario, StatusUsuario, VersaoTabela
+from services import versoes
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def popular_banco():
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Curso(nome="Administração", codigo="ADM"),
+            Curso(nome="Direito", codigo="DIR"),
+            Usuario(
+                email="orientador@professores.ibmec.edu.br",
+                senha="123456",
+                nome="Orientador Teste",
+                tipo=TipoUsuario.orientador,
+                status=StatusUsuario.ativo,
+                vagas_disponiveis=3
+            )
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def revalidar(client, rota):
+    primeira = client.get(rota)
+    assert primeira.status_code == 200, primeira.text
+    etag = primeira.headers["etag"]
+    assert etag.startswith('"') and "max-age" in primeira.headers["cache-control"]
+
+    consultas.clear()
+    segunda = client.get(rota, headers={"If-None-Match": etag})
+    assert segunda.status_code == 304, f"{rota}: esperado 304, veio {segunda.status_code}"
+    assert segunda.content == b""
+    assert segunda.headers["etag"] == etag
+    print(f"📊 {rota} revalidado com 304: {len(consultas)} consulta(s)")
+    assert len(consultas) <= 1, f"{rota}: 304 não deveria reler a tabela"
+    return etag
+
+
+def test_etag_referencias():
+    Base.metadata.create_all(bind=engine)
+    popular_banco()
+    client = TestClient(app)
+
+    etag_cursos = revalidar(client, "/api/cursos")
+    etag_orientadores = revalidar(client, "/api/orientadores")
+    revalidar(client, "/api/unidades")
+
+    # Lista de ETags e W/ também são aceitos
+    resposta = client.get("/api/cursos", headers={"If-None-Match": f'"outra", W/{etag_cursos}'})
+    assert resposta.status_code == 304
+
+    # Alteração de um curso existente (mesmo maior id) muda a ETag
+    db = SessionLocal()
+    try:
+        curso = db.query(Curso).filter(Curso.codigo == "DIR").first()
+        curso.ativo = 0
+        db.commit()
+    finally:
+        db.close()
+
+    resposta = client.get("/api/cursos", headers={"If-None-Match": etag_cursos})
+    assert resposta.status_code == 200, "ETag não mudou após alterar curso"
+    assert [c["codigo"] for c in resposta.json()["cursos"]] == ["ADM"]
+
+    # Alteração de orientador muda a ETag de /api/orientadores
+    db = SessionLocal()
+    try:
+        orientador = db.query(Usuario).filter(Usuario.tipo == TipoUsuario.orientador).first()
+        orientador.vagas_disponiveis = 2
+        db.commit()
+    finally:
+        db.close()
+
+    resposta = client.get("/api/orientadores", headers={"If-None-Match": etag_orientadores})
+    assert resposta.status_code == 200, "ETag não mudou após alterar orientador"
+    assert resposta.json()["orientadores"][0]["vagas_disponiveis"] == 2
+
+
+def engine_ddl_transacional(caminho: str):
+    """
+    SQLite com DDL dentro da transação, como no PostgreSQL (por padrão o
+    pysqlite confirma CREATE TABLE na hora).
+    """
+    novo = create_engine(f"sqlite:///{caminho}")
+
+    @event.listens_for(novo, "connect")
+    def _sem_autocommit(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(novo, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return novo
+
+
+def test_tabela_criada_em_banco_existente():
+    antigo = engine_ddl_transacional(os.path.join(_tmpdir, "banco_antigo.db"))
+    Curso.__table__.create(bind=antigo)
+    verificada = versoes._tabela_verificada
+    versoes._tabela_verificada = False
+    try:
+        # Leitura (GET): a sessão termina com rollback, sem commit
+        db = Session(bind=antigo)
+        try:
+            assert versoes.obter_versao(db, Curso) == "0-0"
+        finally:
+            db.rollback()
+            db.close()
+        assert inspect(antigo).has_table(VersaoTabela.__tablename__), "rollback desfez a tabela"
+
+        # A gravação seguinte incrementa o contador normalmente
+        db = Session(bind=antigo)
+        try:
+            db.add(Curso(nome="Economia", codigo="ECO"))
+            db.commit()
+            assert versoes.obter_versao(db, Curso) == "1-1"
+        finally:
+            db.close()
+
+        # Banco sem a tabela e primeira operação sendo uma gravação: criada na
+        # mesma transação, sem esperar o lock de escrita da própria sessão
+        outro = engine_ddl_transacional(os.path.join(_tmpdir, "banco_antigo_2.db"))
+        Curso.__table__.create(bind=outro)
+        versoes._tabela_verificada = False
+        db = Session(bind=outro)
+        try:
+            db.add(Curso(nome="Economia", codigo="ECO"))
+            db.commit()
+            assert versoes.obter_versao(db, Curso) == "1-1"
+        finally:
+            db.close()
+        assert versoes._tabela_verificada
+        outro.dispose()
+    finally:
+        versoes._tabela_verificada = verificada
+        antigo.dispose()
+
+
+if __name__ == "__main__":
+    test_etag_referencias()
+    test_tabela_criada_em_banco_existente()
+    print("✅ GET condicional das listas de referência validado")
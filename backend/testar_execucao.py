@@ -0,0 +1,130 @@
+"""
+Teste do modelo de execução das rotas (services/execucao.py).
+
+Verifica que:
+- nenhuma rota `async def` usa a Session diretamente (o banco vai para o
+  threadpool: rotas `def` ou run_in_threadpool)
+- com o banco lento (200ms por consulta), requisições simultâneas rodam em
+  paralelo e o detector de loop bloqueado não registra nenhum aviso
+- o detector avisa quando uma rota bloqueia o event loop
+- o limite de threads por worker é respeitado
+Usa um banco SQLite temporário.
+
+Uso: python testar_execucao.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_execucao.db"
+
+import ast
+import asyncio
+import inspect
+import logging
+import textwrap
+import time
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from database import engine, SessionLocal, Base
+from models.database_models import Usuario, TipoUsuario, StatusUsuario
+from services.execucao import configurar_execucao
+from main import app
+
+CONSULTA_LENTA = 0.2
+SIMULTANEAS = 8
+banco_lento = False
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _atrasar_consulta(conn, cursor, statement, parameters, context, executemany):
+    if banco_lento:
+        time.sleep(CONSULTA_LENTA)
+
+
+# Rota de teste que bloqueia o loop de propósito
+@app.get("/api/teste/bloqueante")
+async def rota_bloqueante():
+    time.sleep(CONSULTA_LENTA)
+    return {"ok": True}
+
+
+class Avisos(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.mensagens = []
+
+    def emit(self, registro):
+        self.mensagens.append(registro.getMessage())
+
+
+def test_rotas_async_sem_session():
+    problemas = []
+    for rota in app.routes:
+        if not isinstance(rota, APIRoute) or not inspect.iscoroutinefunction(rota.endpoint):
+            continue
+        if rota.path.startswith("/api/teste/"):
+            continue
+        arvore = ast.parse(textwrap.dedent(inspect.getsource(rota.endpoint)))
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Attribute) and isinstance(no.value, ast.Name) and no.value.id == "db":
+                problemas.append(f"{rota.path} ({rota.endpoint.__name__}): db.{no.attr}")
+    assert not problemas, "Rotas async usando a Session no event loop:\n" + "\n".join(problemas)
+
+
+async def requisicoes_simultaneas(client, url, quantidade=SIMULTANEAS):
+    inicio = time.perf_counter()
+    respostas = await asyncio.gather(*(client.get(url) for _ in range(quantidade)))
+    assert all(r.status_code == 200 for r in respostas), [r.status_code for r in respostas]
+    return time.perf_counter() - inicio
+
+
+async def test_concorrencia(aluno_id):
+    global banco_lento
+    avisos = Avisos()
+    logging.getLogger("asyncio").addHandler(avisos)
+    await configurar_execucao(threads=40, loop_lento_ms=100)
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as client:
+        banco_lento = True
+        try:
+            duracao = await requisicoes_simultaneas(client, f"/api/usuarios/{aluno_id}")
+            print(f"📊 {SIMULTANEAS} requisições com consulta de {CONSULTA_LENTA * 1000:.0f}ms: {duracao:.2f}s")
+            assert duracao < SIMULTANEAS * CONSULTA_LENTA / 2, f"requisições serializadas ({duracao:.2f}s)"
+            assert not avisos.mensagens, avisos.mensagens
+
+            # Limite de threads: 2 por vez
+            await configurar_execucao(threads=2, loop_lento_ms=100)
+            limitada = await requisicoes_simultaneas(client, f"/api/usuarios/{aluno_id}", quantidade=6)
+            print(f"📊 6 requisições com 2 threads: {limitada:.2f}s")
+            assert limitada >= 3 * CONSULTA_LENTA * 0.9, limitada
+            assert not avisos.mensagens, avisos.mensagens
+        finally:
+            banco_lento = False
+
+        # O detector acusa uma rota que bloqueia o loop
+        await client.get("/api/teste/bloqueante")
+        await asyncio.sleep(0)
+        assert any("took" in mensagem for mensagem in avisos.mensagens), avisos.mensagens
+        print(f"⚠️  Aviso do detector: {avisos.mensagens[0][:120]}...")
+
+    logging.getLogger("asyncio").removeHandler(avisos)
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    aluno = Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="Aluno",
+                    tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+    db.add(aluno)
+    db.commit()
+    aluno_id = aluno.id
+    db.close()
+
+    test_rotas_async_sem_session()
+    asyncio.run(test_concorrencia(aluno_id))
+    print("✅ Banco fora do event loop, threadpool limitado e detector de loop bloqueado validados")
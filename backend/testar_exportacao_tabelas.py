@@ -0,0 +1,182 @@
+"""
+Teste da exportação de inscrições e projetos (GET /api/coordenadores/exportacoes/{conjunto}).
+
+Verifica que:
+- a rota exige token de coordenador (401 / 403) ou link temporário assinado,
+  e a assinatura do link cobre os filtros
+- o CSV traz todas as linhas, em vários lotes, com seleção de colunas e
+  filtros por ano, status e etapa
+- coluna, formato, conjunto ou filtro inválidos retornam erro antes do envio;
+  XLSX/Parquet sem a biblioteca instalada retornam 501
+- nenhuma conexão fica emprestada do pool entre um lote e outro
+- a memória usada não cresce com o número de linhas (tracemalloc)
+Usa um banco SQLite temporário.
+
+Uso: python testar_exportacao_tabelas.py
+"""
+
+import csv
+import io
+import os
+import tempfile
+import tracemalloc
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_exportacao_tabelas.db"
+os.environ["EXPORTACAO_LOTE"] = "100"
+
+from urllib.parse import urlsplit
+from fastapi.testclient import TestClient
+from database import SessionLocal, Base, engine
+from models.database_models import (
+    Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from routes.auth import create_access_token
+from services.exportacao_tabelas import preparar_exportacao
+from main import app
+
+INSCRICOES = 450
+URL = "/api/coordenadores/exportacoes"
+
+
+def token(usuario_id, tipo):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': usuario_id, 'tipo': tipo})}"}
+
+
+def popular():
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="Orientador",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        coordenador = Usuario(email="c@ibmec.edu.br", senha="x", nome="Coordenação",
+                              tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo)
+        db.add_all([orientador, coordenador])
+        db.flush()
+
+        for n in range(INSCRICOES):
+            aprovada = n % 3 == 0
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno, \"Ção\" {n}",
+                            tipo=TipoUsuario.aluno,
+                            status=StatusUsuario.ativo if aprovada else StatusUsuario.pendente)
+            db.add(aluno)
+            db.flush()
+            inscricao = Inscricao(
+                usuario_id=aluno.id, nome=aluno.nome, email=aluno.email,
+                orientador_id=orientador.id, titulo_projeto=f"Projeto {n}",
+                area_conhecimento="Computação", descricao="D",
+                status=StatusInscricao.aprovada if aprovada else StatusInscricao.pendente_orientador
+            )
+            db.add(inscricao)
+            db.flush()
+            if aprovada:
+                db.add(Projeto(
+                    inscricao_id=inscricao.id, aluno_id=aluno.id, orientador_id=orientador.id, titulo=f"Projeto {n}",
+                    area_conhecimento="Computação", descricao="D", ano=2025 if n % 2 else 2024,
+                    etapa_atual=EtapaProjeto.relatorio_parcial if n % 2 else EtapaProjeto.artigo_final
+                ))
+        db.commit()
+        return orientador.id, coordenador.id
+    finally:
+        db.close()
+
+
+def ler_csv(response):
+    assert response.status_code == 200, response.text
+    assert response.content.startswith(b"\xef\xbb\xbf")
+    return list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+
+
+def test_rota(orientador_id, coordenador_id):
+    client = TestClient(app)
+    auth = token(coordenador_id, "coordenador")
+    assert client.get(f"{URL}/inscricoes").status_code == 401
+    assert client.get(f"{URL}/inscricoes", headers=token(orientador_id, "orientador")).status_code == 403
+
+    response = client.get(f"{URL}/inscricoes", headers=auth)
+    assert response.headers["content-type"].startswith("text/csv")
+    linhas = ler_csv(response)
+    assert len(linhas) == INSCRICOES
+    assert len({linha["id"] for linha in linhas}) == INSCRICOES
+    assert linhas[0]["nome"] == "Aluno, \"Ção\" 0"
+    assert linhas[0]["status"] == "aprovada"
+    assert {"etapa", "titulo_projeto", "orientador_id"} <= set(linhas[0])
+
+    # Seleção de colunas, na ordem pedida
+    response = client.get(f"{URL}/inscricoes", headers=auth, params={"colunas": "titulo_projeto,id"})
+    linhas = ler_csv(response)
+    assert list(linhas[0]) == ["titulo_projeto", "id"]
+
+    # Filtros
+    linhas = ler_csv(client.get(f"{URL}/inscricoes", headers=auth, params={"status": "aprovada"}))
+    assert len(linhas) == 150 and all(linha["status"] == "aprovada" for linha in linhas)
+    linhas = ler_csv(client.get(f"{URL}/inscricoes", headers=auth,
+                                params={"status": "aprovada", "etapa": "relatorio_parcial"}))
+    assert len(linhas) == 75 and all(linha["etapa"] == "relatorio_parcial" for linha in linhas)
+
+    linhas = ler_csv(client.get(f"{URL}/projetos", headers=auth, params={"ano": 2025}))
+    assert len(linhas) == 75 and all(linha["ano"] == "2025" for linha in linhas)
+    assert linhas[0]["orientador_nome"] == "Orientador" and linhas[0]["aluno_nome"].startswith("Aluno")
+    linhas = ler_csv(client.get(f"{URL}/projetos", headers=auth,
+                                params={"etapa": "artigo_final", "colunas": "id,aluno_email"}))
+    assert len(linhas) == 75 and list(linhas[0]) == ["id", "aluno_email"]
+
+    # Erros antes do envio
+    response = client.get(f"{URL}/inscricoes", headers=auth, params={"colunas": "id,senha_secreta"})
+    assert response.status_code == 400 and "senha_secreta" in response.json()["detail"]
+    assert client.get(f"{URL}/inscricoes", headers=auth, params={"formato": "pdf"}).status_code == 400
+    assert client.get(f"{URL}/inscricoes", headers=auth, params={"status": "xyz"}).status_code == 400
+    assert client.get(f"{URL}/usuarios", headers=auth).status_code == 404
+    for formato, pacote in (("xlsx", "openpyxl"), ("parquet", "pyarrow")):
+        response = client.get(f"{URL}/projetos", headers=auth, params={"formato": formato})
+        try:
+            __import__(pacote)
+            assert response.status_code == 200 and response.content, formato
+        except ImportError:
+            assert response.status_code == 501, (formato, response.status_code)
+
+    # Link temporário: vale para os parâmetros com que foi gerado
+    response = client.get(f"{URL}/projetos/link", headers=auth, params={"ano": 2025})
+    assert response.status_code == 200, response.text
+    link = urlsplit(response.json()["url"])
+    assert len(ler_csv(client.get(f"{link.path}?{link.query}"))) == 75
+    alterado = link.query.replace("ano=2025", "ano=2024")
+    assert client.get(f"{link.path}?{alterado}").status_code == 401
+    assert client.get(f"{URL}/projetos/link", headers=token(orientador_id, "orientador")).status_code == 403
+
+
+def test_lotes():
+    # Entre um lote e outro nenhuma conexão fica com o gerador
+    exportacao = preparar_exportacao("inscricoes")
+    lotes = 0
+    for lote in exportacao.lotes():
+        lotes += 1
+        assert len(lote) <= 100
+        assert engine.pool.checkedout() == 0, engine.pool.checkedout()
+    assert lotes == 5, lotes
+
+
+def test_memoria():
+    # O pico de memória é o de um lote: exportar 5 lotes custa o mesmo que exportar 1
+    def pico(**filtros):
+        tracemalloc.start()
+        total = sum(len(bloco) for bloco in preparar_exportacao("inscricoes", **filtros).gerar())
+        _, maximo = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return total, maximo
+
+    pico()  # aquece caches de compilação do SQLAlchemy
+    _, um_lote = pico(status="aprovada", etapa="relatorio_parcial")
+    total, todos = pico()
+    print(f"📊 CSV de {total / 1024:.0f}KB gerado com pico de {todos / 1024:.0f}KB "
+          f"de memória ({um_lote / 1024:.0f}KB com um lote)")
+    assert todos < um_lote * 1.5, f"pico de memória {todos} bytes (um lote: {um_lote} bytes)"
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    orientador_id, coordenador_id = popular()
+    test_rota(orientador_id, coordenador_id)
+    test_lotes()
+    test_memoria()
+    print("✅ Exportação de inscrições e projetos em blocos validada")
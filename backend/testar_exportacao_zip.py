@@ -0,0 +1,158 @@
+"""
+Teste da exportação em ZIP de um ano (GET /api/coordenadores/exportar/{ano}).
+
+Verifica que:
+- a rota exige token de coordenador (401 / 403) ou link temporário assinado
+- o ZIP é válido e contém relatórios parciais, artigos finais, certificados
+  e o manifesto CSV, que também lista arquivos não encontrados
+- outros anos e outros tipos de entrega ficam de fora
+- o primeiro bloco sai antes de o primeiro arquivo ser lido inteiro
+- a memória usada não cresce com o tamanho da exportação (tracemalloc)
+Usa um diretório e banco SQLite temporários.
+
+Uso: python testar_exportacao_zip.py
+"""
+
+import csv
+import io
+import os
+import tempfile
+import tracemalloc
+import zipfile
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)  # uploads/ relativo ao diretório de trabalho
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_exportacao.db"
+os.environ["MAX_FILE_SIZE"] = str(20 * 1024 * 1024)
+
+from urllib.parse import urlsplit
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from database import SessionLocal, Base, engine
+from models.database_models import Usuario, Projeto, Entrega, TipoUsuario, StatusUsuario
+from routes.auth import create_access_token
+from services.blobs import blob_store
+from services.exportacao_zip import gerar_zip
+from main import app
+
+MB = 1024 * 1024
+ANO = 2025
+
+
+def token(usuario_id, tipo):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': usuario_id, 'tipo': tipo})}"}
+
+
+def guardar(db, categoria, nome, conteudo):
+    blob_store.guardar(db, UploadFile(io.BytesIO(conteudo), filename=nome), categoria, nome)
+
+
+def popular(alunos=3, tamanho=MB):
+    """Projetos do ano com relatório parcial, artigo final e certificado; retorna os conteúdos"""
+    db = SessionLocal()
+    conteudos = {}
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="Orientador",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        coordenador = Usuario(email="c@ibmec.edu.br", senha="x", nome="Coordenação",
+                              tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo)
+        db.add_all([orientador, coordenador])
+        db.flush()
+
+        for n in range(alunos):
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno Ção {n}",
+                            tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+            db.add(aluno)
+            db.flush()
+            projeto = Projeto(aluno_id=aluno.id, orientador_id=orientador.id, titulo=f"Projeto {n}",
+                              area_conhecimento="C", descricao="D", ano=ANO,
+                              certificado_arquivo=f"certificado_{n}.pdf")
+            db.add(projeto)
+            db.flush()
+            guardar(db, "certificados", f"certificado_{n}.pdf", b"%PDF cert " + bytes([n]))
+            conteudos[f"certificado_{n}.pdf"] = b"%PDF cert " + bytes([n])
+
+            for tipo in ("relatorio_parcial", "artigo_final", "apresentacao_amostra"):
+                nome = f"{tipo}_{n}.pdf"
+                conteudo = os.urandom(tamanho)
+                guardar(db, "entregas", nome, conteudo)
+                conteudos[nome] = conteudo
+                db.add(Entrega(projeto_id=projeto.id, aluno_id=aluno.id, tipo=tipo, titulo=tipo, arquivo=nome))
+
+        # Entrega cujo arquivo sumiu do armazenamento
+        db.add(Entrega(projeto_id=projeto.id, aluno_id=aluno.id, tipo="artigo_final", titulo="x", arquivo="sumiu.pdf"))
+        # Projeto de outro ano
+        outro = Projeto(aluno_id=aluno.id, orientador_id=orientador.id, titulo="Antigo",
+                        area_conhecimento="C", descricao="D", ano=ANO - 1)
+        db.add(outro)
+        db.flush()
+        guardar(db, "entregas", "antigo.pdf", b"%PDF antigo")
+        db.add(Entrega(projeto_id=outro.id, aluno_id=aluno.id, tipo="artigo_final", titulo="x", arquivo="antigo.pdf"))
+        db.commit()
+        return conteudos, orientador.id, coordenador.id
+    finally:
+        db.close()
+
+
+def test_rota(conteudos, orientador_id, coordenador_id):
+    client = TestClient(app)
+    url = f"/api/coordenadores/exportar/{ANO}"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=token(orientador_id, "orientador")).status_code == 403
+
+    response = client.get(url, headers=token(coordenador_id, "coordenador"))
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as arquivo_zip:
+        assert arquivo_zip.testzip() is None
+        nomes = arquivo_zip.namelist()
+        assert f"{ANO}/manifesto.csv" in nomes
+        arquivos = [n for n in nomes if not n.endswith("manifesto.csv")]
+        assert len(arquivos) == 9, arquivos  # 3 alunos x (parcial, final, certificado)
+        assert not any("apresentacao_amostra" in n or "antigo" in n for n in nomes)
+        for nome in arquivos:
+            assert arquivo_zip.read(nome) in conteudos.values(), nome
+
+        manifesto = list(csv.DictReader(io.StringIO(arquivo_zip.read(f"{ANO}/manifesto.csv").decode("utf-8-sig"))))
+        assert len(manifesto) == 10, len(manifesto)
+        ausentes = [m for m in manifesto if m["situacao"] == "arquivo_nao_encontrado"]
+        assert [m["arquivo_original"] for m in ausentes] == ["sumiu.pdf"]
+        for linha in manifesto:
+            if linha["situacao"] == "incluido":
+                assert arquivo_zip.read(linha["caminho_zip"]) == conteudos[linha["arquivo_original"]]
+                assert int(linha["tamanho"]) == len(conteudos[linha["arquivo_original"]])
+
+    # Link temporário
+    link = client.get(f"{url}/link", headers=token(coordenador_id, "coordenador")).json()["url"]
+    partes = urlsplit(link)
+    assert client.get(f"{partes.path}?{partes.query}").status_code == 200
+    assert client.get(f"{url}/link", headers=token(orientador_id, "orientador")).status_code == 403
+
+
+def test_streaming():
+    # Primeiro bloco com dados antes de o primeiro arquivo terminar de ser lido
+    gerador = gerar_zip(ANO)
+    primeiro = next(b for b in gerador if b)
+    assert primeiro.startswith(b"PK\x03\x04")
+    assert len(primeiro) < 512 * 1024, len(primeiro)
+    gerador.close()
+
+    # Memória: o pico não acompanha o total exportado (~6MB no ano)
+    tracemalloc.start()
+    total = 0
+    for bloco in gerar_zip(ANO):
+        total += len(bloco)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"📊 ZIP de {total / MB:.1f}MB gerado com pico de {pico / MB:.2f}MB de memória")
+    assert total > 6 * MB
+    assert pico < 2 * MB, f"pico de memória {pico} bytes"
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    conteudos, orientador_id, coordenador_id = popular()
+    test_rota(conteudos, orientador_id, coordenador_id)
+    test_streaming()
+    print("✅ Exportação em ZIP com manifesto e envio em blocos validada")
@@ -0,0 +1,150 @@
+"""
+Teste do cliente assíncrono Microsoft Graph contra um servidor stub local.
+
+Sobe um servidor HTTP local que simula os endpoints de token e do Graph com
+latência artificial e verifica que:
+- chamadas simultâneas não são serializadas (não bloqueiam o event loop)
+- o limite de concorrência é respeitado
+- timeouts por chamada são aplicados
+- o fluxo de validação de email funciona de ponta a ponta
+
+Uso: python testar_graph_client.py
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from graph_client import GraphHttpClient
+from microsoft_auth import MicrosoftOAuth
+
+LATENCIA = 0.3  # segundos por resposta do stub
+
+estado = {"simultaneas": 0, "pico": 0}
+lock = threading.Lock()
+
+
+class StubMicrosoft(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status_code: int, corpo: dict):
+        with lock:
+            estado["simultaneas"] += 1
+            estado["pico"] = max(estado["pico"], estado["simultaneas"])
+        try:
+            atraso = LATENCIA * 10 if self.path.startswith("/lento") else LATENCIA
+            time.sleep(atraso)
+            dados = json.dumps(corpo).encode()
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with lock:
+                estado["simultaneas"] -= 1
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(tamanho)
+        self._responder(200, {"access_token": "token-app", "expires_in": 3600})
+
+    def do_GET(self):
+        if self.path.startswith("/users/inexistente"):
+            self._responder(404, {"error": "not found"})
+        else:
+            email = self.path.rsplit("/", 1)[-1]
+            self._responder(200, {"displayName": "Usuário Stub", "mail": email, "userPrincipalName": email})
+
+
+class ServidorStub(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def iniciar_stub():
+    servidor = ServidorStub(("127.0.0.1", 0), StubMicrosoft)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def criar_oauth(base_url: str, cliente: GraphHttpClient) -> MicrosoftOAuth:
+    oauth = MicrosoftOAuth()
+    oauth.is_development = False
+    oauth.tenant_id = oauth.client_id = oauth.client_secret = "stub"
+    oauth.authority = base_url
+    oauth.token_endpoint = f"{base_url}/oauth2/v2.0/token"
+    oauth.graph_endpoint = base_url
+    oauth.http = cliente
+    return oauth
+
+
+async def _chamadas_simultaneas(base_url: str):
+    cliente = GraphHttpClient(timeout=5, max_concurrency=50)
+    oauth = criar_oauth(base_url, cliente)
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*[
+        oauth.validate_institutional_email(f"aluno{n}@alunos.ibmec.edu.br") for n in range(20)
+    ])
+    duracao = time.perf_counter() - inicio
+
+    assert all(r["valid"] and r["exists"] for r in resultados), resultados
+    assert resultados[0]["user_data"]["display_name"] == "Usuário Stub"
+
+    negativo = await oauth.validate_institutional_email("inexistente@alunos.ibmec.edu.br")
+    assert not negativo["valid"]
+
+    await cliente.aclose()
+    return duracao
+
+
+async def _limite_concorrencia(base_url: str):
+    cliente = GraphHttpClient(timeout=5, max_concurrency=3)
+    estado["pico"] = 0
+    await asyncio.gather(*[cliente.get(f"{base_url}/me") for _ in range(9)])
+    await cliente.aclose()
+    return estado["pico"]
+
+
+async def _timeout(base_url: str):
+    cliente = GraphHttpClient(timeout=5)
+    inicio = time.perf_counter()
+    try:
+        await cliente.get(f"{base_url}/lento", timeout=LATENCIA)
+    except httpx.TimeoutException:
+        return time.perf_counter() - inicio
+    finally:
+        await cliente.aclose()
+    raise AssertionError("Timeout por chamada não foi aplicado")
+
+
+def test_graph_client_contra_stub():
+    servidor, base_url = iniciar_stub()
+    try:
+        duracao = asyncio.run(_chamadas_simultaneas(base_url))
+        print(f"📊 20 validações simultâneas: {duracao:.2f}s (latência do stub {LATENCIA}s por chamada)")
+        # Serializado levaria ~20 x (token + usuário); concorrente fica perto de 2 idas
+        assert duracao < LATENCIA * 6, "Chamadas ao Graph estão sendo serializadas"
+
+        pico = asyncio.run(_limite_concorrencia(base_url))
+        print(f"📊 Pico de chamadas simultâneas com limite 3: {pico}")
+        assert pico <= 3
+
+        duracao_timeout = asyncio.run(_timeout(base_url))
+        print(f"📊 Timeout aplicado após {duracao_timeout:.2f}s")
+        assert duracao_timeout < LATENCIA * 5
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    test_graph_client_contra_stub()
+    print("✅ Cliente Graph assíncrono validado contra servidor stub")
@@ -0,0 +1,163 @@
+"""
+Teste das métricas por rota (services/metricas.py).
+
+Verifica que:
+- toda resposta traz Server-Timing com o tempo da aplicação, do banco e o
+  número de consultas, igual ao contado pelos eventos do engine
+- /metrics agrupa pelo caminho da rota (não pela URL com ids) e exporta
+  contadores por status, histogramas de latência e de consultas por
+  requisição, tempo em SQL e bytes enviados (inclusive respostas em blocos)
+- um N+1 aparece no histograma de consultas da rota
+- com METRICAS_TOKEN definido, /metrics exige o token
+Usa um banco SQLite temporário.
+
+Uso: python testar_metricas.py
+"""
+
+import os
+import re
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_metricas.db"
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base, get_db
+from models.database_models import Usuario, Curso, TipoUsuario, StatusUsuario
+from routes.auth import create_access_token
+from services import metricas as modulo_metricas
+from services.metricas import metricas
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+# Rota de teste com N+1 proposital: uma consulta por curso
+@app.get("/api/teste/cursos-um-a-um")
+async def cursos_um_a_um(db: Session = Depends(get_db)):
+    ids = [curso.id for curso in db.query(Curso.id).all()]
+    return [db.get(Curso, curso_id).nome for curso_id in ids]
+
+
+def popular(cursos: int):
+    db = SessionLocal()
+    try:
+        inicio = db.query(Curso).count()
+        db.add_all([Curso(nome=f"Curso {n}", codigo=f"C{n}") for n in range(inicio, inicio + cursos)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def server_timing(response):
+    cabecalho = response.headers["server-timing"]
+    encontrado = re.fullmatch(r'app;dur=([\d.]+), db;dur=([\d.]+);desc="(\d+) consulta\(s\)"', cabecalho)
+    assert encontrado, cabecalho
+    app_ms, db_ms, quantidade = encontrado.groups()
+    assert float(db_ms) <= float(app_ms)
+    return int(quantidade)
+
+
+def valor(texto: str, linha: str) -> float:
+    for atual in texto.splitlines():
+        if atual.startswith(linha + " "):
+            return float(atual.rsplit(" ", 1)[1])
+    raise AssertionError(f"{linha} não encontrada em /metrics")
+
+
+def test_server_timing(client):
+    consultas.clear()
+    response = client.get("/api/cursos")
+    assert response.status_code == 200
+    assert server_timing(response) == len(consultas) > 0
+
+    # Erros também são medidos
+    response = client.get("/api/usuarios/999999")
+    assert response.status_code == 404 and server_timing(response) == 1
+
+
+def test_metricas(client, aluno_id):
+    metricas.limpar()
+    for _ in range(3):
+        client.get(f"/api/usuarios/{aluno_id}")
+    client.get("/api/usuarios/999999")
+    client.get("/api/nao-existe")
+    exportacao = client.get("/api/coordenadores/exportacoes/inscricoes",
+                            headers={"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': 1, 'tipo': 'coordenador'})}"})
+    assert exportacao.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert "server-timing" not in response.headers
+    texto = response.text
+
+    rota = 'method="GET",route="/api/usuarios/{usuario_id}"'
+    assert valor(texto, f'http_requests_total{{{rota},status="200"}}') == 3
+    assert valor(texto, f'http_requests_total{{{rota},status="404"}}') == 1
+    assert f"/api/usuarios/{aluno_id}" not in texto
+    assert valor(texto, f'http_request_duration_seconds_count{{{rota}}}') == 4
+    assert valor(texto, f'http_request_duration_seconds_bucket{{{rota},le="+Inf"}}') == 4
+    assert valor(texto, f'http_request_sql_queries_bucket{{{rota},le="1"}}') == 4
+    assert valor(texto, f'http_request_sql_queries_sum{{{rota}}}') == 4
+    assert valor(texto, f'http_request_sql_seconds_total{{{rota}}}') > 0
+    assert valor(texto, 'http_requests_total{method="GET",route="(sem rota)",status="404"}') == 1
+
+    rota_exportacao = 'method="GET",route="/api/coordenadores/exportacoes/{conjunto}"'
+    assert valor(texto, f"http_response_size_bytes_total{{{rota_exportacao}}}") == len(exportacao.content)
+
+    # Buckets acumulados em ordem crescente
+    buckets = [valor(texto, f'http_request_duration_seconds_bucket{{{rota},le="{limite}"}}')
+               for limite in modulo_metricas.LIMITES_DURACAO]
+    assert buckets == sorted(buckets)
+
+
+def test_n_mais_um(client):
+    metricas.limpar()
+    client.get("/api/teste/cursos-um-a-um")
+    popular(30)
+    client.get("/api/teste/cursos-um-a-um")
+
+    serie = metricas.serie("GET", "/api/teste/cursos-um-a-um")
+    print(f"📊 Rota com N+1: {serie.consultas.soma:.0f} consultas em 2 requisições "
+          f"(média {serie.consultas.soma / serie.consultas.total:.0f})")
+    texto = client.get("/metrics").text
+    rota = 'method="GET",route="/api/teste/cursos-um-a-um"'
+    assert valor(texto, f'http_request_sql_queries_bucket{{{rota},le="5"}}') == 1
+    assert valor(texto, f'http_request_sql_queries_bucket{{{rota},le="50"}}') == 2
+
+
+def test_token(client):
+    modulo_metricas.METRICAS_TOKEN = "segredo"
+    try:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer outro"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer segredo"}).status_code == 200
+    finally:
+        modulo_metricas.METRICAS_TOKEN = ""
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    popular(3)
+    db = SessionLocal()
+    aluno = Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="Aluno",
+                    tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+    db.add(aluno)
+    db.commit()
+    aluno_id = aluno.id
+    db.close()
+
+    client = TestClient(app)
+    test_server_timing(client)
+    test_metricas(client, aluno_id)
+    test_n_mais_um(client)
+    test_token(client)
+    print("✅ Métricas por rota, Server-Timing e exposição Prometheus validados")
@@ -0,0 +1,73 @@
+"""
+Teste dos armazenamentos de state OAuth (memory e database).
+
+Verifica uso único, expiração por TTL, limite de tamanho e que o state salvo
+por um "worker" pode ser consumido por outro (backend database).
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_oauth_state.py
+"""
+
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_oauth_state.db"
+
+from database import SessionLocal
+from models.database_models import OAuthState
+from services.oauth_state import MemoryOAuthStateStore, DatabaseOAuthStateStore
+
+
+def verificar_store(criar):
+    store = criar(ttl_seconds=60, max_size=3)
+
+    store.save("a")
+    assert store.consume("a"), "state salvo deveria ser válido"
+    assert not store.consume("a"), "state não pode ser usado duas vezes"
+    assert not store.consume("desconhecido")
+
+    # Limite de tamanho: os mais antigos são descartados
+    for state in ["s1", "s2", "s3", "s4", "s5"]:
+        store.save(state)
+    assert not store.consume("s1") and not store.consume("s2")
+    assert store.consume("s5")
+
+    # Expiração por TTL
+    expira = criar(ttl_seconds=1, max_size=10)
+    expira.save("curto")
+    time.sleep(1.1)
+    assert not expira.consume("curto"), "state expirado não pode ser aceito"
+
+
+def test_memory_store():
+    verificar_store(MemoryOAuthStateStore)
+
+
+def test_database_store():
+    verificar_store(DatabaseOAuthStateStore)
+
+    # Dois workers diferentes compartilhando o mesmo banco
+    worker_login = DatabaseOAuthStateStore(ttl_seconds=60)
+    worker_callback = DatabaseOAuthStateStore(ttl_seconds=60)
+    worker_login.save("cross-worker")
+    assert worker_callback.consume("cross-worker")
+    assert not worker_login.consume("cross-worker")
+
+    # Expirados são removidos da tabela
+    curto = DatabaseOAuthStateStore(ttl_seconds=0)
+    curto.save("lixo")
+    assert curto.purge_expired() >= 1
+    db = SessionLocal()
+    try:
+        assert db.query(OAuthState).filter(OAuthState.state == "lixo").count() == 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    test_memory_store()
+    print("✅ Backend memory OK")
+    test_database_store()
+    print("✅ Backend database OK")
@@ -0,0 +1,155 @@
+"""
+Teste da paginação por cursor (keyset) e dos filtros das listagens.
+
+Verifica, para GET /api/inscricoes/, /api/usuarios, /api/coordenadores/alunos
+e /api/orientadores/{id}/alunos, que:
+- seguir next_cursor percorre todos os itens, sem repetir nem pular nenhum
+- o ano mais recente vem primeiro e o filtro por ano/etapa/status funciona
+- limit acima do teto é reduzido e cursor inválido retorna 400
+Usa um banco SQLite temporário, não altera o banco de desenvolvimento.
+
+Uso: python testar_paginacao.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_paginacao.db"
+
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from services.paginacao import LIMITE_MAXIMO
+from main import app
+
+ANOS = (2024, 2025, 2026)
+POR_ANO = 7
+
+
+def popular() -> int:
+    """Cria POR_ANO inscrições/projetos por ano, todos com o mesmo orientador"""
+    db = SessionLocal()
+    try:
+        orientador = Usuario(
+            email="orientador@professores.ibmec.edu.br",
+            senha="123456",
+            nome="Orientador",
+            tipo=TipoUsuario.orientador,
+            status=StatusUsuario.ativo
+        )
+        db.add(orientador)
+        db.flush()
+
+        n = 0
+        for ano in ANOS:
+            for i in range(POR_ANO):
+                aluno = Usuario(
+                    email=f"aluno{n}@alunos.ibmec.edu.br",
+                    senha="123456",
+                    nome=f"Aluno {n}",
+                    tipo=TipoUsuario.aluno,
+                    status=StatusUsuario.ativo if i % 2 == 0 else StatusUsuario.inativo
+                )
+                db.add(aluno)
+                db.flush()
+
+                inscricao = Inscricao(
+                    usuario_id=aluno.id,
+                    nome=aluno.nome,
+                    email=aluno.email,
+                    titulo_projeto=f"Projeto {n}",
+                    area_conhecimento="Computação",
+                    descricao="Descrição",
+                    orientador_id=orientador.id,
+                    status=StatusInscricao.aprovada if i < 5 else StatusInscricao.pendente_orientador,
+                    ano=ano
+                )
+                db.add(inscricao)
+                db.flush()
+
+                if i < 5:
+                    db.add(Projeto(
+                        aluno_id=aluno.id,
+                        orientador_id=orientador.id,
+                        inscricao_id=inscricao.id,
+                        titulo=inscricao.titulo_projeto,
+                        area_conhecimento=inscricao.area_conhecimento,
+                        descricao=inscricao.descricao,
+                        etapa_atual=EtapaProjeto.concluido if i == 0 else EtapaProjeto.relatorio_parcial,
+                        ano=ano
+                    ))
+                n += 1
+        db.commit()
+        return orientador.id
+    finally:
+        db.close()
+
+
+def percorrer(client: TestClient, url: str, chave: str, **params):
+    """Segue next_cursor até o fim e retorna todos os itens e o número de páginas"""
+    itens, paginas, cursor = [], 0, None
+    while True:
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        dados = response.json()
+        itens.extend(dados[chave])
+        paginas += 1
+        cursor = dados["next_cursor"]
+        if not cursor:
+            return itens, paginas
+
+
+def test_paginacao():
+    Base.metadata.create_all(bind=engine)
+    orientador_id = popular()
+    client = TestClient(app)
+    total = len(ANOS) * POR_ANO
+
+    # Inscrições: todas as páginas, sem repetição, ano mais recente primeiro
+    inscricoes, paginas = percorrer(client, "/api/inscricoes/", "inscricoes", limit=4)
+    assert len(inscricoes) == total and len({i["id"] for i in inscricoes}) == total
+    assert paginas == -(-total // 4)
+    assert [i["ano"] for i in inscricoes] == sorted((i["ano"] for i in inscricoes), reverse=True)
+
+    # Filtros de inscrições
+    do_ano, _ = percorrer(client, "/api/inscricoes/", "inscricoes", limit=3, ano=2026)
+    assert len(do_ano) == POR_ANO and {i["ano"] for i in do_ano} == {2026}
+    sem_projeto, _ = percorrer(client, "/api/inscricoes/", "inscricoes", etapa="envio_proposta")
+    assert len(sem_projeto) == len(ANOS) * 2
+    pendentes, _ = percorrer(client, "/api/inscricoes/", "inscricoes", status="pendente_orientador", ano=2025)
+    assert len(pendentes) == 2
+
+    # Usuários: chave só por id
+    usuarios, _ = percorrer(client, "/api/usuarios", "usuarios", limit=5, tipo="aluno")
+    assert len(usuarios) == total and len({u["id"] for u in usuarios}) == total
+    inativos, _ = percorrer(client, "/api/usuarios", "usuarios", status="inativo")
+    assert len(inativos) == len(ANOS) * 3
+
+    # Alunos do coordenador e do orientador
+    alunos, _ = percorrer(client, "/api/coordenadores/alunos", "alunos", limit=4)
+    assert len(alunos) == len(ANOS) * 5 and len({a["projeto_id"] for a in alunos}) == len(ANOS) * 5
+    concluidos, _ = percorrer(client, "/api/coordenadores/alunos", "alunos", etapa="concluido")
+    assert len(concluidos) == len(ANOS)
+    orientados, _ = percorrer(client, f"/api/orientadores/{orientador_id}/alunos", "alunos", limit=2, ano=2024)
+    assert len(orientados) == 5 and {a["ano_projeto"] for a in orientados} == {2024}
+    ativos, _ = percorrer(client, f"/api/orientadores/{orientador_id}/alunos", "alunos", status="ativo")
+    assert len(ativos) == len(ANOS) * 3
+
+    # Limites e erros
+    response = client.get("/api/inscricoes/", params={"limit": LIMITE_MAXIMO * 10})
+    assert response.status_code == 200 and len(response.json()["inscricoes"]) == total
+    assert client.get("/api/inscricoes/", params={"cursor": "invalido"}).status_code == 400
+    assert client.get("/api/coordenadores/alunos", params={"etapa": "xyz"}).status_code == 400
+    assert client.get("/api/usuarios", params={"limit": 0}).status_code == 400
+
+    print(f"📊 {total} inscrições percorridas em {paginas} páginas de 4")
+
+
+if __name__ == "__main__":
+    test_paginacao()
+    print("✅ Paginação por cursor validada")
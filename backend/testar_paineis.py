@@ -0,0 +1,202 @@
+"""
+Teste dos snapshots dos painéis (GET /api/alunos/{id}/painel e GET /api/orientadores/{id}/painel).
+
+Verifica que:
+- as rotas exigem token do próprio usuário ou de coordenador (401 / 403)
+- cada parte do snapshot é igual à resposta da rota individual equivalente
+  (usuário, inscrição, timeline, verificações, certificado, relatórios mensais...)
+- a resposta tem uma ETag; If-None-Match com ela retorna 304 e a ETag muda
+  quando uma entrega é avaliada
+- o número de consultas não cresce com o número de alunos e entregas (sem N+1)
+Usa um banco SQLite temporário.
+
+Uso: python testar_paineis.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_paineis.db"
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, Entrega, MensagemRelatorio,
+    TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from routes.auth import create_access_token
+from main import app
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    consultas.append(statement)
+
+
+def token(usuario_id, tipo):
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'x', 'user_id': usuario_id, 'tipo': tipo})}"}
+
+
+def criar_equipe():
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="Orientador",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo, departamento="Exatas")
+        coordenador = Usuario(email="c@ibmec.edu.br", senha="x", nome="Coordenação",
+                              tipo=TipoUsuario.coordenador, status=StatusUsuario.ativo)
+        db.add_all([orientador, coordenador])
+        db.commit()
+        return orientador.id, coordenador.id
+    finally:
+        db.close()
+
+
+def popular(quantidade: int, orientador_id: int):
+    """Alunos com inscrição, projeto, entregas (relatórios mensais com mensagens) e uma proposta pendente"""
+    db = SessionLocal()
+    ids = []
+    try:
+        inicio = db.query(Usuario).count()
+        base = datetime(2025, 3, 1)
+        for n in range(inicio, inicio + quantidade):
+            aluno = Usuario(email=f"a{n}@alunos.ibmec.edu.br", senha="x", nome=f"Aluno {n}",
+                            tipo=TipoUsuario.aluno, status=StatusUsuario.ativo, curso="Computação")
+            db.add(aluno)
+            db.flush()
+            ids.append(aluno.id)
+            inscricao = Inscricao(
+                usuario_id=aluno.id, nome=aluno.nome, email=aluno.email, orientador_id=orientador_id,
+                titulo_projeto=f"Projeto {n}", area_conhecimento="C", descricao="D",
+                status=StatusInscricao.aprovada, data_submissao=base
+            )
+            db.add(inscricao)
+            db.flush()
+            projeto = Projeto(
+                aluno_id=aluno.id, orientador_id=orientador_id, inscricao_id=inscricao.id, ano=2025,
+                titulo=inscricao.titulo_projeto, area_conhecimento="C", descricao="D",
+                etapa_atual=EtapaProjeto.concluido, data_inicio=base,
+                apresentacao_data="2025-04-10", certificado_arquivo=f"certificado_{n}.pdf",
+                certificado_data_emissao=base + timedelta(days=300)
+            )
+            db.add(projeto)
+            db.flush()
+            for mes in (3, 4):
+                relatorio = Entrega(projeto_id=projeto.id, aluno_id=aluno.id, tipo="relatorio_mensal",
+                                    titulo=f"Relatório Mensal - 2025-0{mes}", arquivo=f"rm_{n}_{mes}.pdf",
+                                    data_entrega=base + timedelta(days=30 * mes))
+                db.add(relatorio)
+                db.flush()
+                db.add(MensagemRelatorio(entrega_id=relatorio.id, usuario_id=orientador_id,
+                                         mensagem="Ok", tipo_usuario="orientador"))
+            for dias, tipo in ((150, "relatorio_parcial"), (200, "artigo_final")):
+                db.add(Entrega(projeto_id=projeto.id, aluno_id=aluno.id, tipo=tipo, titulo=tipo,
+                               arquivo=f"{tipo}_{n}.pdf", data_entrega=base + timedelta(days=dias)))
+            db.add(Inscricao(usuario_id=aluno.id, nome=aluno.nome, email=aluno.email,
+                             orientador_id=orientador_id, titulo_projeto="Nova", area_conhecimento="C",
+                             descricao="D", status=StatusInscricao.pendente_orientador,
+                             data_submissao=base - timedelta(days=1)))
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+
+def medir(client, url, auth):
+    consultas.clear()
+    response = client.get(url, headers=auth)
+    assert response.status_code == 200, response.text
+    return len(consultas), response.json()
+
+
+def test_painel_aluno(client, aluno_id, orientador_id, coordenador_id):
+    url = f"/api/alunos/{aluno_id}/painel"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=token(aluno_id + 1, "aluno")).status_code == 403
+    assert client.get(url, headers=token(coordenador_id, "coordenador")).status_code == 200
+
+    auth = token(aluno_id, "aluno")
+    response = client.get(url, headers=auth)
+    assert response.status_code == 200
+    painel = response.json()
+
+    # Mesmo conteúdo das rotas individuais
+    assert painel["usuario"] == client.get(f"/api/usuarios/{aluno_id}").json()
+    assert painel["inscricao"] == client.get(f"/api/inscricoes/usuario/{aluno_id}").json()
+    assert painel["timeline"] == client.get(f"/api/alunos/{aluno_id}/timeline").json()
+    for tipo, verificacao in painel["verificacoes"].items():
+        assert verificacao == client.get(f"/api/alunos/{aluno_id}/verificar-entrega/{tipo}").json(), tipo
+    assert painel["verificacoes"]["relatorio_parcial"]["ja_enviou"]
+    assert not painel["verificacoes"]["apresentacao_amostra"]["ja_enviou"]
+    certificado = client.get(f"/api/alunos/{aluno_id}/certificado").json()
+    assert {chave: painel["certificado"][chave] for chave in certificado} == certificado
+    detalhado = client.get(f"/api/projetos/aluno/{aluno_id}").json()
+    assert {chave: painel["projeto"][chave] for chave in detalhado} == detalhado
+    assert painel["projeto"]["orientador"]["departamento"] == "Exatas"
+    relatorios = client.get(f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais").json()
+    assert painel["relatorios_mensais"] == relatorios["relatorios"]
+    assert len(painel["entregas"]) == 4
+
+    # ETag: 304 enquanto nada muda
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    consultas_304 = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert consultas_304.status_code == 304 and consultas_304.content == b""
+
+    db = SessionLocal()
+    try:
+        entrega = db.query(Entrega).filter(Entrega.aluno_id == aluno_id, Entrega.tipo == "artigo_final").one()
+        entrega.status_aprovacao_orientador = "aprovado"
+        db.commit()
+    finally:
+        db.close()
+    response = client.get(url, headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert response.json()["verificacoes"]["artigo_final"]["entrega"]["status_aprovacao_orientador"] == "aprovado"
+
+
+def test_painel_orientador(client, orientador_id, coordenador_id, aluno_id):
+    url = f"/api/orientadores/{orientador_id}/painel"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=token(aluno_id, "aluno")).status_code == 403
+
+    auth = token(orientador_id, "orientador")
+    consultas_poucas, painel = medir(client, url, auth)
+    assert painel["usuario"] == client.get(f"/api/usuarios/{orientador_id}").json()
+    pendentes = client.get(f"/api/inscricoes/orientador/{orientador_id}/pendentes").json()["propostas"]
+    assert sorted(p["id"] for p in painel["propostas_pendentes"]) == sorted(p["id"] for p in pendentes)
+
+    aluno = next(a for a in painel["alunos"] if a["aluno_id"] == aluno_id)
+    entregas = client.get(f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/entregas").json()["entregas"]
+    assert [e["id"] for e in aluno["entregas"]] == [e["id"] for e in entregas if e["tipo"] != "relatorio_mensal"]
+    relatorios = client.get(f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais").json()
+    assert aluno["relatorios_mensais"] == relatorios["relatorios"]
+    assert aluno["etapa"] == "concluido"
+    assert client.get(url, headers={**auth, "If-None-Match": client.get(url, headers=auth).headers["etag"]}).status_code == 304
+
+    popular(20, orientador_id)
+    consultas_muitas, painel = medir(client, url, auth)
+    assert len(painel["alunos"]) == 23
+
+    print(f"📊 Painel do orientador com 3 alunos: {consultas_poucas} consulta(s)")
+    print(f"📊 Painel do orientador com 23 alunos: {consultas_muitas} consulta(s)")
+    assert consultas_poucas == consultas_muitas, "Número de consultas cresce com o número de alunos (N+1)"
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    orientador_id, coordenador_id = criar_equipe()
+    alunos = popular(3, orientador_id)
+
+    consultas.clear()
+    client.get(f"/api/alunos/{alunos[0]}/painel", headers=token(alunos[0], "aluno"))
+    print(f"📊 Painel do aluno: {len(consultas)} consulta(s)")
+
+    test_painel_aluno(client, alunos[0], orientador_id, coordenador_id)
+    test_painel_orientador(client, orientador_id, coordenador_id, alunos[1])
+    print("✅ Snapshots dos painéis do aluno e do orientador validados")
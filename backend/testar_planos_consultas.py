@@ -0,0 +1,206 @@
+"""
+Teste de regressão dos planos de execução (EXPLAIN) das consultas das rotas.
+
+Executa as rotas de leitura mais usadas, captura os SELECTs emitidos e roda
+EXPLAIN em cada um. O teste falha se alguma consulta fizer varredura completa
+(full table scan) em inscricoes, projetos, entregas ou mensagens_relatorios.
+
+- SQLite (padrão): banco temporário; falha em "SCAN <tabela>" sem índice
+- PostgreSQL: defina EXPLAIN_DATABASE_URL apontando para um banco descartável
+  (as tabelas são criadas e populadas). Roda com enable_seqscan=off e falha
+  em "Seq Scan" nas tabelas acima, ou seja, quando não existe índice utilizável
+
+Uso: python testar_planos_consultas.py
+     EXPLAIN_DATABASE_URL=postgresql://... python testar_planos_consultas.py
+"""
+
+import json
+import os
+import re
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = os.getenv("EXPLAIN_DATABASE_URL", f"sqlite:///{_tmpdir}/teste_planos.db")
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from database import engine, SessionLocal, Base
+from models.database_models import (
+    Usuario, Inscricao, Projeto, Entrega, MensagemRelatorio,
+    TipoUsuario, StatusUsuario, StatusInscricao, EtapaProjeto
+)
+from main import app
+
+TABELAS_MONITORADAS = ("inscricoes", "projetos", "entregas", "mensagens_relatorios")
+
+consultas = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _capturar_consulta(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        consultas.append((statement, parameters))
+
+
+def popular():
+    """Alguns orientadores, alunos, projetos, entregas e mensagens"""
+    db = SessionLocal()
+    try:
+        orientadores = []
+        for n in range(3):
+            orientador = Usuario(
+                email=f"orientador{n}@professores.ibmec.edu.br",
+                senha="123456",
+                nome=f"Orientador {n}",
+                tipo=TipoUsuario.orientador,
+                status=StatusUsuario.ativo
+            )
+            db.add(orientador)
+            orientadores.append(orientador)
+        db.flush()
+
+        alunos = []
+        for n in range(30):
+            orientador = orientadores[n % 3]
+            aluno = Usuario(
+                email=f"aluno{n}@alunos.ibmec.edu.br",
+                senha="123456",
+                nome=f"Aluno {n}",
+                tipo=TipoUsuario.aluno,
+                status=StatusUsuario.ativo
+            )
+            db.add(aluno)
+            db.flush()
+            alunos.append(aluno)
+
+            inscricao = Inscricao(
+                usuario_id=aluno.id,
+                nome=aluno.nome,
+                email=aluno.email,
+                titulo_projeto=f"Projeto {n}",
+                area_conhecimento="Computação",
+                descricao="Descrição",
+                orientador_id=orientador.id,
+                status=StatusInscricao.aprovada if n % 2 == 0 else StatusInscricao.pendente_orientador,
+                ano=2025 + n % 2
+            )
+            db.add(inscricao)
+            db.flush()
+
+            if n % 2 == 0:
+                projeto = Projeto(
+                    aluno_id=aluno.id,
+                    orientador_id=orientador.id,
+                    inscricao_id=inscricao.id,
+                    titulo=inscricao.titulo_projeto,
+                    area_conhecimento="Computação",
+                    descricao="Descrição",
+                    etapa_atual=EtapaProjeto.relatorio_parcial,
+                    ano=inscricao.ano
+                )
+                db.add(projeto)
+                db.flush()
+
+                for mes in range(3):
+                    entrega = Entrega(
+                        projeto_id=projeto.id,
+                        aluno_id=aluno.id,
+                        tipo="relatorio_mensal",
+                        titulo=f"Relatório Mensal - 2025-0{mes + 1}"
+                    )
+                    db.add(entrega)
+                    db.flush()
+                    db.add(MensagemRelatorio(
+                        entrega_id=entrega.id,
+                        usuario_id=orientador.id,
+                        mensagem="Ok",
+                        tipo_usuario="orientador"
+                    ))
+        db.commit()
+        return orientadores[0].id, alunos[0].id
+    finally:
+        db.close()
+
+
+def rotas(orientador_id: int, aluno_id: int):
+    return [
+        "/api/inscricoes/",
+        "/api/inscricoes/?status=aprovada",
+        "/api/inscricoes/?ano=2025&etapa=relatorio_parcial",
+        f"/api/inscricoes/orientador/{orientador_id}/pendentes",
+        f"/api/inscricoes/usuario/{aluno_id}",
+        "/api/coordenadores/alunos",
+        "/api/coordenadores/alunos?etapa=relatorio_parcial",
+        f"/api/coordenadores/alunos/{aluno_id}/entregas",
+        f"/api/coordenadores/orientadores/{orientador_id}/relatorios-mensais",
+        f"/api/orientadores/{orientador_id}/alunos",
+        f"/api/orientadores/{orientador_id}/alunos?ano=2025",
+        f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/entregas",
+        f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais",
+        f"/api/alunos/{aluno_id}/projeto",
+        f"/api/alunos/{aluno_id}/entregas",
+        f"/api/alunos/{aluno_id}/verificar-entrega/relatorio_parcial",
+        f"/api/alunos/{aluno_id}/timeline",
+        f"/api/projetos/aluno/{aluno_id}",
+        f"/api/alunos/{aluno_id}/projetos",
+    ]
+
+
+def varreduras_sqlite(conn, statement, parameters):
+    plano = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    problemas = []
+    for linha in plano:
+        detalhe = linha[-1]
+        # "SCAN projetos" = varredura completa; "SCAN projetos USING INDEX ..." percorre um índice
+        match = re.match(r"SCAN (\w+)(?: AS \w+)?$", detalhe)
+        if match and match.group(1) in TABELAS_MONITORADAS:
+            problemas.append(detalhe)
+    return problemas
+
+
+def varreduras_postgres(conn, statement, parameters):
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    plano = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+
+    problemas = []
+    pendentes = [plano[0]["Plan"]]
+    while pendentes:
+        no = pendentes.pop()
+        if no.get("Node Type") == "Seq Scan" and no.get("Relation Name") in TABELAS_MONITORADAS:
+            problemas.append(f"Seq Scan on {no['Relation Name']}")
+        pendentes.extend(no.get("Plans", []))
+    return problemas
+
+
+def test_planos_sem_varredura_completa():
+    Base.metadata.create_all(bind=engine)
+    orientador_id, aluno_id = popular()
+    client = TestClient(app)
+
+    explicar = varreduras_postgres if engine.dialect.name == "postgresql" else varreduras_sqlite
+    falhas = []
+    total = 0
+
+    for rota in rotas(orientador_id, aluno_id):
+        consultas.clear()
+        response = client.get(rota)
+        assert response.status_code < 500, f"{rota}: {response.status_code} {response.text}"
+
+        capturadas = list(consultas)
+        with engine.connect() as conn:
+            for statement, parameters in capturadas:
+                if not any(tabela in statement for tabela in TABELAS_MONITORADAS):
+                    continue
+                total += 1
+                for problema in explicar(conn, statement, parameters):
+                    falhas.append(f"{rota}\n    {problema}\n    {' '.join(statement.split())[:200]}")
+
+    print(f"📊 {total} consulta(s) analisadas com EXPLAIN ({engine.dialect.name})")
+    assert not falhas, "Varredura completa de tabela:\n" + "\n".join(falhas)
+
+
+if __name__ == "__main__":
+    test_planos_sem_varredura_completa()
+    print("✅ Nenhuma consulta das rotas faz varredura completa")
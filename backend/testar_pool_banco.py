@@ -0,0 +1,145 @@
+"""
+Teste do dimensionamento do pool de conexões e da telemetria/descarte de
+carga (database.dimensionar_pool e services/pool_banco.py).
+
+Verifica que:
+- o pool de cada worker é o limite da instância dividido pelos workers (e
+  entre os engines síncrono e assíncrono com DATABASE_ASYNC=true), com
+  DB_POOL_SIZE / DB_MAX_OVERFLOW prevalecendo
+- com o pool saturado e a fila cheia, as requisições excedentes recebem 503
+  com Retry-After na hora, sem esperar o pool_timeout, e as da fila são
+  atendidas
+- quem espera mais que o pool_timeout também recebe 503 (não 500)
+- /metrics exporta conexões em uso, espera no checkout, overflow, timeouts
+  e recusas; /api/health mostra o estado do pool
+Usa um banco SQLite temporário.
+
+Uso: python testar_pool_banco.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_pool_banco.db"
+
+import asyncio
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import database
+from database import get_db, dimensionar_pool
+from services import pool_banco
+from services.execucao import configurar_execucao
+from main import app
+
+SEGURA_CONEXAO = 0.5
+SIMULTANEAS = 12
+
+# Pool pequeno para o teste: 2 fixas + 1 de overflow
+database.pool_settings.update(pool_size=2, max_overflow=1, pool_timeout=3)
+
+
+# Rota de teste que segura a conexão, como uma consulta lenta
+@app.get("/api/teste/consulta-lenta")
+def consulta_lenta(db: Session = Depends(get_db)):
+    db.execute(text("SELECT 1"))
+    time.sleep(SEGURA_CONEXAO)
+    return {"ok": True}
+
+
+def test_dimensionamento():
+    variaveis = ("DB_MAX_CONEXOES", "WEB_CONCURRENCY", "DB_POOL_SIZE", "DB_MAX_OVERFLOW")
+    anteriores = {nome: os.environ.pop(nome, None) for nome in variaveis}
+    try:
+        assert dimensionar_pool() == (5, 5)  # 40 conexões / 4 workers
+        assert dimensionar_pool(engines=2) == (2, 3)  # DATABASE_ASYNC: síncrono + assíncrono
+        os.environ.update(DB_MAX_CONEXOES="20", WEB_CONCURRENCY="4")
+        assert dimensionar_pool() == (2, 3)
+        os.environ["WEB_CONCURRENCY"] = "1"
+        assert dimensionar_pool() == (10, 10)
+        os.environ.update(DB_MAX_CONEXOES="3", WEB_CONCURRENCY="8")
+        assert dimensionar_pool() == (1, 1)  # mínimo de 2 por worker
+        assert dimensionar_pool(engines=2) == (1, 1)
+        os.environ.update(DB_POOL_SIZE="7", DB_MAX_OVERFLOW="0")
+        assert dimensionar_pool() == (7, 0)
+        assert dimensionar_pool(engines=2) == (7, 0)
+    finally:
+        for nome, valor in anteriores.items():
+            os.environ.pop(nome, None)
+            if valor is not None:
+                os.environ[nome] = valor
+
+
+async def rajada(client):
+    """SIMULTANEAS requisições à rota lenta: {status: [durações]}"""
+    async def uma():
+        inicio = time.perf_counter()
+        response = await client.get("/api/teste/consulta-lenta")
+        if response.status_code == 503:
+            assert response.headers["retry-after"] == "2", response.headers
+        return response.status_code, time.perf_counter() - inicio
+
+    resultado = {}
+    for status, duracao in await asyncio.gather(*(uma() for _ in range(SIMULTANEAS))):
+        resultado.setdefault(status, []).append(duracao)
+    return resultado
+
+
+async def test_descarte_de_carga():
+    await configurar_execucao(threads=40)
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as client:
+        # 3 conexões em uso, 3 na fila (padrão: uma por conexão), o resto recusado na hora
+        resultado = await rajada(client)
+        print(f"📊 Pool saturado: {len(resultado.get(200, []))} atendidas, "
+              f"{len(resultado.get(503, []))} recusadas em até {max(resultado.get(503, [0])) * 1000:.0f}ms")
+        # A fila conta também quem está terminando o checkout: a divisão pode variar em uma requisição
+        assert sorted(resultado) == [200, 503], resultado
+        assert 5 <= len(resultado[200]) <= 6, resultado
+        assert max(resultado[503]) < SEGURA_CONEXAO, resultado[503]
+        assert max(resultado[200]) < 2 * SEGURA_CONEXAO + 0.4, resultado[200]
+
+        telemetria = pool_banco.telemetrias["sync"]
+        recusadas = len(resultado[503])
+        assert telemetria.recusados == recusadas and telemetria.timeouts == 0
+        assert telemetria.checkouts_overflow >= 1 and telemetria.aguardando == 0
+
+        # Sem limite de fila e pool_timeout curto: quem espera demais também recebe 503
+        database.get_engine().pool._timeout = 0.8
+        pool_banco.FILA_MAXIMA = 100
+        try:
+            resultado = await rajada(client)
+        finally:
+            pool_banco.FILA_MAXIMA = 0
+        print(f"📊 Timeout do pool: {len(resultado.get(200, []))} atendidas, "
+              f"{len(resultado.get(503, []))} com 503 após ~{min(resultado.get(503, [0])) * 1000:.0f}ms")
+        assert len(resultado[200]) == 6 and len(resultado[503]) == 6, resultado
+        assert min(resultado[503]) >= 0.7, resultado[503]
+        assert telemetria.timeouts == 6 and telemetria.recusados == recusadas
+
+        texto = (await client.get("/metrics")).text
+        assert 'db_pool_size{pool="sync"} 2' in texto
+        assert 'db_pool_max_overflow{pool="sync"} 1' in texto
+        assert 'db_pool_connections_in_use{pool="sync"} 0' in texto
+        assert f'db_pool_checkouts_rejected_total{{pool="sync"}} {recusadas}' in texto
+        assert 'db_pool_checkout_timeouts_total{pool="sync"} 6' in texto
+        assert 'db_pool_overflow_checkouts_total{pool="sync"}' in texto
+        espera = [linha for linha in texto.splitlines() if linha.startswith('db_pool_checkout_wait_seconds_count{pool="sync"}')]
+        assert espera and int(espera[0].rsplit(" ", 1)[1]) >= 2 * SIMULTANEAS - recusadas, espera
+        rota = 'method="GET",route="/api/teste/consulta-lenta"'
+        assert f'http_requests_total{{{rota},status="503"}} {recusadas + 6}' in texto
+
+        saude = (await client.get("/api/health")).json()
+        assert saude["pool_banco"]["sync"]["tamanho"] == 2, saude
+        assert saude["pool_banco"]["sync"]["recusados"] == recusadas
+
+
+if __name__ == "__main__":
+    database.Base.metadata.create_all(bind=database.get_engine())
+    test_dimensionamento()
+    asyncio.run(test_descarte_de_carga())
+    print("✅ Pool dimensionado por worker, telemetria exportada e carga descartada com 503")
@@ -0,0 +1,124 @@
+"""
+Teste do perfil otimizado do SQLite (database.pragmas_sqlite e
+benchmark_sqlite.py).
+
+Verifica que:
+- toda conexão nova do engine (síncrono e aiosqlite) sai com WAL,
+  synchronous=NORMAL, busy_timeout, mmap_size, cache_size e temp_store
+- SQLITE_PERFIL=padrao e bancos em memória ficam com os padrões do SQLite
+- com WAL, uma transação de escrita aberta não bloqueia leitores (no modo
+  padrão, o leitor fica esperando o lock)
+- o benchmark de leituras durante escritas roda nos dois perfis
+Usa bancos SQLite temporários.
+
+Uso: python testar_sqlite_perfil.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_sqlite_perfil.db"
+
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+import database
+from database import get_engine, get_async_engine, fechar_async_engine, pragmas_sqlite
+from benchmark_sqlite import comparar, criar_engine, popular
+
+ESPERADOS = {
+    "journal_mode": "wal",
+    "synchronous": 1,  # NORMAL
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": 2,  # MEMORY
+}
+
+
+def ler_pragmas(conn) -> dict:
+    return {nome: conn.execute(text(f"PRAGMA {nome}")).scalar() for nome in ESPERADOS}
+
+
+def test_pragmas():
+    engine = get_engine()
+    # Duas conexões ao mesmo tempo: as duas passaram pelo evento connect
+    with engine.connect() as primeira, engine.connect() as segunda:
+        assert ler_pragmas(primeira) == ESPERADOS, ler_pragmas(primeira)
+        assert ler_pragmas(segunda) == ESPERADOS, ler_pragmas(segunda)
+
+
+async def test_pragmas_async():
+    try:
+        async with get_async_engine().connect() as conn:
+            pragmas = await conn.run_sync(lambda sync_conn: ler_pragmas(sync_conn))
+        assert pragmas == ESPERADOS, pragmas
+    finally:
+        await fechar_async_engine()
+
+
+def test_perfil_padrao():
+    assert database._usa_perfil_sqlite(f"sqlite:///{_tmpdir}/x.db")
+    assert not database._usa_perfil_sqlite("sqlite://")
+    assert not database._usa_perfil_sqlite("sqlite:///:memory:")
+    assert not database._usa_perfil_sqlite("postgresql://u:s@localhost/ic")
+    database.SQLITE_PERFIL = "padrao"
+    try:
+        assert not database._usa_perfil_sqlite(f"sqlite:///{_tmpdir}/x.db")
+    finally:
+        database.SQLITE_PERFIL = "otimizado"
+
+    os.environ["SQLITE_BUSY_TIMEOUT_MS"] = "250"
+    try:
+        assert pragmas_sqlite()["busy_timeout"] == 250
+    finally:
+        del os.environ["SQLITE_BUSY_TIMEOUT_MS"]
+
+
+def leitura_durante_escrita(perfil: str):
+    """Lê com uma transação de escrita aberta em outra conexão: (valor lido, segundos) ou erro"""
+    caminho = os.path.join(_tmpdir, f"bloqueio_{perfil}.db")
+    popular(caminho, perfil, 10)
+    escritor, leitor = criar_engine(caminho, perfil), criar_engine(caminho, perfil)
+
+    with escritor.connect() as escrita, leitor.connect() as leitura:
+        leitura.exec_driver_sql("PRAGMA busy_timeout=300")
+        escrita.exec_driver_sql("BEGIN EXCLUSIVE")
+        escrita.execute(text("UPDATE inscricoes SET titulo_projeto = 'novo' WHERE id = 1"))
+        inicio = time.perf_counter()
+        try:
+            valor = leitura.execute(text("SELECT titulo_projeto FROM inscricoes WHERE id = 1")).scalar()
+        except OperationalError as e:
+            return e, time.perf_counter() - inicio
+        return valor, time.perf_counter() - inicio
+
+
+def test_leitor_nao_bloqueia():
+    valor, duracao = leitura_durante_escrita("otimizado")
+    print(f"📊 WAL: leitura com escrita em andamento em {duracao * 1000:.1f}ms")
+    assert valor == "Projeto 0" and duracao < 0.1, (valor, duracao)
+
+    erro, duracao = leitura_durante_escrita("padrao")
+    print(f"📊 Journal padrão: leitor bloqueado por {duracao * 1000:.0f}ms ({erro})")
+    assert isinstance(erro, OperationalError) and "locked" in str(erro) and duracao >= 0.25
+
+
+def test_benchmark():
+    resultados = comparar(leitores=3, escritores=1, segundos=1.5, inscricoes=1000)
+    print("📊 Leituras durante escritas (3 leitores, 1 escritor):")
+    for resultado in resultados:
+        print(f"   {resultado.resumo()}")
+        assert resultado.leituras > 0 and resultado.escritas > 0
+    assert resultados[-1].perfil == "otimizado" and resultados[-1].erros == 0
+
+
+if __name__ == "__main__":
+    test_pragmas()
+    asyncio.run(test_pragmas_async())
+    test_perfil_padrao()
+    test_leitor_nao_bloqueia()
+    test_benchmark()
+    print("✅ Perfil otimizado do SQLite aplicado em cada conexão e leitores sem bloqueio durante escritas")
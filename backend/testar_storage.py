@@ -0,0 +1,194 @@
+"""
+Teste dos backends de armazenamento (services/storage.py).
+
+Roda o mesmo roteiro (put / get / stream com intervalo / listar / delete) no
+LocalStorage e no S3Storage contra o cliente S3 em memória
+(services/s3_memoria.py), e verifica que:
+- arquivos acima do limite usam multipart upload, com partes de no mínimo 5MB
+- um erro no meio do multipart aborta o upload e não deixa objeto nem temporário
+- a listagem segue a paginação do S3 (ContinuationToken)
+- presign gera URL só no S3
+- um backend que não implementa a interface inteira falha ao ser criado
+- o blob store e uma rota de upload funcionam com STORAGE_BACKEND=s3
+Usa diretórios e banco SQLite temporários.
+
+Uso: python testar_storage.py
+"""
+
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_storage.db"
+
+from pathlib import Path
+from fastapi.testclient import TestClient
+from database import SessionLocal, Base, engine
+from models.database_models import Usuario, Projeto, TipoUsuario, StatusUsuario
+from services import storage as storage_module
+from services.storage import LocalStorage, S3Storage, StorageBackend, ArquivoNaoEncontrado
+from services.s3_memoria import ClienteS3Memoria
+from services.blobs import blob_store
+from main import app
+
+MB = 1024 * 1024
+
+
+def arquivo_temporario(conteudo: bytes) -> Path:
+    caminho = Path(tempfile.mkstemp(dir=_tmpdir)[1])
+    caminho.write_bytes(conteudo)
+    return caminho
+
+
+def roteiro(storage):
+    conteudo = os.urandom(300_000)
+    origem = arquivo_temporario(conteudo)
+    storage.put_arquivo(origem, "blobs/ab/cd/arquivo")
+    assert not origem.exists(), "put_arquivo deve consumir a origem"
+    storage.put("documentos_cr/cr.pdf", b"%PDF-1.4 cr")
+
+    assert storage.get("blobs/ab/cd/arquivo") == conteudo
+    assert b"".join(storage.stream("blobs/ab/cd/arquivo", tamanho_bloco=64 * 1024)) == conteudo
+    assert b"".join(storage.stream("blobs/ab/cd/arquivo", inicio=100, fim=199)) == conteudo[100:200]
+    assert b"".join(storage.stream("blobs/ab/cd/arquivo", inicio=299_990)) == conteudo[299_990:]
+
+    info = storage.info("blobs/ab/cd/arquivo")
+    assert info.tamanho == len(conteudo) and info.modificado_em > 0
+    assert storage.info("nao/existe") is None
+    try:
+        storage.get("nao/existe")
+        raise AssertionError("chave inexistente não gerou erro")
+    except ArquivoNaoEncontrado:
+        pass
+
+    assert [i.chave for i in storage.listar("blobs")] == ["blobs/ab/cd/arquivo"]
+    assert sorted(i.chave for i in storage.listar()) == ["blobs/ab/cd/arquivo", "documentos_cr/cr.pdf"]
+
+    storage.delete("blobs/ab/cd/arquivo")
+    storage.delete("blobs/ab/cd/arquivo")  # idempotente
+    assert storage.info("blobs/ab/cd/arquivo") is None
+
+
+def testar_local():
+    storage = LocalStorage(Path(_tmpdir) / "local")
+    roteiro(storage)
+    assert storage.presign("documentos_cr/cr.pdf") is None
+    assert storage.caminho_local("documentos_cr/cr.pdf").read_bytes() == b"%PDF-1.4 cr"
+    assert storage.caminho_local("../../etc/passwd") is None
+
+
+def testar_s3():
+    cliente = ClienteS3Memoria(max_keys=2)
+    storage = S3Storage(bucket="teste", client=cliente, prefixo="pict", limite_multipart=8 * MB)
+    roteiro(storage)
+    assert all(key.startswith("pict/") for _, key in cliente.objetos)
+
+    # Listagem com várias páginas
+    for n in range(5):
+        storage.put(f"blobs/00/00/{n}", b"x")
+    assert len(list(storage.listar("blobs"))) == 5
+    assert cliente.chamadas.count("list_objects_v2") >= 3
+
+    # Arquivo grande: multipart com partes de 8MB
+    grande = os.urandom(20 * MB + 123)
+    cliente.chamadas.clear()
+    storage.put_arquivo(arquivo_temporario(grande), "blobs/gr/an/de")
+    assert cliente.chamadas.count("upload_part") == 3, cliente.chamadas
+    assert "complete_multipart_upload" in cliente.chamadas
+    assert storage.get("blobs/gr/an/de") == grande
+
+    # Partes abaixo de 5MB são ajustadas (o S3 recusaria o complete)
+    pequeno = S3Storage(bucket="teste", client=cliente, prefixo="", limite_multipart=MB, tamanho_parte=MB)
+    pequeno.put_arquivo(arquivo_temporario(grande[:12 * MB]), "partes/minimas")
+    assert pequeno.get("partes/minimas") == grande[:12 * MB]
+
+    # Falha no meio do multipart: abort, sem objeto e sem temporário
+    original = cliente.upload_part
+    chamadas = {"n": 0}
+
+    def upload_part_falho(**kwargs):
+        chamadas["n"] += 1
+        if chamadas["n"] == 2:
+            raise ConnectionError("conexão perdida")
+        return original(**kwargs)
+
+    cliente.upload_part = upload_part_falho
+    origem = arquivo_temporario(grande)
+    try:
+        storage.put_arquivo(origem, "blobs/fa/lh/a")
+        raise AssertionError("falha no upload_part não foi propagada")
+    except ConnectionError:
+        pass
+    cliente.upload_part = original
+    assert storage.info("blobs/fa/lh/a") is None
+    assert not cliente.uploads, "multipart não foi abortado"
+    assert not origem.exists()
+
+    url = storage.presign("documentos_cr/cr.pdf", expira_em=60, nome_download="cr.pdf")
+    assert "pict/documentos_cr/cr.pdf" in url and "X-Amz-Expires=60" in url and "cr.pdf" in url
+    assert storage.caminho_local("documentos_cr/cr.pdf") is None
+
+
+def testar_rota_com_s3():
+    cliente = ClienteS3Memoria()
+    storage_module._storage = S3Storage(bucket="uploads", client=cliente, prefixo="")
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="O",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        aluno = Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="A",
+                        tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+        db.add_all([orientador, aluno])
+        db.flush()
+        db.add(Projeto(aluno_id=aluno.id, orientador_id=orientador.id, titulo="P",
+                       area_conhecimento="C", descricao="D"))
+        db.commit()
+        orientador_id, aluno_id = orientador.id, aluno.id
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    response = client.post(
+        f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais",
+        data={"mes": "2026-04"},
+        files={"arquivo": ("relatorio.pdf", b"%PDF-1.4 s3", "application/pdf")}
+    )
+    assert response.status_code == 201, response.text
+    nome = response.json()["arquivo"]
+
+    db = SessionLocal()
+    try:
+        assert blob_store.ler(db, "relatorios", nome) == b"%PDF-1.4 s3"
+        assert blob_store.caminho(db, "relatorios", nome) is None  # nada em disco
+        assert all(key.startswith("blobs/") for _, key in cliente.objetos)
+    finally:
+        db.close()
+    assert not (Path(_tmpdir) / "uploads").exists(), "upload com S3 gravou no diretório local"
+
+
+def testar_backend_incompleto():
+    class SemListar(StorageBackend):
+        diretorio_temporario = LocalStorage.diretorio_temporario
+        put_arquivo = LocalStorage.put_arquivo
+        put = LocalStorage.put
+        stream = LocalStorage.stream
+        info = LocalStorage.info
+        delete = LocalStorage.delete
+
+    try:
+        SemListar()
+    except TypeError as e:
+        assert "listar" in str(e), e
+    else:
+        raise AssertionError("backend sem listar() deveria falhar ao ser criado")
+
+
+if __name__ == "__main__":
+    testar_local()
+    testar_s3()
+    testar_rota_com_s3()
+    testar_backend_incompleto()
+    print("✅ Backends de armazenamento local e S3 validados")
@@ -0,0 +1,92 @@
+"""
+Teste do cache de token de aplicação (AppTokenManager).
+
+Verifica que:
+- requisições simultâneas sem token fazem uma única chamada ao endpoint de token
+- tokens válidos são servidos da memória (hits)
+- o token é renovado em segundo plano antes de expirar, sem bloquear chamadores
+- falhas de renovação não derrubam um token ainda válido
+
+Uso: python testar_token_manager.py
+"""
+
+import asyncio
+
+from graph_client import AppTokenManager
+
+
+class FakeTokenEndpoint:
+    def __init__(self, expires_in: float, latencia: float = 0.05):
+        self.expires_in = expires_in
+        self.latencia = latencia
+        self.chamadas = 0
+        self.falhar = False
+
+    async def __call__(self):
+        self.chamadas += 1
+        await asyncio.sleep(self.latencia)
+        if self.falhar:
+            raise RuntimeError("endpoint de token indisponível")
+        return {"access_token": f"token-{self.chamadas}", "expires_in": self.expires_in}
+
+
+async def _single_flight():
+    endpoint = FakeTokenEndpoint(expires_in=3600)
+    manager = AppTokenManager(endpoint, refresh_margin=300)
+
+    tokens = await asyncio.gather(*[manager.get_token() for _ in range(50)])
+    assert set(tokens) == {"token-1"}, tokens
+    assert endpoint.chamadas == 1, f"{endpoint.chamadas} chamadas ao endpoint de token (stampede)"
+
+    for _ in range(100):
+        assert await manager.get_token() == "token-1"
+    return manager.stats()
+
+
+async def _renovacao_antecipada():
+    endpoint = FakeTokenEndpoint(expires_in=1.0, latencia=0.05)
+    manager = AppTokenManager(endpoint, refresh_margin=0.6)
+
+    assert await manager.get_token() == "token-1"
+    await asyncio.sleep(0.55)  # entra na janela de renovação, token ainda válido
+
+    token = await manager.get_token()
+    assert token == "token-1", "chamador não deve esperar a renovação em segundo plano"
+    await asyncio.sleep(0.1)
+    assert await manager.get_token() == "token-2"
+    return manager.stats()
+
+
+async def _falha_renovacao():
+    endpoint = FakeTokenEndpoint(expires_in=1.0, latencia=0.01)
+    manager = AppTokenManager(endpoint, refresh_margin=0.6)
+
+    assert await manager.get_token() == "token-1"
+    endpoint.falhar = True
+    await asyncio.sleep(0.55)
+    assert await manager.get_token() == "token-1"
+    await asyncio.sleep(0.05)
+    assert await manager.get_token() == "token-1", "token válido deve continuar em uso após falha"
+
+    await asyncio.sleep(0.5)  # expirou e endpoint continua fora
+    assert await manager.get_token() is None
+    return manager.stats()
+
+
+def test_token_manager():
+    stats = asyncio.run(_single_flight())
+    print(f"📊 Single-flight: {stats}")
+    assert stats["misses"] == 50 and stats["refreshes"] == 1 and stats["hits"] == 100
+
+    stats = asyncio.run(_renovacao_antecipada())
+    print(f"📊 Renovação antecipada: {stats}")
+    assert stats["background_refreshes"] == 1
+
+    stats = asyncio.run(_falha_renovacao())
+    print(f"📊 Falha de renovação: {stats}")
+    assert stats["refresh_failures"] >= 1
+
+
+if __name__ == "__main__":
+    test_token_manager()
+    print("✅ Cache de token de aplicação validado")
@@ -0,0 +1,157 @@
+"""
+Teste do serviço de upload em blocos (services/uploads.py).
+
+Verifica que:
+- o arquivo é gravado inteiro, com SHA-256 correto e sem temporários no diretório
+- uploads acima de MAX_FILE_SIZE retornam 413, param de ler cedo e não deixam arquivo
+- nomes com diretórios ("../") não saem do diretório de upload
+- o event loop continua respondendo durante a gravação de um arquivo grande
+- a rota de relatório mensal rejeita arquivo grande sem criar a entrega
+Usa um diretório e banco SQLite temporários.
+
+Uso: python testar_uploads.py
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp()
+os.chdir(_tmpdir)  # uploads/ relativo ao diretório de trabalho
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/teste_uploads.db"
+os.environ["MAX_FILE_SIZE"] = str(2 * 1024 * 1024)
+
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from database import SessionLocal, Base, engine
+from models.database_models import Usuario, Projeto, Entrega, TipoUsuario, StatusUsuario
+from services.uploads import salvar_upload, nome_seguro
+from services.blobs import blob_store
+from main import app
+
+MAX = 2 * 1024 * 1024
+
+
+class ArquivoContado(io.BytesIO):
+    """BytesIO que conta quantos bytes foram lidos"""
+    lidos = 0
+
+    def read(self, n=-1):
+        dados = super().read(n)
+        self.lidos += len(dados)
+        return dados
+
+
+def upload(conteudo: bytes, nome="arquivo.pdf", tamanho_conhecido=True):
+    arquivo = ArquivoContado(conteudo)
+    return UploadFile(arquivo, filename=nome, size=len(conteudo) if tamanho_conhecido else None), arquivo
+
+
+def arquivos_em(diretorio: Path):
+    return sorted(p.name for p in diretorio.iterdir()) if diretorio.exists() else []
+
+
+async def testar_servico():
+    destino_dir = Path(_tmpdir) / "uploads" / "teste"
+
+    # Gravação normal
+    conteudo = os.urandom(MAX - 10)
+    arquivo, _ = upload(conteudo)
+    salvo = await salvar_upload(arquivo, destino_dir / "ok.pdf", tamanho_bloco=64 * 1024)
+    assert salvo.tamanho == len(conteudo)
+    assert salvo.sha256 == hashlib.sha256(conteudo).hexdigest()
+    assert (destino_dir / "ok.pdf").read_bytes() == conteudo
+    assert arquivos_em(destino_dir) == ["ok.pdf"], arquivos_em(destino_dir)
+
+    # Tamanho conhecido acima do limite: rejeitado sem ler
+    arquivo, bruto = upload(os.urandom(MAX + 1))
+    try:
+        await salvar_upload(arquivo, destino_dir / "grande.pdf")
+        raise AssertionError("upload acima do limite foi aceito")
+    except HTTPException as e:
+        assert e.status_code == 413
+    assert bruto.lidos == 0
+
+    # Tamanho desconhecido: interrompe logo após passar do limite
+    arquivo, bruto = upload(os.urandom(MAX * 4), tamanho_conhecido=False)
+    try:
+        await salvar_upload(arquivo, destino_dir / "grande.pdf", tamanho_bloco=64 * 1024)
+        raise AssertionError("upload acima do limite foi aceito")
+    except HTTPException as e:
+        assert e.status_code == 413
+    assert bruto.lidos <= MAX + 64 * 1024, f"leu {bruto.lidos} bytes antes de abortar"
+    assert arquivos_em(destino_dir) == ["ok.pdf"], "arquivo parcial ficou no diretório"
+
+    # Nome com diretórios
+    assert nome_seguro("../../main.py") == "main.py"
+    assert nome_seguro("..\\..\\x.pdf") == "x.pdf"
+    assert nome_seguro("") == "arquivo"
+
+    # Event loop responde durante a gravação
+    maior_intervalo = 0.0
+    gravando = True
+
+    async def relogio():
+        nonlocal maior_intervalo
+        anterior = time.perf_counter()
+        while gravando:
+            await asyncio.sleep(0.005)
+            agora = time.perf_counter()
+            maior_intervalo = max(maior_intervalo, agora - anterior)
+            anterior = agora
+
+    tarefa = asyncio.create_task(relogio())
+    arquivo, _ = upload(os.urandom(MAX - 1))
+    await salvar_upload(arquivo, destino_dir / "loop.pdf", tamanho_bloco=256 * 1024)
+    gravando = False
+    await tarefa
+    print(f"📊 Maior intervalo do event loop durante o upload: {maior_intervalo * 1000:.1f}ms")
+    assert maior_intervalo < 0.1, "gravação bloqueou o event loop"
+
+
+def testar_rota():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        orientador = Usuario(email="o@professores.ibmec.edu.br", senha="x", nome="O",
+                             tipo=TipoUsuario.orientador, status=StatusUsuario.ativo)
+        aluno = Usuario(email="a@alunos.ibmec.edu.br", senha="x", nome="A",
+                        tipo=TipoUsuario.aluno, status=StatusUsuario.ativo)
+        db.add_all([orientador, aluno])
+        db.flush()
+        db.add(Projeto(aluno_id=aluno.id, orientador_id=orientador.id, titulo="P",
+                       area_conhecimento="C", descricao="D"))
+        db.commit()
+        orientador_id, aluno_id = orientador.id, aluno.id
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    url = f"/api/orientadores/{orientador_id}/alunos/{aluno_id}/relatorios-mensais"
+
+    response = client.post(url, data={"mes": "2026-03"},
+                           files={"arquivo": ("relatorio.pdf", os.urandom(MAX + 1), "application/pdf")})
+    assert response.status_code == 413, response.text
+
+    response = client.post(url, data={"mes": "2026-03"},
+                           files={"arquivo": ("../../relatorio.pdf", b"%PDF-1.4 ok", "application/pdf")})
+    assert response.status_code == 201, response.text
+    nome = response.json()["arquivo"]
+    assert "/" not in nome
+
+    db = SessionLocal()
+    try:
+        assert blob_store.caminho(db, "relatorios", nome).read_bytes() == b"%PDF-1.4 ok"
+        assert db.query(Entrega).count() == 1, "upload rejeitado criou entrega"
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(testar_servico())
+    testar_rota()
+    print("✅ Upload em blocos validado")
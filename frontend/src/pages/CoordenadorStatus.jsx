@@ -2,6 +2,7 @@ import { useEffect, useState } from 'react';
 import { useAuth } from '../context/AuthContext';
 import Card from '../components/Card';
 import API_BASE_URL from '../config/api';
+import { fetchTodasPaginas } from '../utils/fetchHelpers';
 
 const etapaLabels = {
   envio_proposta: 'Submissão de Documentação e Proposta Inicial',
@@ -505,10 +506,8 @@ const CoordenadorStatus = () => {
 
   const fetchAlunos = async () => {
     try {
-      const res = await fetch(`${API_BASE_URL}/coordenadores/alunos`);
-      if (!res.ok) throw new Error('Falha ao carregar alunos');
-      const data = await res.json();
-      setAlunos(data.alunos || []);
+      const todosAlunos = await fetchTodasPaginas(`${API_BASE_URL}/coordenadores/alunos`, 'alunos');
+      setAlunos(todosAlunos);
     } catch (err) {
       setError(err.message);
     } finally {
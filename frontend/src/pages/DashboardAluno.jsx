@@ -6,6 +6,8 @@ import EnviarRelatorioParcial from './EnviarRelatorioParcial';
 import EnviarApresentacaoAmostra from './EnviarApresentacaoAmostra';
 import EnviarArtigoFinal from './EnviarArtigoFinal';
 import API_BASE_URL from '../config/api';
+import { abrirArquivo } from '../utils/fetchHelpers';
+import { apiGet } from '../utils/api';
 
 const DashboardAluno = () => {
   const { user, updateUser } = useAuth();
@@ -32,91 +34,61 @@ const DashboardAluno = () => {
   const [loadingOrientadores, setLoadingOrientadores] = useState(false);
 
 
-  // Verificar status das inscrições
-  useEffect(() => {
-    const verificarStatusInscricoes = async () => {
-      try {
-        const response = await fetch(`${API_BASE_URL}/inscricoes/status`);
-        if (response.ok) {
-          const data = await response.json();
-          setInscricoesAbertas(data.inscricoes_abertas);
-        }
-      } catch (error) {
-        console.error('Erro ao verificar status das inscrições:', error);
-      } finally {
-        setLoadingInscricoesStatus(false);
-      }
-    };
-
-    verificarStatusInscricoes();
-  }, []);
-
-  // Buscar status da entrega do relatório parcial
-  const fetchStatusRelatorioParcial = async () => {
+  // Painel completo (usuário, inscrição, projeto, entregas, certificado e
+  // relatórios mensais) em uma requisição; o navegador revalida pela ETag
+  const carregarPainel = async () => {
     if (!user?.id) return;
+    setLoadingRelatorios(true);
     try {
-      console.log('🔍 Buscando status do relatório parcial...');
-      const res = await fetch(`${API_BASE_URL}/alunos/${user.id}/verificar-entrega/relatorio_parcial`);
-      if (res.ok) {
-        try {
-          const text = await res.text();
-          const data = text ? JSON.parse(text) : null;
-          console.log('📦 Dados do relatório parcial:', data);
-          if (data?.ja_enviou && data.entrega) {
-            console.log('✅ Status aprovação orientador:', data.entrega.status_aprovacao_orientador);
-            console.log('✅ Status aprovação coordenador:', data.entrega.status_aprovacao_coordenador);
-            setEntregaRelatorioParcial(data.entrega);
-          }
-        } catch (parseError) {
-          console.error('Erro ao fazer parse da resposta:', parseError);
-        }
-      }
-    } catch (error) {
-      console.error('Erro ao verificar status do relatório parcial:', error);
-    }
-  };
+      const res = await apiGet(`/alunos/${user.id}/painel`);
+      if (!res.ok) throw new Error(`Erro HTTP ${res.status}`);
+      const painel = await res.json();
 
-  // Buscar status da entrega do artigo final
-  const fetchStatusArtigoFinal = async () => {
-    if (!user?.id) return;
-    try {
-      console.log('🔍 Buscando status do artigo final...');
-      const res = await fetch(`${API_BASE_URL}/alunos/${user.id}/verificar-entrega/artigo_final`);
-      if (res.ok) {
-        try {
-          const text = await res.text();
-          const data = text ? JSON.parse(text) : null;
-          console.log('📦 Dados do artigo final:', data);
-          if (data?.ja_enviou && data.entrega) {
-            console.log('✅ Status aprovação orientador:', data.entrega.status_aprovacao_orientador);
-            console.log('✅ Status aprovação coordenador:', data.entrega.status_aprovacao_coordenador);
-            setEntregaArtigoFinal(data.entrega);
-          }
-        } catch (parseError) {
-          console.error('Erro ao fazer parse da resposta:', parseError);
-        }
+      setUserData(painel.usuario);
+      setInscricoesAbertas(painel.inscricoes_abertas);
+      setInscricao(painel.inscricao?.tem_proposta ? painel.inscricao.inscricao : null);
+      setRelatoriosMensais(painel.relatorios_mensais || []);
+
+      const verificacoes = painel.verificacoes || {};
+      if (verificacoes.relatorio_parcial?.ja_enviou) {
+        setEntregaRelatorioParcial(verificacoes.relatorio_parcial.entrega);
+      }
+      if (verificacoes.artigo_final?.ja_enviou) {
+        setEntregaArtigoFinal(verificacoes.artigo_final.entrega);
+      }
+      if (painel.certificado?.tem_certificado) {
+        setCertificadoInfo(painel.certificado);
       }
-    } catch (error) {
-      console.error('Erro ao verificar status do artigo final:', error);
-    }
-  };
 
-  // Buscar informações do certificado
-  const fetchCertificado = async () => {
-    if (!user?.id) return;
-    try {
-      const res = await fetch(`${API_BASE_URL}/alunos/${user.id}/certificado`);
-      if (res.ok) {
-        const data = await res.json();
-        if (data.tem_certificado) {
-          setCertificadoInfo(data);
+      const projeto = painel.projeto;
+      if (painel.inscricao?.tem_proposta && projeto) {
+        setEtapaAtual(projeto.etapa_atual || '');
+        if (projeto.apresentacao_data) {
+          setApresentacaoInfo({
+            data: projeto.apresentacao_data,
+            hora: projeto.apresentacao_hora,
+            campus: projeto.apresentacao_campus,
+            sala: projeto.apresentacao_sala
+          });
+        }
+        if (projeto.feedback_apresentacao) {
+          setFeedbackApresentacao(projeto.feedback_apresentacao);
+        }
+        if (projeto.amostra_data) {
+          setAmostraInfo({
+            data: projeto.amostra_data,
+            hora: projeto.amostra_hora,
+            campus: projeto.amostra_campus,
+            sala: projeto.amostra_sala
+          });
         }
-      } else if (res.status === 404) {
-        // 404 é esperado quando não há certificado ainda
-        console.log('Certificado ainda não disponível');
       }
     } catch (error) {
-      console.error('Erro ao verificar certificado:', error);
+      console.error('Erro ao carregar painel do aluno:', error);
+    } finally {
+      setLoading(false);
+      setLoadingInscricoesStatus(false);
+      setLoadingRelatorios(false);
     }
   };
 
@@ -137,104 +109,6 @@ const DashboardAluno = () => {
   };
 
   useEffect(() => {
-    // Função para buscar dados atualizados do usuário
-    const fetchUserData = async () => {
-      if (!user?.id) return;
-      
-      try {
-        console.log('🔍 Buscando dados do usuário ID:', user.id);
-        const response = await fetch(`${API_BASE_URL}/usuarios/${user.id}`);
-        
-        if (response.ok) {
-          // Parse seguro da resposta
-          try {
-            const text = await response.text();
-            const data = text ? JSON.parse(text) : null;
-            if (data) {
-              console.log('✅ Dados recebidos do backend:', data);
-              setUserData(data);
-              // NÃO atualizar o contexto global aqui para evitar loop infinito
-              // O contexto já tem os dados necessários do login
-            }
-          } catch (parseError) {
-            console.error('❌ Erro ao fazer parse da resposta:', parseError);
-          }
-        } else {
-          console.error('❌ Erro na resposta:', response.status);
-        }
-      } catch (error) {
-        console.error('❌ Erro ao buscar dados do usuário:', error);
-      }
-    };
-
-    // Buscar inscrição do aluno
-    const fetchInscricao = async () => {
-      try {
-        const response = await fetch(`${API_BASE_URL}/inscricoes/usuario/${user?.id}`);
-        
-        let data = null;
-        try {
-          const text = await response.text();
-          data = text ? JSON.parse(text) : null;
-        } catch (parseError) {
-          console.error('Erro ao fazer parse da resposta:', parseError);
-          return;
-        }
-        
-        if (data?.tem_proposta) {
-          setInscricao(data.inscricao);
-          // Buscar etapa atual do projeto
-          const etapaRes = await fetch(`${API_BASE_URL}/projetos/alunos/${user?.id}/status-etapa`);
-          if (etapaRes.ok) {
-            const etapaData = await etapaRes.json();
-            setEtapaAtual(etapaData.etapa || '');
-            
-            // Buscar informações do projeto (apresentação e amostra)
-            try {
-              const projetoRes = await fetch(`${API_BASE_URL}/projetos/aluno/${user?.id}`);
-              if (projetoRes.ok) {
-                const projetoData = await projetoRes.json();
-                
-                // Buscar informações da apresentação da proposta
-                if (projetoData.apresentacao_data) {
-                  setApresentacaoInfo({
-                    data: projetoData.apresentacao_data,
-                    hora: projetoData.apresentacao_hora,
-                    campus: projetoData.apresentacao_campus,
-                    sala: projetoData.apresentacao_sala
-                  });
-                }
-                
-                // Buscar feedback da apresentação se houver
-                if (projetoData.feedback_apresentacao) {
-                  setFeedbackApresentacao(projetoData.feedback_apresentacao);
-                }
-                
-                // Buscar informações da apresentação na amostra
-                if (projetoData.amostra_data) {
-                  setAmostraInfo({
-                    data: projetoData.amostra_data,
-                    hora: projetoData.amostra_hora,
-                    campus: projetoData.amostra_campus,
-                    sala: projetoData.amostra_sala
-                  });
-                }
-              }
-            } catch (error) {
-              console.error('Erro ao buscar informações do projeto:', error);
-            }
-          }
-        } else {
-          setInscricao(null);
-        }
-      } catch (error) {
-        console.error('Erro ao buscar inscrição:', error);
-        setInscricao(null);
-      } finally {
-        setLoading(false);
-      }
-    };
-    
     if (user?.id) {
       // Verificar se já fez fetch ou se o ID mudou
       if (!hasFetchedRef.current || userIdRef.current !== user.id) {
@@ -242,47 +116,16 @@ const DashboardAluno = () => {
         userIdRef.current = user.id;
         hasFetchedRef.current = true;
         
-        fetchUserData();
-        fetchInscricao();
-        fetchStatusRelatorioParcial();
-        fetchStatusArtigoFinal();
-        fetchCertificado();
+        carregarPainel();
         fetchOrientadores();
       }
     } else {
       setLoading(false);
+      setLoadingInscricoesStatus(false);
       hasFetchedRef.current = false;
     }
   }, [user?.id]); // Removido updateUser das dependências para evitar loop infinito
 
-  // Função para buscar relatórios mensais do aluno
-  const buscarRelatoriosMensais = async () => {
-    if (!inscricao?.orientador_id || !user?.id) return;
-    
-    setLoadingRelatorios(true);
-    try {
-      const response = await fetch(
-        `${API_BASE_URL}/orientadores/${inscricao.orientador_id}/alunos/${user.id}/relatorios-mensais`
-      );
-      if (response.ok) {
-        const data = await response.json();
-        setRelatoriosMensais(data.relatorios || []);
-      }
-    } catch (error) {
-      console.error('Erro ao buscar relatórios mensais:', error);
-    } finally {
-      setLoadingRelatorios(false);
-    }
-  };
-
-  // Buscar relatórios quando tiver orientador definido
-  useEffect(() => {
-    if (inscricao?.orientador_id && user?.id) {
-      buscarRelatoriosMensais();
-    }
-    // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [inscricao?.orientador_id]); // Removido user.id para evitar re-renders desnecessários
-
   // Simular se o aluno tem proposta submetida
   const temProposta = inscricao !== null;
   const semProposta = !temProposta;
@@ -1164,7 +1007,7 @@ const DashboardAluno = () => {
                             <div className="flex items-center justify-between">
                               <h3 className="text-lg font-bold text-ibmec-blue-800">📋 Status da Avaliação</h3>
                               <button
-                                onClick={fetchStatusRelatorioParcial}
+                                onClick={carregarPainel}
                                 className="text-sm bg-ibmec-blue-600 hover:bg-ibmec-blue-700 text-white px-3 py-1.5 rounded-lg transition flex items-center gap-2"
                               >
                                 🔄 Atualizar Status
@@ -1364,15 +1207,14 @@ const DashboardAluno = () => {
                                     year: 'numeric'
                                   })}
                                 </p>
-                                <a
-                                  href={`${API_BASE_URL}/uploads/certificados/${certificadoInfo.certificado_arquivo}`}
-                                  target="_blank"
-                                  rel="noopener noreferrer"
+                                <button
+                                  type="button"
+                                  onClick={() => abrirArquivo(API_BASE_URL, 'certificados', certificadoInfo.certificado_arquivo)}
                                   className="inline-flex items-center gap-2 bg-green-600 hover:bg-green-700 text-white font-bold py-3 px-6 rounded-lg transition shadow-lg"
                                 >
                                   <span className="text-xl">📥</span>
                                   Baixar Certificado (PDF)
-                                </a>
+                                </button>
                               </>
                             ) : (
                               <>
@@ -1646,14 +1488,13 @@ const DashboardAluno = () => {
 
                                   {relatorio.arquivo && (
                                     <div className="mt-4">
-                                      <a
-                                        href={`${API_BASE_URL.replace('/api', '')}/uploads/entregas/${relatorio.arquivo}`}
-                                        target="_blank"
-                                        rel="noopener noreferrer"
+                                      <button
+                                        type="button"
+                                        onClick={() => abrirArquivo(API_BASE_URL, 'entregas', relatorio.arquivo)}
                                         className="btn-primary inline-block"
                                       >
                                         📎 Baixar Arquivo do Relatório
-                                      </a>
+                                      </button>
                                     </div>
                                   )}
                                 </div>
@@ -3,6 +3,8 @@ import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import Card from '../components/Card';
 import API_BASE_URL from '../config/api';
+import { abrirArquivo, abrirLinkAutenticado } from '../utils/fetchHelpers';
+import { apiGet } from '../utils/api';
 
 const DashboardCoordenador = () => {
   const { user } = useAuth();
@@ -14,6 +16,7 @@ const DashboardCoordenador = () => {
   const [filterCurso, setFilterCurso] = useState('todos');
   const [filterUnidade, setFilterUnidade] = useState('todas');
   const [inscricoes, setInscricoes] = useState([]);
+  const [resumo, setResumo] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [feedbackModal, setFeedbackModal] = useState({ open: false, id: null, status: 'aprovado', mensagem: '' });
@@ -37,18 +40,23 @@ const DashboardCoordenador = () => {
   const [certificadoFile, setCertificadoFile] = useState(null);
   const [uploadingCertificado, setUploadingCertificado] = useState(false);
 
-  const loadInscricoes = async () => {
+  // Inscrições, orientadores, alunos (com certificado) e configuração em uma requisição
+  const carregarDashboard = async () => {
     try {
       setLoading(true);
-      const res = await fetch(`${API_BASE_URL}/inscricoes`);
-      
-      // Parse seguro
-      const text = await res.text();
-      const data = text ? JSON.parse(text) : null;
-      
-      setInscricoes(data || []);
+      const res = await apiGet('/coordenadores/dashboard');
+      if (!res.ok) throw new Error('Falha ao carregar painel');
+
+      const data = await res.json();
+      setInscricoes(data.inscricoes || []);
+      setResumo(data.resumo || null);
+      setOrientadores(data.orientadores || []);
+      setAlunosConcluidos((data.alunos || []).filter(aluno => aluno.etapa === 'concluido'));
+      setInscricoesAbertas(data.configuracoes.inscricoes_abertas);
+      setAnoAtivo(data.configuracoes.ano_ativo || new Date().getFullYear());
+      setAnoSelecionado(data.configuracoes.ano_ativo || new Date().getFullYear());
     } catch (err) {
-      console.error('Erro ao carregar inscrições:', err);
+      console.error('Erro ao carregar painel:', err);
       setError('Falha ao carregar propostas');
     } finally {
       setLoading(false);
@@ -56,39 +64,9 @@ const DashboardCoordenador = () => {
   };
 
   useEffect(() => {
-    loadInscricoes();
-    loadOrientadores();
-    carregarStatusInscricoes();
+    carregarDashboard();
   }, []);
 
-  const loadOrientadores = async () => {
-    try {
-      const res = await fetch(`${API_BASE_URL}/orientadores`);
-      
-      // Parse seguro
-      const text = await res.text();
-      const data = text ? JSON.parse(text) : null;
-      
-      setOrientadores(data?.orientadores || []);
-    } catch (err) {
-      console.error('Erro ao carregar orientadores:', err);
-    }
-  };
-
-  const carregarStatusInscricoes = async () => {
-    try {
-      const res = await fetch(`${API_BASE_URL}/coordenadores/configuracoes/inscricoes`);
-      if (!res.ok) throw new Error('Falha ao carregar status das inscrições');
-      
-      const data = await res.json();
-      setInscricoesAbertas(data.inscricoes_abertas);
-      setAnoAtivo(data.ano_ativo || new Date().getFullYear());
-      setAnoSelecionado(data.ano_ativo || new Date().getFullYear());
-    } catch (err) {
-      console.error('Erro ao carregar status das inscrições:', err);
-    }
-  };
-
   const alternarStatusInscricoes = async () => {
     const novoStatus = !inscricoesAbertas;
     
@@ -364,36 +342,6 @@ const DashboardCoordenador = () => {
   };
 
   // Funções para gerenciar certificados
-  const carregarAlunosConcluidos = async () => {
-    try {
-      const res = await fetch(`${API_BASE_URL}/coordenadores/alunos`);
-      const data = await res.json();
-      
-      // Acessar array de alunos corretamente
-      const todosAlunos = data.alunos || [];
-      
-      // Filtrar apenas alunos com projeto concluído
-      const concluidos = todosAlunos.filter(aluno => aluno.etapa === 'concluido');
-      
-      // Buscar status do certificado para cada aluno
-      const alunosComCertificado = await Promise.all(
-        concluidos.map(async (aluno) => {
-          try {
-            const certRes = await fetch(`${API_BASE_URL}/coordenadores/projetos/${aluno.projeto_id}/certificado`);
-            const certData = await certRes.json();
-            return { ...aluno, ...certData };
-          } catch {
-            return { ...aluno, tem_certificado: false };
-          }
-        })
-      );
-      
-      setAlunosConcluidos(alunosComCertificado);
-    } catch (err) {
-      console.error('Erro ao carregar alunos concluídos:', err);
-    }
-  };
-
   const enviarCertificado = async (projetoId, alunoNome) => {
     if (!certificadoFile) {
       alert('Por favor, selecione um arquivo PDF');
@@ -428,7 +376,7 @@ const DashboardCoordenador = () => {
       setCertificadoFile(null);
       
       // Recarregar lista de alunos concluídos
-      await carregarAlunosConcluidos();
+      await carregarDashboard();
     } catch (err) {
       console.error('Erro ao enviar certificado:', err);
       alert(`Erro ao enviar certificado: ${err.message}`);
@@ -500,11 +448,16 @@ const DashboardCoordenador = () => {
     i.status !== 'rejeitada_coordenador'
   );
 
+  // Totais por status vêm dos contadores do servidor (resumo do painel)
+  const porStatus = resumo?.inscricoes_por_status || {};
+  const somarStatus = (lista) => lista.reduce((total, st) => total + (porStatus[st] || 0), 0);
+  const rejeitados = somarStatus(['rejeitada', 'rejeitada_orientador', 'rejeitada_coordenador']);
+
   const estatisticas = {
-    total: inscricoesAtivas.length,
-    aprovados: inscricoesAtivas.filter(i => i.status === 'aprovada').length,
-    pendentes: inscricoesAtivas.filter(i => i.status === 'pendente' || i.status === 'em_analise' || i.status === 'pendente_coordenador' || i.status === 'pendente_orientador').length,
-    rejeitados: inscricoes.filter(i => i.status === 'rejeitada' || i.status === 'rejeitada_orientador' || i.status === 'rejeitada_coordenador').length,
+    total: (resumo?.total_inscricoes || 0) - rejeitados,
+    aprovados: somarStatus(['aprovada']),
+    pendentes: somarStatus(['pendente', 'em_analise', 'pendente_coordenador', 'pendente_orientador']),
+    rejeitados,
     alunos: [...new Set(inscricoesAtivas.filter(i => i.usuario_id).map(i => i.usuario_id))].length,
     orientadores: [...new Set(inscricoesAtivas.filter(i => i.orientador_id).map(i => i.orientador_id))].length
   };
@@ -643,7 +596,7 @@ const DashboardCoordenador = () => {
       console.log('Sucesso:', data);
       
       setFeedbackModal({ open: false, id: null, status: 'aprovado', mensagem: '' });
-      await loadInscricoes();
+      await carregarDashboard();
       alert(data.message || 'Decisão registrada com sucesso!');
     } catch (err) {
       console.error('Erro ao avaliar:', err);
@@ -843,7 +796,7 @@ const DashboardCoordenador = () => {
               <button
                 onClick={() => {
                   setActiveTab('certificados');
-                  carregarAlunosConcluidos();
+                  carregarDashboard();
                 }}
                 className={`px-6 py-3 font-semibold transition ${
                   activeTab === 'certificados'
@@ -1163,14 +1116,13 @@ const DashboardCoordenador = () => {
                                 {e.arquivo && (
                                   <p>
                                     <strong>Arquivo:</strong>{' '}
-                                    <a 
-                                      href={`${API_BASE_URL}/uploads/entregas/${e.arquivo}`}
-                                      target="_blank"
-                                      rel="noopener noreferrer"
+                                    <button
+                                      type="button"
+                                      onClick={() => abrirArquivo(API_BASE_URL, 'entregas', e.arquivo)}
                                       className="text-blue-600 hover:underline"
                                     >
                                       📎 {e.arquivo}
-                                    </a>
+                                    </button>
                                   </p>
                                 )}
                                 
@@ -1276,14 +1228,13 @@ const DashboardCoordenador = () => {
                                 {e.arquivo && (
                                   <p>
                                     <strong>Arquivo:</strong>{' '}
-                                    <a 
-                                      href={`${API_BASE_URL}/uploads/entregas/${e.arquivo}`}
-                                      target="_blank"
-                                      rel="noopener noreferrer"
+                                    <button
+                                      type="button"
+                                      onClick={() => abrirArquivo(API_BASE_URL, 'entregas', e.arquivo)}
                                       className="text-blue-600 hover:underline"
                                     >
                                       📎 {e.arquivo}
-                                    </a>
+                                    </button>
                                   </p>
                                 )}
                                 
@@ -1384,14 +1335,13 @@ const DashboardCoordenador = () => {
                                 {e.arquivo && (
                                   <p>
                                     <strong>Arquivo:</strong>{' '}
-                                    <a 
-                                      href={`${API_BASE_URL}/uploads/entregas/${e.arquivo}`}
-                                      target="_blank"
-                                      rel="noopener noreferrer"
+                                    <button
+                                      type="button"
+                                      onClick={() => abrirArquivo(API_BASE_URL, 'entregas', e.arquivo)}
                                       className="text-blue-600 hover:underline"
                                     >
                                       📎 {e.arquivo}
-                                    </a>
+                                    </button>
                                   </p>
                                 )}
                                 
@@ -1725,7 +1675,7 @@ const DashboardCoordenador = () => {
               <h3 className="text-xl font-bold text-ibmec-blue-700 mb-4">
                 📥 Exportar Relatórios
               </h3>
-              <div className="grid md:grid-cols-3 gap-4">
+              <div className="grid md:grid-cols-4 gap-4">
                 <button className="btn-primary">
                   📄 Exportar PDF
                 </button>
@@ -1735,6 +1685,16 @@ const DashboardCoordenador = () => {
                 <button className="btn-outline">
                   📧 Enviar por Email
                 </button>
+                <button
+                  type="button"
+                  className="btn-outline"
+                  onClick={() => {
+                    const ano = filterAno !== 'todos' ? filterAno : new Date().getFullYear();
+                    abrirLinkAutenticado(`${API_BASE_URL}/coordenadores/exportar/${ano}/link`);
+                  }}
+                >
+                  🗂️ Arquivos do Ano (ZIP)
+                </button>
               </div>
             </Card>
           </div>
@@ -2,11 +2,14 @@ import { useEffect, useState, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import Card from '../components/Card';
 import API_BASE_URL from '../config/api';
+import { abrirArquivo } from '../utils/fetchHelpers';
+import { apiGet } from '../utils/api';
 
 const DashboardOrientador = () => {
   const { user, updateUser } = useAuth();
   const userIdRef = useRef(user?.id);
   const hasFetchedRef = useRef(false);
+  const selectedAlunoRef = useRef(null);
   const [activeTab, setActiveTab] = useState('propostas');
   const [alunos, setAlunos] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -33,97 +36,55 @@ const DashboardOrientador = () => {
   // Estados para resposta ao coordenador
   const [respostaModal, setRespostaModal] = useState({ open: false, relatorioId: null, resposta: '', relatorioInfo: null });
 
-  // Buscar dados atualizados do usuário
-  useEffect(() => {
-    const fetchUserData = async () => {
-      if (!user?.id) return;
-      
-      try {
-        console.log('🔍 Buscando dados do orientador ID:', user.id);
-        const response = await fetch(`${API_BASE_URL}/usuarios/${user.id}`);
-        if (response.ok) {
-          try {
-            const text = await response.text();
-            const data = text ? JSON.parse(text) : null;
-            if (data) {
-              console.log('✅ Dados recebidos do backend:', data);
-              setUserData(data);
-              // NÃO atualizar o contexto global aqui para evitar loop infinito
-            }
-          } catch (parseError) {
-            console.error('❌ Erro ao fazer parse da resposta:', parseError);
-          }
-        } else {
-          console.error('❌ Erro na resposta:', response.status);
-        }
-      } catch (error) {
-        console.error('❌ Erro ao buscar dados do usuário:', error);
+  const mostrarDetalhesAluno = (aluno) => {
+    setEntregas(aluno.entregas || []);
+    setRelatorios(aluno.relatorios_mensais || []);
+    setEtapaAtual(aluno.etapa || 'proposta');
+  };
+
+  // Painel completo (dados do orientador, orientandos com entregas e relatórios,
+  // propostas pendentes) em uma requisição; o navegador revalida pela ETag
+  const carregarPainel = async (alunoSelecionadoId = null) => {
+    if (!user?.id) return;
+    try {
+      const res = await apiGet(`/orientadores/${user.id}/painel`);
+      if (!res.ok) throw new Error('Falha ao carregar painel');
+      const painel = await res.json();
+
+      setUserData(painel.usuario);
+      setAlunos(painel.alunos || []);
+      setPropostasPendentes(painel.propostas_pendentes || []);
+      if (alunoSelecionadoId) {
+        const aluno = (painel.alunos || []).find(a => a.aluno_id === alunoSelecionadoId);
+        if (aluno) mostrarDetalhesAluno(aluno);
       }
-    };
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoading(false);
+      setLoadingPropostas(false);
+    }
+  };
 
+  useEffect(() => {
     if (user?.id) {
       // Verificar se já fez fetch ou se o ID mudou
       if (!hasFetchedRef.current || userIdRef.current !== user.id) {
         console.log('👤 Usuário atual:', user);
         userIdRef.current = user.id;
         hasFetchedRef.current = true;
-        fetchUserData();
+        setLoadingPropostas(true);
+        carregarPainel();
       }
     } else {
       hasFetchedRef.current = false;
     }
-  }, [user?.id]); // Removido updateUser das dependências
-
-  useEffect(() => {
-    const fetchAlunos = async () => {
-      try {
-        const res = await fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos`);
-        if (!res.ok) throw new Error('Falha ao carregar alunos');
-        
-        let data = null;
-        try {
-          const text = await res.text();
-          data = text ? JSON.parse(text) : null;
-        } catch (parseError) {
-          throw new Error('Erro ao processar resposta do servidor');
-        }
-        
-        setAlunos(data?.alunos || []);
-      } catch (err) {
-        setError(err.message);
-      } finally {
-        setLoading(false);
-      }
-    };
-    if (user?.id) fetchAlunos();
-  }, [user?.id]);
-
-  // Buscar propostas pendentes
-  useEffect(() => {
-    const fetchPropostasPendentes = async () => {
-      if (!user?.id) return;
-      setLoadingPropostas(true);
-      try {
-        const res = await fetch(`${API_BASE_URL}/inscricoes/orientador/${user.id}/pendentes`);
-        if (!res.ok) throw new Error('Falha ao carregar propostas');
-        const data = await res.json();
-        setPropostasPendentes(data.propostas || []);
-      } catch (err) {
-        console.error('Erro ao carregar propostas:', err);
-      } finally {
-        setLoadingPropostas(false);
-      }
-    };
-    
-    if (user?.id) {
-      fetchPropostasPendentes();
-    }
-    // Atualizar a cada 30 segundos
+    // Atualizar a cada 30 segundos (sem mudanças o servidor responde 304)
     const interval = setInterval(() => {
-      if (user?.id) fetchPropostasPendentes();
+      if (user?.id) carregarPainel(selectedAlunoRef.current);
     }, 30000);
     return () => clearInterval(interval);
-  }, [user?.id]);
+  }, [user?.id]); // Removido updateUser das dependências
 
   const abrirModalProposta = (proposta) => {
     setSelectedProposta(proposta);
@@ -173,10 +134,8 @@ const DashboardOrientador = () => {
       const data = await res.json();
       alert(data.message);
       
-      // Recarregar lista de entregas (filtrar relatórios mensais)
-      const resEnt = await fetch(`${API_BASE_URL}/orientadores/${user.id}/alunos/${selectedAluno.aluno_id}/entregas`);
-      const dataEnt = await resEnt.json();
-      setEntregas((dataEnt.entregas || []).filter(e => e.tipo !== 'relatorio_mensal'));
+      // Recarregar entregas do aluno
+      await carregarPainel(selectedAluno.aluno_id);
       
       fecharModalEntrega();
     } catch (err) {
@@ -224,10 +183,8 @@ const DashboardOrientador = () => {
       console.log('Sucesso:', data);
       alert(data.message);
       
-      // Recarregar lista de propostas
-      const resProp = await fetch(`${API_BASE_URL}/inscricoes/orientador/${user.id}/pendentes`);
-      const dataProp = await resProp.json();
-      setPropostasPendentes(dataProp.propostas || []);
+      // Recarregar propostas e alunos
+      await carregarPainel(selectedAluno?.aluno_id);
       
       fecharModal();
     } catch (err) {
@@ -238,26 +195,11 @@ const DashboardOrientador = () => {
     }
   };
 
-  const openAluno = async (aluno) => {
+  const openAluno = (aluno) => {
     setSelectedAluno(aluno);
-    setEntregas([]);
-    setRelatorios([]);
-    try {
-      const [resEnt, resRel, resEtapa] = await Promise.all([
-        fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${aluno.aluno_id}/entregas`),
-        fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${aluno.aluno_id}/relatorios-mensais`),
-        fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${aluno.aluno_id}/status-etapa`),
-      ]);
-      const dataEnt = await resEnt.json();
-      const dataRel = await resRel.json();
-      const dataEtapa = await resEtapa.json();
-      setEntregas((dataEnt.entregas || []).filter(e => e.tipo !== 'relatorio_mensal'));
-      setRelatorios(dataRel.relatorios || []);
-      setEtapaAtual(dataEtapa.etapa || 'proposta');
-      setActiveTab('detalhes');
-    } catch (err) {
-      setError('Falha ao carregar detalhes do aluno');
-    }
+    selectedAlunoRef.current = aluno.aluno_id;
+    mostrarDetalhesAluno(aluno);
+    setActiveTab('detalhes');
   };
 
   const handleUploadChange = (e) => {
@@ -289,9 +231,7 @@ const DashboardOrientador = () => {
       if (!res.ok) throw new Error('Falha ao enviar relatório');
       const data = await res.json();
       // Recarregar lista
-      const resRel = await fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${selectedAluno.aluno_id}/relatorios-mensais`);
-      const dataRel = await resRel.json();
-      setRelatorios(dataRel.relatorios || []);
+      await carregarPainel(selectedAluno.aluno_id);
       setUploadState({ mes: '', descricao: '', arquivo: null, sending: false });
       alert('Relatório enviado com sucesso!');
     } catch (err) {
@@ -314,10 +254,8 @@ const DashboardOrientador = () => {
         body: fd,
       });
       if (!res.ok) throw new Error('Falha ao enviar entrega da etapa');
-      // reload entregas (filtrar relatórios mensais)
-      const resEnt = await fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${selectedAluno.aluno_id}/entregas`);
-      const dataEnt = await resEnt.json();
-      setEntregas((dataEnt.entregas || []).filter(e => e.tipo !== 'relatorio_mensal'));
+      // reload entregas
+      await carregarPainel(selectedAluno.aluno_id);
       setUploadState({ mes: '', descricao: '', arquivo: null, sending: false });
       alert('Entrega da etapa enviada com sucesso!');
     } catch (err) {
@@ -362,11 +300,7 @@ const DashboardOrientador = () => {
       alert(data.message || 'Mensagem enviada com sucesso!');
 
       // Recarregar relatórios
-      if (selectedAluno) {
-        const resRel = await fetch(`${API_BASE_URL}/orientadores/${user?.id}/alunos/${selectedAluno.aluno_id}/relatorios-mensais`);
-        const dataRel = await resRel.json();
-        setRelatorios(dataRel.relatorios || []);
-      }
+      await carregarPainel(selectedAluno?.aluno_id);
 
       // Fechar modal
       setRespostaModal({ open: false, relatorioId: null, resposta: '', relatorioInfo: null });
@@ -722,14 +656,13 @@ const DashboardOrientador = () => {
                             {entrega.arquivo && (
                               <p className="text-sm">
                                 <span className="font-semibold">Arquivo:</span>{' '}
-                                <a
-                                  href={`${API_BASE_URL.replace('/api', '')}/uploads/entregas/${entrega.arquivo}`}
-                                  target="_blank"
-                                  rel="noopener noreferrer"
+                                <button
+                                  type="button"
+                                  onClick={() => abrirArquivo(API_BASE_URL, 'entregas', entrega.arquivo)}
                                   className="text-ibmec-blue-600 hover:underline"
                                 >
                                   📎 {entrega.arquivo}
-                                </a>
+                                </button>
                               </p>
                             )}
                             
@@ -926,9 +859,9 @@ const DashboardOrientador = () => {
                           <p className="text-xs text-gray-500 mt-1">Enviado em {new Date(r.data_envio).toLocaleString('pt-BR')}</p>
                         </div>
                         {r.arquivo && (
-                          <a className="btn-outline text-sm ml-4" href={`${API_BASE_URL.replace('/api', '')}/uploads/${r.arquivo}`} target="_blank" rel="noopener noreferrer">
+                          <button type="button" className="btn-outline text-sm ml-4" onClick={() => abrirArquivo(API_BASE_URL, 'relatorios', r.arquivo)}>
                             ⬇️ Baixar
-                          </a>
+                          </button>
                         )}
                       </div>
                       
@@ -1120,14 +1053,13 @@ const DashboardOrientador = () => {
                       <label className="block text-sm font-semibold text-gray-700 mb-1">
                         Arquivo Anexado:
                       </label>
-                      <a
-                        href={`${API_BASE_URL.replace('/api', '')}/uploads/propostas/${selectedProposta.arquivo_projeto}`}
-                        target="_blank"
-                        rel="noopener noreferrer"
+                      <button
+                        type="button"
+                        onClick={() => abrirArquivo(API_BASE_URL, 'propostas', selectedProposta.arquivo_projeto)}
                         className="inline-flex items-center gap-2 bg-gray-100 hover:bg-gray-200 text-gray-800 px-4 py-2 rounded transition"
                       >
                         📎 {selectedProposta.arquivo_projeto}
-                      </a>
+                      </button>
                     </div>
                   )}
                 </div>
@@ -1244,15 +1176,14 @@ const DashboardOrientador = () => {
               {entregaSelecionada.arquivo && (
                 <div>
                   <h3 className="text-lg font-bold text-ibmec-blue-700 mb-3">📎 Arquivo Anexado</h3>
-                  <a
-                    href={`${API_BASE_URL.replace('/api', '')}/uploads/entregas/${entregaSelecionada.arquivo}`}
-                    target="_blank"
-                    rel="noopener noreferrer"
+                  <button
+                    type="button"
+                    onClick={() => abrirArquivo(API_BASE_URL, 'entregas', entregaSelecionada.arquivo)}
                     className="inline-flex items-center gap-2 bg-gray-100 hover:bg-gray-200 text-gray-800 px-4 py-3 rounded transition"
                   >
                     📄 {entregaSelecionada.arquivo}
                     <span className="text-xs text-gray-600">- Clique para visualizar</span>
-                  </a>
+                  </button>
                 </div>
               )}
 
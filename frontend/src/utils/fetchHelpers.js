@@ -129,3 +129,55 @@ export const safeDelete = async (url, headers = {}) => {
     },
   });
 };
+
+/**
+ * Busca todas as páginas de uma listagem paginada por cursor (next_cursor)
+ * @param {string} url - URL da listagem (pode já conter filtros na query string)
+ * @param {string} chave - Campo da resposta com os itens (ex.: 'alunos', 'inscricoes')
+ * @returns {Promise<Array>} - Itens de todas as páginas
+ */
+export const fetchTodasPaginas = async (url, chave) => {
+  const itens = [];
+  let cursor = null;
+
+  do {
+    const separador = url.includes('?') ? '&' : '?';
+    const pageUrl = cursor ? `${url}${separador}cursor=${encodeURIComponent(cursor)}` : url;
+    const data = await safeGet(pageUrl);
+    itens.push(...(data?.[chave] || []));
+    cursor = data?.next_cursor || null;
+  } while (cursor);
+
+  return itens;
+};
+
+/**
+ * Pede à API um link temporário (rotas .../link, autenticadas com o token do
+ * login) e abre o link em nova aba.
+ * @param {string} urlDoLink - URL da rota que devolve { url, expira_em }
+ */
+export const abrirLinkAutenticado = async (urlDoLink) => {
+  // Abre a aba antes do await para não ser bloqueada como pop-up
+  const aba = window.open('', '_blank');
+  try {
+    const token = localStorage.getItem('token');
+    const data = await safeGet(urlDoLink, token ? { Authorization: `Bearer ${token}` } : {});
+    if (aba) {
+      aba.location.href = data.url;
+    } else {
+      window.location.href = data.url;
+    }
+  } catch (error) {
+    aba?.close();
+    alert(error.message || 'Não foi possível abrir o arquivo');
+  }
+};
+
+/**
+ * Abre um arquivo enviado (proposta, entrega, relatório, certificado) em nova aba.
+ * @param {string} apiBaseUrl - URL base da API (API_BASE_URL)
+ * @param {string} categoria - 'propostas', 'entregas', 'relatorios', 'certificados' ou 'documentos_cr'
+ * @param {string} nome - Nome do arquivo gravado no registro
+ */
+export const abrirArquivo = (apiBaseUrl, categoria, nome) =>
+  abrirLinkAutenticado(`${apiBaseUrl}/arquivos/${categoria}/${encodeURIComponent(nome)}/link`);